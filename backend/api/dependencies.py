@@ -0,0 +1,75 @@
+"""FastAPI dependencies that resolve the shared services.
+
+Services are created on first use (or at startup by the lifespan), not
+at import. The dependencies are coroutines so FastAPI resolves them on
+the event loop instead of sending each one to the thread pool. Tests
+swap services with `app.dependency_overrides`.
+"""
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException
+
+from api.services.cache_service import CacheService, get_cache_service
+from api.services.core_service import CoreService, get_core_service
+from api.services.embedding_service import (
+    EmbeddingService, get_embedding_service
+)
+from api.services.logging_service import LogService, get_log_service
+from api.services.loop_monitor_service import (
+    EventLoopMonitor, get_loop_monitor
+)
+from api.services.profiling_service import (
+    ProfilingService, get_profiling_service
+)
+from api.services.routing_service import RoutingService, get_routing_service
+
+
+async def cache_dependency() -> CacheService:
+    """Resolve the shared cache service."""
+    return get_cache_service()
+
+
+async def core_dependency() -> CoreService:
+    """Resolve the shared core service."""
+    return get_core_service()
+
+
+async def embedding_dependency() -> EmbeddingService:
+    """Resolve the shared embedding service."""
+    return get_embedding_service()
+
+
+async def routing_dependency() -> RoutingService:
+    """Resolve the shared routing service."""
+    return get_routing_service()
+
+
+async def log_dependency() -> LogService:
+    """Resolve the shared log service."""
+    return get_log_service()
+
+
+async def loop_monitor_dependency() -> EventLoopMonitor:
+    """Resolve the shared event loop monitor."""
+    return get_loop_monitor()
+
+
+async def profiling_dependency() -> ProfilingService:
+    """Resolve the shared profiling service."""
+    return get_profiling_service()
+
+
+async def admin_dependency(
+    x_admin_token: Optional[str] = Header(default=None),
+    profiling: ProfilingService = Depends(profiling_dependency),
+) -> None:
+    """Require the admin token in the X-Admin-Token header.
+
+    Raises:
+        HTTPException: 404 if ADMIN_TOKEN isn't set, so the admin
+            endpoints don't exist, 403 if the token doesn't match
+    """
+    if not profiling.enabled:
+        raise HTTPException(status_code=404, detail='Not Found')
+    if not profiling.authorize(x_admin_token):
+        raise HTTPException(status_code=403, detail='Invalid admin token')
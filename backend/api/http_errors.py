@@ -0,0 +1,76 @@
+"""HTTP errors shared by the API routers.
+
+Routers map service failures to the same status codes, headers and
+details through these helpers, so the 429 and 503 responses of the
+chat and embedding endpoints stay in step.
+"""
+import math
+
+from fastapi import HTTPException
+
+from api.services.cache_service import (
+    CacheService, ClientConcurrencyExceeded
+)
+from api.services.concurrency_service import ConcurrencyLimitExceeded
+from api.services.model_health_service import (
+    ModelNotFound, ModelUnavailable, ModelUnsupported
+)
+from api.services.rate_limit_service import RateLimitExceeded
+
+
+async def check_rate_limit(cache: CacheService, client_ip: str) -> None:
+    """Raise 429 if the client is over its rate limit.
+
+    Args:
+        cache (CacheService): Rate limiter.
+        client_ip (str): Client identifier for rate limiting.
+
+    Raises:
+        HTTPException: 429 if the rate limit is exceeded.
+    """
+    is_allowed, _ = await cache.check_rate_limit(client_ip)
+    if not is_allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f'Rate limit exceeded. Max {cache.rate_limit_max} '
+            f'requests per {cache.rate_limit_window} seconds',
+        )
+
+
+def generation_error(
+    e: Exception, action: str = 'Generation'
+) -> HTTPException:
+    """Map a generation or embedding failure to an HTTP error.
+
+    Args:
+        e (Exception): The exception raised while calling the model.
+        action (str): What failed, for the 500 detail.
+            Defaults to 'Generation'.
+
+    Returns:
+        HTTPException: 404 if the model isn't available, 400 if it
+            can't serve the request, 429 if the client ran out of
+            quota or has too many generations in flight, 503 if
+            Ollama shed the request or the model is failing, 500
+            otherwise.
+    """
+    if isinstance(e, ModelNotFound):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, ModelUnsupported):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, ModelUnavailable):
+        return HTTPException(
+            status_code=503, detail=str(e),
+            headers={'Retry-After': str(math.ceil(e.retry_after))},
+        )
+    if isinstance(e, RateLimitExceeded):
+        return HTTPException(status_code=429, detail=str(e))
+    if isinstance(e, ClientConcurrencyExceeded):
+        return HTTPException(
+            status_code=429, detail=str(e), headers={'Retry-After': '1'}
+        )
+    if isinstance(e, ConcurrencyLimitExceeded):
+        return HTTPException(
+            status_code=503, detail=str(e), headers={'Retry-After': '1'}
+        )
+    return HTTPException(status_code=500, detail=f'{action} failed: {str(e)}')
@@ -1,31 +1,100 @@
-import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.middlewares.access_log_middleware import AccessLogMiddleware
+from api.middlewares.capture_middleware import CaptureMiddleware
+from api.middlewares.profile_middleware import ProfileMiddleware
+from api.responses import FastJSONResponse
 from api.routers.v1.api_main_router import api_v1_router
-from api.services.config_service import config_service
+from api.services.cache_service import get_cache_service
+from api.services.capture_service import get_capture_service
+from api.services.config_service import get_config_service, get_settings
+from api.services.core_service import get_core_service
+from api.services.embedding_service import get_embedding_service
+from api.services.logging_service import get_log_service
+from api.services.loop_monitor_service import get_loop_monitor
+from api.services.profiling_service import get_profiling_service
+from api.services.routing_service import get_routing_service
 
 
-# Load environment variables
+# Load environment variables before any settings are parsed; nothing
+# reads the environment at import
 load_dotenv()
+settings = get_settings()
+config_service = get_config_service()
+
+# Shared services, built at startup
+_SERVICE_GETTERS = (
+    get_core_service,
+    get_cache_service,
+    get_embedding_service,
+    get_routing_service,
+    get_capture_service,
+    get_profiling_service,
+    get_loop_monitor,
+    get_log_service,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the services on startup and release them on shutdown.
+
+    Services are built here rather than at import, so importing the
+    app stays cheap and the first request doesn't pay for client
+    construction. Structured logging starts first and stops last, so
+    the other services' start and shutdown are logged; request capture
+    opens its file and the event loop monitor starts with them. On
+    shutdown background writers are flushed and connections closed,
+    and the services are dropped so a restarted app builds fresh ones.
+    """
+    get_log_service().start()
+    for getter in _SERVICE_GETTERS:
+        getter()
+    get_capture_service().start()
+    get_loop_monitor().start()
+    yield
+    await get_loop_monitor().stop()
+    get_capture_service().close()
+    await get_cache_service().close()
+    await get_core_service().close()
+    get_log_service().close()
+    for getter in _SERVICE_GETTERS:
+        getter.cache_clear()
+
 
 # FastAPI application instance
 app = FastAPI(
     title=config_service.get_api_title(),
     description=config_service.get_project_description(),
     version=config_service.get_project_version(),
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.getenv('ALLOWED_ORIGINS', '*').split(','),
+    allow_origins=settings.allowed_origins.split(','),
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
 )
 
+# Sample chat requests for replay when CAPTURE_PATH is set
+if settings.capture_path and settings.capture_sample_rate > 0:
+    app.add_middleware(CaptureMiddleware)
+
+# Structured access logs, sampled by LOG_ACCESS_SAMPLE_RATE
+if settings.log_access_sample_rate > 0:
+    app.add_middleware(AccessLogMiddleware)
+
+# Per-request profiling with X-Profile, only when ADMIN_TOKEN is set
+if settings.admin_token:
+    app.add_middleware(ProfileMiddleware)
+
 # Register Routers
 app.include_router(router=api_v1_router)
@@ -0,0 +1,75 @@
+"""ASGI middleware that writes structured access logs."""
+import time
+
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.middlewares.response_recorder import ResponseRecorder
+from api.services.logging_service import log_access
+
+
+class AccessLogMiddleware:
+    """Log every HTTP request with its route, status and latency.
+
+    The status and X-Cache header are taken from the response start,
+    and the route template from the scope once the router has matched
+    it. Ask routes put the model and mode on the request state, so
+    they are logged for cache hits too. Records go to the 'api.access'
+    logger; `LogService` samples them and writes them off the event
+    loop.
+
+    Attributes:
+        app: Wrapped ASGI application
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        response = ResponseRecorder(send)
+        root_path = scope.get('root_path', '')
+        scope.setdefault('state', {})
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, response)
+        finally:
+            client = scope.get('client')
+            state = scope['state']
+            log_access(
+                scope['method'],
+                scope['path'],
+                _route_template(scope, root_path),
+                response.status,
+                (response.started_at or time.perf_counter()) - start,
+                response.cache,
+                client[0] if client else None,
+                state.get('model'),
+                state.get('mode'),
+            )
+
+
+def _route_template(scope: Scope, root_path: str) -> Optional[str]:
+    """Get the full path template of the matched route.
+
+    Mounted apps match their routes against the path below the mount
+    and extend the scope's root_path by the mount path, so that part
+    is put back in front of the route's own template.
+
+    Args:
+        scope (Scope): Request scope after routing
+        root_path (str): root_path before the app handled the request
+
+    Returns:
+        Optional[str]: The path template, or None if no route matched
+    """
+    path = getattr(scope.get('route'), 'path', None)
+    if path is None:
+        return None
+    return scope.get('root_path', '')[len(root_path):] + path
@@ -0,0 +1,75 @@
+"""ASGI middleware that samples chat requests for replay."""
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.middlewares.response_recorder import ResponseRecorder
+from api.services.capture_service import (
+    RequestCaptureService, get_capture_service
+)
+
+
+class CaptureMiddleware:
+    """Capture a sample of requests under `prefix`.
+
+    Requests that aren't sampled are passed straight through. For
+    sampled ones the body is collected as the app reads it and the
+    status and X-Cache header are taken from the response start, so
+    nothing is buffered ahead of the app.
+
+    Attributes:
+        app: Wrapped ASGI application
+        prefix: Path prefix of captured requests
+        capture: Capture service the records are written through,
+            the shared one when not given
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        prefix: str = '/v1/chats/',
+        capture: Optional[RequestCaptureService] = None,
+    ):
+        self.app = app
+        self.prefix = prefix
+        self._capture = capture
+
+    @property
+    def capture(self) -> RequestCaptureService:
+        """Capture service given at construction, or the shared one."""
+        if self._capture is not None:
+            return self._capture
+        return get_capture_service()
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http' \
+                or not scope['path'].startswith(self.prefix) \
+                or not self.capture.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        chunks: list[bytes] = []
+        response = ResponseRecorder(send)
+        start = time.perf_counter()
+
+        async def capture_receive() -> Message:
+            message = await receive()
+            if message['type'] == 'http.request':
+                chunks.append(message.get('body', b''))
+            return message
+
+        try:
+            await self.app(scope, capture_receive, response)
+        finally:
+            self.capture.capture(
+                scope['path'],
+                response.status,
+                time.perf_counter() - start,
+                b''.join(chunks),
+                response.cache,
+                method=scope['method'],
+                query_string=scope.get('query_string', b''),
+            )
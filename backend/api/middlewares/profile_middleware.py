@@ -0,0 +1,81 @@
+"""ASGI middleware that profiles single requests on request."""
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.services.profiling_service import (
+    ProfilingService, get_profiling_service
+)
+
+
+class ProfileMiddleware:
+    """Profile requests to `path` that send an X-Profile header.
+
+    The request must also carry the admin token in X-Admin-Token;
+    otherwise the header is ignored. The handler runs under cProfile
+    until the response starts, and the response gets an X-Profile-Id
+    header to fetch the report from
+    `/v1/admin/profile/requests/{id}`, or `X-Profile: busy` if another
+    profile was running. Other requests only pay for a path check.
+
+    The profiler is attached to the event loop thread, so requests
+    handled concurrently on the same worker appear in the report too.
+
+    Attributes:
+        app: Wrapped ASGI application
+        path: Path of profiled requests
+        profiling: Profiling service, the shared one when not given
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path: str = '/v1/chats/ask',
+        profiling: Optional[ProfilingService] = None,
+    ):
+        self.app = app
+        self.path = path
+        self._profiling = profiling
+
+    @property
+    def profiling(self) -> ProfilingService:
+        """Profiling service given at construction, or the shared one."""
+        if self._profiling is not None:
+            return self._profiling
+        return get_profiling_service()
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if 'x-profile' not in headers or not self.profiling.authorize(
+            headers.get('x-admin-token')
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self.profiling.start_request_profile()
+        label = f"{scope['method']} {scope['path']}"
+
+        async def profile_send(message: Message) -> None:
+            nonlocal profiler
+            if message['type'] == 'http.response.start':
+                header = (b'x-profile', b'busy')
+                if profiler is not None:
+                    profile_id = await self.profiling.finish_request_profile(
+                        profiler, label
+                    )
+                    profiler = None
+                    header = (b'x-profile-id', profile_id.encode())
+                message['headers'] = [*message.get('headers', []), header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profile_send)
+        finally:
+            if profiler is not None:
+                await self.profiling.finish_request_profile(profiler, label)
@@ -0,0 +1,36 @@
+"""Send wrapper recording what a response started with."""
+import time
+from typing import Optional
+
+from starlette.types import Message, Send
+
+
+class ResponseRecorder:
+    """Wrap an ASGI `send` to note the response's status and cache.
+
+    Middlewares pass the recorder to the app in place of `send`; once
+    the response has started, its status, X-Cache header and start
+    time are available. Until then the status reads as 500, which is
+    what the server sends if the app fails before responding.
+
+    Attributes:
+        status: Response status code
+        cache: Value of the X-Cache header, None if absent
+        started_at: `time.perf_counter()` at the response start, None
+            until it is sent
+    """
+
+    def __init__(self, send: Send):
+        self._send = send
+        self.status = 500
+        self.cache: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            self.started_at = time.perf_counter()
+            for name, value in message.get('headers', []):
+                if name.lower() == b'x-cache':
+                    self.cache = value.decode('latin-1')
+        await self._send(message)
@@ -0,0 +1,22 @@
+from enum import StrEnum
+
+from pydantic import BaseModel
+
+
+class CpuProfileFormat(StrEnum):
+    PSTATS = 'pstats'
+    COLLAPSED = 'collapsed'
+
+
+class AllocationSite(BaseModel):
+    file: str
+    line: int
+    size_bytes: int
+    count: int
+
+
+class MemoryProfileResponse(BaseModel):
+    seconds: float
+    traced_current_bytes: int
+    traced_peak_bytes: int
+    top: list[AllocationSite] = []
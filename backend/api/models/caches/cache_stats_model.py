@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+
+
+class ModelModeStats(BaseModel):
+    model: str
+    mode: str
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class HotPrompt(BaseModel):
+    key: str
+    count: int
+    prompt: str
+
+
+class CacheMemoryStats(BaseModel):
+    pattern: str
+    keys: int
+    sampled_keys: int
+    sampled_bytes: int
+    estimated_bytes: int
+
+
+class CacheStatsResponse(BaseModel):
+    workers: int
+    lookups: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    distinct_prompts: int
+    by_model_mode: list[ModelModeStats] = []
+    top_prompts: list[HotPrompt] = []
+    memory: CacheMemoryStats
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 from enum import StrEnum
 
 from pydantic import BaseModel, Field
@@ -12,8 +12,24 @@ class AskMode(StrEnum):
     FRIENDLY = 'friendly'
 
 
+class GenerationOptions(BaseModel):
+    num_predict: Optional[int] = Field(
+        default=None, ge=1,
+        description='Maximum tokens to generate (capped by the server)',
+    )
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0)
+    num_ctx: Optional[int] = Field(
+        default=None, ge=256,
+        description='Context window size (capped by the server)',
+    )
+    stop: Optional[list[str]] = Field(default=None, max_length=4)
+
+
 class AskRequest(BaseModel):
-    model: str = 'llama3.2'
+    model: str = Field(
+        default='llama3.2',
+        description="Ollama model name, or 'auto' to route by complexity",
+    )
     prompt: str = 'hello world'
     mode: Literal[
         AskMode.CONCISE, AskMode.PROFESSIONAL, AskMode.SARCASTIC,
@@ -25,6 +41,23 @@ class AskRequest(BaseModel):
             'sarcastic (witty), creative (imaginative), friendly (casual)'
         )
     )
+    modes: Optional[list[AskMode]] = Field(
+        default=None, min_length=1, max_length=len(AskMode),
+        description=(
+            'Answer in several modes at once; overrides mode and returns '
+            'an AskMultiResponse'
+        ),
+    )
+    options: Optional[GenerationOptions] = Field(
+        default=None,
+        description='Overrides for the per-mode generation defaults',
+    )
+
+
+class RouteDecision(BaseModel):
+    tier: str
+    model: str
+    reason: str
 
 
 class AskResponse(BaseModel):
@@ -33,3 +66,21 @@ class AskResponse(BaseModel):
     created_at: str
     done: bool
     mode: str
+    route: Optional[RouteDecision] = None
+
+
+class ModeError(BaseModel):
+    mode: str
+    status: int
+    detail: str
+
+
+class AskMultiResponse(BaseModel):
+    model: str
+    responses: list[AskResponse]
+    route: Optional[RouteDecision] = None
+    errors: list[ModeError] = Field(
+        default_factory=list,
+        description='Modes that failed to generate, with the HTTP status '
+                    'a single-mode ask would have returned',
+    )
@@ -0,0 +1,18 @@
+from typing import Annotated, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class EmbeddingRequest(BaseModel):
+    model: Optional[str] = Field(
+        default=None,
+        description='Ollama embedding model (defaults to EMBED_MODEL)',
+    )
+    input: Union[
+        str, Annotated[list[str], Field(min_length=1, max_length=256)]
+    ] = Field(description='Text or list of up to 256 texts to embed')
+
+
+class EmbeddingResponse(BaseModel):
+    model: str
+    embeddings: list[list[float]]
@@ -12,4 +12,16 @@ class HealthCheckResponse(BaseModel):
     ollama: str
     redis: str
     available_models: Optional[list] = []
+    event_loop: dict = {}
     error: Optional[str] = None
+
+
+class MetricsResponse(BaseModel):
+    concurrency: dict
+    embeddings: dict = {}
+    rate_limit: dict = {}
+    cache_writes: dict = {}
+    models: dict = {}
+    ollama_pool: dict = {}
+    event_loop: dict = {}
+    logging: dict = {}
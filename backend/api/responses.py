@@ -0,0 +1,18 @@
+"""Response classes for the API."""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from api.services import json_service
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the shared serializer.
+
+    Drop-in replacement for `JSONResponse` that encodes with orjson
+    when it is installed and with the stdlib otherwise. The body format
+    is the same either way, so it is the app's default response class.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_service.dumps(content)
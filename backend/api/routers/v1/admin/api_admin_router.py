@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from api.dependencies import admin_dependency, profiling_dependency
+from api.models.admin.profile_model import (
+    CpuProfileFormat, MemoryProfileResponse
+)
+from api.services.profiling_service import ProfilerBusy, ProfilingService
+
+
+api_admin_router = APIRouter(
+    prefix='/admin',
+    tags=['admin'],
+    dependencies=[Depends(admin_dependency)],
+)
+
+
+@api_admin_router.get('/profile/cpu', response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(default=5, gt=0),
+    output: CpuProfileFormat = Query(
+        default=CpuProfileFormat.PSTATS, alias='format'
+    ),
+    sort: str = 'cumulative',
+    limit: int = Query(default=50, ge=1, le=1000),
+    profiling: ProfilingService = Depends(profiling_dependency),
+) -> PlainTextResponse:
+    """Profile this worker's CPU use for a time window.
+
+    Args:
+        seconds (float): Window length, capped by PROFILE_MAX_SECONDS.
+        output (CpuProfileFormat): 'pstats' for a cProfile report of
+            the event loop thread, 'collapsed' for sampled stacks of
+            all threads, ready for flamegraph.pl or speedscope.
+        sort (str): pstats sort key.
+        limit (int): Functions listed in a pstats report.
+        profiling (ProfilingService): Profiler of this worker.
+
+    Returns:
+        PlainTextResponse: The report.
+
+    Raises:
+        HTTPException: 400 for an unknown sort key, 409 if another
+            profile is running.
+    """
+    try:
+        if output == CpuProfileFormat.COLLAPSED:
+            report = await profiling.sample_stacks(seconds)
+        else:
+            report = await profiling.profile_cpu(seconds, sort, limit)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PlainTextResponse(report)
+
+
+@api_admin_router.get(
+    '/profile/memory', response_model=MemoryProfileResponse
+)
+async def profile_memory(
+    seconds: float = Query(default=5, gt=0),
+    limit: int = Query(default=25, ge=1, le=1000),
+    profiling: ProfilingService = Depends(profiling_dependency),
+) -> MemoryProfileResponse:
+    """Report the largest allocations made during a time window.
+
+    Args:
+        seconds (float): Window length, capped by PROFILE_MAX_SECONDS.
+        limit (int): Allocation sites listed.
+        profiling (ProfilingService): Profiler of this worker.
+
+    Returns:
+        MemoryProfileResponse: Traced totals and top allocation sites.
+
+    Raises:
+        HTTPException: 409 if another profile is running.
+    """
+    try:
+        snapshot = await profiling.profile_memory(seconds, limit)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return MemoryProfileResponse(**snapshot)
+
+
+@api_admin_router.get(
+    '/profile/requests/{profile_id}', response_class=PlainTextResponse
+)
+async def request_profile(
+    profile_id: str,
+    profiling: ProfilingService = Depends(profiling_dependency),
+) -> PlainTextResponse:
+    """Fetch the profile of a request sent with X-Profile.
+
+    Args:
+        profile_id (str): Id from the request's X-Profile-Id header.
+        profiling (ProfilingService): Profiler of this worker.
+
+    Returns:
+        PlainTextResponse: pstats report of the request.
+
+    Raises:
+        HTTPException: 404 if the id is unknown, evicted or belongs to
+            another worker.
+    """
+    report = profiling.get_request_profile(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    return PlainTextResponse(report)
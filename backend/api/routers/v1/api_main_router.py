@@ -1,9 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from api.models.generic_model import HealthCheckResponse, RootResponse
-from api.services.core_service import core_service
-from api.services.cache_service import cache_service
+from api.dependencies import (
+    cache_dependency, core_dependency, embedding_dependency,
+    log_dependency, loop_monitor_dependency,
+)
+from api.models.generic_model import (
+    HealthCheckResponse, MetricsResponse, RootResponse
+)
+from api.services.core_service import CoreService
+from api.services.cache_service import CacheService
+from api.services.embedding_service import EmbeddingService
+from api.services.logging_service import LogService
+from api.services.loop_monitor_service import EventLoopMonitor
+from api.routers.v1.admin.api_admin_router import api_admin_router
+from api.routers.v1.caches.api_cache_router import api_cache_router
 from api.routers.v1.chats.api_chat_router import api_chat_router
+from api.routers.v1.embeddings.api_embedding_router import (
+    api_embedding_router
+)
 
 
 api_v1_router = APIRouter(
@@ -12,6 +26,9 @@ api_v1_router = APIRouter(
 )
 
 api_v1_router.include_router(router=api_chat_router)
+api_v1_router.include_router(router=api_cache_router)
+api_v1_router.include_router(router=api_embedding_router)
+api_v1_router.include_router(router=api_admin_router)
 
 
 @api_v1_router.get('/', response_model=RootResponse)
@@ -25,22 +42,32 @@ async def root() -> RootResponse:
 
 
 @api_v1_router.get('/health', response_model=HealthCheckResponse)
-async def health_check() -> HealthCheckResponse:
+async def health_check(
+    core: CoreService = Depends(core_dependency),
+    cache: CacheService = Depends(cache_dependency),
+    loop_monitor: EventLoopMonitor = Depends(loop_monitor_dependency),
+) -> HealthCheckResponse:
     """Health check v1 endpoint.
 
+    Args:
+        core (CoreService): Service checking the Ollama connection.
+        cache (CacheService): Service checking the Redis connection.
+        loop_monitor (EventLoopMonitor): Event loop lag of this worker.
+
     Returns:
-        HealthCheckResponse: Status of Ollama and Redis connections.
+        HealthCheckResponse: Status of Ollama and Redis connections
+            and the worker's event loop lag percentiles.
     """
     try:
         # Check Ollama connection
-        available_models = await core_service.get_ollama_models()
+        available_models = await core.get_ollama_models()
         ollama_status = 'connected'
     except Exception:
         available_models = []
         ollama_status = 'disconnected'
 
     # Check Redis connection
-    redis_healthy = await cache_service.health_check()
+    redis_healthy = await cache.health_check()
     redis_status = 'connected' if redis_healthy else 'disconnected'
 
     # Determine overall status
@@ -55,4 +82,42 @@ async def health_check() -> HealthCheckResponse:
         ollama=ollama_status,
         redis=redis_status,
         available_models=available_models,
+        event_loop=loop_monitor.get_metrics(),
+    )
+
+
+@api_v1_router.get('/metrics', response_model=MetricsResponse)
+async def metrics(
+    core: CoreService = Depends(core_dependency),
+    cache: CacheService = Depends(cache_dependency),
+    embedding: EmbeddingService = Depends(embedding_dependency),
+    loop_monitor: EventLoopMonitor = Depends(loop_monitor_dependency),
+    log: LogService = Depends(log_dependency),
+) -> MetricsResponse:
+    """Metrics v1 endpoint.
+
+    Args:
+        core (CoreService): Service owning the limiter, model health
+            and connection pool.
+        cache (CacheService): Service owning the rate limiter and
+            write-behind buffer.
+        embedding (EmbeddingService): Embedding batcher.
+        loop_monitor (EventLoopMonitor): Event loop lag monitor.
+        log (LogService): Structured log queue.
+
+    Returns:
+        MetricsResponse: Snapshot of the adaptive Ollama concurrency
+            limiter, embedding batcher, rate limiter, cache
+            write-behind buffer, failing models, Ollama connection
+            pool, event loop lag and log queue of this worker.
+    """
+    return MetricsResponse(
+        concurrency=core.concurrency_limiter.get_metrics(),
+        embeddings=embedding.get_metrics(),
+        rate_limit=cache.get_rate_limit_metrics(),
+        cache_writes=cache.get_write_behind_metrics(),
+        models=core.model_health.get_metrics(),
+        ollama_pool=core.ollama_transport.get_metrics(),
+        event_loop=loop_monitor.get_metrics(),
+        logging=log.get_metrics(),
     )
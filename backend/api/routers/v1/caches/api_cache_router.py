@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+
+from api.dependencies import admin_dependency, cache_dependency
+from api.models.caches.cache_stats_model import CacheStatsResponse
+from api.services.cache_service import CacheService
+
+
+api_cache_router = APIRouter(
+    prefix='/cache',
+    tags=['cache'],
+    dependencies=[Depends(admin_dependency)],
+)
+
+
+@api_cache_router.get('/stats', response_model=CacheStatsResponse)
+async def stats(
+    cache: CacheService = Depends(cache_dependency),
+) -> CacheStatsResponse:
+    """Cache analytics across all workers.
+
+    Hot prompts include previews of other users' prompts, so the
+    endpoint requires the admin token like the other admin endpoints.
+
+    Args:
+        cache (CacheService): Cache service holding the analytics.
+
+    Returns:
+        CacheStatsResponse: Hit ratios per model and mode, the hottest
+            prompts, the distinct prompt estimate and memory used by
+            the 'llm:*' namespace.
+    """
+    return CacheStatsResponse(**await cache.get_cache_stats())
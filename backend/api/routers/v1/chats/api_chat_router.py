@@ -1,8 +1,25 @@
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import time
+from typing import Optional, Union
 
-from api.models.chats.ask_model import AskRequest, AskResponse
-from api.services.core_service import core_service
-from api.services.cache_service import cache_service
+from fastapi import (
+    APIRouter, Depends, Header, HTTPException, Query, Request, Response
+)
+
+from api.dependencies import (
+    cache_dependency, core_dependency, routing_dependency
+)
+from api.http_errors import check_rate_limit, generation_error
+from api.models.chats.ask_model import (
+    AskMode, AskMultiResponse, AskRequest, AskResponse, ModeError
+)
+from api.services.core_service import CoreService
+from api.services.cache_service import (
+    CacheService, ClientConcurrencyExceeded
+)
+from api.services.logging_service import log_generation
+from api.services.rate_limit_service import RateLimitExceeded
+from api.services.routing_service import AUTO_MODEL, RoutingService
 
 
 api_chat_router = APIRouter(
@@ -12,94 +29,431 @@ api_chat_router = APIRouter(
 )
 
 
-@api_chat_router.post('/ask', response_model=AskResponse)
-async def ask(
-    request: AskRequest, req: Request
+async def _generate_response(
+    core: CoreService,
+    cache: CacheService,
+    request: AskRequest,
+    mode: str,
+    system_prompt: str,
+    options: dict,
+    route: Optional[dict] = None,
 ) -> AskResponse:
+    """Generate an answer in one mode, log it and cache it.
+
+    Args:
+        core (CoreService): Service generating the answer.
+        cache (CacheService): Service caching the answer.
+        request (AskRequest): The ask request.
+        mode (str): The response mode to answer in.
+        system_prompt (str): The system prompt for the mode.
+        options (dict): Resolved generation options for the mode.
+        route (Optional[dict]): Route decision for 'auto' requests.
+
+    Returns:
+        AskResponse: The generated answer.
+    """
+    start = time.perf_counter()
+    response = await core.generate_text(
+        model=request.model,
+        prompt=request.prompt,
+        system_prompt=system_prompt,
+        options=options,
+    )
+    log_generation(
+        request.model, mode, response, time.perf_counter() - start, route
+    )
+
+    answer = AskResponse(
+        model=request.model,
+        response=response.get('response', ''),
+        created_at=response.get('created_at', ''),
+        done=response.get('done', True),
+        mode=mode,
+        route=route,
+    )
+
+    # Cache the final body (without the per-request route) so hits can
+    # be sent without re-serializing
+    await cache.cache_response(
+        request.model, request.prompt,
+        answer.model_dump(exclude={'route'}), mode, options=options,
+    )
+
+    return answer
+
+
+async def _generate_single(
+    core: CoreService,
+    cache: CacheService,
+    request: AskRequest,
+    client_ip: str,
+    options: dict,
+    route: Optional[dict] = None,
+) -> AskResponse:
+    """Answer a cache miss in the request's mode.
+
+    Takes one of the client's concurrency slots, then counts the
+    request against the rate limit and generates while holding it.
+
+    Args:
+        core (CoreService): Ollama generation service.
+        cache (CacheService): Response cache and rate limiter.
+        request (AskRequest): The ask request.
+        client_ip (str): Client identifier for rate limiting.
+        options (dict): Resolved generation options for the mode.
+        route (Optional[dict]): Route decision for 'auto' requests.
+
+    Returns:
+        AskResponse: The generated answer.
+
+    Raises:
+        HTTPException: 400 for an invalid mode, otherwise see
+            `generation_error`.
+    """
+    # Get the system prompt based on the mode
+    system_prompt = core.get_system_prompt(request.mode)
+    if not system_prompt:
+        raise HTTPException(
+            status_code=400, detail='Invalid mode specified.'
+        )
+
+    try:
+        async with cache.client_concurrency_slot(client_ip):
+            # Only count requests that got a slot
+            await cache.increment_rate_limit(client_ip)
+            return await _generate_response(
+                core, cache, request, request.mode, system_prompt,
+                options, route,
+            )
+    except Exception as e:
+        raise generation_error(e)
+
+
+def _tag_request(req: Request, request: AskRequest) -> None:
+    """Record the resolved model and mode(s) for the access log.
+
+    Set on the request state, which is shared with the ASGI scope, so
+    cache hits that never reach `log_generation` are logged with them.
+
+    Args:
+        req (Request): FastAPI request object.
+        request (AskRequest): The ask request, after 'auto' routing.
+    """
+    req.state.model = request.model
+    req.state.mode = (
+        ','.join(request.modes) if request.modes else request.mode
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so
+    a W/ prefix added by a proxy doesn't prevent a match.
+    """
+    if if_none_match.strip() == '*':
+        return True
+    return any(
+        candidate.strip().removeprefix('W/') == etag
+        for candidate in if_none_match.split(',')
+    )
+
+
+@api_chat_router.post(
+    '/ask', response_model=Union[AskResponse, AskMultiResponse]
+)
+async def ask(
+    request: AskRequest,
+    req: Request,
+    response: Response,
+    cache: CacheService = Depends(cache_dependency),
+    core: CoreService = Depends(core_dependency),
+    routing: RoutingService = Depends(routing_dependency),
+) -> Union[AskResponse, AskMultiResponse, Response]:
     """Ask a question using an Ollama model.
 
     Args:
-        request (AskRequest): The request body containing model
-            and prompt. Available modes are:
+        request (AskRequest): The request body containing model,
+            prompt and optional generation options. Available modes are:
             - concise
             - professional
             - sarcastic
             - creative
             - friendly
+            Set `modes` to answer in several modes in one call and
+            `model='auto'` to let the server pick the model.
         req (Request): FastAPI request object for client info.
+        response (Response): Outgoing response, used to set X-Cache to
+            HIT, MISS or (for several modes) PARTIAL.
+        cache (CacheService): Response cache and rate limiter.
+        core (CoreService): Ollama generation service.
+        routing (RoutingService): Model router for 'auto' requests.
 
     Returns:
-        AskResponse: The response containing the answer and metadata.
+        Union[AskResponse, AskMultiResponse, Response]: The answer and
+            metadata, or one answer per mode when `modes` is set. A
+            single-mode cache hit is sent as the stored JSON body.
 
     Raises:
         HTTPException:
-            400: Invalid mode specified.
-            429: Rate limit exceeded.
+            400: Invalid mode specified, or the model can't generate.
+            404: The model isn't available.
+            429: Rate limit or per-client concurrency exceeded.
             500: Generation failed.
+            503: Ollama is saturated and the request was shed, or the
+                model keeps failing.
     """
     # Get client identifier for rate limiting (IP address)
     client_ip = req.client.host if req.client else 'unknown'
 
     # Check rate limit
-    is_allowed, _ = await cache_service.check_rate_limit(
-        client_ip
-    )
-    if not is_allowed:
-        raise HTTPException(
-            status_code=429,
-            detail=f'Rate limit exceeded. Max {cache_service.rate_limit_max} '
-            f'requests per {cache_service.rate_limit_window} seconds',
+    await check_rate_limit(cache, client_ip)
+
+    # Resolve model='auto' to a configured model tier
+    route = None
+    if request.model == AUTO_MODEL:
+        route = await routing.route(
+            request.prompt, request.modes or [request.mode]
         )
+        request = request.model_copy(update={'model': route['model']})
+    _tag_request(req, request)
 
-    # Check cache for existing response
-    cached_response = await cache_service.get_cached_response(
-        request.model, request.prompt, request.mode
+    overrides = (
+        request.options.model_dump(exclude_none=True)
+        if request.options else None
     )
-    if cached_response:
-        return AskResponse(
-            model=request.model,
-            response=cached_response.get('response', ''),
-            created_at=cached_response.get('created_at', ''),
-            done=cached_response.get('done', True),
-            mode=request.mode,
+    if request.modes:
+        return await _ask_multi(
+            core, cache, request, client_ip, overrides, response, route
         )
 
-    # Increment rate limit counter
-    await cache_service.increment_rate_limit(client_ip)
+    # Resolve per-mode generation options with client overrides
+    options = core.get_generation_options(request.mode, overrides)
 
-    # Get the system prompt based on the mode
-    system_prompt = core_service.get_system_prompt(request.mode)
-    if not system_prompt:
-        raise HTTPException(
-            status_code=400, detail='Invalid mode specified.'
+    # Check cache for existing response; hits are sent as the stored
+    # body, skipping the parse, validation and encode steps
+    cached_body = await cache.get_cached_body(
+        request.model, request.prompt, request.mode, options, route
+    )
+    if cached_body:
+        return Response(
+            content=cached_body,
+            media_type='application/json',
+            headers={'X-Cache': 'HIT'},
         )
 
-    try:
-        response = await core_service.generate_text(
-            model=request.model,
-            prompt=request.prompt,
-            system_prompt=system_prompt
-        )
+    response.headers['X-Cache'] = 'MISS'
+    return await _generate_single(
+        core, cache, request, client_ip, options, route
+    )
+
 
-        # Cache the response for future requests
-        response_data = {
-            'response': response.get('response', ''),
-            'created_at': response.get('created_at', ''),
-            'done': response.get('done', True),
+@api_chat_router.get(
+    '/ask',
+    response_model=AskResponse,
+    responses={304: {'description': 'The cached answer is unchanged'}},
+)
+async def ask_cacheable(
+    req: Request,
+    response: Response,
+    prompt: str = Query(min_length=1),
+    model: str = Query(
+        default='llama3.2',
+        description="Ollama model name, or 'auto' to route by complexity",
+    ),
+    mode: AskMode = AskMode.CONCISE,
+    if_none_match: Optional[str] = Header(default=None),
+    cache: CacheService = Depends(cache_dependency),
+    core: CoreService = Depends(core_dependency),
+    routing: RoutingService = Depends(routing_dependency),
+) -> Union[AskResponse, Response]:
+    """Ask a question with a cacheable GET request.
+
+    Answers like the single-mode POST with default generation options,
+    and adds HTTP caching headers so CDNs and reverse proxies can serve
+    hot answers without reaching the API. Answers held by the cache
+    carry a strong ETag and `Cache-Control: public, max-age=<seconds
+    until the entry expires>`. A matching If-None-Match is answered
+    with 304 after reading only the entry's TTL.
+
+    Args:
+        req (Request): FastAPI request object for client info.
+        response (Response): Outgoing response for the caching headers.
+        prompt (str): The question.
+        model (str): Ollama model name, or 'auto'.
+        mode (AskMode): The response mode.
+        if_none_match (Optional[str]): ETags the client already holds.
+        cache (CacheService): Response cache and rate limiter.
+        core (CoreService): Ollama generation service.
+        routing (RoutingService): Model router for 'auto' requests.
+
+    Returns:
+        Union[AskResponse, Response]: The answer, the stored JSON body
+            on a cache hit, or an empty 304 response.
+
+    Raises:
+        HTTPException: As for `POST /ask`.
+    """
+    client_ip = req.client.host if req.client else 'unknown'
+    await check_rate_limit(cache, client_ip)
+
+    request = AskRequest(model=model, prompt=prompt, mode=mode)
+    route = None
+    if request.model == AUTO_MODEL:
+        route = await routing.route(request.prompt, [request.mode])
+        request = request.model_copy(update={'model': route['model']})
+    _tag_request(req, request)
+    options = core.get_generation_options(request.mode)
+
+    validator = await cache.get_cached_validator(
+        request.model, request.prompt, request.mode, options, route
+    )
+    headers = {'Cache-Control': 'no-cache', 'X-Cache': 'HIT'}
+    if validator:
+        etag, max_age = validator
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={max_age}',
+            'X-Cache': 'HIT',
         }
-        await cache_service.cache_response(
-            request.model, request.prompt, response_data, request.mode
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+    cached_body = await cache.get_cached_body(
+        request.model, request.prompt, request.mode, options, route
+    )
+    if cached_body:
+        # Entries only held by the local tiers get no validator
+        return Response(
+            content=cached_body,
+            media_type='application/json',
+            headers=headers,
         )
 
-        return AskResponse(
+    answer = await _generate_single(
+        core, cache, request, client_ip, options, route
+    )
+    response.headers['X-Cache'] = 'MISS'
+    validator = await cache.get_cached_validator(
+        request.model, request.prompt, request.mode, options, route
+    )
+    if validator:
+        response.headers['ETag'] = validator[0]
+        response.headers['Cache-Control'] = f'public, max-age={validator[1]}'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return answer
+
+
+async def _ask_multi(
+    core: CoreService,
+    cache: CacheService,
+    request: AskRequest,
+    client_ip: str,
+    overrides: Optional[dict],
+    response: Response,
+    route: Optional[dict] = None,
+) -> AskMultiResponse:
+    """Answer one prompt in several modes.
+
+    Cached modes are fetched together; missing ones are generated
+    concurrently, at most `core.max_fanout_concurrency` at a time.
+    The whole call counts as one request against the rate limit and
+    holds one of the client's concurrency slots.
+
+    Modes that fail to generate are listed in `errors` while the
+    others are still returned; only when no mode has an answer is the
+    first failure raised as the call's error.
+
+    Args:
+        core (CoreService): Ollama generation service.
+        cache (CacheService): Response cache and rate limiter.
+        request (AskRequest): The ask request with `modes` set.
+        client_ip (str): Client identifier for rate limiting.
+        overrides (Optional[dict]): Client generation option overrides.
+        response (Response): Outgoing response for the X-Cache header.
+        route (Optional[dict]): Route decision for 'auto' requests.
+
+    Returns:
+        AskMultiResponse: One answer per answered mode, in request
+            order, and an error per failed mode.
+
+    Raises:
+        HTTPException: If no mode could be answered.
+    """
+    modes = list(dict.fromkeys(request.modes))
+    options_by_mode = {
+        mode: core.get_generation_options(mode, overrides)
+        for mode in modes
+    }
+
+    cached = await cache.get_cached_responses(
+        request.model, request.prompt, options_by_mode
+    )
+    responses = {
+        mode: AskResponse(
             model=request.model,
-            response=response.get('response', ''),
-            created_at=response.get('created_at', ''),
-            done=response.get('done', True),
-            mode=request.mode,
+            response=data.get('response', ''),
+            created_at=data.get('created_at', ''),
+            done=data.get('done', True),
+            mode=mode,
+            route=route,
         )
+        for mode, data in cached.items() if data
+    }
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f'Generation failed: {str(e)}'
+    missing = [mode for mode in modes if mode not in responses]
+    errors: list[ModeError] = []
+    response.headers['X-Cache'] = (
+        'HIT' if not missing else 'PARTIAL' if responses else 'MISS'
+    )
+    if missing:
+        system_prompts = {
+            mode: core.get_system_prompt(mode) for mode in missing
+        }
+        if not all(system_prompts.values()):
+            raise HTTPException(
+                status_code=400, detail='Invalid mode specified.'
+            )
+
+        semaphore = asyncio.Semaphore(core.max_fanout_concurrency)
+
+        async def generate(mode: str) -> AskResponse:
+            async with semaphore:
+                return await _generate_response(
+                    core, cache, request, mode, system_prompts[mode],
+                    options_by_mode[mode], route,
+                )
+
+        try:
+            async with cache.client_concurrency_slot(client_ip):
+                # Count the whole fan-out once, after it got a slot
+                await cache.increment_rate_limit(client_ip)
+                results = await asyncio.gather(
+                    *(generate(mode) for mode in missing),
+                    return_exceptions=True,
+                )
+        except (ClientConcurrencyExceeded, RateLimitExceeded) as e:
+            raise generation_error(e)
+        failures = {
+            mode: generation_error(result)
+            for mode, result in zip(missing, results)
+            if isinstance(result, Exception)
+        }
+        responses.update(
+            (mode, result) for mode, result in zip(missing, results)
+            if mode not in failures
         )
+        if not responses:
+            raise next(iter(failures.values()))
+        errors = [
+            ModeError(mode=mode, status=error.status_code, detail=error.detail)
+            for mode, error in failures.items()
+        ]
+
+    return AskMultiResponse(
+        model=request.model,
+        responses=[responses[mode] for mode in modes if mode in responses],
+        route=route,
+        errors=errors,
+    )
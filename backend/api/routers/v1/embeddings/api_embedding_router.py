@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, Request
+
+from api.dependencies import cache_dependency, embedding_dependency
+from api.http_errors import check_rate_limit, generation_error
+from api.models.embeddings.embedding_model import (
+    EmbeddingRequest, EmbeddingResponse
+)
+from api.services.cache_service import CacheService
+from api.services.embedding_service import EmbeddingService
+
+
+api_embedding_router = APIRouter(
+    prefix='/embeddings',
+    tags=['embeddings'],
+    dependencies=[],
+)
+
+
+@api_embedding_router.post('', response_model=EmbeddingResponse)
+async def embeddings(
+    request: EmbeddingRequest,
+    req: Request,
+    cache: CacheService = Depends(cache_dependency),
+    embedding: EmbeddingService = Depends(embedding_dependency),
+) -> EmbeddingResponse:
+    """Embed one or more texts.
+
+    Concurrent requests are coalesced into batched Ollama calls and
+    embeddings are cached per text.
+
+    Args:
+        request (EmbeddingRequest): The model and text(s) to embed.
+        req (Request): FastAPI request object for client info.
+        cache (CacheService): Rate limiter.
+        embedding (EmbeddingService): Batching embedding service.
+
+    Returns:
+        EmbeddingResponse: One embedding per input text, in order.
+
+    Raises:
+        HTTPException:
+            400: The model can't produce embeddings.
+            404: The model isn't available.
+            429: Rate limit exceeded.
+            500: Embedding failed.
+            503: The model keeps failing.
+    """
+    # Get client identifier for rate limiting (IP address)
+    client_ip = req.client.host if req.client else 'unknown'
+
+    # Check rate limit
+    await check_rate_limit(cache, client_ip)
+
+    texts = (
+        [request.input] if isinstance(request.input, str) else request.input
+    )
+    model = request.model or embedding.default_model
+    try:
+        # Counted against the rate limit only if a text misses the
+        # cache, like /ask
+        vectors = await embedding.embed(
+            texts, model,
+            on_miss=lambda: cache.increment_rate_limit(client_ip),
+        )
+    except Exception as e:
+        raise generation_error(e, 'Embedding')
+    return EmbeddingResponse(model=model, embeddings=vectors)
@@ -0,0 +1,157 @@
+"""Backend interface for the cache and rate limiter stores."""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheBackend(ABC):
+    """Key-value store used by `CacheService`.
+
+    Method names and semantics follow the Redis commands they map to,
+    so a Redis client can back the interface directly and in-process
+    implementations behave the same way under the contract tests.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Get the value of a key, or None if missing or expired."""
+
+    @abstractmethod
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        """Get several keys in one round trip, None for missing ones."""
+
+    @abstractmethod
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        """Set a key with a time-to-live in seconds."""
+
+    async def setex_many(self, items: list[tuple[str, int, str]]) -> None:
+        """Set several (key, ttl, value) entries, pipelined if possible.
+
+        The writes are not atomic as a group.
+        """
+        for key, ttl, value in items:
+            await self.setex(key, ttl, value)
+
+    @abstractmethod
+    async def mget_bytes(self, *keys: str) -> list[Optional[bytes]]:
+        """Like `mget`, for values stored with `setex_bytes`."""
+
+    @abstractmethod
+    async def setex_bytes(self, key: str, ttl: int, value: bytes) -> None:
+        """Like `setex`, storing a binary value as is."""
+
+    async def setex_many_bytes(
+        self, items: list[tuple[str, int, bytes]]
+    ) -> None:
+        """Like `setex_many`, storing binary values as is."""
+        for key, ttl, value in items:
+            await self.setex_bytes(key, ttl, value)
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically increment a counter, creating it at 0 if missing."""
+
+    @abstractmethod
+    async def expire(self, key: str, ttl: int) -> bool:
+        """Set a key's time-to-live, returning False if it is missing."""
+
+    @abstractmethod
+    async def ttl(self, key: str) -> Optional[float]:
+        """Seconds a key has left to live.
+
+        Returns:
+            Optional[float]: Remaining time-to-live, None if the key is
+                missing or never expires
+        """
+
+    @abstractmethod
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 10
+    ) -> tuple[int, list[str]]:
+        """Iterate keys matching a glob pattern.
+
+        Returns:
+            tuple[int, list[str]]: Next cursor (0 when done) and keys
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int:
+        """Delete keys, returning how many existed."""
+
+    @abstractmethod
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        """Add a member to a sorted set, or update its score."""
+
+    @abstractmethod
+    async def zrem(self, key: str, *members: str) -> int:
+        """Remove members from a sorted set, returning how many existed."""
+
+    @abstractmethod
+    async def zcard(self, key: str) -> int:
+        """Number of members in a sorted set, 0 if missing."""
+
+    @abstractmethod
+    async def zremrangebyscore(
+        self, key: str, min_score: float, max_score: float
+    ) -> int:
+        """Remove members scored within [min, max], returning the count."""
+
+    async def acquire_slot(
+        self, key: str, member: str, limit: int, now: float, ttl: int
+    ) -> bool:
+        """Add a lease to a sorted set of slots unless it is full.
+
+        Members scored at or below `now` are expired leases and are
+        dropped first. If fewer than `limit` remain, `member` is added
+        scored `now + ttl` and the set's time-to-live is refreshed.
+        Backends able to do this in one atomic step should.
+
+        Returns:
+            bool: Whether the lease was added
+        """
+        await self.zremrangebyscore(key, 0, now)
+        if await self.zcard(key) >= limit:
+            return False
+        await self.zadd(key, member, now + ttl)
+        await self.expire(key, ttl)
+        return True
+
+    async def renew_slot(
+        self, key: str, member: str, now: float, ttl: int
+    ) -> bool:
+        """Extend a lease in a sorted set of slots if it is still held.
+
+        A lease that expired and was dropped may have had its slot
+        taken by another request, so it is not added back. Otherwise
+        `member` is rescored `now + ttl` and the set's time-to-live is
+        refreshed. Backends able to do this in one atomic step should.
+
+        Returns:
+            bool: Whether the lease was still held and got extended
+        """
+        if not await self.zrem(key, member):
+            return False
+        await self.zadd(key, member, now + ttl)
+        await self.expire(key, ttl)
+        return True
+
+    @abstractmethod
+    async def memory_usage(self, key: str) -> Optional[int]:
+        """Approximate bytes used by a key, or None if missing."""
+
+    @abstractmethod
+    async def ping(self) -> bool:
+        """Check the backend is reachable, raising if it is not."""
+
+    async def replication_offset(self) -> Optional[int]:
+        """Replication stream offset this node has reached.
+
+        A primary reports how far its stream has been written, a
+        replica how far it has processed it, or None if its link to
+        the primary is down. In-process backends don't replicate and
+        report 0.
+        """
+        return 0
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release connections held by the backend."""
@@ -0,0 +1,145 @@
+"""In-process implementation of the cache backend."""
+import fnmatch
+import sys
+import time
+from typing import Optional
+
+from api.services.backends.base_backend import CacheBackend
+
+
+class MemoryBackend(CacheBackend):
+    """Cache backend held in process memory.
+
+    Intended for single-node deployments that don't need Redis. State
+    is per process, so with several uvicorn workers each worker has its
+    own cache and rate limit counters. Expired keys are dropped lazily;
+    once `max_keys` is reached the oldest key is evicted.
+
+    All operations complete without awaiting, which makes them atomic
+    with respect to other coroutines on the event loop.
+
+    Attributes:
+        max_keys: Maximum number of keys held
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> (value, expires_at or None)
+        self._data: dict[str, tuple[str, Optional[float]]] = {}
+
+    def _get_entry(self, key: str) -> Optional[tuple]:
+        """Return a live entry, dropping it if expired."""
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None \
+                and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def _put(self, key: str, value: str, expires_at: Optional[float]):
+        """Store an entry, evicting the oldest key when full."""
+        if key not in self._data and len(self._data) >= self.max_keys:
+            del self._data[next(iter(self._data))]
+        self._data[key] = (value, expires_at)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._get_entry(key)
+        return entry[0] if entry else None
+
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        self._data.pop(key, None)
+        self._put(key, value, time.monotonic() + ttl)
+
+    async def mget_bytes(self, *keys: str) -> list[Optional[bytes]]:
+        return await self.mget(*keys)
+
+    async def setex_bytes(self, key: str, ttl: int, value: bytes) -> None:
+        await self.setex(key, ttl, value)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        entry = self._get_entry(key)
+        value = int(entry[0]) + amount if entry else amount
+        self._put(key, str(value), entry[1] if entry else None)
+        return value
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        entry = self._get_entry(key)
+        if entry is None:
+            return False
+        self._data[key] = (entry[0], time.monotonic() + ttl)
+        return True
+
+    async def ttl(self, key: str) -> Optional[float]:
+        entry = self._get_entry(key)
+        if entry is None or entry[1] is None:
+            return None
+        return entry[1] - time.monotonic()
+
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 10
+    ) -> tuple[int, list[str]]:
+        # Everything is in memory, so return all matches in one page;
+        # this keeps iteration stable when callers delete while scanning
+        return 0, [
+            key for key in list(self._data)
+            if (match is None or fnmatch.fnmatchcase(key, match))
+            and self._get_entry(key) is not None
+        ]
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self._get_entry(key) is not None:
+                del self._data[key]
+                deleted += 1
+        return deleted
+
+    def _sorted_set(self, key: str, create: bool = False) -> dict:
+        """Return the member -> score dict stored at a key."""
+        entry = self._get_entry(key)
+        if entry is not None:
+            return entry[0]
+        members: dict[str, float] = {}
+        if create:
+            self._put(key, members, None)
+        return members
+
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        self._sorted_set(key, create=True)[member] = score
+
+    async def zrem(self, key: str, *members: str) -> int:
+        sorted_set = self._sorted_set(key)
+        removed = sum(
+            sorted_set.pop(member, None) is not None for member in members
+        )
+        if not sorted_set:
+            self._data.pop(key, None)
+        return removed
+
+    async def zcard(self, key: str) -> int:
+        return len(self._sorted_set(key))
+
+    async def zremrangebyscore(
+        self, key: str, min_score: float, max_score: float
+    ) -> int:
+        sorted_set = self._sorted_set(key)
+        doomed = [
+            member for member, score in sorted_set.items()
+            if min_score <= score <= max_score
+        ]
+        return await self.zrem(key, *doomed) if doomed else 0
+
+    async def memory_usage(self, key: str) -> Optional[int]:
+        entry = self._get_entry(key)
+        if entry is None:
+            return None
+        return sys.getsizeof(key) + sys.getsizeof(entry[0])
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._data.clear()
@@ -0,0 +1,182 @@
+"""Redis implementation of the cache backend."""
+from typing import Optional
+
+import redis.asyncio as redis
+
+from api.services.backends.base_backend import CacheBackend
+
+
+# KEYS: slot set; ARGV: member, now, limit, ttl
+_ACQUIRE_SLOT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], tonumber(ARGV[2]) + tonumber(ARGV[4]), ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# KEYS: slot set; ARGV: member, now, ttl
+_RENEW_SLOT = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+local expires_at = tonumber(ARGV[2]) + tonumber(ARGV[3])
+redis.call('ZADD', KEYS[1], 'XX', expires_at, ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisBackend(CacheBackend):
+    """Cache backend delegating to an async Redis client.
+
+    With `cluster=True` the URL is a Redis Cluster entry node: keys are
+    routed to their slot's node, MGET and DEL are split per slot and
+    SCAN walks every primary, returning all matches in one page.
+
+    Attributes:
+        client: Async Redis client instance, decoding replies to str
+        cluster: Whether the client talks to a Redis Cluster
+    """
+
+    def __init__(self, url: str, cluster: bool = False):
+        """Connect to Redis.
+
+        Args:
+            url (str): Redis connection URL
+            cluster (bool): Connect to a Redis Cluster
+        """
+        self.url = url
+        self.cluster = cluster
+        self.client = self._connect(encoding='utf-8', decode_responses=True)
+        self._raw_client: Optional[redis.Redis] = None
+        self._acquire_slot_script = None
+        self._renew_slot_script = None
+
+    def _connect(self, **kwargs):
+        """Create a standalone or cluster client for the URL."""
+        if self.cluster:
+            return redis.RedisCluster.from_url(self.url, **kwargs)
+        return redis.from_url(self.url, **kwargs)
+
+    @property
+    def raw_client(self) -> redis.Redis:
+        """Client returning raw bytes, created on first binary access."""
+        if self._raw_client is None:
+            self._raw_client = self._connect()
+        return self._raw_client
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        if self.cluster:
+            return await self.client.mget_nonatomic(*keys)
+        return await self.client.mget(*keys)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        await self.client.setex(key, ttl, value)
+
+    async def setex_many(self, items: list[tuple[str, int, str]]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, ttl, value in items:
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+
+    async def mget_bytes(self, *keys: str) -> list[Optional[bytes]]:
+        if self.cluster:
+            return await self.raw_client.mget_nonatomic(*keys)
+        return await self.raw_client.mget(*keys)
+
+    async def setex_bytes(self, key: str, ttl: int, value: bytes) -> None:
+        await self.raw_client.setex(key, ttl, value)
+
+    async def setex_many_bytes(
+        self, items: list[tuple[str, int, bytes]]
+    ) -> None:
+        async with self.raw_client.pipeline(transaction=False) as pipe:
+            for key, ttl, value in items:
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.client.incr(key, amount)
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        return await self.client.expire(key, ttl)
+
+    async def ttl(self, key: str) -> Optional[float]:
+        # PTTL answers -2 for missing keys and -1 for keys without TTL
+        milliseconds = await self.client.pttl(key)
+        return milliseconds / 1000 if milliseconds >= 0 else None
+
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 10
+    ) -> tuple[int, list[str]]:
+        if self.cluster:
+            return 0, [
+                key async for key in self.client.scan_iter(
+                    match=match, count=count
+                )
+            ]
+        return await self.client.scan(cursor, match=match, count=count)
+
+    async def delete(self, *keys: str) -> int:
+        return await self.client.delete(*keys)
+
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        await self.client.zadd(key, {member: score})
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return await self.client.zrem(key, *members)
+
+    async def zcard(self, key: str) -> int:
+        return await self.client.zcard(key)
+
+    async def zremrangebyscore(
+        self, key: str, min_score: float, max_score: float
+    ) -> int:
+        return await self.client.zremrangebyscore(key, min_score, max_score)
+
+    async def acquire_slot(
+        self, key: str, member: str, limit: int, now: float, ttl: int
+    ) -> bool:
+        if self._acquire_slot_script is None:
+            self._acquire_slot_script = self.client.register_script(
+                _ACQUIRE_SLOT
+            )
+        return bool(await self._acquire_slot_script(
+            keys=[key], args=[member, now, limit, ttl]
+        ))
+
+    async def renew_slot(
+        self, key: str, member: str, now: float, ttl: int
+    ) -> bool:
+        if self._renew_slot_script is None:
+            self._renew_slot_script = self.client.register_script(
+                _RENEW_SLOT
+            )
+        return bool(await self._renew_slot_script(
+            keys=[key], args=[member, now, ttl]
+        ))
+
+    async def memory_usage(self, key: str) -> Optional[int]:
+        return await self.client.memory_usage(key)
+
+    async def ping(self) -> bool:
+        return await self.client.ping()
+
+    async def replication_offset(self) -> Optional[int]:
+        info = await self.client.info('replication')
+        if info.get('role') != 'slave':
+            return int(info.get('master_repl_offset', 0))
+        if info.get('master_link_status') != 'up':
+            return None
+        return int(info.get('slave_repl_offset', 0))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        if self._raw_client is not None:
+            await self._raw_client.aclose()
@@ -0,0 +1,237 @@
+"""Cache backend reading from replicas and writing to the primary."""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Optional
+
+from api.services.backends.base_backend import CacheBackend
+from api.services.backends.sharded_backend import hash_slot_key, ring_hash
+
+
+class ReplicatedBackend(CacheBackend):
+    """Cache backend that sends reads to read replicas.
+
+    GET and MGET go to a replica picked at random, or sticky per key
+    (the same key always reads from the same replica while the set of
+    healthy replicas is unchanged). Every other operation, including
+    writes and counters, goes to the primary.
+
+    Replicas are checked every `lag_check_interval` seconds by a
+    background task: each check samples the primary's replication
+    offset and compares every replica's offset with the samples. A
+    replica that hasn't reached an offset the primary had more than
+    `max_lag` seconds ago, or whose replication link is down, is
+    skipped until the next check. Lag is therefore measured in steps
+    of `lag_check_interval`. Reads wait for a running check at most
+    `lag_check_timeout` seconds and are otherwise served with the
+    previous health state. A replica that fails a read is skipped for
+    `retry_after` seconds and the read is retried on the primary.
+
+    Attributes:
+        primary: Backend receiving writes
+        replicas: Backends serving reads
+        selection: 'random' or 'sticky'
+        max_lag: Replication lag tolerated on reads, in seconds
+        lag_check_interval: Seconds between replica lag checks
+        lag_check_timeout: Seconds a read waits for a running check
+        retry_after: Seconds a failed replica is skipped
+    """
+
+    def __init__(
+        self,
+        primary: CacheBackend,
+        replicas: list[CacheBackend],
+        selection: str = 'random',
+        max_lag: float = 5.0,
+        lag_check_interval: float = 5.0,
+        lag_check_timeout: float = 0.05,
+        retry_after: float = 10.0,
+    ):
+        if selection not in ('random', 'sticky'):
+            raise ValueError(f'Unknown replica selection: {selection}')
+        self.primary = primary
+        self.replicas = replicas
+        self.selection = selection
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_check_timeout = lag_check_timeout
+        self.retry_after = retry_after
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self._skip_until = [0.0] * len(replicas)
+        self._lag_checked_at: Optional[float] = None
+        self._lag_check: Optional[asyncio.Task] = None
+        # (monotonic time, primary offset) samples, oldest first
+        self._offsets: deque[tuple[float, int]] = deque()
+
+    async def _offset(self, backend: CacheBackend) -> Optional[int]:
+        """Read a replication offset, bounded by the check interval."""
+        return await asyncio.wait_for(
+            backend.replication_offset(), self.lag_check_interval
+        )
+
+    def _lag(self, offset: int, now: float) -> float:
+        """Seconds since the primary first had data past `offset`."""
+        for sampled_at, primary_offset in self._offsets:
+            if primary_offset > offset:
+                return now - sampled_at
+        return 0.0
+
+    async def _measure_lag(self) -> None:
+        """Sample offsets and skip replicas lagging over max_lag."""
+        offsets = await asyncio.gather(
+            self._offset(self.primary),
+            *(self._offset(replica) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        primary_offset, replica_offsets = offsets[0], offsets[1:]
+        if not isinstance(primary_offset, int):
+            # Without the primary's offset there's nothing to compare
+            return
+        now = time.monotonic()
+        self._offsets.append((now, primary_offset))
+        # Keep the newest sample older than max_lag and all later ones
+        while len(self._offsets) > 1 \
+                and self._offsets[1][0] < now - self.max_lag:
+            self._offsets.popleft()
+        for index, offset in enumerate(replica_offsets):
+            if not isinstance(offset, int) \
+                    or self._lag(offset, now) > self.max_lag:
+                self._skip_until[index] = max(
+                    self._skip_until[index], now + self.lag_check_interval
+                )
+
+    async def _check_lag(self) -> None:
+        """Start a lag check once per interval and wait for it briefly."""
+        now = time.monotonic()
+        if self._lag_check is None and (
+            self._lag_checked_at is None
+            or now - self._lag_checked_at >= self.lag_check_interval
+        ):
+            self._lag_checked_at = now
+            self._lag_check = asyncio.create_task(self._measure_lag())
+            self._lag_check.add_done_callback(self._lag_check_done)
+        if self._lag_check is not None:
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(self._lag_check), self.lag_check_timeout
+                )
+            except Exception:
+                # Serve with the previous health state
+                pass
+
+    def _lag_check_done(self, task: asyncio.Task) -> None:
+        self._lag_check = None
+        if not task.cancelled():
+            task.exception()
+
+    def _pick(self, key: str) -> Optional[int]:
+        """Choose a healthy replica for a read, None if there is none."""
+        now = time.monotonic()
+        healthy = [
+            index for index, until in enumerate(self._skip_until)
+            if until <= now
+        ]
+        if not healthy:
+            return None
+        if self.selection == 'sticky':
+            return healthy[ring_hash(hash_slot_key(key)) % len(healthy)]
+        return random.choice(healthy)
+
+    async def _read(self, method: str, *keys: str):
+        """Run a read on a replica, falling back to the primary."""
+        await self._check_lag()
+        index = self._pick(keys[0]) if keys else None
+        if index is not None:
+            try:
+                result = await getattr(self.replicas[index], method)(*keys)
+                self.replica_reads += 1
+                return result
+            except Exception:
+                self._skip_until[index] = (
+                    time.monotonic() + self.retry_after
+                )
+        self.primary_reads += 1
+        return await getattr(self.primary, method)(*keys)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._read('get', key)
+
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        return await self._read('mget', *keys)
+
+    async def mget_bytes(self, *keys: str) -> list[Optional[bytes]]:
+        return await self._read('mget_bytes', *keys)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        await self.primary.setex(key, ttl, value)
+
+    async def setex_many(self, items: list[tuple[str, int, str]]) -> None:
+        await self.primary.setex_many(items)
+
+    async def setex_bytes(self, key: str, ttl: int, value: bytes) -> None:
+        await self.primary.setex_bytes(key, ttl, value)
+
+    async def setex_many_bytes(
+        self, items: list[tuple[str, int, bytes]]
+    ) -> None:
+        await self.primary.setex_many_bytes(items)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.primary.incr(key, amount)
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        return await self.primary.expire(key, ttl)
+
+    async def ttl(self, key: str) -> Optional[float]:
+        return await self._read('ttl', key)
+
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 10
+    ) -> tuple[int, list[str]]:
+        return await self.primary.scan(cursor, match=match, count=count)
+
+    async def delete(self, *keys: str) -> int:
+        return await self.primary.delete(*keys)
+
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        await self.primary.zadd(key, member, score)
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return await self.primary.zrem(key, *members)
+
+    async def zcard(self, key: str) -> int:
+        return await self.primary.zcard(key)
+
+    async def zremrangebyscore(
+        self, key: str, min_score: float, max_score: float
+    ) -> int:
+        return await self.primary.zremrangebyscore(key, min_score, max_score)
+
+    async def acquire_slot(
+        self, key: str, member: str, limit: int, now: float, ttl: int
+    ) -> bool:
+        return await self.primary.acquire_slot(key, member, limit, now, ttl)
+
+    async def renew_slot(
+        self, key: str, member: str, now: float, ttl: int
+    ) -> bool:
+        return await self.primary.renew_slot(key, member, now, ttl)
+
+    async def memory_usage(self, key: str) -> Optional[int]:
+        return await self.primary.memory_usage(key)
+
+    async def ping(self) -> bool:
+        return await self.primary.ping()
+
+    async def replication_offset(self) -> Optional[int]:
+        return await self.primary.replication_offset()
+
+    async def close(self) -> None:
+        if self._lag_check is not None:
+            self._lag_check.cancel()
+        await asyncio.gather(
+            self.primary.close(),
+            *(replica.close() for replica in self.replicas),
+        )
@@ -0,0 +1,205 @@
+"""Client-side sharding of the cache backend across several nodes."""
+import asyncio
+import bisect
+import hashlib
+from typing import Optional
+
+from api.services.backends.base_backend import CacheBackend
+
+
+def hash_slot_key(key: str) -> str:
+    """Return the part of a key that decides its shard.
+
+    Follows the Redis Cluster rule: if the key holds a non-empty
+    `{...}` section, only the text between the first braces is hashed,
+    so keys sharing a hash tag always land on the same node.
+
+    Args:
+        key (str): Cache key
+
+    Returns:
+        str: Hash tag if present, otherwise the whole key
+    """
+    start = key.find('{')
+    if start != -1:
+        end = key.find('}', start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+def ring_hash(value: str) -> int:
+    """64-bit hash used to place keys and nodes on the ring."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class ShardedBackend(CacheBackend):
+    """Cache backend spreading keys over several backends.
+
+    Keys are placed on a consistent hash ring with `replicas` virtual
+    nodes per shard, so adding or removing a node only moves about
+    1/N of the keys. Hash tags are honoured, which keeps multi-key
+    reads of related keys on a single node.
+
+    Multi-key operations are split per shard and run concurrently.
+    Scans walk the shards one after another; the cursor encodes the
+    shard index and that shard's own cursor.
+
+    Attributes:
+        shards: Backends in ring order of construction
+    """
+
+    def __init__(self, shards: list[CacheBackend], replicas: int = 160):
+        """Build the hash ring.
+
+        Args:
+            shards (list[CacheBackend]): Backends to spread keys over
+            replicas (int): Virtual nodes per shard
+        """
+        if not shards:
+            raise ValueError('ShardedBackend needs at least one shard')
+        self.shards = shards
+        ring = sorted(
+            (ring_hash(f'{index}:{replica}'), index)
+            for index in range(len(shards))
+            for replica in range(replicas)
+        )
+        self._ring_hashes = [point for point, _ in ring]
+        self._ring_shards = [index for _, index in ring]
+
+    def shard_index(self, key: str) -> int:
+        """Index of the shard that owns a key."""
+        position = bisect.bisect(
+            self._ring_hashes, ring_hash(hash_slot_key(key))
+        )
+        return self._ring_shards[position % len(self._ring_shards)]
+
+    def _shard(self, key: str) -> CacheBackend:
+        return self.shards[self.shard_index(key)]
+
+    def _group(self, keys: tuple[str, ...]) -> dict[int, list[int]]:
+        """Group key positions by owning shard."""
+        groups: dict[int, list[int]] = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self.shard_index(key), []).append(position)
+        return groups
+
+    async def _mget(self, keys: tuple[str, ...], binary: bool) -> list:
+        groups = self._group(keys)
+        results = await asyncio.gather(*(
+            (
+                self.shards[index].mget_bytes if binary
+                else self.shards[index].mget
+            )(*(keys[position] for position in positions))
+            for index, positions in groups.items()
+        ))
+        values: list = [None] * len(keys)
+        for positions, shard_values in zip(groups.values(), results):
+            for position, value in zip(positions, shard_values):
+                values[position] = value
+        return values
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._shard(key).get(key)
+
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        return await self._mget(keys, binary=False)
+
+    async def mget_bytes(self, *keys: str) -> list[Optional[bytes]]:
+        return await self._mget(keys, binary=True)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        await self._shard(key).setex(key, ttl, value)
+
+    async def setex_many(self, items: list[tuple[str, int, str]]) -> None:
+        groups = self._group(tuple(key for key, _, _ in items))
+        await asyncio.gather(*(
+            self.shards[index].setex_many([items[p] for p in positions])
+            for index, positions in groups.items()
+        ))
+
+    async def setex_many_bytes(
+        self, items: list[tuple[str, int, bytes]]
+    ) -> None:
+        groups = self._group(tuple(key for key, _, _ in items))
+        await asyncio.gather(*(
+            self.shards[index].setex_many_bytes(
+                [items[p] for p in positions]
+            )
+            for index, positions in groups.items()
+        ))
+
+    async def setex_bytes(self, key: str, ttl: int, value: bytes) -> None:
+        await self._shard(key).setex_bytes(key, ttl, value)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self._shard(key).incr(key, amount)
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        return await self._shard(key).expire(key, ttl)
+
+    async def ttl(self, key: str) -> Optional[float]:
+        return await self._shard(key).ttl(key)
+
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 10
+    ) -> tuple[int, list[str]]:
+        shard_count = len(self.shards)
+        index, shard_cursor = cursor % shard_count, cursor // shard_count
+        shard_cursor, keys = await self.shards[index].scan(
+            shard_cursor, match=match, count=count
+        )
+        if shard_cursor == 0:
+            # This shard is done; continue with the next one, or stop
+            index += 1
+            if index == shard_count:
+                return 0, keys
+        return shard_cursor * shard_count + index, keys
+
+    async def delete(self, *keys: str) -> int:
+        groups = self._group(keys)
+        deleted = await asyncio.gather(*(
+            self.shards[index].delete(*(keys[p] for p in positions))
+            for index, positions in groups.items()
+        ))
+        return sum(deleted)
+
+    async def zadd(self, key: str, member: str, score: float) -> None:
+        await self._shard(key).zadd(key, member, score)
+
+    async def zrem(self, key: str, *members: str) -> int:
+        return await self._shard(key).zrem(key, *members)
+
+    async def zcard(self, key: str) -> int:
+        return await self._shard(key).zcard(key)
+
+    async def zremrangebyscore(
+        self, key: str, min_score: float, max_score: float
+    ) -> int:
+        return await self._shard(key).zremrangebyscore(
+            key, min_score, max_score
+        )
+
+    async def acquire_slot(
+        self, key: str, member: str, limit: int, now: float, ttl: int
+    ) -> bool:
+        return await self._shard(key).acquire_slot(
+            key, member, limit, now, ttl
+        )
+
+    async def renew_slot(
+        self, key: str, member: str, now: float, ttl: int
+    ) -> bool:
+        return await self._shard(key).renew_slot(key, member, now, ttl)
+
+    async def memory_usage(self, key: str) -> Optional[int]:
+        return await self._shard(key).memory_usage(key)
+
+    async def ping(self) -> bool:
+        await asyncio.gather(*(shard.ping() for shard in self.shards))
+        return True
+
+    async def close(self) -> None:
+        await asyncio.gather(*(shard.close() for shard in self.shards))
@@ -0,0 +1,242 @@
+"""Probabilistic cache analytics: hot keys, hit ratios, distinct prompts."""
+import base64
+import hashlib
+import math
+import os
+import socket
+import time
+from typing import Optional
+
+from api.services.config_service import Settings
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash, identical across worker processes."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Fold case and whitespace so trivially different prompts match."""
+    return ' '.join(prompt.split()).casefold()
+
+
+class CountMinSketch:
+    """Count-min sketch for approximate per-key frequencies.
+
+    Attributes:
+        width: Counters per row
+        depth: Number of rows (independent hash functions)
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def add(self, key_hash: int) -> int:
+        """Increment a key and return its new estimated count.
+
+        Args:
+            key_hash (int): 64-bit hash of the key
+
+        Returns:
+            int: Estimated count (never under-estimates)
+        """
+        # Kirsch-Mitzenmacher double hashing from a single 64-bit hash
+        h1 = key_hash & 0xFFFFFFFF
+        h2 = key_hash >> 32
+        estimate = None
+        for i, row in enumerate(self._rows):
+            idx = (h1 + i * h2) % self.width
+            row[idx] += 1
+            if estimate is None or row[idx] < estimate:
+                estimate = row[idx]
+        return estimate
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator.
+
+    Attributes:
+        precision: Number of index bits (2**precision registers)
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, key_hash: int) -> None:
+        """Add a 64-bit hash to the estimator."""
+        idx = key_hash >> (64 - self.precision)
+        rest = (key_hash << self.precision) & 0xFFFFFFFFFFFFFFFF
+        if rest:
+            rank = 64 - rest.bit_length() + 1
+        else:
+            rank = 64 - self.precision + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, registers: bytes) -> None:
+        """Merge registers from another estimator of the same precision."""
+        self.registers = bytearray(
+            max(a, b) for a, b in zip(self.registers, registers)
+        )
+
+    def count(self) -> int:
+        """Estimate the number of distinct items added.
+
+        Returns:
+            int: Estimated cardinality
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class CacheAnalytics:
+    """Per-worker cache lookup analytics.
+
+    Tracks hit/miss counters per model and mode, approximate hot keys
+    (count-min sketch feeding a bounded top-K table) and the number of
+    distinct prompts (HyperLogLog over the normalized prompt, so one
+    prompt asked in several modes or with different options counts
+    once). Recording a lookup costs a handful
+    of microseconds and never touches the network.
+
+    Attributes:
+        top_k: Number of hot keys to keep
+        flush_interval: Seconds between snapshot flushes to Redis
+        worker_id: Identifier of this worker process
+    """
+
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        flush_interval: Optional[int] = None,
+        settings: Optional[Settings] = None,
+    ):
+        settings = settings or Settings.from_env()
+        self.top_k = top_k or settings.cache_stats_top_k
+        self.flush_interval = (
+            flush_interval or settings.cache_stats_flush_interval
+        )
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.sketch = CountMinSketch()
+        self.distinct = HyperLogLog()
+        self.counters: dict[str, list[int]] = {}
+        self.top: dict[str, dict] = {}
+        self._top_floor = 0
+        self._last_flush = time.monotonic()
+
+    def record(
+        self, cache_key: str, model: str, mode: str, prompt: str, hit: bool
+    ) -> None:
+        """Record a cache lookup.
+
+        Args:
+            cache_key (str): The cache key looked up
+            model (str): The model name
+            mode (str): The response mode
+            prompt (str): The prompt text, counted for distinct prompts
+                and kept as a preview for hot keys
+            hit (bool): Whether the lookup was a cache hit
+        """
+        counter = self.counters.get(f'{model}:{mode}')
+        if counter is None:
+            counter = self.counters[f'{model}:{mode}'] = [0, 0]
+        counter[0 if hit else 1] += 1
+
+        self.distinct.add(_hash64(_normalize_prompt(prompt)))
+        key_hash = _hash64(cache_key)
+        estimate = self.sketch.add(key_hash)
+
+        entry = self.top.get(cache_key)
+        if entry is not None:
+            entry['count'] = estimate
+        elif len(self.top) < self.top_k:
+            self.top[cache_key] = {'count': estimate, 'prompt': prompt[:80]}
+        elif estimate > self._top_floor:
+            coldest = min(self.top, key=lambda k: self.top[k]['count'])
+            if estimate > self.top[coldest]['count']:
+                del self.top[coldest]
+                self.top[cache_key] = {
+                    'count': estimate, 'prompt': prompt[:80]
+                }
+            self._top_floor = min(e['count'] for e in self.top.values())
+
+    def should_flush(self) -> bool:
+        """Check whether the flush interval has elapsed."""
+        return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def snapshot(self) -> dict:
+        """Serialize this worker's analytics for storage in Redis.
+
+        Returns:
+            dict: JSON-serializable snapshot
+        """
+        self._last_flush = time.monotonic()
+        return {
+            'worker_id': self.worker_id,
+            'counters': self.counters,
+            'top': self.top,
+            'hll': base64.b64encode(self.distinct.registers).decode(),
+        }
+
+    @staticmethod
+    def merge_snapshots(snapshots: list[dict], top_k: int) -> dict:
+        """Merge snapshots from several workers into one report.
+
+        Args:
+            snapshots (list[dict]): Snapshots produced by `snapshot()`
+            top_k (int): Number of hot keys to report
+
+        Returns:
+            dict: Aggregated lookups, hit ratios, hot keys and the
+                distinct prompt estimate
+        """
+        counters: dict[str, list[int]] = {}
+        top: dict[str, dict] = {}
+        distinct = HyperLogLog()
+        for snap in snapshots:
+            for name, (hits, misses) in snap.get('counters', {}).items():
+                total = counters.setdefault(name, [0, 0])
+                total[0] += hits
+                total[1] += misses
+            for key, entry in snap.get('top', {}).items():
+                merged = top.setdefault(
+                    key, {'count': 0, 'prompt': entry.get('prompt', '')}
+                )
+                merged['count'] += entry.get('count', 0)
+            if snap.get('hll'):
+                distinct.merge(base64.b64decode(snap['hll']))
+
+        hits = sum(c[0] for c in counters.values())
+        misses = sum(c[1] for c in counters.values())
+        by_model_mode = []
+        for name, (h, m) in sorted(counters.items()):
+            model, _, mode = name.rpartition(':')
+            by_model_mode.append({
+                'model': model, 'mode': mode, 'hits': h, 'misses': m,
+                'hit_ratio': h / (h + m) if h + m else 0.0,
+            })
+        hot = sorted(top.items(), key=lambda kv: kv[1]['count'], reverse=True)
+        return {
+            'workers': len(snapshots),
+            'lookups': hits + misses,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'distinct_prompts': distinct.count(),
+            'by_model_mode': by_model_mode,
+            'top_prompts': [
+                {'key': k, 'count': e['count'], 'prompt': e['prompt']}
+                for k, e in hot[:top_k]
+            ],
+        }
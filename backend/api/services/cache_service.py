@@ -1,51 +1,237 @@
-"""Cache service for Redis operations."""
+"""Cache service for response caching and rate limiting."""
+import asyncio
+import fnmatch
 import hashlib
 import json
-import os
-from typing import Optional
-
-import redis.asyncio as redis
+import logging
+import sys
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
 
 from api.models.chats.ask_model import AskMode
+from api.services.backends.base_backend import CacheBackend
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.backends.redis_backend import RedisBackend
+from api.services.backends.replicated_backend import ReplicatedBackend
+from api.services.backends.sharded_backend import ShardedBackend
+from api.services.cache_analytics_service import CacheAnalytics
+from api.services import json_service
+from api.services.config_service import Settings, get_settings
+from api.services.disk_cache_service import DiskCacheService
+from api.services.rate_limit_service import (
+    LeasedRateLimiter, RateLimitExceeded
+)
+from api.services.shm_cache_service import SharedMemoryCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClientConcurrencyExceeded(Exception):
+    """Raised when a client already has too many generations in flight."""
+
+
+def _pack_vector(vector: list[float]) -> bytes:
+    """Encode an embedding as little-endian float32 bytes."""
+    packed = array('f', vector)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_vector(data: bytes) -> list[float]:
+    """Decode an embedding written by `_pack_vector`."""
+    packed = array('f')
+    packed.frombytes(data)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tolist()
 
 
 class CacheService:
-    """Service for caching and rate limiting using Redis.
+    """Service for caching and rate limiting.
 
-    This service provides async Redis operations for:
+    This service provides async operations on a pluggable backend
+    (Redis by default, or in-process memory for single-node
+    deployments) for:
     - Caching LLM responses to reduce redundant API calls
     - Rate limiting to prevent abuse
     - Session management for conversation history
 
+    When SHM_CACHE_PATH is set, responses are first looked up in a
+    shared-memory table common to all workers on the host. When
+    DISK_CACHE_PATH is set, responses are also kept in a local SQLite
+    tier that is consulted when Redis misses or is unavailable.
+
+    Response caching and rate limiting can use separate stores, so
+    small hot counters don't compete with large cached values, and the
+    response cache can be sharded across several Redis nodes.
+
+    With CACHE_WRITE_BEHIND enabled, response writes to the backend
+    are buffered in memory and flushed in pipelined batches by a
+    background task, so a cache miss doesn't wait for SETEX. Buffered
+    entries are served from the buffer until they are flushed.
+
     Attributes:
-        redis_client: Async Redis client instance
+        backend: Response cache backend (Redis, sharded or replicated
+            Redis, or memory)
+        limiter_backend: Rate limit counter backend
         cache_ttl: Time-to-live for cached responses in seconds
         rate_limit_window: Time window for rate limiting in seconds
         rate_limit_max: Maximum requests allowed per window
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        limiter_backend: Optional[CacheBackend] = None,
+        settings: Optional[Settings] = None,
+    ):
         """Initialize the cache service.
 
-        Connects to Redis using REDIS_URL from environment.
-        Falls back to localhost if not specified.
+        Selects the backend type with CACHE_BACKEND ('redis' or
+        'memory'). Cached responses use CACHE_REDIS_URL and rate limit
+        counters use RATE_LIMIT_REDIS_URL; both fall back to REDIS_URL
+        (and localhost) and share one connection when they are equal.
+
+        Args:
+            backend (Optional[CacheBackend]): Response cache backend to
+                use instead of the configured one
+            limiter_backend (Optional[CacheBackend]): Rate limit backend
+                to use instead of the configured one, defaults to
+                `backend` when that is given
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
         """
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-        self.redis_client = redis.from_url(
-            redis_url,
-            encoding='utf-8',
-            decode_responses=True,
+        settings = settings or Settings.from_env()
+        if backend is None:
+            backend, configured_limiter = self._create_backends(settings)
+            limiter_backend = limiter_backend or configured_limiter
+        self.backend = backend
+        self.limiter_backend = limiter_backend or backend
+        self.cache_ttl = settings.cache_ttl  # 1 hour
+        self.rate_limit_window = settings.rate_limit_window  # 60 seconds
+        self.rate_limit_max = settings.rate_limit_max  # 10 requests
+        self.rate_limit_mode = settings.rate_limit_mode.lower()
+        self.leased_limiter: Optional[LeasedRateLimiter] = None
+        if self.rate_limit_mode == 'leased':
+            self.leased_limiter = LeasedRateLimiter(
+                self.limiter_backend,
+                self.rate_limit_max,
+                self.rate_limit_window,
+                lease_size=(
+                    settings.rate_limit_lease_size
+                    if settings.rate_limit_lease_size is not None
+                    else max(1, self.rate_limit_max // 10)
+                ),
+                lease_ttl=settings.rate_limit_lease_ttl,
+            )
+        self.client_concurrency_max = settings.client_concurrency_max
+        self.client_concurrency_lease_ttl = (
+            settings.client_concurrency_lease_ttl
+        )
+        self.client_concurrency_queue_timeout = (
+            settings.client_concurrency_queue_timeout
         )
-        self.cache_ttl = int(os.getenv('CACHE_TTL', '3600'))  # 1 hour
-        self.rate_limit_window = int(
-            os.getenv('RATE_LIMIT_WINDOW', '60')
-        )  # 60 seconds
-        self.rate_limit_max = int(
-            os.getenv('RATE_LIMIT_MAX', '10')
-        )  # 10 requests
+        self.analytics = CacheAnalytics(settings=settings)
+        self.disk_cache = DiskCacheService(settings=settings)
+        self.shm_cache = SharedMemoryCache(settings=settings)
+        self.shm_cache_ttl = settings.shm_cache_ttl
+        self.embedding_cache_ttl = settings.embed_cache_ttl  # 1 day
+        self.memory_sample_size = settings.cache_stats_memory_sample
+        self.write_behind = settings.cache_write_behind
+        self.write_behind_max = settings.cache_write_behind_max
+        self.write_behind_batch = settings.cache_write_behind_batch
+        self.write_behind_interval = (
+            settings.cache_write_behind_interval_ms / 1000
+        )
+        self.write_behind_flushed = 0
+        self.write_behind_dropped = 0
+        self.write_behind_failed = 0
+        # key -> (ttl, payload), oldest first; entries move to
+        # _flushing while their batch is being written
+        self._write_buffer: OrderedDict[str, tuple[int, str]] = \
+            OrderedDict()
+        self._flushing: dict[str, tuple[int, str]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._analytics_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _create_backends(
+        settings: Settings,
+    ) -> tuple[CacheBackend, CacheBackend]:
+        """Create the response cache and rate limit backends.
+
+        CACHE_REDIS_URL may list several comma-separated URLs to shard
+        the response cache client-side with consistent hashing, or
+        name a Redis Cluster node when CACHE_REDIS_CLUSTER is true.
+        With a single cache URL, CACHE_REDIS_REPLICA_URLS sends cache
+        reads to read replicas of it.
+
+        Args:
+            settings (Settings): Backend type, URLs and options
+
+        Returns:
+            tuple[CacheBackend, CacheBackend]: Cache and limiter backends
+
+        Raises:
+            ValueError: If CACHE_BACKEND names an unknown backend
+        """
+        backend = settings.cache_backend.lower()
+        if backend == 'memory':
+            # Separate stores, so filling the response cache can't
+            # evict rate limit counters or concurrency leases
+            max_keys = settings.memory_backend_max_keys
+            return MemoryBackend(max_keys), MemoryBackend(max_keys)
+        if backend != 'redis':
+            raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+        default_url = settings.redis_url
+        cache_urls = [
+            url.strip() for url in
+            (settings.cache_redis_url or default_url).split(',')
+            if url.strip()
+        ]
+        limiter_url = settings.rate_limit_redis_url or default_url
+        cluster = settings.cache_redis_cluster
+
+        replica_urls = [
+            url.strip() for url in
+            settings.cache_redis_replica_urls.split(',')
+            if url.strip()
+        ]
+
+        if len(cache_urls) > 1:
+            cache = ShardedBackend([RedisBackend(url) for url in cache_urls])
+        else:
+            cache = RedisBackend(cache_urls[0], cluster=cluster)
+        limiter = cache
+        if cache_urls != [limiter_url] or cluster:
+            limiter = RedisBackend(limiter_url)
+        if replica_urls and isinstance(cache, RedisBackend) \
+                and not cluster:
+            # Reads go to replicas; writes and counters stay on the
+            # primary, which the limiter keeps using directly
+            cache = ReplicatedBackend(
+                cache,
+                [RedisBackend(url) for url in replica_urls],
+                selection=settings.cache_replica_selection,
+                max_lag=settings.cache_replica_max_lag,
+            )
+        return cache, limiter
 
     def _generate_cache_key(
-        self, model: str, prompt: str, mode: str = AskMode.CONCISE
+        self,
+        model: str,
+        prompt: str,
+        mode: str = AskMode.CONCISE,
+        options: Optional[dict] = None,
     ) -> str:
         """Generate a cache key for LLM responses.
 
@@ -53,16 +239,70 @@ class CacheService:
             model (str): The model name
             prompt (str): The prompt text
             mode (str): The response mode (concise, professional, etc.)
+            options (Optional[dict]): Generation options for the request
 
         Returns:
-            str: Cache key in format 'llm:{model}:{mode}:{hash}'
+            str: Cache key in format 'llm:{<model>:<hash>}:<mode>', with
+                ':<options_hash>' appended when options are given. The
+                braces are a Redis Cluster hash tag, so every mode of a
+                prompt lives on one node and can be read with one MGET.
         """
         # Use SHA256 hash of prompt for consistent key generation
         prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()[:16]
-        return f'llm:{model}:{mode}:{prompt_hash}'
+        key = f'llm:{{{model}:{prompt_hash}}}:{mode}'
+        if options:
+            # Hashed with the stdlib encoder so keys don't depend on
+            # whether a worker has the fast encoder installed
+            options_hash = hashlib.sha256(
+                json.dumps(options, sort_keys=True).encode()
+            ).hexdigest()[:8]
+            key = f'{key}:{options_hash}'
+        return key
+
+    async def _lookup(
+        self, cache_key: str, model: str, prompt: str, mode: str
+    ) -> Optional[str]:
+        """Read a cached value through every tier and record the lookup.
+
+        Args:
+            cache_key (str): Cache key
+            model (str): The model name
+            prompt (str): The prompt text
+            mode (str): The response mode
+
+        Returns:
+            Optional[str]: Serialized value or None if not found
+        """
+        cached_data = None
+        if self.shm_cache.enabled:
+            cached_data = self.shm_cache.get(cache_key)
+        if not cached_data:
+            cached_data = await self._get_from_stores(cache_key)
+            if cached_data and self.shm_cache.enabled:
+                # Backfill so other workers on this host hit locally;
+                # a failed copy mustn't turn the hit into an error
+                try:
+                    self.shm_cache.set(
+                        cache_key, cached_data,
+                        min(self.shm_cache_ttl, self.cache_ttl),
+                    )
+                except Exception:
+                    logger.warning(
+                        'Shared memory backfill failed for %s', cache_key,
+                        exc_info=True,
+                    )
+        self.analytics.record(
+            cache_key, model, mode, prompt, hit=bool(cached_data)
+        )
+        self._schedule_analytics_flush()
+        return cached_data
 
     async def get_cached_response(
-        self, model: str, prompt: str, mode: str = AskMode.CONCISE
+        self,
+        model: str,
+        prompt: str,
+        mode: str = AskMode.CONCISE,
+        options: Optional[dict] = None,
     ) -> Optional[dict]:
         """Get cached LLM response if available.
 
@@ -70,20 +310,219 @@ class CacheService:
             model (str): The model name
             prompt (str): The prompt text
             mode (str): The response mode (concise, professional, etc.)
+            options (Optional[dict]): Generation options for the request
 
         Returns:
             Optional[dict]: Cached response dict or None if not found
         """
         try:
-            cache_key = self._generate_cache_key(model, prompt, mode)
-            cached_data = await self.redis_client.get(cache_key)
+            cache_key = self._generate_cache_key(
+                model, prompt, mode, options
+            )
+            cached_data = await self._lookup(cache_key, model, prompt, mode)
             if cached_data:
-                return json.loads(cached_data)
+                return json_service.loads(cached_data)
             return None
         except Exception:
             # If Redis fails, don't break the app - just skip cache
             return None
 
+    async def get_cached_body(
+        self,
+        model: str,
+        prompt: str,
+        mode: str = AskMode.CONCISE,
+        options: Optional[dict] = None,
+        route: Optional[dict] = None,
+    ) -> Optional[bytes]:
+        """Get a cached response as a ready-to-send JSON body.
+
+        Entries are stored as the serialized `AskResponse` minus its
+        `route`, so a hit is returned without parsing or validating it:
+        the route (null for explicit models) is added as the last key
+        of the stored object. An entry not in that format is treated as
+        a miss rather than spliced.
+
+        Args:
+            model (str): The model name
+            prompt (str): The prompt text
+            mode (str): The response mode (concise, professional, etc.)
+            options (Optional[dict]): Generation options for the request
+            route (Optional[dict]): Route decision for 'auto' requests
+
+        Returns:
+            Optional[bytes]: UTF-8 JSON response body or None if not
+                found
+        """
+        try:
+            cache_key = self._generate_cache_key(
+                model, prompt, mode, options
+            )
+            cached_data = await self._lookup(cache_key, model, prompt, mode)
+        except Exception:
+            # If Redis fails, don't break the app - just skip cache
+            return None
+        if not cached_data or not (
+            cached_data.startswith('{"model":') and cached_data.endswith('}')
+        ):
+            return None
+        body, _, _ = cached_data.rpartition('}')
+        return f'{body},"route":{json_service.dumps_str(route)}}}'.encode()
+
+    async def get_cached_validator(
+        self,
+        model: str,
+        prompt: str,
+        mode: str = AskMode.CONCISE,
+        options: Optional[dict] = None,
+        route: Optional[dict] = None,
+    ) -> Optional[tuple[str, int]]:
+        """Get the ETag and remaining lifetime of a cached response.
+
+        Only the small validator written next to the entry (a hash of
+        the stored payload and its expiry) is read, never the payload
+        itself, so conditional requests are answered without moving
+        it. The ETag hashes the payload hash and the route, which
+        together determine the body `get_cached_body` sends, so every
+        worker derives the same ETag for the same content.
+
+        Args:
+            model (str): The model name
+            prompt (str): The prompt text
+            mode (str): The response mode (concise, professional, etc.)
+            options (Optional[dict]): Generation options for the request
+            route (Optional[dict]): Route decision for 'auto' requests
+
+        Returns:
+            Optional[tuple[str, int]]: Quoted strong ETag and whole
+                seconds left to live, or None if the backend doesn't
+                hold the entry (or has under a second left)
+        """
+        cache_key = self._generate_cache_key(model, prompt, mode, options)
+        entry = self._write_buffer.get(cache_key) \
+            or self._flushing.get(cache_key)
+        if entry:
+            # Not written yet; derive the validator the flush will write
+            validator = self._with_validator(cache_key, *entry)[1][2]
+        else:
+            try:
+                validator = await self.backend.get(
+                    self._validator_key(cache_key)
+                )
+            except Exception:
+                return None
+        if not validator:
+            return None
+        payload_hash, _, expires_at = validator.partition(':')
+        try:
+            ttl = float(expires_at) - time.time()
+        except ValueError:
+            return None
+        if ttl < 1:
+            return None
+        digest = hashlib.sha256(
+            f'{payload_hash}:{json_service.dumps_str(route)}'.encode()
+        ).hexdigest()[:32]
+        return f'"{digest}"', int(ttl)
+
+    async def get_cached_responses(
+        self, model: str, prompt: str, options_by_mode: dict
+    ) -> dict[str, Optional[dict]]:
+        """Get cached responses for several modes of one prompt.
+
+        Keys missing from the shared-memory tier are fetched from the
+        backend with a single MGET.
+
+        Args:
+            model (str): The model name
+            prompt (str): The prompt text
+            options_by_mode (dict): Generation options keyed by mode
+
+        Returns:
+            dict[str, Optional[dict]]: Cached response (or None) per mode
+        """
+        keys = {
+            mode: self._generate_cache_key(model, prompt, mode, options)
+            for mode, options in options_by_mode.items()
+        }
+        found: dict[str, Optional[str]] = dict.fromkeys(keys)
+        if self.shm_cache.enabled:
+            for mode, key in keys.items():
+                try:
+                    found[mode] = self.shm_cache.get(key)
+                except Exception:
+                    pass
+
+        for mode, key in keys.items():
+            if not found[mode]:
+                found[mode] = self._buffered(key)
+
+        pending = [mode for mode in keys if not found[mode]]
+        if pending:
+            try:
+                values = await self.backend.mget(
+                    *(keys[mode] for mode in pending)
+                )
+            except Exception:
+                # Redis is down - fall through to the disk tier
+                values = [None] * len(pending)
+            for mode, value in zip(pending, values):
+                if not value and self.disk_cache.enabled:
+                    try:
+                        value = await self.disk_cache.get(keys[mode])
+                    except Exception:
+                        value = None
+                if value and self.shm_cache.enabled:
+                    try:
+                        self.shm_cache.set(
+                            keys[mode], value,
+                            min(self.shm_cache_ttl, self.cache_ttl),
+                        )
+                    except Exception:
+                        logger.warning(
+                            'Shared memory backfill failed for %s',
+                            keys[mode], exc_info=True,
+                        )
+                found[mode] = value
+
+        results: dict[str, Optional[dict]] = {}
+        for mode, value in found.items():
+            data = None
+            if value:
+                try:
+                    data = json_service.loads(value)
+                except ValueError:
+                    # Corrupt entry: regenerate it like a miss
+                    pass
+            self.analytics.record(
+                keys[mode], model, mode, prompt, hit=data is not None
+            )
+            results[mode] = data
+        self._schedule_analytics_flush()
+        return results
+
+    async def _get_from_stores(self, cache_key: str) -> Optional[str]:
+        """Read a key from the backend, falling back to the disk tier.
+
+        Args:
+            cache_key (str): Cache key
+
+        Returns:
+            Optional[str]: Serialized value or None if not found
+        """
+        cached_data = self._buffered(cache_key)
+        if cached_data:
+            return cached_data
+        try:
+            cached_data = await self.backend.get(cache_key)
+        except Exception:
+            # Redis is down - fall through to the disk tier
+            cached_data = None
+        if not cached_data and self.disk_cache.enabled:
+            # Redis missed or is down - fall back to the disk tier
+            cached_data = await self.disk_cache.get(cache_key)
+        return cached_data
+
     async def cache_response(
         self,
         model: str,
@@ -91,33 +530,252 @@ class CacheService:
         response: dict,
         mode: str = AskMode.CONCISE,
         ttl: Optional[int] = None,
+        options: Optional[dict] = None,
     ) -> bool:
         """Cache an LLM response.
 
+        The response is stored as compact JSON, so a dumped
+        `AskResponse` without its route can later be served as is by
+        `get_cached_body`. A validator holding the payload's hash and
+        expiry is written to the backend in the same batch for
+        `get_cached_validator`.
+
         Args:
             model (str): The model name
             prompt (str): The prompt text
             response (dict): The response data to cache
             mode (str): The response mode (concise, professional, etc.)
             ttl (Optional[int]): Time-to-live in seconds, uses default if None
+            options (Optional[dict]): Generation options for the request
 
         Returns:
             bool: True if cached successfully, False otherwise
         """
+        cache_key = self._generate_cache_key(model, prompt, mode, options)
+        ttl = ttl or self.cache_ttl
+        payload = json_service.dumps_str(response)
+        cached = False
+        if self.shm_cache.enabled:
+            try:
+                self.shm_cache.set(
+                    cache_key, payload, min(self.shm_cache_ttl, ttl)
+                )
+            except Exception:
+                pass
+        if self.write_behind:
+            # The flusher writes the disk tier too
+            self._enqueue_write(cache_key, ttl, payload)
+            return True
         try:
-            cache_key = self._generate_cache_key(model, prompt, mode)
-            ttl = ttl or self.cache_ttl
-            await self.redis_client.setex(
-                cache_key, ttl, json.dumps(response)
+            await self.backend.setex_many(
+                self._with_validator(cache_key, ttl, payload)
+            )
+            cached = True
+        except Exception:
+            # If Redis fails, don't break the app - just skip cache
+            pass
+        if self.disk_cache.enabled:
+            try:
+                await self.disk_cache.set(cache_key, payload, ttl)
+                cached = True
+            except Exception:
+                pass
+        return cached
+
+    @staticmethod
+    def _validator_key(cache_key: str) -> str:
+        """Key of the validator stored next to a cached response.
+
+        It shares the entry's hash tag and 'llm:' prefix, so it lives
+        on the same node and is cleared with it.
+        """
+        return f'{cache_key}:etag'
+
+    def _with_validator(
+        self, cache_key: str, ttl: int, payload: str
+    ) -> list[tuple[str, int, str]]:
+        """Backend writes for a response and its validator."""
+        payload_hash = hashlib.sha256(payload.encode()).hexdigest()[:32]
+        return [
+            (cache_key, ttl, payload),
+            (
+                self._validator_key(cache_key),
+                ttl,
+                f'{payload_hash}:{time.time() + ttl:.3f}',
+            ),
+        ]
+
+    def _buffered(self, cache_key: str) -> Optional[str]:
+        """Return a response still waiting to be written, if any."""
+        entry = self._write_buffer.get(cache_key) \
+            or self._flushing.get(cache_key)
+        return entry[1] if entry else None
+
+    def _enqueue_write(self, cache_key: str, ttl: int, payload: str) -> None:
+        """Buffer a backend write and make sure the flusher is running.
+
+        A full buffer drops its oldest entry: losing a cache write only
+        costs a future miss, while blocking would slow the response.
+        """
+        self._write_buffer[cache_key] = (ttl, payload)
+        self._write_buffer.move_to_end(cache_key)
+        while len(self._write_buffer) > self.write_behind_max:
+            self._write_buffer.popitem(last=False)
+            self.write_behind_dropped += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Flush the buffer every interval until it stays empty."""
+        while self._write_buffer:
+            await asyncio.sleep(self.write_behind_interval)
+            while self._write_buffer:
+                await self.flush_writes()
+
+    async def flush_writes(self) -> int:
+        """Write the oldest batch of buffered responses to the backend.
+
+        The batch, with each response's validator, is sent as one
+        pipeline, then to the disk tier in one transaction. If the
+        backend write fails the entries are dropped, like a failed
+        synchronous write would be; the disk tier still gets them.
+        Batches are written one at a time, and not while
+        `clear_cache` runs.
+
+        Returns:
+            int: Number of entries written to the backend
+        """
+        async with self._flush_lock:
+            batch = []
+            while self._write_buffer \
+                    and len(batch) < self.write_behind_batch:
+                key, entry = self._write_buffer.popitem(last=False)
+                self._flushing[key] = entry
+                batch.append((key, *entry))
+            if not batch:
+                return 0
+            try:
+                written = 0
+                try:
+                    await self.backend.setex_many([
+                        item for entry in batch
+                        for item in self._with_validator(*entry)
+                    ])
+                    self.write_behind_flushed += len(batch)
+                    written = len(batch)
+                except Exception:
+                    self.write_behind_failed += len(batch)
+                if self.disk_cache.enabled:
+                    try:
+                        await self.disk_cache.set_many([
+                            (key, ttl, payload)
+                            for key, ttl, payload in batch
+                        ])
+                    except Exception:
+                        pass
+                return written
+            finally:
+                for key, _, _ in batch:
+                    self._flushing.pop(key, None)
+
+    async def drain_writes(self) -> None:
+        """Flush every buffered write and stop the flusher."""
+        while self._write_buffer:
+            await self.flush_writes()
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            # Let a batch the flusher is writing finish
+            await task
+
+    def get_write_behind_metrics(self) -> dict:
+        """Get write-behind counters for this worker.
+
+        Returns:
+            dict: Whether it is enabled, buffered entries and flushed,
+                dropped and failed writes
+        """
+        return {
+            'enabled': self.write_behind,
+            'buffered': len(self._write_buffer) + len(self._flushing),
+            'flushed': self.write_behind_flushed,
+            'dropped': self.write_behind_dropped,
+            'failed': self.write_behind_failed,
+        }
+
+    def _embedding_cache_key(self, model: str, text: str) -> str:
+        """Generate a cache key for an embedding.
+
+        Args:
+            model (str): The embedding model name
+            text (str): The embedded text
+
+        Returns:
+            str: Cache key in format 'emb:{model}:{hash}'
+        """
+        text_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
+        return f'emb:{model}:{text_hash}'
+
+    async def get_cached_embeddings(
+        self, model: str, texts: list[str]
+    ) -> list[Optional[list[float]]]:
+        """Get cached embeddings for several texts with one MGET.
+
+        Args:
+            model (str): The embedding model name
+            texts (list[str]): Texts to look up
+
+        Returns:
+            list[Optional[list[float]]]: Embedding (or None) per text
+        """
+        try:
+            values = await self.backend.mget_bytes(
+                *(self._embedding_cache_key(model, text) for text in texts)
             )
-            return True
         except Exception:
             # If Redis fails, don't break the app - just skip cache
+            return [None] * len(texts)
+        return [_unpack_vector(value) if value else None for value in values]
+
+    async def cache_embeddings(
+        self,
+        model: str,
+        embeddings: dict[str, list[float]],
+        ttl: Optional[int] = None,
+    ) -> bool:
+        """Cache embeddings as float32 binary values, in one pipeline.
+
+        Ollama returns embeddings as float64 JSON numbers, so storing
+        them as float32 rounds each value to about 7 significant
+        digits. That is far below what changes a similarity ranking,
+        and the values take a third of the space of JSON text.
+
+        Args:
+            model (str): The embedding model name
+            embeddings (dict[str, list[float]]): Embedding per text
+            ttl (Optional[int]): Time-to-live in seconds, defaults to
+                EMBED_CACHE_TTL
+
+        Returns:
+            bool: True if cached successfully, False otherwise
+        """
+        ttl = ttl or self.embedding_cache_ttl
+        try:
+            await self.backend.setex_many_bytes([
+                (self._embedding_cache_key(model, text), ttl,
+                 _pack_vector(vector))
+                for text, vector in embeddings.items()
+            ])
+            return True
+        except Exception:
             return False
 
     async def check_rate_limit(self, identifier: str) -> tuple[bool, int]:
         """Check if request is within rate limit.
 
+        With RATE_LIMIT_MODE=leased the decision is usually made from
+        this worker's quota lease without a round trip, and the count
+        is an estimate.
+
         Args:
             identifier (str): Unique identifier (user ID, IP address, etc.)
 
@@ -127,8 +785,10 @@ class CacheService:
                 current_count: Current number of requests in window
         """
         try:
+            if self.leased_limiter is not None:
+                return await self.leased_limiter.check(identifier)
             key = f'rate_limit:{identifier}'
-            current_count = await self.redis_client.get(key)
+            current_count = await self.limiter_backend.get(key)
 
             if current_count is None:
                 current_count = 0
@@ -150,63 +810,378 @@ class CacheService:
 
         Returns:
             int: New count after increment
+
+        Raises:
+            RateLimitExceeded: With RATE_LIMIT_MODE=leased, if the
+                client's quota ran out after its request was checked
         """
         try:
+            if self.leased_limiter is not None:
+                return await self.leased_limiter.consume(identifier)
             key = f'rate_limit:{identifier}'
-            count = await self.redis_client.incr(key)
+            count = await self.limiter_backend.incr(key)
 
             # Set expiry on first request
             if count == 1:
-                await self.redis_client.expire(key, self.rate_limit_window)
+                await self.limiter_backend.expire(
+                    key, self.rate_limit_window
+                )
 
             return count
+        except RateLimitExceeded:
+            raise
         except Exception:
             # If Redis fails, return 0
             return 0
 
+    async def _try_acquire_client_slot(
+        self, identifier: str
+    ) -> Optional[str]:
+        """Try once to take one of a client's concurrency slots.
+
+        Slots are members of the sorted set 'concurrency:{identifier}'
+        scored by lease expiry. Expired leases (from crashed workers)
+        are dropped, counted and the new lease added in one atomic
+        backend call, a single round trip on Redis.
+
+        Args:
+            identifier (str): Unique identifier (user ID, IP address, etc.)
+
+        Returns:
+            Optional[str]: Lease token, '' if the limiter store is down
+                (fail open), or None if the client is at its limit
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.limiter_backend.acquire_slot(
+                f'concurrency:{identifier}',
+                token,
+                self.client_concurrency_max,
+                time.time(),
+                self.client_concurrency_lease_ttl,
+            )
+        except Exception:
+            # If Redis fails, allow the request (fail open)
+            return ''
+        return token if acquired else None
+
+    async def _renew_client_slot(self, identifier: str, token: str) -> None:
+        """Extend a held lease every half lease TTL until cancelled.
+
+        Stops once the lease is gone: it expired and was dropped, and
+        its slot may already belong to another request.
+        """
+        key = f'concurrency:{identifier}'
+        ttl = self.client_concurrency_lease_ttl
+        while True:
+            await asyncio.sleep(ttl / 2)
+            try:
+                renewed = await self.limiter_backend.renew_slot(
+                    key, token, time.time(), ttl
+                )
+            except Exception:
+                continue
+            if not renewed:
+                return
+
+    @asynccontextmanager
+    async def client_concurrency_slot(
+        self, identifier: str
+    ) -> AsyncIterator[None]:
+        """Hold one of a client's concurrency slots for the block.
+
+        Caps in-flight generations per client at CLIENT_CONCURRENCY_MAX
+        across all workers. A client at its limit waits up to
+        CLIENT_CONCURRENCY_QUEUE_TIMEOUT seconds for a slot (0 rejects
+        immediately). Leases expire after CLIENT_CONCURRENCY_LEASE_TTL
+        seconds so slots held by crashed workers come back; while the
+        block runs, its lease is renewed every half TTL so long
+        generations keep their slot.
+
+        Args:
+            identifier (str): Unique identifier (user ID, IP address, etc.)
+
+        Raises:
+            ClientConcurrencyExceeded: If no slot freed up in time
+        """
+        if self.client_concurrency_max <= 0:
+            yield
+            return
+        deadline = time.monotonic() + self.client_concurrency_queue_timeout
+        delay = 0.05
+        while True:
+            token = await self._try_acquire_client_slot(identifier)
+            if token is not None:
+                break
+            if time.monotonic() + delay > deadline:
+                raise ClientConcurrencyExceeded(
+                    f'Too many concurrent requests '
+                    f'(max {self.client_concurrency_max} per client)'
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        renewal = (
+            asyncio.create_task(self._renew_client_slot(identifier, token))
+            if token else None
+        )
+        try:
+            yield
+        finally:
+            if renewal is not None:
+                renewal.cancel()
+            if token:
+                try:
+                    await self.limiter_backend.zrem(
+                        f'concurrency:{identifier}', token
+                    )
+                except Exception:
+                    pass
+
     async def clear_cache(self, pattern: str = 'llm:*') -> int:
         """Clear cached entries matching pattern.
 
+        The shared-memory tier stores key hashes only, so it can't be
+        matched against the pattern: any clear empties the whole tier
+        on this host. Its entries are refilled from Redis on the next
+        lookups.
+
         Args:
             pattern (str): Redis key pattern to match
 
         Returns:
-            int: Number of keys deleted
+            int: Number of keys deleted, not counting shared-memory
+                entries
         """
+        # Wait for a batch being flushed, so it can't bring cleared
+        # entries back, and hold off the next one until the clear is
+        # done
+        async with self._flush_lock:
+            return await self._clear_unflushed(pattern)
+
+    async def _clear_unflushed(self, pattern: str) -> int:
+        """Clear entries matching pattern; the flush lock must be held."""
+        deleted = 0
+        for key in [
+            key for key in self._write_buffer
+            if fnmatch.fnmatchcase(key, pattern)
+        ]:
+            del self._write_buffer[key]
+        if self.shm_cache.enabled:
+            try:
+                # Only key hashes are stored, so drop the whole tier
+                self.shm_cache.clear()
+            except Exception:
+                pass
+        if self.disk_cache.enabled:
+            try:
+                deleted += await self.disk_cache.clear(pattern)
+            except Exception:
+                pass
         try:
             cursor = 0
-            deleted = 0
             while True:
-                cursor, keys = await self.redis_client.scan(
+                cursor, keys = await self.backend.scan(
                     cursor, match=pattern, count=100
                 )
                 if keys:
-                    deleted += await self.redis_client.delete(*keys)
+                    deleted += await self.backend.delete(*keys)
                 if cursor == 0:
                     break
             return deleted
         except Exception:
-            return 0
+            return deleted
+
+    def _schedule_analytics_flush(self) -> None:
+        """Flush analytics in the background once the interval is up.
+
+        The lookup that crosses the interval doesn't wait for the write,
+        and only one flush is in flight at a time.
+        """
+        if not self.analytics.should_flush():
+            return
+        if self._analytics_task is None or self._analytics_task.done():
+            self._analytics_task = asyncio.create_task(
+                self.flush_analytics()
+            )
+
+    async def flush_analytics(self) -> bool:
+        """Flush this worker's cache analytics snapshot to Redis.
+
+        Each worker writes its own snapshot under
+        'cache_stats:{worker_id}' with a TTL of a few flush intervals,
+        so snapshots of dead workers age out on their own.
+
+        Returns:
+            bool: True if flushed successfully, False otherwise
+        """
+        try:
+            snapshot = self.analytics.snapshot()
+            await self.backend.setex(
+                f'cache_stats:{snapshot["worker_id"]}',
+                self.analytics.flush_interval * 5,
+                json_service.dumps_str(snapshot),
+            )
+            return True
+        except Exception:
+            return False
+
+    async def get_memory_usage(
+        self, pattern: str = 'llm:*', sample_size: Optional[int] = None
+    ) -> dict:
+        """Estimate memory used by keys matching pattern.
+
+        Counts every matching key but only asks Redis for MEMORY USAGE
+        on the first `sample_size` keys, extrapolating the total.
+
+        Args:
+            pattern (str): Redis key pattern to match
+            sample_size (Optional[int]): Keys to measure, defaults to
+                CACHE_STATS_MEMORY_SAMPLE (100)
+
+        Returns:
+            dict: Key count, sampled keys, sampled bytes and the
+                estimated total bytes
+        """
+        sample_size = sample_size or self.memory_sample_size
+        keys_total = 0
+        sampled = 0
+        sampled_bytes = 0
+        try:
+            cursor = 0
+            while True:
+                cursor, keys = await self.backend.scan(
+                    cursor, match=pattern, count=1000
+                )
+                keys_total += len(keys)
+                for key in keys[:max(0, sample_size - sampled)]:
+                    sampled_bytes += (
+                        await self.backend.memory_usage(key) or 0
+                    )
+                    sampled += 1
+                if cursor == 0:
+                    break
+        except Exception:
+            pass
+        estimated = (
+            int(sampled_bytes / sampled * keys_total) if sampled else 0
+        )
+        return {
+            'pattern': pattern,
+            'keys': keys_total,
+            'sampled_keys': sampled,
+            'sampled_bytes': sampled_bytes,
+            'estimated_bytes': estimated,
+        }
+
+    async def get_cache_stats(self) -> dict:
+        """Aggregate cache analytics across all workers.
+
+        Flushes this worker's snapshot first so the report is current,
+        then merges every live worker snapshot and adds memory
+        accounting for the 'llm:*' namespace.
+
+        Returns:
+            dict: Aggregated cache statistics
+        """
+        await self.flush_analytics()
+        snapshots = []
+        try:
+            cursor = 0
+            while True:
+                cursor, keys = await self.backend.scan(
+                    cursor, match='cache_stats:*', count=100
+                )
+                for key in keys:
+                    data = await self.backend.get(key)
+                    if data:
+                        snapshots.append(json_service.loads(data))
+                if cursor == 0:
+                    break
+        except Exception:
+            # Fall back to this worker's view if Redis is unavailable
+            snapshots = [self.analytics.snapshot()]
+        stats = CacheAnalytics.merge_snapshots(
+            snapshots, self.analytics.top_k
+        )
+        stats['memory'] = await self.get_memory_usage()
+        return stats
+
+    @property
+    def _limiter_is_separate(self) -> bool:
+        """Whether the limiter store needs its own ping and close.
+
+        It doesn't when it is the cache backend, or the primary of a
+        replicated cache backend, which pings and closes it already.
+        """
+        if self.limiter_backend is self.backend:
+            return False
+        return not (
+            isinstance(self.backend, ReplicatedBackend)
+            and self.limiter_backend is self.backend.primary
+        )
 
     async def health_check(self) -> bool:
-        """Check if Redis connection is healthy.
+        """Check if the backend connections are healthy.
 
         Returns:
-            bool: True if Redis is accessible, False otherwise
+            bool: True if the cache and limiter backends are accessible,
+                False otherwise
         """
         try:
-            await self.redis_client.ping()
+            await self.backend.ping()
+            if self._limiter_is_separate:
+                await self.limiter_backend.ping()
             return True
         except Exception:
             return False
 
+    def get_rate_limit_metrics(self) -> dict:
+        """Get rate limiter counters for this worker.
+
+        Returns:
+            dict: Limiter mode, plus lease counters in leased mode
+        """
+        if self.leased_limiter is not None:
+            return self.leased_limiter.get_metrics()
+        return {'mode': self.rate_limit_mode}
+
     async def close(self):
-        """Close Redis connection."""
+        """Flush buffered writes, return leased quota and close stores."""
         try:
-            await self.redis_client.close()
+            await self.drain_writes()
+        except Exception:
+            pass
+        task, self._analytics_task = self._analytics_task, None
+        if task is not None:
+            await task
+        if self.leased_limiter is not None:
+            try:
+                await self.leased_limiter.release_all()
+            except Exception:
+                pass
+        backends = [self.backend]
+        if self._limiter_is_separate:
+            backends.append(self.limiter_backend)
+        for backend in backends:
+            try:
+                await backend.close()
+            except Exception:
+                pass
+        try:
+            self.disk_cache.close()
+        except Exception:
+            pass
+        try:
+            self.shm_cache.close()
         except Exception:
             pass
 
 
-# Singleton instance
-cache_service = CacheService()
+@lru_cache
+def get_cache_service() -> CacheService:
+    """Get the cache service, created on first use.
+
+    Returns:
+        CacheService: The shared cache service
+    """
+    return CacheService(settings=get_settings())
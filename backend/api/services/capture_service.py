@@ -0,0 +1,212 @@
+"""Sampled capture of chat requests for replay testing."""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import time
+from functools import lru_cache
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from api.services.config_service import Settings, get_settings
+
+
+# Emails and long digit runs (phone, card and account numbers)
+_DEFAULT_REDACT_PATTERNS = (
+    r'[\w.+-]+@[\w-]+\.[\w.-]+',
+    r'\b\d[\d -]{7,}\d\b',
+)
+_REDACTED = '[REDACTED]'
+
+
+class RequestCaptureService:
+    """Writes a sample of requests to rotating JSONL files.
+
+    Each sampled request becomes one JSON line with its method, path,
+    status, duration, model, mode, cache outcome and (redacted) query
+    parameters and body. Records
+    are handed to a bounded queue and written by a background thread
+    through a `RotatingFileHandler`, so the event loop never touches
+    the file. When the queue is full, records are dropped rather than
+    slowing requests down.
+
+    A rotating handler isn't safe across processes, so each worker
+    writes (and rotates) its own file: CAPTURE_PATH suffixed with the
+    worker's pid. The file is opened by `start`, which the app calls
+    at startup; records captured before that wait in the queue.
+
+    Capture is disabled unless CAPTURE_PATH is set.
+
+    Attributes:
+        path: Configured JSONL file path, empty if disabled
+        file_path: This worker's file, set once started
+        sample_rate: Fraction of requests captured
+        redact_fields: Body fields removed before writing
+        redact_patterns: Regexes replaced in body string values
+        enabled: Whether capture is active
+        captured: Records queued for writing
+        dropped: Records dropped because the queue was full
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the capture service.
+
+        Takes CAPTURE_MAX_BYTES, CAPTURE_BACKUP_COUNT,
+        CAPTURE_REDACT_FIELDS and CAPTURE_REDACT_PATTERNS from the
+        settings. The file is opened by `start`.
+
+        Args:
+            path (Optional[str]): JSONL file, defaults to CAPTURE_PATH
+            sample_rate (Optional[float]): Fraction captured, defaults
+                to CAPTURE_SAMPLE_RATE (0.1)
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.path = path if path is not None else settings.capture_path
+        self.sample_rate = (
+            sample_rate if sample_rate is not None
+            else settings.capture_sample_rate
+        )
+        self.max_bytes = settings.capture_max_bytes
+        self.backup_count = settings.capture_backup_count
+        self.redact_fields = {
+            field.strip()
+            for field in settings.capture_redact_fields.split(',')
+            if field.strip()
+        }
+        patterns = settings.capture_redact_patterns
+        self.redact_patterns = [
+            re.compile(pattern) for pattern in (
+                patterns.split(',') if patterns is not None
+                else _DEFAULT_REDACT_PATTERNS
+            ) if pattern
+        ]
+        self.enabled = bool(self.path) and self.sample_rate > 0
+        self.file_path = ''
+        self.captured = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._listener: Optional[QueueListener] = None
+
+    def should_sample(self) -> bool:
+        """Decide whether to capture the current request."""
+        return self.enabled and random.random() < self.sample_rate
+
+    def redact(self, body: dict) -> dict:
+        """Drop redacted fields and mask patterns in string values.
+
+        Args:
+            body (dict): Parsed request body
+
+        Returns:
+            dict: Redacted copy of the body
+        """
+        def scrub(value):
+            if isinstance(value, str):
+                for pattern in self.redact_patterns:
+                    value = pattern.sub(_REDACTED, value)
+                return value
+            if isinstance(value, list):
+                return [scrub(item) for item in value]
+            if isinstance(value, dict):
+                return {k: scrub(v) for k, v in value.items()}
+            return value
+
+        return {
+            key: scrub(value) for key, value in body.items()
+            if key not in self.redact_fields
+        }
+
+    def start(self) -> None:
+        """Open this worker's file and start the writer thread."""
+        if not self.enabled or self._listener is not None:
+            return
+        self.file_path = f'{self.path}.{os.getpid()}'
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            self.file_path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def capture(
+        self,
+        path: str,
+        status: int,
+        duration: float,
+        raw_body: bytes,
+        cache: Optional[str] = None,
+        method: str = 'POST',
+        query_string: bytes = b'',
+    ) -> None:
+        """Queue one request record for writing.
+
+        Args:
+            path (str): Request path
+            status (int): Response status code
+            duration (float): Handling time in seconds
+            raw_body (bytes): Raw request body
+            cache (Optional[str]): Cache outcome from the X-Cache header
+            method (str): Request method
+            query_string (bytes): Raw query string, e.g. the prompt of
+                a GET ask
+        """
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        query = dict(parse_qsl(query_string.decode('latin-1')))
+        fields = {**query, **body}
+        record = {
+            'ts': time.time(),
+            'method': method,
+            'path': path,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'model': fields.get('model'),
+            'mode': fields.get('modes') or fields.get('mode'),
+            'cache': cache,
+            'query': self.redact(query),
+            'body': self.redact(body),
+        }
+        message = logging.makeLogRecord({'msg': json.dumps(record)})
+        try:
+            self._queue.put_nowait(message)
+            self.captured += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+
+@lru_cache
+def get_capture_service() -> RequestCaptureService:
+    """Get the capture service, created on first use.
+
+    Returns:
+        RequestCaptureService: The shared capture service
+    """
+    return RequestCaptureService(settings=get_settings())
@@ -0,0 +1,186 @@
+"""Adaptive concurrency limiting for Ollama generations."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from api.services.config_service import Settings
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a request is shed because the in-flight limit is full."""
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter driven by observed latency.
+
+    The limiter keeps a latency baseline (the best latency seen, drifting
+    slowly upwards so it can follow model or hardware changes) and
+    adjusts the in-flight limit after every completed request:
+
+    - If the sample exceeds ``baseline * latency_tolerance`` or the
+      request failed, the limit is multiplied by ``backoff_ratio``.
+    - Otherwise, if the limiter is actually being used (at least half
+      of the limit in flight), the limit grows by one.
+
+    Requests arriving while ``in_flight >= limit`` are rejected
+    immediately instead of queueing, so excess load is shed fast.
+
+    Attributes:
+        limit: Current (fractional) in-flight limit
+        min_limit: Lower bound for the limit
+        max_limit: Upper bound for the limit
+        latency_tolerance: Ratio over baseline treated as congestion
+        backoff_ratio: Multiplicative decrease applied on congestion
+        baseline_drift: Fraction the baseline moves towards slower samples
+        in_flight: Number of requests currently holding a slot
+        baseline_latency: Current latency baseline, in the samples' unit
+    """
+
+    def __init__(
+        self,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        latency_tolerance: Optional[float] = None,
+        backoff_ratio: Optional[float] = None,
+        baseline_drift: float = 0.01,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the limiter.
+
+        Unset arguments are taken from the settings:
+        OLLAMA_CONCURRENCY_INITIAL, OLLAMA_CONCURRENCY_MIN,
+        OLLAMA_CONCURRENCY_MAX, OLLAMA_LATENCY_TOLERANCE and
+        OLLAMA_CONCURRENCY_BACKOFF.
+        """
+        settings = settings or Settings.from_env()
+        self.min_limit = min_limit or settings.ollama_concurrency_min
+        self.max_limit = max_limit or settings.ollama_concurrency_max
+        initial = initial_limit or settings.ollama_concurrency_initial
+        self.limit = float(
+            min(max(initial, self.min_limit), self.max_limit)
+        )
+        self.latency_tolerance = (
+            latency_tolerance or settings.ollama_latency_tolerance
+        )
+        self.backoff_ratio = (
+            backoff_ratio or settings.ollama_concurrency_backoff
+        )
+        self.baseline_drift = baseline_drift
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.accepted = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        """Try to take an in-flight slot without waiting.
+
+        Returns:
+            bool: True if a slot was taken, False if the request is shed
+        """
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.accepted += 1
+        return True
+
+    def release(
+        self, latency: Optional[float], success: bool = True
+    ) -> None:
+        """Release a slot and feed the latency sample into the limit.
+
+        A failure always counts as congestion; its latency, if any, is
+        not used as a sample.
+
+        Args:
+            latency (Optional[float]): Observed latency sample, None to
+                free the slot without a sample
+            success (bool): False if the request failed or timed out
+        """
+        in_flight = self.in_flight
+        self.in_flight = max(0, self.in_flight - 1)
+        if not success:
+            self.limit = max(
+                float(self.min_limit), self.limit * self.backoff_ratio
+            )
+            return
+        if latency is None:
+            return
+        self.last_latency = latency
+
+        baseline = self.baseline_latency
+        if baseline is None or latency < baseline:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency += (
+                (latency - self.baseline_latency) * self.baseline_drift
+            )
+
+        if latency > self.baseline_latency * self.latency_tolerance:
+            self.limit = max(
+                float(self.min_limit), self.limit * self.backoff_ratio
+            )
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+
+    @asynccontextmanager
+    async def acquire(
+        self, ignore: tuple[type[BaseException], ...] = ()
+    ) -> AsyncIterator[dict]:
+        """Hold a slot for the duration of the block.
+
+        The block reports its latency by setting ``sample['latency']``;
+        callers must use one unit for every sample (e.g. seconds per
+        token), and leave it unset when they can't measure in that
+        unit, which frees the slot without a sample. Exceptions raised
+        in the block count as congestion, except those in `ignore` and
+        cancellation (e.g. a client disconnect), which free the slot
+        without a sample.
+
+        Args:
+            ignore (tuple[type[BaseException], ...]): Exceptions that
+                say nothing about load, such as client errors
+
+        Yields:
+            dict: Mutable sample dict for the caller to annotate
+
+        Raises:
+            ConcurrencyLimitExceeded: If no slot is available
+        """
+        if not self.try_acquire():
+            raise ConcurrencyLimitExceeded(
+                f'Too many concurrent generations (limit {int(self.limit)})'
+            )
+        sample: dict = {}
+        try:
+            yield sample
+        except ignore:
+            self.release(None)
+            raise
+        except asyncio.CancelledError:
+            self.release(None)
+            raise
+        except BaseException:
+            self.release(None, success=False)
+            raise
+        self.release(sample.get('latency'))
+
+    def get_metrics(self) -> dict:
+        """Get a snapshot of the limiter state.
+
+        Returns:
+            dict: Current limit, in-flight count, latency baseline and
+                accepted/rejected counters
+        """
+        return {
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'baseline_latency': self.baseline_latency,
+            'last_latency': self.last_latency,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+        }
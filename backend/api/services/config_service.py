@@ -1,7 +1,193 @@
-"""Configuration service for loading project metadata."""
+"""Configuration service for settings and project metadata."""
+import dataclasses
+import os
 import tomllib
+import typing
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Mapping, Optional
+
+
+_TRUE_VALUES = ('1', 'true', 'yes')
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    """Typed application settings, parsed once from the environment.
+
+    Each field is read from the environment variable of the same name
+    in upper case and cast to the field's type. Booleans accept '1',
+    'true' and 'yes'. Optional numbers treat an empty value as unset.
+    Unset variables keep the field's default.
+
+    Services take a `Settings` instance instead of reading the
+    environment themselves, so `.env` is applied before anything is
+    read and every worker parses its configuration exactly once.
+    """
+
+    # CORS
+    allowed_origins: str = '*'
+
+    # Ollama client and connection pool
+    ollama_host: Optional[str] = None
+    ollama_max_connections: int = 64
+    ollama_max_keepalive: Optional[int] = None
+    ollama_keepalive_expiry: float = 60
+    ollama_connect_timeout: float = 5
+    ollama_read_timeout: Optional[float] = None
+    ollama_pool_timeout: Optional[float] = 30
+
+    # Generation
+    generation_max_num_predict: int = 1024
+    generation_max_num_ctx: int = 8192
+    ask_fanout_concurrency: int = 2
+
+    # Adaptive Ollama concurrency
+    ollama_concurrency_min: int = 1
+    ollama_concurrency_max: int = 32
+    ollama_concurrency_initial: int = 4
+    ollama_latency_tolerance: float = 2.0
+    ollama_concurrency_backoff: float = 0.9
+
+    # Model fast-fail
+    negative_cache_ttl: float = 30
+    model_error_window: float = 30
+    model_error_min_requests: int = 5
+    model_error_threshold: float = 0.5
+    model_error_cooldown: float = 10
+
+    # Cache and rate limit backends
+    cache_backend: str = 'redis'
+    memory_backend_max_keys: int = 10000
+    redis_url: str = 'redis://localhost:6379/0'
+    cache_redis_url: Optional[str] = None
+    rate_limit_redis_url: Optional[str] = None
+    cache_redis_cluster: bool = False
+    cache_redis_replica_urls: str = ''
+    cache_replica_selection: str = 'random'
+    cache_replica_max_lag: float = 5
+
+    # Response cache
+    cache_ttl: int = 3600
+    cache_write_behind: bool = False
+    cache_write_behind_max: int = 1000
+    cache_write_behind_batch: int = 100
+    cache_write_behind_interval_ms: float = 50
+    cache_stats_top_k: int = 20
+    cache_stats_flush_interval: int = 60
+    cache_stats_memory_sample: int = 100
+    disk_cache_path: str = ''
+    disk_cache_max_bytes: int = 256 * 1024 * 1024
+    shm_cache_path: str = ''
+    shm_cache_slots: int = 4096
+    shm_cache_slot_bytes: int = 4096
+    shm_cache_ttl: int = 300
+
+    # Rate limiting and per-client concurrency
+    rate_limit_window: int = 60
+    rate_limit_max: int = 10
+    rate_limit_mode: str = 'global'
+    rate_limit_lease_size: Optional[int] = None
+    rate_limit_lease_ttl: float = 5
+    client_concurrency_max: int = 0
+    client_concurrency_lease_ttl: int = 120
+    client_concurrency_queue_timeout: float = 1
+
+    # Embeddings
+    embed_model: str = 'nomic-embed-text'
+    embed_batch_window_ms: float = 5
+    embed_batch_max_size: int = 32
+    embed_cache_ttl: int = 86400
+
+    # Model routing
+    model_tier_small: str = 'llama3.2:1b'
+    model_tier_medium: str = 'llama3.2'
+    model_tier_large: str = 'llama3.1:8b'
+    model_router_short_chars: int = 200
+    model_router_long_chars: int = 1500
+    model_router_judge: str = ''
+    model_router_judge_timeout: float = 2
+
+    # Request capture
+    capture_path: str = ''
+    capture_sample_rate: float = 0.1
+    capture_max_bytes: int = 64 * 1024 * 1024
+    capture_backup_count: int = 5
+    capture_redact_fields: str = ''
+    capture_redact_patterns: Optional[str] = None
+
+    # Event loop monitoring
+    loop_monitor_interval_ms: float = 100
+    loop_slow_callback_ms: float = 250
+    loop_lag_window: int = 600
+
+    # Structured logging
+    log_level: str = 'INFO'
+    log_path: str = ''
+    log_queue_size: int = 10000
+    log_access_sample_rate: float = 1.0
+    log_generation_sample_rate: float = 1.0
+    log_slow_request_ms: float = 1000
+
+    # Admin profiling
+    admin_token: str = ''
+    profile_max_seconds: float = 30
+    profile_sample_interval_ms: float = 5
+    profile_history: int = 20
+    profile_tracemalloc_frames: int = 1
+
+    @classmethod
+    def from_env(
+        cls, environ: Optional[Mapping[str, str]] = None
+    ) -> 'Settings':
+        """Parse settings from environment variables.
+
+        Args:
+            environ (Optional[Mapping[str, str]]): Variables to read,
+                defaults to `os.environ`
+
+        Returns:
+            Settings: The parsed settings
+
+        Raises:
+            ValueError: If a variable can't be cast to its field's type
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for field in dataclasses.fields(cls):
+            name = field.name.upper()
+            if name in environ:
+                values[field.name] = _cast(name, environ[name], field.type)
+        return cls(**values)
+
+
+def _cast(name: str, value: str, kind: Any) -> Any:
+    """Cast an environment value to a settings field type."""
+    optional = typing.get_origin(kind) is typing.Union
+    if optional:
+        kind = next(
+            arg for arg in typing.get_args(kind) if arg is not type(None)
+        )
+        if kind is not str and not value.strip():
+            return None
+    if kind is bool:
+        return value.strip().lower() in _TRUE_VALUES
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(
+            f'Invalid value for {name}: {value!r} is not {kind.__name__}'
+        ) from None
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get the application settings, parsed on first use.
+
+    Returns:
+        Settings: Settings parsed from the environment
+    """
+    return Settings.from_env()
 
 
 class ConfigService:
@@ -106,5 +292,11 @@ class ConfigService:
         return name.replace('backend', 'Byte in Bottle API')
 
 
-# Singleton instance
-config_service = ConfigService()
+@lru_cache
+def get_config_service() -> ConfigService:
+    """Get the configuration service, created on first use.
+
+    Returns:
+        ConfigService: The shared configuration service
+    """
+    return ConfigService()
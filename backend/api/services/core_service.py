@@ -1,50 +1,124 @@
-import os
+import time
+from functools import lru_cache
+from typing import Optional
 
+import httpx
 import ollama
 
 from api.models.chats.ask_model import AskMode
+from api.services.concurrency_service import AdaptiveConcurrencyLimiter
+from api.services.config_service import Settings, get_settings
+from api.services.http_pool_service import InstrumentedTransport
+from api.services.model_health_service import (
+    ModelHealthTracker, ModelNotFound, ModelUnsupported
+)
 
 
-# System prompts for different response modes
+# System prompts for different response modes. They are sent through
+# Ollama's `system` field and must stay byte-for-byte stable per mode so
+# the model can reuse the evaluated prompt prefix across requests.
 MODE_PROMPTS = {
     AskMode.CONCISE: (
-        'Please provide a concise answer to the following question '
+        'Please provide a concise answer to the user\'s question '
         'without any additional explanations or context. Be brief and '
-        'to the point.'
+        'to the point. '
         'Do not ask back questions.'
     ),
     AskMode.PROFESSIONAL: (
         'Please provide a professional, well-structured answer to the '
-        'following question. Use formal language, proper terminology, '
-        'and maintain a business-appropriate tone.'
+        'user\'s question. Use formal language, proper terminology, '
+        'and maintain a business-appropriate tone. '
         'Do not ask back questions.'
     ),
     AskMode.SARCASTIC: (
-        'Please answer the following question with a sarcastic and witty '
+        'Please answer the user\'s question with a sarcastic and witty '
         'tone. Be clever, use humor, and don\'t take things too seriously, '
-        'but still provide a helpful answer.'
+        'but still provide a helpful answer. '
         'Do not ask back questions.'
     ),
     AskMode.CREATIVE: (
-        'Please provide a creative and imaginative answer to the following '
+        'Please provide a creative and imaginative answer to the user\'s '
         'question. Feel free to use metaphors, analogies, and think outside '
-        'the box while still being informative.'
+        'the box while still being informative. '
         'Do not ask back questions.'
     ),
     AskMode.FRIENDLY: (
-        'Please provide a friendly, casual answer to the following question. '
+        'Please provide a friendly, casual answer to the user\'s question. '
         'Use a warm, conversational tone as if talking to a friend. '
-        'Be approachable and personable.'
+        'Be approachable and personable. '
         'Do not ask back questions.'
     ),
 }
 
 
+# Default generation options per response mode. Bounding output length
+# is the biggest latency lever, so every mode carries a token cap.
+MODE_OPTIONS = {
+    AskMode.CONCISE: {
+        'num_predict': 128, 'temperature': 0.3, 'num_ctx': 2048,
+        'stop': ['\n\n\n'],
+    },
+    AskMode.PROFESSIONAL: {
+        'num_predict': 512, 'temperature': 0.5, 'num_ctx': 4096,
+    },
+    AskMode.SARCASTIC: {
+        'num_predict': 256, 'temperature': 0.9, 'num_ctx': 2048,
+    },
+    AskMode.CREATIVE: {
+        'num_predict': 768, 'temperature': 1.0, 'num_ctx': 4096,
+    },
+    AskMode.FRIENDLY: {
+        'num_predict': 256, 'temperature': 0.7, 'num_ctx': 2048,
+    },
+}
+
+
 class CoreService:
 
-    def __init__(self):
-        self.ollama_client = self._get_ollama_client()
+    def __init__(self, settings: Optional[Settings] = None):
+        """Initialize the core service.
+
+        Args:
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.ollama_host = settings.ollama_host
+        max_connections = settings.ollama_max_connections
+        # Keep every connection alive by default so bursts reuse them
+        # instead of reconnecting
+        self.pool_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=(
+                settings.ollama_max_keepalive
+                if settings.ollama_max_keepalive is not None
+                else max_connections
+            ),
+            keepalive_expiry=settings.ollama_keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=settings.ollama_connect_timeout,
+            read=settings.ollama_read_timeout,
+            write=settings.ollama_read_timeout,
+            pool=settings.ollama_pool_timeout,
+        )
+        self.ollama_transport = InstrumentedTransport(self.pool_limits)
+        self._ollama_client: Optional[ollama.Client] = None
         self.async_ollama_client = self._get_async_ollama_client()
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            settings=settings
+        )
+        self.model_health = ModelHealthTracker(settings=settings)
+        self.max_num_predict = settings.generation_max_num_predict
+        self.max_num_ctx = settings.generation_max_num_ctx
+        self.max_fanout_concurrency = settings.ask_fanout_concurrency
+
+    @property
+    def ollama_client(self) -> ollama.Client:
+        """Sync Ollama client, created on first use."""
+        if self._ollama_client is None:
+            self._ollama_client = self._get_ollama_client()
+        return self._ollama_client
 
     def _get_ollama_client(self) -> ollama.Client:
         """Get Ollama client instance.
@@ -52,29 +126,46 @@ class CoreService:
         Returns:
             ollama.Client: The Ollama client.
         """
-        ollama_host = os.getenv('OLLAMA_HOST')
-        if ollama_host:
-            return ollama.Client(host=ollama_host)
-        return ollama.Client()
+        kwargs = {'timeout': self.timeout, 'limits': self.pool_limits}
+        if self.ollama_host:
+            return ollama.Client(host=self.ollama_host, **kwargs)
+        return ollama.Client(**kwargs)
 
     def _get_async_ollama_client(self) -> ollama.AsyncClient:
         """Get async Ollama client instance.
 
+        The client sends requests through the instrumented connection
+        pool, sized by OLLAMA_MAX_CONNECTIONS, OLLAMA_MAX_KEEPALIVE and
+        OLLAMA_KEEPALIVE_EXPIRY, with OLLAMA_CONNECT_TIMEOUT,
+        OLLAMA_READ_TIMEOUT and OLLAMA_POOL_TIMEOUT.
+
         Returns:
             ollama.AsyncClient: The async Ollama client.
         """
-        ollama_host = os.getenv('OLLAMA_HOST')
-        if ollama_host:
-            return ollama.AsyncClient(host=ollama_host)
-        return ollama.AsyncClient()
+        kwargs = {'timeout': self.timeout, 'transport': self.ollama_transport}
+        if self.ollama_host:
+            return ollama.AsyncClient(host=self.ollama_host, **kwargs)
+        return ollama.AsyncClient(**kwargs)
+
+    async def close(self) -> None:
+        """Close the Ollama clients and their connection pools."""
+        await self.async_ollama_client.close()
+        if self._ollama_client is not None:
+            self._ollama_client.close()
 
     async def get_ollama_models(self) -> list:
         """Retrieve the list of available Ollama models.
 
+        A changed list clears remembered model-not-found failures, so a
+        freshly pulled model is usable right away.
+
         Returns:
             list: A list of available Ollama model objects.
         """
         res = await self.async_ollama_client.list()
+        self.model_health.update_models(
+            [getattr(model, 'model', None) for model in res.models]
+        )
         return res.models
 
     def get_system_prompt(self, mode: str = AskMode.CONCISE) -> str:
@@ -89,31 +180,130 @@ class CoreService:
         """
         return MODE_PROMPTS.get(mode, MODE_PROMPTS[AskMode.CONCISE])
 
+    def get_generation_options(
+        self, mode: str = AskMode.CONCISE, overrides: Optional[dict] = None
+    ) -> dict:
+        """Get generation options for a mode with client overrides.
+
+        Overrides replace the mode defaults key by key; `num_predict`
+        and `num_ctx` are then capped at GENERATION_MAX_NUM_PREDICT and
+        GENERATION_MAX_NUM_CTX.
+
+        Args:
+            mode (str): The response mode (concise, professional, etc.).
+                Defaults to AskMode.CONCISE.
+            overrides (Optional[dict]): Client supplied options, None
+                values are ignored.
+
+        Returns:
+            dict: Ollama options for the request.
+        """
+        options = dict(
+            MODE_OPTIONS.get(mode, MODE_OPTIONS[AskMode.CONCISE])
+        )
+        options.update(
+            {k: v for k, v in (overrides or {}).items() if v is not None}
+        )
+        if 'num_predict' in options:
+            options['num_predict'] = min(
+                options['num_predict'], self.max_num_predict
+            )
+        if 'num_ctx' in options:
+            options['num_ctx'] = min(options['num_ctx'], self.max_num_ctx)
+        return options
+
     async def generate_text(
         self, model: str,
         prompt: str,
-        system_prompt: str = ''
+        system_prompt: str = '',
+        options: Optional[dict] = None,
     ) -> dict:
         """Generate text using a specified Ollama model.
 
         Args:
             model (str): The Ollama model to use.
             prompt (str): The prompt text.
-            system_prompt (str): The system prompt to guide the model.
-                Defaults to ''.
+            system_prompt (str): The system prompt to guide the model,
+                sent as Ollama's `system` field. Defaults to ''.
+            options (Optional[dict]): Ollama generation options such as
+                num_predict, temperature, num_ctx and stop.
+                Defaults to None.
 
         Returns:
             dict: The generated text response.
 
         Raises:
-            ValueError: If the specified model is not available.
+            ModelNotFound: If the specified model is not available.
+            ModelUnsupported: If the model can't generate text.
+            ModelUnavailable: If the model keeps failing and requests
+                for it are failed fast.
+            ConcurrencyLimitExceeded: If the adaptive in-flight limit
+                is full and the request was shed.
         """
-        if system_prompt:
-            prompt = f"{system_prompt}:\n\n{prompt}"
-        return await self.async_ollama_client.generate(
-            model=model, prompt=prompt
-        )
+        kwargs = {'system': system_prompt} if system_prompt else {}
+        if options:
+            kwargs['options'] = options
+        self.model_health.check(model)
+        # Unknown or unsupported models are the client's mistake, not
+        # a sign that Ollama is congested
+        async with self.concurrency_limiter.acquire(
+            ignore=(ModelNotFound, ModelUnsupported)
+        ) as sample:
+            start = time.perf_counter()
+            try:
+                response = await self.async_ollama_client.generate(
+                    model=model, prompt=prompt, **kwargs
+                )
+            except Exception as e:
+                error = self.model_health.record_failure(model, e)
+                if error is e:
+                    raise
+                raise error from e
+            self.model_health.record_success(model)
+            # Normalize by generated tokens so long answers don't look
+            # like congestion; without a token count there's no sample
+            eval_count = response.get('eval_count')
+            if isinstance(eval_count, int) and eval_count > 0:
+                sample['latency'] = (
+                    (time.perf_counter() - start) / eval_count
+                )
+        return response
+
+    async def embed_texts(self, model: str, texts: list[str]) -> list:
+        """Embed several texts with one Ollama call.
+
+        Args:
+            model (str): The Ollama embedding model to use.
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list: One embedding (list of floats) per text, in order.
+
+        Raises:
+            ModelNotFound: If the specified model is not available.
+            ModelUnsupported: If the model can't produce embeddings.
+            ModelUnavailable: If the model keeps failing and requests
+                for it are failed fast.
+        """
+        self.model_health.check(model)
+        try:
+            response = await self.async_ollama_client.embed(
+                model=model, input=texts
+            )
+        except Exception as e:
+            error = self.model_health.record_failure(model, e)
+            if error is e:
+                raise
+            raise error from e
+        self.model_health.record_success(model)
+        return list(response.get('embeddings') or [])
+
 
+@lru_cache
+def get_core_service() -> CoreService:
+    """Get the core service, created on first use.
 
-# Singleton instance
-core_service = CoreService()
+    Returns:
+        CoreService: The shared core service
+    """
+    return CoreService(get_settings())
@@ -0,0 +1,270 @@
+"""Persistent on-disk cache tier backed by SQLite."""
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from api.services.config_service import Settings
+
+
+# Reads refresh an entry's recency at most this often, in seconds
+_TOUCH_INTERVAL = 60.0
+
+
+class DiskCacheService:
+    """Size-bounded SQLite cache used as a fallback for Redis.
+
+    All SQLite access runs in a worker thread via `asyncio.to_thread`,
+    so neither reads nor writes block the event loop. Entries carry an
+    absolute expiry; when the total value size exceeds `max_bytes` the
+    least recently used entries are evicted.
+
+    The total size is kept in the database by triggers, so every
+    worker sharing the file evicts against the same figure. Reads
+    refresh an entry's recency only when it is older than
+    `touch_interval`, so hot entries don't cost a write per hit.
+
+    The tier is disabled unless DISK_CACHE_PATH is set.
+
+    Attributes:
+        path: SQLite database file path, empty if disabled
+        max_bytes: Maximum total size of cached values in bytes
+        enabled: Whether the disk tier is active
+        touch_interval: Seconds between recency updates of an entry
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the disk cache.
+
+        The database is opened lazily on first use.
+
+        Args:
+            path (Optional[str]): Database file, defaults to
+                DISK_CACHE_PATH
+            max_bytes (Optional[int]): Size bound, defaults to
+                DISK_CACHE_MAX_BYTES (256 MiB)
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.path = path if path is not None else settings.disk_cache_path
+        self.max_bytes = max_bytes or settings.disk_cache_max_bytes
+        self.enabled = bool(self.path)
+        self.touch_interval = _TOUCH_INTERVAL
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed.
+
+        Must be called with the lock held.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # Serializes schema setup with other workers
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                _create_schema(conn)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                conn.close()
+                raise
+            conn.execute('COMMIT')
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _total_bytes(conn: sqlite3.Connection) -> int:
+        """Total value size of all workers' entries."""
+        return conn.execute(
+            'SELECT total_bytes FROM stats WHERE id = 0'
+        ).fetchone()[0]
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        """Blocking implementation of `get`."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT value, expires_at, accessed_at FROM entries '
+                'WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at <= now:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return None
+            if now - accessed_at >= self.touch_interval:
+                conn.execute(
+                    'UPDATE entries SET accessed_at = ? WHERE key = ?',
+                    (now, key),
+                )
+            return value
+
+    def _set_sync(self, key: str, value: str, ttl: int) -> None:
+        """Blocking implementation of `set`."""
+        self._set_many_sync([(key, ttl, value)])
+
+    def _set_many_sync(self, items: list[tuple[str, int, str]]) -> None:
+        """Blocking implementation of `set_many`."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN')
+            try:
+                # An upsert fires the update trigger; REPLACE would
+                # skip the delete trigger and leave the total too high
+                conn.executemany(
+                    'INSERT INTO entries '
+                    '(key, value, size, expires_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET '
+                    'value = excluded.value, size = excluded.size, '
+                    'expires_at = excluded.expires_at, '
+                    'accessed_at = excluded.accessed_at',
+                    [
+                        (key, value, len(value.encode()), now + ttl, now)
+                        for key, ttl, value in items
+                    ],
+                )
+                if self._total_bytes(conn) > self.max_bytes:
+                    self._evict(conn, now)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired, then least recently used, entries.
+
+        Evicts down to 90% of `max_bytes` so eviction doesn't run on
+        every write once the cache is full. Must be called with the
+        lock held.
+        """
+        conn.execute('DELETE FROM entries WHERE expires_at <= ?', (now,))
+        total = self._total_bytes(conn)
+        target = int(self.max_bytes * 0.9)
+        while total > target:
+            rows = conn.execute(
+                'SELECT key, size FROM entries '
+                'ORDER BY accessed_at LIMIT 100'
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                total -= conn.execute(
+                    'DELETE FROM entries WHERE key = ?', (key,)
+                ).rowcount * size
+                if total <= target:
+                    break
+
+    def _clear_sync(self, pattern: str) -> int:
+        """Blocking implementation of `clear`."""
+        with self._lock:
+            conn = self._connect()
+            # SQLite GLOB uses the same wildcards as Redis MATCH
+            return conn.execute(
+                'DELETE FROM entries WHERE key GLOB ?', (pattern,)
+            ).rowcount
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a cached value without blocking the event loop.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[str]: Cached value or None if missing or expired
+        """
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value without blocking the event loop.
+
+        Args:
+            key (str): Cache key
+            value (str): Serialized value
+            ttl (int): Time-to-live in seconds
+        """
+        await asyncio.to_thread(self._set_sync, key, value, ttl)
+
+    async def set_many(self, items: list[tuple[str, int, str]]) -> None:
+        """Store several values in one transaction off the event loop.
+
+        Args:
+            items (list[tuple[str, int, str]]): (key, ttl, value) tuples
+        """
+        await asyncio.to_thread(self._set_many_sync, items)
+
+    async def clear(self, pattern: str = 'llm:*') -> int:
+        """Delete entries matching a glob pattern.
+
+        Args:
+            pattern (str): Key pattern to match
+
+        Returns:
+            int: Number of entries deleted
+        """
+        return await asyncio.to_thread(self._clear_sync, pattern)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """Create the entries table and the triggers keeping its total.
+
+    The total is seeded from the existing rows when the stats table
+    is first created, so files written before it existed are counted.
+    """
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS entries ('
+        'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+        'size INTEGER NOT NULL, expires_at REAL NOT NULL, '
+        'accessed_at REAL NOT NULL)'
+    )
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS entries_accessed_at '
+        'ON entries (accessed_at)'
+    )
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS stats ('
+        'id INTEGER PRIMARY KEY CHECK (id = 0), '
+        'total_bytes INTEGER NOT NULL)'
+    )
+    conn.execute(
+        'INSERT OR IGNORE INTO stats (id, total_bytes) '
+        'SELECT 0, COALESCE(SUM(size), 0) FROM entries'
+    )
+    conn.execute(
+        'CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT '
+        'ON entries BEGIN UPDATE stats '
+        'SET total_bytes = total_bytes + NEW.size WHERE id = 0; END'
+    )
+    conn.execute(
+        'CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size '
+        'ON entries BEGIN UPDATE stats '
+        'SET total_bytes = total_bytes + NEW.size - OLD.size '
+        'WHERE id = 0; END'
+    )
+    conn.execute(
+        'CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE '
+        'ON entries BEGIN UPDATE stats '
+        'SET total_bytes = total_bytes - OLD.size WHERE id = 0; END'
+    )
@@ -0,0 +1,194 @@
+"""Embeddings with dynamic micro-batching of Ollama calls."""
+import asyncio
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional
+
+from api.services.cache_service import CacheService, get_cache_service
+from api.services.config_service import Settings, get_settings
+from api.services.core_service import CoreService, get_core_service
+
+
+class EmbeddingService:
+    """Service that coalesces concurrent embedding requests.
+
+    Texts submitted within `batch_window` seconds of the first pending
+    text for a model are sent to Ollama in one embed call, and each
+    caller gets its own vector back. A batch is sent early once it
+    holds `max_batch_size` distinct texts. Identical texts pending at
+    the same time share one slot in the batch, and texts already in the
+    cache never reach the batcher.
+
+    Attributes:
+        default_model: Model used when a request doesn't name one
+        batch_window: Seconds to wait for more texts before sending
+        max_batch_size: Texts per Ollama call
+        batches: Number of Ollama embed calls made
+        batched_texts: Number of texts sent in those calls
+    """
+
+    def __init__(
+        self,
+        core: Optional[CoreService] = None,
+        cache: Optional[CacheService] = None,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the embedding service.
+
+        Takes EMBED_MODEL, EMBED_BATCH_WINDOW_MS and EMBED_BATCH_MAX_SIZE
+        from the settings.
+
+        Args:
+            core (Optional[CoreService]): Core service, defaults to the
+                shared instance
+            cache (Optional[CacheService]): Cache service, defaults to
+                the shared instance
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.core = core or get_core_service()
+        self.cache = cache or get_cache_service()
+        self.default_model = settings.embed_model
+        self.batch_window = settings.embed_batch_window_ms / 1000
+        self.max_batch_size = settings.embed_batch_max_size
+        self.batches = 0
+        self.batched_texts = 0
+        # model -> {text: future}, in arrival order
+        self._pending: dict[str, dict[str, asyncio.Future]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _submit(self, model: str, text: str) -> asyncio.Future:
+        """Add a text to the model's pending batch.
+
+        Args:
+            model (str): The embedding model name
+            text (str): Text to embed
+
+        Returns:
+            asyncio.Future: Resolves to the text's embedding
+        """
+        batch = self._pending.setdefault(model, {})
+        future = batch.get(text)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = batch[text] = loop.create_future()
+        if len(batch) >= self.max_batch_size:
+            self._flush(model)
+        elif model not in self._timers:
+            self._timers[model] = loop.call_later(
+                self.batch_window, self._flush, model
+            )
+        return future
+
+    def _flush(self, model: str) -> None:
+        """Send the model's pending batch to Ollama."""
+        timer = self._timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(model, None)
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(model, batch))
+        # Keep a reference so the task isn't garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(
+        self, model: str, batch: dict[str, asyncio.Future]
+    ) -> None:
+        """Embed a batch and resolve its futures.
+
+        Args:
+            model (str): The embedding model name
+            batch (dict[str, asyncio.Future]): Future per text
+        """
+        self.batches += 1
+        self.batched_texts += len(batch)
+        try:
+            embeddings = await self.core.embed_texts(model, list(batch))
+            if len(embeddings) != len(batch):
+                raise ValueError(
+                    f'Expected {len(batch)} embeddings, '
+                    f'got {len(embeddings)}'
+                )
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, embedding in zip(batch.values(), embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    async def embed(
+        self,
+        texts: list[str],
+        model: Optional[str] = None,
+        on_miss: Optional[Callable[[], Awaitable[object]]] = None,
+    ) -> list[list[float]]:
+        """Embed texts, using the cache and the shared batcher.
+
+        Args:
+            texts (list[str]): Texts to embed
+            model (Optional[str]): Embedding model, defaults to
+                EMBED_MODEL
+            on_miss (Optional[Callable[[], Awaitable[object]]]): Awaited
+                once before any text is sent to the model, not at all
+                when every text is cached
+
+        Returns:
+            list[list[float]]: One embedding per text, in order
+
+        Raises:
+            Exception: Whatever `on_miss` or the Ollama embed call raised
+        """
+        model = model or self.default_model
+        embeddings = await self.cache.get_cached_embeddings(model, texts)
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings)
+            if embedding is None
+        ))
+        if missing:
+            if on_miss is not None:
+                await on_miss()
+            futures = [self._submit(model, text) for text in missing]
+            # Futures are shared with other callers, so cancelling this
+            # request must not cancel them
+            results = await asyncio.gather(
+                *(asyncio.shield(future) for future in futures)
+            )
+            generated = dict(zip(missing, results))
+            await self.cache.cache_embeddings(model, generated)
+            embeddings = [
+                embedding if embedding is not None else generated[text]
+                for text, embedding in zip(texts, embeddings)
+            ]
+        return embeddings
+
+    def get_metrics(self) -> dict:
+        """Get batching counters for this worker.
+
+        Returns:
+            dict: Batches sent, texts embedded and average batch size
+        """
+        return {
+            'batches': self.batches,
+            'batched_texts': self.batched_texts,
+            'average_batch_size': (
+                self.batched_texts / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+@lru_cache
+def get_embedding_service() -> EmbeddingService:
+    """Get the embedding service, created on first use.
+
+    Returns:
+        EmbeddingService: The shared embedding service
+    """
+    return EmbeddingService(
+        get_core_service(), get_cache_service(), get_settings()
+    )
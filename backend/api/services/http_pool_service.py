@@ -0,0 +1,175 @@
+"""Instrumented HTTP connection pool for the Ollama client."""
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+
+# First trace event after a request got a connection: either a new
+# connection starts connecting, or a pooled one starts sending
+_ACQUIRED_EVENTS = frozenset((
+    'connection.connect_tcp.started',
+    'connection.connect_unix_socket.started',
+    'http11.send_request_headers.started',
+    'http2.send_request_headers.started',
+))
+# Trace events carrying a newly opened network stream
+_CONNECTED_EVENTS = frozenset((
+    'connection.connect_tcp.complete',
+    'connection.connect_unix_socket.complete',
+))
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that reports when its connection is released.
+
+    httpcore hands the connection back to the pool when the body is
+    closed, not when the response headers arrive.
+    """
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, release: Callable[[], None]
+    ):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Async HTTP transport that reports on its connection pool.
+
+    Wraps `httpx.AsyncHTTPTransport` and uses httpcore's trace
+    extension to measure how long each request waited for a pooled
+    connection and how many new connections were opened. A pool sized
+    to keep every connection alive between bursts should show
+    `connections_opened` levelling off instead of growing with
+    traffic.
+
+    Connections count as in use from the moment a request gets one
+    until its response body is closed. Open connections are the
+    sockets seen being connected that aren't closed yet, so the idle
+    count needs nothing from the pool's internals.
+
+    Attributes:
+        limits: Pool size and keepalive settings
+        requests: Requests sent through the pool
+        acquired: Requests that got a connection
+        waiting: Requests currently waiting for a connection
+        in_use: Connections currently carrying a request
+        connections_opened: Connections opened so far
+        wait_time_total: Seconds spent waiting for connections
+        wait_time_max: Longest wait for a connection in seconds
+    """
+
+    def __init__(self, limits: httpx.Limits, **kwargs):
+        """Create the underlying transport.
+
+        Args:
+            limits (httpx.Limits): Pool size and keepalive settings
+            **kwargs: Passed on to `httpx.AsyncHTTPTransport`
+        """
+        self.limits = limits
+        self.transport = httpx.AsyncHTTPTransport(limits=limits, **kwargs)
+        self.requests = 0
+        self.acquired = 0
+        self.waiting = 0
+        self.in_use = 0
+        self.connections_opened = 0
+        self._sockets: set = set()
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.last_wait_time: Optional[float] = None
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        acquired = released = False
+        outer_trace = request.extensions.get('trace')
+
+        def acquire() -> None:
+            nonlocal acquired
+            acquired = True
+            self.acquired += 1
+            self.waiting -= 1
+            self.in_use += 1
+            wait = time.perf_counter() - start
+            self.last_wait_time = wait
+            self.wait_time_total += wait
+            self.wait_time_max = max(self.wait_time_max, wait)
+
+        def release() -> None:
+            nonlocal released
+            if acquired and not released:
+                released = True
+                self.in_use -= 1
+
+        async def trace(name: str, info: dict) -> None:
+            if not acquired and name in _ACQUIRED_EVENTS:
+                acquire()
+            if name in _CONNECTED_EVENTS:
+                self.connections_opened += 1
+                sock = info['return_value'].get_extra_info('socket')
+                if sock is not None:
+                    self._prune_sockets()
+                    self._sockets.add(sock)
+            if outer_trace is not None:
+                await outer_trace(name, info)
+
+        request.extensions['trace'] = trace
+        self.requests += 1
+        self.waiting += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        finally:
+            if not acquired:
+                self.waiting -= 1
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def _prune_sockets(self) -> None:
+        """Forget sockets the pool has closed."""
+        self._sockets = {
+            sock for sock in self._sockets if sock.fileno() != -1
+        }
+
+    def get_metrics(self) -> dict:
+        """Get a snapshot of the pool.
+
+        Returns:
+            dict: Pool limits, connections in use and idle, requests
+                waiting for a connection and wait time statistics
+        """
+        self._prune_sockets()
+        return {
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections':
+                self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+            'in_use': self.in_use,
+            'idle': max(0, len(self._sockets) - self.in_use),
+            'waiting': self.waiting,
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'wait_time_avg': (
+                self.wait_time_total / self.acquired if self.acquired
+                else 0.0
+            ),
+            'wait_time_max': self.wait_time_max,
+            'last_wait_time': self.last_wait_time,
+        }
@@ -0,0 +1,69 @@
+"""Shared JSON serializer, using orjson when it is installed."""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised without orjson
+    orjson = None
+
+
+# Whether the fast encoder is in use
+FAST_JSON = orjson is not None
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON.
+
+    Output has the format of Starlette's `JSONResponse`: no whitespace
+    and non-ASCII characters written as UTF-8 rather than escaped.
+    Dictionary keys must be strings. NaN and infinity are rejected by
+    the stdlib encoder and written as null by orjson.
+
+    Args:
+        value (Any): JSON-compatible value
+
+    Returns:
+        bytes: Encoded JSON
+
+    Raises:
+        TypeError: If the value isn't JSON-serializable
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode()
+
+
+def dumps_str(value: Any) -> str:
+    """Encode a value as compact JSON text.
+
+    Args:
+        value (Any): JSON-compatible value
+
+    Returns:
+        str: Encoded JSON, in the same format as `dumps`
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    )
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes.
+
+    Args:
+        data (Union[str, bytes]): Encoded JSON
+
+    Returns:
+        Any: Decoded value
+
+    Raises:
+        ValueError: If the data isn't valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
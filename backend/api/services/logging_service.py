@@ -0,0 +1,331 @@
+"""Structured JSON logging written off the event loop."""
+import copy
+import logging
+import queue
+import random
+import sys
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from typing import Optional
+
+from api.services import json_service
+from api.services.config_service import Settings, get_settings
+
+
+# Parent of every application logger; its records go through the queue
+APP_LOGGER = 'api'
+ACCESS_LOGGER = 'api.access'
+GENERATION_LOGGER = 'api.generation'
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = frozenset(
+    logging.makeLogRecord({}).__dict__
+) | {'message', 'asctime', 'fields'}
+_JSON_TYPES = (str, int, float, bool, type(None), list, dict)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Each line has the time, level, logger and message, plus the
+    record's `fields` dict (passed as `extra={'fields': {...}}`) and
+    any other `extra` keys merged in at the top level. Extra values
+    that aren't JSON types are written as their `str`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = (
+                    value if isinstance(value, _JSON_TYPES) else str(value)
+                )
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json_service.dumps_str(entry)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking.
+
+    Attributes:
+        queued: Records handed to the queue
+        dropped: Records dropped because the queue was full
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.queued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve the message and traceback, leaving JSON to the thread.
+
+        The stock `prepare` formats the whole record on the caller's
+        thread; only the parts that can't safely wait are done here.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of routine access and generation records.
+
+    Records at WARNING or above, requests that failed (status 400 or
+    more) and requests slower than `slow_seconds` are always kept.
+
+    Attributes:
+        rates: Fraction of records kept per logger name
+        slow_seconds: Duration from which records are always kept
+        sampled_out: Records left out by sampling
+    """
+
+    def __init__(self, rates: dict[str, float], slow_seconds: float):
+        super().__init__()
+        self.rates = rates
+        self.slow_seconds = slow_seconds
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name, 1.0)
+        if rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        fields = getattr(record, 'fields', None) or {}
+        if fields.get('status', 0) >= 400 or (
+            fields.get('duration_ms', 0) >= self.slow_seconds * 1000
+        ):
+            return True
+        if random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class _Listener(QueueListener):
+    """Queue listener whose stop waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class LogService:
+    """Writes application logs as JSON lines from a background thread.
+
+    Once started, every record of the 'api' loggers (access logs,
+    generation logs and service warnings) is handed to a bounded queue
+    and formatted and written by a `QueueListener` thread, so the event
+    loop never encodes JSON or waits on the sink. When the sink falls
+    behind and the queue fills up, records are dropped and counted
+    rather than slowing requests down.
+
+    Routine access and generation records can be sampled; errors,
+    warnings and slow requests are always kept.
+
+    Attributes:
+        level: Level of the 'api' loggers
+        path: File written to, stdout when empty
+        queue_size: Records buffered before new ones are dropped
+        access_sample_rate: Fraction of access records kept
+        generation_sample_rate: Fraction of generation records kept
+        slow_seconds: Duration from which records are always kept
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        """Initialize the log service.
+
+        Takes LOG_LEVEL, LOG_PATH, LOG_QUEUE_SIZE,
+        LOG_ACCESS_SAMPLE_RATE, LOG_GENERATION_SAMPLE_RATE and
+        LOG_SLOW_REQUEST_MS from the settings. Nothing is installed
+        until `start`.
+
+        Args:
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.level = logging.getLevelName(settings.log_level.upper())
+        if not isinstance(self.level, int):
+            raise ValueError(f'Invalid log level: {settings.log_level}')
+        self.path = settings.log_path
+        self.queue_size = settings.log_queue_size
+        self.access_sample_rate = settings.log_access_sample_rate
+        self.generation_sample_rate = settings.log_generation_sample_rate
+        self.slow_seconds = settings.log_slow_request_ms / 1000
+        self._handler: Optional[DroppingQueueHandler] = None
+        self._filter: Optional[SamplingFilter] = None
+        self._listener: Optional[QueueListener] = None
+        self._previous: Optional[tuple[int, bool]] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the queue handler is installed."""
+        return self._listener is not None
+
+    def _sink(self) -> logging.Handler:
+        if self.path:
+            # Reopens the file when logrotate moves it
+            sink = WatchedFileHandler(self.path, encoding='utf-8')
+        else:
+            sink = logging.StreamHandler(sys.stdout)
+        sink.setFormatter(JsonFormatter())
+        return sink
+
+    def start(self) -> None:
+        """Install the queue handler and start the writer thread."""
+        if self.running:
+            return
+        self._filter = SamplingFilter(
+            {
+                ACCESS_LOGGER: self.access_sample_rate,
+                GENERATION_LOGGER: self.generation_sample_rate,
+            },
+            self.slow_seconds,
+        )
+        self._handler = DroppingQueueHandler(
+            queue.Queue(maxsize=self.queue_size)
+        )
+        self._handler.addFilter(self._filter)
+        self._listener = _Listener(self._handler.queue, self._sink())
+        self._listener.start()
+
+        logger = logging.getLogger(APP_LOGGER)
+        self._previous = (logger.level, logger.propagate)
+        logger.setLevel(self.level)
+        logger.propagate = False
+        logger.addHandler(self._handler)
+
+    def close(self) -> None:
+        """Write queued records, stop the thread and remove the handler."""
+        if not self.running:
+            return
+        logger = logging.getLogger(APP_LOGGER)
+        logger.removeHandler(self._handler)
+        level, logger.propagate = self._previous
+        logger.setLevel(level)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+    def get_metrics(self) -> dict:
+        """Get log queue counters for this worker.
+
+        Returns:
+            dict: Whether logging runs, records waiting to be written
+                and queued, dropped and sampled-out counts
+        """
+        if self._handler is None:
+            return {'running': False}
+        return {
+            'running': self.running,
+            'pending': self._handler.queue.qsize(),
+            'queued': self._handler.queued,
+            'dropped': self._handler.dropped,
+            'sampled_out': self._filter.sampled_out,
+        }
+
+
+def log_generation(
+    model: str,
+    mode: str,
+    response: dict,
+    duration: float,
+    route: Optional[dict] = None,
+) -> None:
+    """Log one generation with its token counts and latency.
+
+    Args:
+        model (str): Model that generated the answer
+        mode (str): Response mode
+        response (dict): Ollama generate response
+        duration (float): Seconds spent generating
+        route (Optional[dict]): Route decision for 'auto' requests
+    """
+    logger = logging.getLogger(GENERATION_LOGGER)
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    total = response.get('total_duration')
+    logger.info('generation', extra={'fields': {
+        'model': model,
+        'mode': mode,
+        'tier': route.get('tier') if route else None,
+        'prompt_tokens': response.get('prompt_eval_count'),
+        'completion_tokens': response.get('eval_count'),
+        'duration_ms': round(duration * 1000, 3),
+        'ollama_duration_ms': (
+            round(total / 1e6, 3) if isinstance(total, int) else None
+        ),
+    }})
+
+
+def log_access(
+    method: str,
+    path: str,
+    route: Optional[str],
+    status: int,
+    duration: float,
+    cache: Optional[str] = None,
+    client: Optional[str] = None,
+    model: Optional[str] = None,
+    mode: Optional[str] = None,
+) -> None:
+    """Log one handled HTTP request.
+
+    Args:
+        method (str): Request method
+        path (str): Request path
+        route (Optional[str]): Path template of the matched route
+        status (int): Response status code
+        duration (float): Seconds until the response was sent
+        cache (Optional[str]): Cache outcome from the X-Cache header
+        client (Optional[str]): Client address
+        model (Optional[str]): Model that answered, for ask requests
+        mode (Optional[str]): Response mode(s), comma-separated, for
+            ask requests
+    """
+    logger = logging.getLogger(ACCESS_LOGGER)
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info('request', extra={'fields': {
+        'method': method,
+        'path': path,
+        'route': route,
+        'status': status,
+        'duration_ms': round(duration * 1000, 3),
+        'cache': cache,
+        'client': client,
+        'model': model,
+        'mode': mode,
+    }})
+
+
+@lru_cache
+def get_log_service() -> LogService:
+    """Get the log service, created on first use.
+
+    Returns:
+        LogService: The shared log service
+    """
+    return LogService(settings=get_settings())
@@ -0,0 +1,188 @@
+"""Event loop lag and blocking callback monitoring."""
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from functools import lru_cache
+from typing import Optional
+
+from api.services.config_service import Settings, get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """Measures event loop lag and reports callbacks that block it.
+
+    All requests of a worker share one event loop, so one blocking call
+    (sync I/O, a sync client, heavy CPU work) delays every request in
+    flight. Two pieces watch for this:
+
+    - A heartbeat task sleeps for `interval` seconds and records how
+      much later than asked it woke up. That lag is the time callbacks
+      waited to be scheduled, and its percentiles are reported.
+    - A watchdog thread checks that the heartbeat keeps ticking. When
+      the loop hasn't come back for `slow_threshold` seconds, it logs
+      the loop thread's stack, showing the blocking code while it is
+      still running. Each stall is logged once.
+
+    The heartbeat costs one timer wakeup per interval; the watchdog
+    sleeps between checks and takes the GIL only briefly.
+
+    Attributes:
+        interval: Seconds between heartbeats, 0 if disabled
+        slow_threshold: Seconds the loop may stall before its stack
+            is logged
+        window: Number of lag samples percentiles are computed over
+        slow_callbacks: Stalls logged since start
+        max_lag: Largest lag seen since start, in seconds
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        """Initialize the monitor.
+
+        Takes LOOP_MONITOR_INTERVAL_MS, LOOP_SLOW_CALLBACK_MS and
+        LOOP_LAG_WINDOW from the settings. Nothing runs until `start`.
+
+        Args:
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.interval = settings.loop_monitor_interval_ms / 1000
+        self.slow_threshold = settings.loop_slow_callback_ms / 1000
+        self.window = settings.loop_lag_window
+        self.slow_callbacks = 0
+        self.max_lag = 0.0
+        self._lags: deque[float] = deque(maxlen=self.window)
+        self._last_beat = 0.0
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether monitoring is configured."""
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the heartbeat is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop.
+
+        Must be called from the loop's thread. Does nothing if the
+        monitor is disabled or already running.
+        """
+        if not self.enabled or self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(
+            self._heartbeat()
+        )
+        if self.slow_threshold > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch, name='loop-watchdog', daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and the watchdog."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - start - self.interval)
+
+    def record(self, lag: float) -> None:
+        """Record one lag sample.
+
+        Args:
+            lag (float): Seconds the heartbeat woke up late
+        """
+        lag = max(lag, 0.0)
+        self._lags.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        self._last_beat = time.monotonic()
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.slow_threshold) / 2
+        reported_beat = None
+        while not self._stopped.wait(check_every):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat - self.interval
+            if stalled >= self.slow_threshold and last_beat != reported_beat:
+                reported_beat = last_beat
+                self._report_stall(stalled)
+
+    def _report_stall(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        self.slow_callbacks += 1
+        logger.warning(
+            'Event loop blocked for over %.0f ms in:\n%s',
+            stalled * 1000, ''.join(traceback.format_stack(frame)),
+        )
+
+    def get_metrics(self) -> dict:
+        """Get lag percentiles over the recent samples.
+
+        Returns:
+            dict: p50, p95, p99 and max lag of the window in
+                milliseconds, the largest lag since start, the sample
+                count and the number of stalls logged
+        """
+        lags = sorted(self._lags)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not lags:
+                return None
+            # Nearest-rank percentile
+            index = max(0, math.ceil(fraction * len(lags)) - 1)
+            return round(lags[index] * 1000, 2)
+
+        return {
+            'running': self.running,
+            'samples': len(lags),
+            'lag_p50_ms': percentile(0.50),
+            'lag_p95_ms': percentile(0.95),
+            'lag_p99_ms': percentile(0.99),
+            'lag_max_ms': percentile(1.0),
+            'lag_max_since_start_ms': round(self.max_lag * 1000, 2),
+            'slow_callbacks': self.slow_callbacks,
+            'slow_callback_threshold_ms': self.slow_threshold * 1000,
+        }
+
+
+@lru_cache
+def get_loop_monitor() -> EventLoopMonitor:
+    """Get the event loop monitor, created on first use.
+
+    Returns:
+        EventLoopMonitor: The shared event loop monitor
+    """
+    return EventLoopMonitor(settings=get_settings())
@@ -0,0 +1,224 @@
+"""Negative caching and error-rate fast-fail for Ollama models."""
+import math
+import time
+from collections import deque
+from typing import Optional
+
+import ollama
+
+from api.services.config_service import Settings
+
+
+class ModelNotFound(Exception):
+    """Raised when the requested model isn't available in Ollama."""
+
+
+class ModelUnsupported(Exception):
+    """Raised when the model can't serve the kind of request made."""
+
+
+class ModelUnavailable(Exception):
+    """Raised when a model is failed fast after repeated errors.
+
+    Attributes:
+        retry_after: Seconds until requests are let through again
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelHealthTracker:
+    """Fails requests fast for models that are known to fail.
+
+    Two mechanisms keep a misconfigured client from hammering Ollama:
+
+    - Deterministic failures (the model isn't pulled, or can't do what
+      was asked) are remembered per model for `negative_ttl` seconds
+      and answered without calling Ollama. Not-found entries are
+      dropped as soon as the model list is seen to change.
+    - Other failures are tracked per model over the last
+      `error_window` seconds. Once at least `min_requests` calls were
+      made and the error rate reaches `error_threshold`, the model is
+      failed fast for `cooldown` seconds; then one probe request is let
+      through, and its outcome closes or reopens the breaker.
+
+    Attributes:
+        negative_ttl: Seconds a deterministic failure is remembered
+        error_window: Seconds of outcomes used for the error rate
+        min_requests: Calls in the window before the rate is trusted
+        error_threshold: Error rate that opens the breaker
+        cooldown: Seconds the breaker stays open
+        fast_failed: Requests rejected without calling Ollama
+    """
+
+    def __init__(
+        self,
+        negative_ttl: Optional[float] = None,
+        error_window: Optional[float] = None,
+        min_requests: Optional[int] = None,
+        error_threshold: Optional[float] = None,
+        cooldown: Optional[float] = None,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the tracker.
+
+        Unset arguments are taken from the settings:
+        NEGATIVE_CACHE_TTL, MODEL_ERROR_WINDOW, MODEL_ERROR_MIN_REQUESTS,
+        MODEL_ERROR_THRESHOLD and MODEL_ERROR_COOLDOWN.
+        """
+        settings = settings or Settings.from_env()
+        self.negative_ttl = negative_ttl or settings.negative_cache_ttl
+        self.error_window = error_window or settings.model_error_window
+        self.min_requests = min_requests or settings.model_error_min_requests
+        self.error_threshold = (
+            error_threshold or settings.model_error_threshold
+        )
+        self.cooldown = cooldown or settings.model_error_cooldown
+        self.fast_failed = 0
+        # model -> (message, status code, expires_at)
+        self._negative: dict[str, tuple[str, int, float]] = {}
+        # model -> deque of (timestamp, failed)
+        self._outcomes: dict[str, deque] = {}
+        # model -> time the breaker lets a probe through
+        self._open_until: dict[str, float] = {}
+        # model -> time its probe request was let through
+        self._probing: dict[str, float] = {}
+        self._known_models: Optional[frozenset] = None
+
+    @staticmethod
+    def _deterministic(error: Exception) -> Optional[int]:
+        """Status code of a failure that will repeat for the model."""
+        if not isinstance(error, ollama.ResponseError):
+            return None
+        if error.status_code == 404:
+            return 404
+        if error.status_code == 400 and 'does not support' in error.error:
+            return 400
+        return None
+
+    def check(self, model: str) -> None:
+        """Raise if requests for a model should fail fast.
+
+        Args:
+            model (str): The Ollama model name
+
+        Raises:
+            ModelNotFound: If the model recently wasn't found
+            ModelUnsupported: If the model recently rejected the
+                request kind
+            ModelUnavailable: If the model's breaker is open
+        """
+        now = time.monotonic()
+        negative = self._negative.get(model)
+        if negative is not None:
+            message, status_code, expires_at = negative
+            if expires_at > now:
+                self.fast_failed += 1
+                if status_code == 404:
+                    raise ModelNotFound(message)
+                raise ModelUnsupported(message)
+            del self._negative[model]
+
+        open_until = self._open_until.get(model)
+        if open_until is None:
+            return
+        # A probe that never reported back (e.g. was cancelled) stops
+        # blocking others after a cooldown
+        probe = self._probing.get(model)
+        if open_until > now or (
+            probe is not None and probe > now - self.cooldown
+        ):
+            self.fast_failed += 1
+            raise ModelUnavailable(
+                f'Model {model} is failing, retry later',
+                retry_after=max(open_until - now, 1.0),
+            )
+        # Cooldown is over: let this request through as the probe
+        self._probing[model] = now
+
+    def record_success(self, model: str) -> None:
+        """Record a successful call, closing the model's breaker."""
+        if self._open_until.pop(model, None) is not None:
+            self._probing.pop(model, None)
+            self._outcomes.pop(model, None)
+        self._record(model, failed=False)
+
+    def record_failure(self, model: str, error: Exception) -> Exception:
+        """Record a failed call and return the error to raise.
+
+        Args:
+            model (str): The Ollama model name
+            error (Exception): What the call raised
+
+        Returns:
+            Exception: `ModelNotFound` or `ModelUnsupported` for
+                deterministic failures, otherwise `error` itself
+        """
+        status_code = self._deterministic(error)
+        if status_code is not None:
+            message = getattr(error, 'error', str(error))
+            self._negative[model] = (
+                message, status_code, time.monotonic() + self.negative_ttl
+            )
+            if status_code == 404:
+                return ModelNotFound(message)
+            return ModelUnsupported(message)
+
+        now = time.monotonic()
+        if model in self._probing:
+            # The probe failed: stay open for another cooldown
+            self._probing.pop(model)
+            self._open_until[model] = now + self.cooldown
+            return error
+        outcomes = self._record(model, failed=True)
+        failures = sum(failed for _, failed in outcomes)
+        if len(outcomes) >= self.min_requests \
+                and failures / len(outcomes) >= self.error_threshold:
+            self._open_until[model] = now + self.cooldown
+        return error
+
+    def _record(self, model: str, failed: bool) -> deque:
+        """Add an outcome and drop the ones older than the window."""
+        now = time.monotonic()
+        outcomes = self._outcomes.setdefault(model, deque())
+        outcomes.append((now, failed))
+        while outcomes and outcomes[0][0] <= now - self.error_window:
+            outcomes.popleft()
+        return outcomes
+
+    def update_models(self, models: list[str]) -> None:
+        """Drop not-found entries when the model list has changed.
+
+        Args:
+            models (list[str]): Names of the models Ollama has
+        """
+        known = frozenset(models)
+        if known == self._known_models:
+            return
+        self._known_models = known
+        self._negative = {
+            model: entry for model, entry in self._negative.items()
+            if entry[1] != 404
+        }
+
+    def get_metrics(self) -> dict:
+        """Get a snapshot of negative entries and open breakers.
+
+        Returns:
+            dict: Models with a live negative entry, models with an
+                open breaker and the fast-failed counter
+        """
+        now = time.monotonic()
+        return {
+            'negative': sorted(
+                model for model, entry in self._negative.items()
+                if entry[2] > now
+            ),
+            'open': {
+                model: math.ceil(max(until - now, 0))
+                for model, until in self._open_until.items()
+            },
+            'fast_failed': self.fast_failed,
+        }
@@ -0,0 +1,341 @@
+"""On-demand CPU and memory profiling of the running worker."""
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from api.services.config_service import Settings, get_settings
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another is running."""
+
+
+class ProfilingService:
+    """Time-boxed profiles of this worker process, taken on demand.
+
+    Nothing is hooked until a profile is requested: the profilers are
+    started for the requested window and removed again afterwards, so
+    an idle service costs nothing. Only one profile runs at a time.
+
+    Three kinds of profile are offered:
+
+    - deterministic (`cProfile`) profiles of the event loop thread,
+      reported as pstats text
+    - wall-clock stack samples of every thread, reported as collapsed
+      stacks ready for flamegraph.pl or speedscope
+    - `tracemalloc` snapshots of the largest allocations made during
+      the window
+
+    Single requests can also be profiled with cProfile; their reports
+    are kept in a small history to be fetched by id.
+
+    Profiles expose code paths and allocation sites, so they are only
+    available when ADMIN_TOKEN is set and callers present it.
+
+    Attributes:
+        admin_token: Token admin callers must present, empty if the
+            admin endpoints are disabled
+        max_seconds: Longest profile window allowed
+        sample_interval: Seconds between stack samples
+        history_size: Request profiles kept for retrieval
+        tracemalloc_frames: Frames stored per traced allocation
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        """Initialize the profiling service.
+
+        Args:
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.admin_token = settings.admin_token
+        self.max_seconds = settings.profile_max_seconds
+        self.sample_interval = settings.profile_sample_interval_ms / 1000
+        self.history_size = settings.profile_history
+        self.tracemalloc_frames = settings.profile_tracemalloc_frames
+        self._busy = False
+        self._request_profiles: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether admin profiling is configured."""
+        return bool(self.admin_token)
+
+    @property
+    def busy(self) -> bool:
+        """Whether a profile is currently running."""
+        return self._busy
+
+    def authorize(self, token: Optional[str]) -> bool:
+        """Check an admin token in constant time.
+
+        Args:
+            token (Optional[str]): Token presented by the caller
+
+        Returns:
+            bool: True if profiling is enabled and the token matches
+        """
+        if not self.admin_token or not token:
+            return False
+        return hmac.compare_digest(
+            token.encode(), self.admin_token.encode()
+        )
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the single profiling slot.
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        if self._busy:
+            raise ProfilerBusy('A profile is already running')
+        self._busy = True
+        try:
+            yield
+        finally:
+            self._busy = False
+
+    def _window(self, seconds: float) -> float:
+        return max(0.0, min(seconds, self.max_seconds))
+
+    async def profile_cpu(
+        self, seconds: float, sort: str = 'cumulative', limit: int = 50
+    ) -> str:
+        """Profile the event loop thread with cProfile.
+
+        Every coroutine and callback the loop runs during the window
+        is recorded, including the awaiting request's own. Work sent
+        to other threads isn't; use `sample_stacks` for that.
+
+        Args:
+            seconds (float): Window length, capped at `max_seconds`
+            sort (str): pstats sort key, e.g. 'cumulative' or 'tottime'
+            limit (int): Number of functions listed
+
+        Returns:
+            str: pstats report
+
+        Raises:
+            ProfilerBusy: If another profile is running
+            ValueError: If the sort key is unknown
+        """
+        sort_key = pstats.SortKey(sort)
+        with self._exclusive():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another tool holds the profiling hook (Python 3.12+)
+                raise ProfilerBusy(str(e)) from e
+            try:
+                await asyncio.sleep(self._window(seconds))
+            finally:
+                profiler.disable()
+        # Sorting and printing the stats can take a while for a busy
+        # window, so it runs off the event loop
+        return await asyncio.to_thread(
+            _format_stats, profiler, sort_key, limit
+        )
+
+    async def sample_stacks(self, seconds: float) -> str:
+        """Sample the stacks of every thread in collapsed format.
+
+        A background thread records each thread's stack every
+        `sample_interval` seconds. Samples are wall-clock, so idle
+        threads show where they wait (the event loop in `select`,
+        pool workers on their queue).
+
+        Args:
+            seconds (float): Window length, capped at `max_seconds`
+
+        Returns:
+            str: One 'thread;outer;...;inner count' line per distinct
+                stack, hottest first
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        with self._exclusive():
+            stacks = await asyncio.to_thread(
+                _sample_stacks, self._window(seconds), self.sample_interval
+            )
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in stacks.most_common()
+        )
+
+    async def profile_memory(self, seconds: float, limit: int = 25) -> dict:
+        """Report the largest allocations made during a window.
+
+        Starts `tracemalloc` for the window unless it is already
+        tracing (e.g. PYTHONTRACEMALLOC is set), in which case the
+        report covers everything allocated since tracing began.
+
+        Taking the snapshot and grouping its traces take time in
+        proportion to the live allocations, so both run in a worker
+        thread rather than on the event loop.
+
+        Args:
+            seconds (float): Window length, capped at `max_seconds`
+            limit (int): Number of allocation sites listed
+
+        Returns:
+            dict: Window length, traced current and peak bytes and
+                the top allocation sites by size
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        with self._exclusive():
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(self.tracemalloc_frames)
+            try:
+                window = self._window(seconds)
+                await asyncio.sleep(window)
+                current, peak = tracemalloc.get_traced_memory()
+                snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+            finally:
+                if started:
+                    tracemalloc.stop()
+
+        top = await asyncio.to_thread(_top_allocations, snapshot, limit)
+        return {
+            'seconds': window,
+            'traced_current_bytes': current,
+            'traced_peak_bytes': peak,
+            'top': top,
+        }
+
+    def start_request_profile(self) -> Optional[cProfile.Profile]:
+        """Start profiling a single request.
+
+        Returns:
+            Optional[cProfile.Profile]: Running profiler, or None if
+                another profile holds the slot
+        """
+        if self._busy:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        self._busy = True
+        return profiler
+
+    async def finish_request_profile(
+        self, profiler: cProfile.Profile, label: str, limit: int = 50
+    ) -> str:
+        """Stop a request profile and keep its report.
+
+        Args:
+            profiler (cProfile.Profile): Profiler from
+                `start_request_profile`
+            label (str): Request line shown above the report
+            limit (int): Number of functions listed
+
+        Returns:
+            str: Id the report can be fetched with
+        """
+        profiler.disable()
+        self._busy = False
+        profile_id = uuid.uuid4().hex
+        report = await asyncio.to_thread(
+            _format_stats, profiler, pstats.SortKey.CUMULATIVE, limit
+        )
+        self._request_profiles[profile_id] = f'{label}\n{report}'
+        while len(self._request_profiles) > self.history_size:
+            self._request_profiles.popitem(last=False)
+        return profile_id
+
+    def get_request_profile(self, profile_id: str) -> Optional[str]:
+        """Get a stored request profile.
+
+        Args:
+            profile_id (str): Id returned by `finish_request_profile`
+
+        Returns:
+            Optional[str]: pstats report, None if unknown or evicted
+        """
+        return self._request_profiles.get(profile_id)
+
+
+def _format_stats(
+    profiler: cProfile.Profile, sort_key: pstats.SortKey, limit: int
+) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort_key).print_stats(limit)
+    return stream.getvalue()
+
+
+def _top_allocations(
+    snapshot: tracemalloc.Snapshot, limit: int
+) -> list[dict]:
+    """Group a snapshot's traces by line, largest first."""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+    top = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        top.append({
+            'file': frame.filename,
+            'line': frame.lineno,
+            'size_bytes': stat.size,
+            'count': stat.count,
+        })
+    return top
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def _sample_stacks(seconds: float, interval: float) -> Counter:
+    """Collect collapsed stacks of all other threads for a window."""
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while True:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, f'thread-{ident}'))
+            stacks[';'.join(reversed(labels))] += 1
+        if time.monotonic() >= deadline:
+            return stacks
+        time.sleep(interval)
+
+
+@lru_cache
+def get_profiling_service() -> ProfilingService:
+    """Get the profiling service, created on first use.
+
+    Returns:
+        ProfilingService: The shared profiling service
+    """
+    return ProfilingService(settings=get_settings())
@@ -0,0 +1,228 @@
+"""Rate limiting with per-worker quota leases."""
+import asyncio
+import time
+import weakref
+from typing import Optional
+
+from api.services.backends.base_backend import CacheBackend
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is counted against a used-up quota."""
+
+
+class LeasedRateLimiter:
+    """Fixed-window rate limiter that enforces leased quota locally.
+
+    Instead of a Redis round trip per request, a worker leases
+    `lease_size` requests of a client's window quota with one INCRBY
+    and counts them down in memory. When the lease is used up or
+    expires (after `lease_ttl` seconds, or at the end of the window)
+    the worker leases again; unused quota of an expired lease is given
+    back with a negative INCRBY while its window is still current.
+    Only `consume` leases: `check` decides from the current lease, or
+    reads the window's counter when there is none, so requests that
+    are never counted (cache hits, rejections) reserve no quota.
+    Requests that passed `check` concurrently can find the quota gone
+    by the time they are counted; `consume` rejects those.
+
+    Leases are reservations, so the global limit is never exceeded.
+    The cost is the opposite error: a client can be rejected while
+    other workers still hold unused quota for it, by at most
+    `lease_size` requests per other worker. `lease_size` is therefore
+    the error bound traded for fewer round trips.
+
+    Attributes:
+        backend: Store holding the per-window counters
+        max_requests: Requests allowed per client per window
+        window: Window length in seconds
+        lease_size: Requests leased per round trip
+        lease_ttl: Seconds a lease lives before unused quota returns
+        lease_requests: Round trips made to lease quota
+        local_decisions: Requests decided without a round trip
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        max_requests: int,
+        window: int,
+        lease_size: int,
+        lease_ttl: float,
+    ):
+        self.backend = backend
+        self.max_requests = max_requests
+        self.window = window
+        self.lease_size = max(1, min(lease_size, max_requests))
+        self.lease_ttl = lease_ttl
+        self.lease_requests = 0
+        self.local_decisions = 0
+        # identifier -> lease dict with window, granted, used, count and
+        # expires_at
+        self._leases: dict[str, dict] = {}
+        # Locks live while a request holds or waits for them, so idle
+        # clients don't accumulate and a held lock is never replaced
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+        self._next_sweep = 0.0
+
+    def _key(self, identifier: str, window_index: int) -> str:
+        return f'rate_limit:{identifier}:{window_index}'
+
+    @staticmethod
+    def _remaining(lease: Optional[dict], now: float) -> int:
+        if lease is None or lease['expires_at'] <= now:
+            return 0
+        return lease['granted'] - lease['used']
+
+    def _usable(self, lease: Optional[dict], now: float) -> bool:
+        """Whether a lease can decide requests without a round trip.
+
+        A live lease with quota left can; so can a live lease that was
+        granted less than asked for, because the window was exhausted
+        and leasing again would only be refused.
+        """
+        if lease is None or lease['expires_at'] <= now:
+            return False
+        return lease['used'] < lease['granted'] \
+            or lease['granted'] < self.lease_size
+
+    async def _release(self, identifier: str, lease: dict) -> None:
+        """Give unused quota of a lease back to its window."""
+        unused = lease['granted'] - lease['used']
+        if unused > 0 and lease['window'] == int(time.time() // self.window):
+            await self.backend.incr(
+                self._key(identifier, lease['window']), -unused
+            )
+
+    def _is_locked(self, identifier: str) -> bool:
+        lock = self._locks.get(identifier)
+        return lock is not None and lock.locked()
+
+    async def _sweep(self, now: float) -> None:
+        """Return quota of expired leases, at most once per lease_ttl."""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.lease_ttl
+        # Leases whose lock is held are being replaced by a request,
+        # which returns their quota itself
+        expired = [
+            identifier for identifier, lease in self._leases.items()
+            if lease['expires_at'] <= now
+            and not self._is_locked(identifier)
+        ]
+        for identifier in expired:
+            lease = self._leases.pop(identifier)
+            await self._release(identifier, lease)
+
+    async def _lease(self, identifier: str) -> dict:
+        """Return a lease with quota left, leasing from Redis if needed."""
+        now = time.time()
+        lease = self._leases.get(identifier)
+        if self._usable(lease, now):
+            self.local_decisions += 1
+            return lease
+
+        lock = self._locks.setdefault(identifier, asyncio.Lock())
+        async with lock:
+            # Another request may have leased while this one waited
+            now = time.time()
+            lease = self._leases.get(identifier)
+            if self._usable(lease, now):
+                self.local_decisions += 1
+                return lease
+            if lease is not None:
+                await self._release(identifier, lease)
+
+            window_index = int(now // self.window)
+            key = self._key(identifier, window_index)
+            count = await self.backend.incr(key, self.lease_size)
+            self.lease_requests += 1
+            if count <= self.lease_size:
+                # First lease of the window
+                await self.backend.expire(key, self.window + 1)
+            overflow = min(
+                self.lease_size, max(0, count - self.max_requests)
+            )
+            if overflow:
+                await self.backend.incr(key, -overflow)
+            lease = {
+                'window': window_index,
+                'granted': self.lease_size - overflow,
+                'used': 0,
+                'count': count - overflow,
+                'expires_at': min(
+                    now + self.lease_ttl, (window_index + 1) * self.window
+                ),
+            }
+            self._leases[identifier] = lease
+        await self._sweep(now)
+        return lease
+
+    def _estimate(self, lease: dict) -> int:
+        """Estimate the client's global count from a lease."""
+        return lease['count'] - (lease['granted'] - lease['used'])
+
+    async def check(self, identifier: str) -> tuple[bool, int]:
+        """Check whether a client may make a request.
+
+        Decided from this worker's lease when it has a usable one,
+        otherwise from the window's counter; no quota is leased.
+
+        Args:
+            identifier (str): Client identifier
+
+        Returns:
+            tuple[bool, int]: (is_allowed, estimated_count)
+        """
+        now = time.time()
+        lease = self._leases.get(identifier)
+        if self._usable(lease, now):
+            self.local_decisions += 1
+            return self._remaining(lease, now) > 0, self._estimate(lease)
+        value = await self.backend.get(
+            self._key(identifier, int(now // self.window))
+        )
+        count = int(value or 0)
+        return count < self.max_requests, count
+
+    async def consume(self, identifier: str) -> int:
+        """Count one request against the client's quota.
+
+        Args:
+            identifier (str): Client identifier
+
+        Returns:
+            int: Estimated global count after the request
+
+        Raises:
+            RateLimitExceeded: If the client has no quota left
+        """
+        lease = await self._lease(identifier)
+        if self._remaining(lease, time.time()) <= 0:
+            raise RateLimitExceeded(
+                f'Rate limit exceeded. Max {self.max_requests} '
+                f'requests per {self.window} seconds'
+            )
+        lease['used'] += 1
+        return self._estimate(lease)
+
+    async def release_all(self) -> None:
+        """Give back the unused quota of every lease."""
+        leases, self._leases = self._leases, {}
+        for identifier, lease in leases.items():
+            await self._release(identifier, lease)
+
+    def get_metrics(self) -> dict:
+        """Get leasing counters for this worker.
+
+        Returns:
+            dict: Active leases, round trips and local decisions
+        """
+        return {
+            'mode': 'leased',
+            'active_leases': len(self._leases),
+            'lease_requests': self.lease_requests,
+            'local_decisions': self.local_decisions,
+        }
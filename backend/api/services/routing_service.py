@@ -0,0 +1,184 @@
+"""Model routing for requests that ask for model='auto'."""
+import asyncio
+import logging
+import re
+from functools import lru_cache
+from typing import Optional
+
+from api.models.chats.ask_model import AskMode
+from api.services.config_service import Settings, get_settings
+from api.services.core_service import CoreService, get_core_service
+
+
+logger = logging.getLogger(__name__)
+
+# Model name that asks the router to pick a model
+AUTO_MODEL = 'auto'
+
+TIERS = ('small', 'medium', 'large')
+
+# Modes whose answers are long or style-sensitive enough to skip the
+# smallest tier
+_DEMANDING_MODES = {AskMode.PROFESSIONAL, AskMode.CREATIVE}
+
+_SIMPLE_PATTERN = re.compile(
+    r'^\s*(what|who|when|where|which|define|is|are|does|do|how many|'
+    r'how much|name)\b',
+    re.IGNORECASE,
+)
+_COMPLEX_PATTERN = re.compile(
+    r'\b(explain|compare|contrast|analy[sz]e|evaluate|why|step[- ]by[- ]'
+    r'step|derive|prove|design|implement|refactor|debug|code|algorithm|'
+    r'essay|story|poem|pros and cons|trade-?offs?)\b',
+    re.IGNORECASE,
+)
+
+_JUDGE_PROMPT = (
+    'Classify how hard the user\'s request is to answer well. '
+    'Reply with exactly one word: simple or complex.'
+)
+
+
+class RoutingService:
+    """Service that routes 'auto' requests to a tier of Ollama models.
+
+    A cheap local classifier looks at prompt length, the response mode
+    and keywords. When MODEL_ROUTER_JUDGE names a model, prompts the
+    heuristics can't place confidently are classified by that (tiny)
+    model instead, within MODEL_ROUTER_JUDGE_TIMEOUT seconds.
+
+    Attributes:
+        tiers: Model name per tier ('small', 'medium', 'large')
+        short_prompt_chars: Prompts up to this length may use 'small'
+        long_prompt_chars: Prompts over this length use 'large'
+        judge_model: Optional model used to break ties
+        judge_timeout: Seconds to wait for the judge
+    """
+
+    def __init__(
+        self,
+        core: Optional[CoreService] = None,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the routing service from the settings."""
+        settings = settings or Settings.from_env()
+        self.core = core or get_core_service()
+        self.tiers = {
+            'small': settings.model_tier_small,
+            'medium': settings.model_tier_medium,
+            'large': settings.model_tier_large,
+        }
+        self.short_prompt_chars = settings.model_router_short_chars
+        self.long_prompt_chars = settings.model_router_long_chars
+        self.judge_model = settings.model_router_judge
+        self.judge_timeout = settings.model_router_judge_timeout
+
+    def classify(self, prompt: str, mode: str) -> tuple[str, str, bool]:
+        """Classify a prompt with local heuristics.
+
+        Args:
+            prompt (str): The prompt text
+            mode (str): The response mode
+
+        Returns:
+            tuple[str, str, bool]: (tier, reason, confident)
+        """
+        length = len(prompt)
+        complex_hits = len(_COMPLEX_PATTERN.findall(prompt))
+        if length > self.long_prompt_chars:
+            return 'large', 'long prompt', True
+        if '```' in prompt or complex_hits >= 2:
+            return 'large', 'complex keywords', True
+        if complex_hits:
+            return 'medium', 'complex keyword', False
+        if mode in _DEMANDING_MODES:
+            return 'medium', f'{mode} mode', True
+        if length <= self.short_prompt_chars and \
+                _SIMPLE_PATTERN.match(prompt):
+            return 'small', 'short factual question', True
+        return 'medium', 'default', False
+
+    async def _judge(self, prompt: str) -> Optional[str]:
+        """Ask the judge model for a tier, or None if it can't tell.
+
+        The judge calls Ollama directly rather than through
+        `generate_text`: a three-token answer would be a misleading
+        per-token latency sample, and a timeout would count as a
+        failure, so both would shrink the adaptive limit for real
+        generations. The model's health is still checked and recorded,
+        except on a timeout, which says nothing about the model.
+        """
+        health = self.core.model_health
+        try:
+            health.check(self.judge_model)
+        except Exception:
+            return None
+        try:
+            response = await asyncio.wait_for(
+                self.core.async_ollama_client.generate(
+                    model=self.judge_model,
+                    prompt=prompt[:self.long_prompt_chars],
+                    system=_JUDGE_PROMPT,
+                    options={'num_predict': 3, 'temperature': 0.0},
+                ),
+                timeout=self.judge_timeout,
+            )
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            health.record_failure(self.judge_model, e)
+            return None
+        health.record_success(self.judge_model)
+        verdict = response.get('response', '').strip().lower()
+        if verdict.startswith('simple'):
+            return 'small'
+        if verdict.startswith('complex'):
+            return 'large'
+        return None
+
+    async def route(self, prompt: str, modes: list[str]) -> dict:
+        """Pick a model for a prompt answered in the given modes.
+
+        With several modes the most demanding tier wins, so a single
+        model answers all of them.
+
+        Args:
+            prompt (str): The prompt text
+            modes (list[str]): The requested response modes
+
+        Returns:
+            dict: Route decision with 'tier', 'model' and 'reason'
+        """
+        decisions = [self.classify(prompt, mode) for mode in modes]
+        tier, reason, confident = max(
+            decisions, key=lambda d: TIERS.index(d[0])
+        )
+        if not confident and self.judge_model:
+            judged = await self._judge(prompt)
+            if judged:
+                tier, reason = judged, f'judge ({self.judge_model})'
+
+        decision = {
+            'tier': tier, 'model': self.tiers[tier], 'reason': reason,
+        }
+        logger.info(
+            'Routed auto model request',
+            extra={'fields': {
+                'route_tier': tier,
+                'route_model': decision['model'],
+                'route_reason': reason,
+                'prompt_chars': len(prompt),
+                'modes': list(modes),
+            }},
+        )
+        return decision
+
+
+@lru_cache
+def get_routing_service() -> RoutingService:
+    """Get the routing service, created on first use.
+
+    Returns:
+        RoutingService: The shared routing service
+    """
+    return RoutingService(get_core_service(), get_settings())
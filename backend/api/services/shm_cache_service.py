@@ -0,0 +1,246 @@
+"""Cross-process response cache in a memory-mapped file."""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import Optional
+
+from api.services.config_service import Settings
+
+
+# Header: magic, slots, slot_bytes, ways
+_HEADER = struct.Struct('<8sIII')
+_HEADER_SIZE = 64
+_MAGIC = b'BIBSHM01'
+# Entry: seq, key_hi, key_lo, expires_at, length
+_ENTRY = struct.Struct('<IQQdI')
+_SEQ = struct.Struct('<I')
+_READ_RETRIES = 3
+
+
+class SharedMemoryCache:
+    """Fixed-size hash table shared by all workers on a host.
+
+    The file (ideally on tmpfs such as /dev/shm) holds a header, a table
+    of entries and a slab arena with one fixed-size chunk per entry.
+    The table is set-associative: a key hashes to a set of `ways`
+    entries and, when the set is full, the entry closest to expiry is
+    replaced.
+
+    Reads are lock-free: every entry carries a sequence number that a
+    writer makes odd while it updates the entry and even again when
+    done, and readers retry if the number changed under them. Writers
+    serialize per set with a POSIX byte-range lock on the set's entries,
+    so writes to different sets never contend. The lock is only tried:
+    a write to a set another worker is writing is skipped rather than
+    stalling the event loop, which at worst costs a later miss. POSIX
+    locks are per process, so a single instance must not be written
+    from several threads at once.
+
+    Values larger than a chunk are not stored.
+
+    The layout (slots, chunk size, ways and format version) is part of
+    the file name, so workers configured differently, e.g. during a
+    rolling deploy, map separate files. A file is only ever grown from
+    empty, never truncated while another process may have it mapped.
+    Files of old layouts are left behind for tmpfs to drop on reboot.
+
+    Attributes:
+        path: Backing file path prefix, empty if disabled
+        file_path: Backing file, the path suffixed with the layout
+        slots: Total number of entries
+        slot_bytes: Size of each value chunk in bytes
+        ways: Entries per set
+        enabled: Whether the shared cache is active
+        busy_skips: Writes skipped because the set was locked
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        slots: Optional[int] = None,
+        slot_bytes: Optional[int] = None,
+        ways: int = 4,
+        settings: Optional[Settings] = None,
+    ):
+        """Initialize the shared cache.
+
+        The file is mapped lazily on first use.
+
+        Args:
+            path (Optional[str]): Backing file prefix, defaults to
+                SHM_CACHE_PATH
+            slots (Optional[int]): Number of entries, defaults to
+                SHM_CACHE_SLOTS (4096)
+            slot_bytes (Optional[int]): Chunk size per entry, defaults to
+                SHM_CACHE_SLOT_BYTES (4096)
+            ways (int): Entries per set
+            settings (Optional[Settings]): Settings to use, parsed from
+                the environment when not given
+        """
+        settings = settings or Settings.from_env()
+        self.path = path if path is not None else settings.shm_cache_path
+        self.ways = ways
+        slots = slots or settings.shm_cache_slots
+        self.slots = max(ways, slots - slots % ways)
+        self.slot_bytes = slot_bytes or settings.shm_cache_slot_bytes
+        self.enabled = bool(self.path)
+        self._sets = self.slots // ways
+        self._table_offset = _HEADER_SIZE
+        self._arena_offset = self._table_offset + self.slots * _ENTRY.size
+        self.size = self._arena_offset + self.slots * self.slot_bytes
+        self.file_path = (
+            f'{self.path}.{_MAGIC.decode().lower()}'
+            f'-{self.slots}x{self.slot_bytes}x{ways}'
+        )
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self.busy_skips = 0
+
+    def _map(self) -> mmap.mmap:
+        """Open and map the backing file, initializing it if needed."""
+        if self._mm is None:
+            fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                header = _HEADER.pack(
+                    _MAGIC, self.slots, self.slot_bytes, self.ways
+                )
+                if os.fstat(fd).st_size < self.size:
+                    # First worker: grow the new file; zeroed entries
+                    # are empty
+                    os.ftruncate(fd, self.size)
+                if os.pread(fd, _HEADER.size, 0) != header:
+                    os.pwrite(fd, header, 0)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            self._fd = fd
+            self._mm = mmap.mmap(fd, self.size)
+        return self._mm
+
+    @staticmethod
+    def _hash(key: str) -> tuple[int, int]:
+        """Hash a key to the 128-bit identity stored in the table."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return struct.unpack('<QQ', digest)
+
+    def _entry_offset(self, slot: int) -> int:
+        return self._table_offset + slot * _ENTRY.size
+
+    def _value_offset(self, slot: int) -> int:
+        return self._arena_offset + slot * self.slot_bytes
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a key without taking any lock.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[str]: Cached value or None if missing or expired
+        """
+        mm = self._map()
+        key_hi, key_lo = self._hash(key)
+        first = (key_hi % self._sets) * self.ways
+        now = time.time()
+        for slot in range(first, first + self.ways):
+            offset = self._entry_offset(slot)
+            for _ in range(_READ_RETRIES):
+                seq, hi, lo, expires_at, length = _ENTRY.unpack_from(
+                    mm, offset
+                )
+                if seq & 1:
+                    continue  # Writer in progress
+                if hi != key_hi or lo != key_lo or expires_at <= now:
+                    break
+                start = self._value_offset(slot)
+                value = mm[start:start + length]
+                if _SEQ.unpack_from(mm, offset)[0] == seq:
+                    return value.decode()
+        return None
+
+    def set(self, key: str, value: str, ttl: int) -> bool:
+        """Store a value, replacing the set's stalest entry if full.
+
+        Args:
+            key (str): Cache key
+            value (str): Serialized value
+            ttl (int): Time-to-live in seconds
+
+        Returns:
+            bool: True if stored, False if the value exceeds a chunk
+                or another process is writing the key's set
+        """
+        data = value.encode()
+        if len(data) > self.slot_bytes:
+            return False
+        mm = self._map()
+        key_hi, key_lo = self._hash(key)
+        first = (key_hi % self._sets) * self.ways
+        lock_start = self._entry_offset(first)
+        lock_len = self.ways * _ENTRY.size
+        try:
+            fcntl.lockf(
+                self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, lock_len, lock_start
+            )
+        except OSError:
+            self.busy_skips += 1
+            return False
+        try:
+            now = time.time()
+            victim, victim_expiry = first, None
+            for slot in range(first, first + self.ways):
+                _, hi, lo, expires_at, _ = _ENTRY.unpack_from(
+                    mm, self._entry_offset(slot)
+                )
+                if hi == key_hi and lo == key_lo:
+                    victim = slot
+                    break
+                if expires_at <= now:
+                    expires_at = 0.0  # Empty or expired, reuse first
+                if victim_expiry is None or expires_at < victim_expiry:
+                    victim, victim_expiry = slot, expires_at
+
+            offset = self._entry_offset(victim)
+            seq = _SEQ.unpack_from(mm, offset)[0]
+            _SEQ.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF)
+            start = self._value_offset(victim)
+            mm[start:start + len(data)] = data
+            _ENTRY.pack_into(
+                mm, offset, (seq + 1) & 0xFFFFFFFF,
+                key_hi, key_lo, now + ttl, len(data),
+            )
+            _SEQ.pack_into(mm, offset, (seq + 2) & 0xFFFFFFFF)
+            return True
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, lock_len, lock_start)
+
+    def clear(self) -> None:
+        """Invalidate every entry."""
+        mm = self._map()
+        table_len = self.slots * _ENTRY.size
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, table_len, self._table_offset)
+        try:
+            for slot in range(self.slots):
+                offset = self._entry_offset(slot)
+                seq = _SEQ.unpack_from(mm, offset)[0]
+                _SEQ.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF)
+                _ENTRY.pack_into(
+                    mm, offset, (seq + 1) & 0xFFFFFFFF, 0, 0, 0.0, 0
+                )
+                _SEQ.pack_into(mm, offset, (seq + 2) & 0xFFFFFFFF)
+        finally:
+            fcntl.lockf(
+                self._fd, fcntl.LOCK_UN, table_len, self._table_offset
+            )
+
+    def close(self) -> None:
+        """Unmap the file. The file itself is left for other workers."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,95 @@
+import logging
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.testclient import TestClient
+
+from api.middlewares.access_log_middleware import AccessLogMiddleware
+from api.services.logging_service import ACCESS_LOGGER
+
+
+class TestAccessLogMiddleware:
+    """Test suite for AccessLogMiddleware."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client for an app wrapped in the middleware."""
+        app = FastAPI()
+
+        @app.get('/v1/items/{item_id}')
+        async def item(item_id: int, response: Response):
+            response.headers['X-Cache'] = 'HIT'
+            return {'id': item_id}
+
+        @app.get('/v1/missing')
+        async def missing():
+            raise HTTPException(status_code=404)
+
+        @app.get('/v1/ask')
+        async def ask(req: Request):
+            req.state.model = 'llama3.2'
+            req.state.mode = 'concise'
+            return {}
+
+        sub = FastAPI()
+
+        @sub.get('/chats/{chat_id}')
+        async def chat(chat_id: int):
+            return {'id': chat_id}
+
+        app.mount('/v2', sub)
+        app.add_middleware(AccessLogMiddleware)
+        return TestClient(app)
+
+    def _fields(self, caplog):
+        return [
+            record.fields for record in caplog.records
+            if record.name == ACCESS_LOGGER
+        ]
+
+    def test_logs_request(self, client, caplog):
+        """Test requests are logged with route, status and cache."""
+        caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+        client.get('/v1/items/7')
+
+        [fields] = self._fields(caplog)
+        assert fields['method'] == 'GET'
+        assert fields['path'] == '/v1/items/7'
+        assert fields['route'] == '/v1/items/{item_id}'
+        assert fields['status'] == 200
+        assert fields['cache'] == 'HIT'
+        assert fields['duration_ms'] >= 0
+        assert fields['client'] == 'testclient'
+
+    def test_logs_errors(self, client, caplog):
+        """Test failed and unmatched requests are logged."""
+        caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+        client.get('/v1/missing')
+        client.get('/nowhere')
+
+        missing, nowhere = self._fields(caplog)
+        assert missing['status'] == 404
+        assert missing['route'] == '/v1/missing'
+        assert nowhere['status'] == 404
+        assert nowhere['route'] is None
+
+    def test_logs_model_and_mode(self, client, caplog):
+        """Test the model and mode set by a handler are logged."""
+        caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+        client.get('/v1/ask')
+        client.get('/v1/items/7')
+
+        ask, item = self._fields(caplog)
+        assert ask['model'] == 'llama3.2'
+        assert ask['mode'] == 'concise'
+        assert item['model'] is None
+        assert item['mode'] is None
+
+    def test_logs_full_route_of_mounted_app(self, client, caplog):
+        """Test routes of a mounted app keep the mount prefix."""
+        caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+        client.get('/v2/chats/3')
+
+        [fields] = self._fields(caplog)
+        assert fields['status'] == 200
+        assert fields['route'] == '/v2/chats/{chat_id}'
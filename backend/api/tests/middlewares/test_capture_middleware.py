@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from api.middlewares.capture_middleware import CaptureMiddleware
+from api.services.capture_service import RequestCaptureService
+
+
+class TestCaptureMiddleware:
+    """Test suite for CaptureMiddleware."""
+
+    @pytest.fixture
+    def capture(self, tmp_path):
+        """Create a capture service sampling every request."""
+        capture = RequestCaptureService(
+            path=str(tmp_path / 'capture.jsonl'), sample_rate=1.0
+        )
+        capture.start()
+        yield capture
+        capture.close()
+
+    @pytest.fixture
+    def client(self, capture):
+        """Create a test client for an app wrapped in the middleware."""
+        app = FastAPI()
+
+        @app.post('/v1/chats/ask')
+        async def ask(body: dict, response: Response):
+            response.headers['X-Cache'] = 'HIT'
+            return {'echo': body}
+
+        @app.get('/v1/chats/ask')
+        async def ask_get(prompt: str, model: str):
+            return {'prompt': prompt}
+
+        @app.get('/v1/health')
+        async def health():
+            return {'status': 'healthy'}
+
+        app.add_middleware(CaptureMiddleware, capture=capture)
+        return TestClient(app)
+
+    def _records(self, capture):
+        capture.close()
+        with open(capture.file_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_captures_chat_request(self, client, capture):
+        """Test chat requests are recorded with status and cache."""
+        body = {'model': 'llama3.2', 'prompt': 'hi', 'mode': 'friendly'}
+        response = client.post('/v1/chats/ask', json=body)
+        assert response.json() == {'echo': body}
+
+        [record] = self._records(capture)
+        assert record['method'] == 'POST'
+        assert record['status'] == 200
+        assert record['cache'] == 'HIT'
+        assert record['mode'] == 'friendly'
+        assert record['body'] == body
+        assert record['query'] == {}
+
+    def test_captures_method_and_query(self, client, capture):
+        """Test GET requests are recorded with their query parameters."""
+        client.get(
+            '/v1/chats/ask',
+            params={'prompt': 'mail a@b.io', 'model': 'llama3.2'},
+        )
+
+        [record] = self._records(capture)
+        assert record['method'] == 'GET'
+        assert record['model'] == 'llama3.2'
+        assert record['query'] == {
+            'prompt': 'mail [REDACTED]', 'model': 'llama3.2'
+        }
+        assert record['body'] == {}
+
+    def test_ignores_other_paths(self, client, capture):
+        """Test requests outside the prefix are not captured."""
+        client.get('/v1/health')
+        assert capture.captured == 0
+
+    def test_unsampled_requests_pass_through(self, client, capture):
+        """Test nothing is recorded when the request isn't sampled."""
+        capture.sample_rate = 0.0
+        response = client.post('/v1/chats/ask', json={'prompt': 'hi'})
+        assert response.status_code == 200
+        assert capture.captured == 0
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.middlewares.profile_middleware import ProfileMiddleware
+from api.services.config_service import Settings
+from api.services.profiling_service import ProfilingService
+
+
+def answer() -> int:
+    return sum(range(1000))
+
+
+class TestProfileMiddleware:
+    """Test suite for ProfileMiddleware."""
+
+    @pytest.fixture
+    def profiling(self):
+        """Create a profiling service with admin access enabled."""
+        if sys.getprofile() is not None:
+            pytest.skip('another profiler is active')
+        return ProfilingService(settings=Settings(admin_token='secret'))
+
+    @pytest.fixture
+    def client(self, profiling):
+        """Create a test client for an app wrapped in the middleware."""
+        app = FastAPI()
+
+        @app.post('/v1/chats/ask')
+        async def ask():
+            return {'answer': answer()}
+
+        @app.get('/v1/health')
+        async def health():
+            return {'status': 'healthy'}
+
+        app.add_middleware(ProfileMiddleware, profiling=profiling)
+        return TestClient(app)
+
+    def test_profiles_request(self, client, profiling):
+        """Test opted-in requests get a report id."""
+        response = client.post('/v1/chats/ask', headers={
+            'X-Profile': '1', 'X-Admin-Token': 'secret',
+        })
+        assert response.json() == {'answer': 499500}
+
+        report = profiling.get_request_profile(
+            response.headers['X-Profile-Id']
+        )
+        assert report.startswith('POST /v1/chats/ask\n')
+        assert 'answer' in report
+        assert not profiling.busy
+
+    @pytest.mark.parametrize('headers', [
+        {},
+        {'X-Profile': '1'},
+        {'X-Profile': '1', 'X-Admin-Token': 'wrong'},
+    ])
+    def test_ignores_unauthorized(self, client, profiling, headers):
+        """Test requests without a valid opt-in aren't profiled."""
+        response = client.post('/v1/chats/ask', headers=headers)
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
+        assert 'X-Profile' not in response.headers
+
+    def test_ignores_other_paths(self, client):
+        """Test only the configured path is profiled."""
+        response = client.get('/v1/health', headers={
+            'X-Profile': '1', 'X-Admin-Token': 'secret',
+        })
+        assert 'X-Profile-Id' not in response.headers
+
+    def test_reports_busy(self, client, profiling):
+        """Test requests arriving during another profile are marked."""
+        running = profiling.start_request_profile()
+        try:
+            response = client.post('/v1/chats/ask', headers={
+                'X-Profile': '1', 'X-Admin-Token': 'secret',
+            })
+        finally:
+            asyncio.run(profiling.finish_request_profile(running, 'other'))
+        assert response.status_code == 200
+        assert response.headers['X-Profile'] == 'busy'
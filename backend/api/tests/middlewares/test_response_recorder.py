@@ -0,0 +1,37 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from api.middlewares.response_recorder import ResponseRecorder
+
+
+class TestResponseRecorder:
+    """Test suite for ResponseRecorder."""
+
+    @pytest.mark.asyncio
+    async def test_records_response_start(self):
+        """Test the status and X-Cache header are noted and forwarded."""
+        send = AsyncMock()
+        recorder = ResponseRecorder(send)
+        start = {
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'X-Cache', b'HIT')],
+        }
+        await recorder(start)
+        await recorder({'type': 'http.response.body', 'body': b'{}'})
+
+        assert recorder.status == 200
+        assert recorder.cache == 'HIT'
+        assert recorder.started_at is not None
+        assert send.await_count == 2
+        send.assert_any_await(start)
+
+    @pytest.mark.asyncio
+    async def test_defaults_before_start(self):
+        """Test an unstarted response reads as a 500 without cache."""
+        recorder = ResponseRecorder(AsyncMock())
+
+        assert recorder.status == 500
+        assert recorder.cache is None
+        assert recorder.started_at is None
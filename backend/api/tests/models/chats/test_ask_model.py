@@ -1,7 +1,9 @@
 import pytest
 from pydantic import ValidationError
 
-from api.models.chats.ask_model import AskMode, AskRequest, AskResponse
+from api.models.chats.ask_model import (
+    AskMode, AskRequest, AskResponse, GenerationOptions
+)
 
 
 class TestAskMode:
@@ -64,6 +66,45 @@ class TestAskRequest:
         assert AskRequest(prompt=special).prompt == special
 
 
+class TestAskRequestModes:
+    """Test suite for multi-mode AskRequest."""
+
+    def test_modes(self):
+        """Test modes are optional and validated."""
+        assert AskRequest().modes is None
+        request = AskRequest(modes=['concise', 'friendly'])
+        assert request.modes == [AskMode.CONCISE, AskMode.FRIENDLY]
+
+        with pytest.raises(ValidationError):
+            AskRequest(modes=[])
+        with pytest.raises(ValidationError):
+            AskRequest(modes=['invalid_mode'])
+
+
+class TestGenerationOptions:
+    """Test suite for GenerationOptions model."""
+
+    def test_defaults_and_request_field(self):
+        """Test options default to unset and are optional on requests."""
+        assert GenerationOptions().model_dump(exclude_none=True) == {}
+        assert AskRequest().options is None
+
+        request = AskRequest(options={'num_predict': 64, 'stop': ['\n']})
+        assert request.options.num_predict == 64
+        assert request.options.stop == ['\n']
+
+    def test_validation(self):
+        """Test out-of-range options are rejected."""
+        for options in (
+            {'num_predict': 0},
+            {'temperature': 2.5},
+            {'num_ctx': 16},
+            {'stop': ['a', 'b', 'c', 'd', 'e']},
+        ):
+            with pytest.raises(ValidationError):
+                AskRequest(options=options)
+
+
 class TestAskResponse:
     """Test suite for AskResponse model."""
 
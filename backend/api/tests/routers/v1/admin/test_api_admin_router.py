@@ -0,0 +1,135 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+
+from api.dependencies import profiling_dependency
+from api.main import app
+from api.services.profiling_service import ProfilerBusy
+
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+class TestAdminRouter:
+    """Test suite for admin profiling endpoints."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client."""
+        return TestClient(app)
+
+    @pytest.fixture
+    def mock_profiling(self):
+        """Mock the profiling service with admin access enabled."""
+        mock_profiling = MagicMock()
+        mock_profiling.enabled = True
+        mock_profiling.authorize = lambda token: token == 'secret'
+        app.dependency_overrides[profiling_dependency] = (
+            lambda: mock_profiling
+        )
+        yield mock_profiling
+        app.dependency_overrides.clear()
+
+    def test_disabled_without_admin_token(self, client, mock_profiling):
+        """Test the endpoints don't exist unless ADMIN_TOKEN is set."""
+        mock_profiling.enabled = False
+        response = client.get('/v1/admin/profile/cpu', headers=ADMIN)
+        assert response.status_code == 404
+
+    def test_requires_token(self, client, mock_profiling):
+        """Test a missing or wrong token is rejected."""
+        assert client.get('/v1/admin/profile/cpu').status_code == 403
+        response = client.get(
+            '/v1/admin/profile/memory',
+            headers={'X-Admin-Token': 'wrong'},
+        )
+        assert response.status_code == 403
+
+    def test_cpu_pstats(self, client, mock_profiling):
+        """Test the default CPU profile is a pstats report."""
+        mock_profiling.profile_cpu = AsyncMock(return_value='10 calls')
+
+        response = client.get(
+            '/v1/admin/profile/cpu',
+            params={'seconds': 2, 'sort': 'tottime', 'limit': 5},
+            headers=ADMIN,
+        )
+        assert response.status_code == 200
+        assert response.text == '10 calls'
+        assert response.headers['content-type'].startswith('text/plain')
+        mock_profiling.profile_cpu.assert_awaited_once_with(
+            2, 'tottime', 5
+        )
+
+    def test_cpu_collapsed(self, client, mock_profiling):
+        """Test format=collapsed returns sampled stacks."""
+        mock_profiling.sample_stacks = AsyncMock(
+            return_value='MainThread;run 3\n'
+        )
+        response = client.get(
+            '/v1/admin/profile/cpu', params={'format': 'collapsed'},
+            headers=ADMIN,
+        )
+        assert response.text == 'MainThread;run 3\n'
+        mock_profiling.sample_stacks.assert_awaited_once_with(5)
+
+    def test_cpu_errors(self, client, mock_profiling):
+        """Test busy profilers and bad sort keys map to 409 and 400."""
+        mock_profiling.profile_cpu = AsyncMock(
+            side_effect=ProfilerBusy('A profile is already running')
+        )
+        response = client.get('/v1/admin/profile/cpu', headers=ADMIN)
+        assert response.status_code == 409
+
+        mock_profiling.profile_cpu = AsyncMock(
+            side_effect=ValueError("'bogus' is not a valid SortKey")
+        )
+        response = client.get(
+            '/v1/admin/profile/cpu', params={'sort': 'bogus'},
+            headers=ADMIN,
+        )
+        assert response.status_code == 400
+
+        response = client.get(
+            '/v1/admin/profile/cpu', params={'seconds': 0}, headers=ADMIN
+        )
+        assert response.status_code == 422
+
+    def test_memory(self, client, mock_profiling):
+        """Test the memory snapshot endpoint."""
+        mock_profiling.profile_memory = AsyncMock(return_value={
+            'seconds': 1.0,
+            'traced_current_bytes': 2048,
+            'traced_peak_bytes': 4096,
+            'top': [{
+                'file': 'api/services/cache_service.py', 'line': 10,
+                'size_bytes': 1024, 'count': 3,
+            }],
+        })
+        response = client.get(
+            '/v1/admin/profile/memory', params={'seconds': 1, 'limit': 1},
+            headers=ADMIN,
+        )
+        assert response.status_code == 200
+        assert response.json()['top'][0]['line'] == 10
+        mock_profiling.profile_memory.assert_awaited_once_with(1, 1)
+
+    def test_memory_busy(self, client, mock_profiling):
+        """Test a busy profiler maps to 409."""
+        mock_profiling.profile_memory = AsyncMock(side_effect=ProfilerBusy)
+        response = client.get('/v1/admin/profile/memory', headers=ADMIN)
+        assert response.status_code == 409
+
+    def test_request_profile(self, client, mock_profiling):
+        """Test stored request profiles can be fetched by id."""
+        mock_profiling.get_request_profile = lambda profile_id: (
+            'POST /v1/chats/ask\n' if profile_id == 'abc' else None
+        )
+        response = client.get(
+            '/v1/admin/profile/requests/abc', headers=ADMIN
+        )
+        assert response.text == 'POST /v1/chats/ask\n'
+        response = client.get(
+            '/v1/admin/profile/requests/gone', headers=ADMIN
+        )
+        assert response.status_code == 404
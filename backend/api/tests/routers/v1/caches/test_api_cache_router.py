@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+
+from api.dependencies import (
+    admin_dependency, cache_dependency, profiling_dependency
+)
+from api.main import app
+
+
+class TestCacheRouter:
+    """Test suite for cache router endpoints."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client."""
+        return TestClient(app)
+
+    def test_stats_endpoint(self, client):
+        """Test cache stats endpoint returns aggregated analytics."""
+        stats = {
+            'workers': 1,
+            'lookups': 4,
+            'hits': 3,
+            'misses': 1,
+            'hit_ratio': 0.75,
+            'distinct_prompts': 2,
+            'by_model_mode': [{
+                'model': 'llama3.2', 'mode': 'concise',
+                'hits': 3, 'misses': 1, 'hit_ratio': 0.75,
+            }],
+            'top_prompts': [
+                {'key': 'llm:llama3.2:concise:abc', 'count': 3,
+                 'prompt': 'What is AI?'},
+            ],
+            'memory': {
+                'pattern': 'llm:*', 'keys': 2, 'sampled_keys': 2,
+                'sampled_bytes': 512, 'estimated_bytes': 512,
+            },
+        }
+        mock_cache = MagicMock()
+        mock_cache.get_cache_stats = AsyncMock(return_value=stats)
+        app.dependency_overrides[cache_dependency] = lambda: mock_cache
+        app.dependency_overrides[admin_dependency] = lambda: None
+        try:
+            response = client.get('/v1/cache/stats')
+        finally:
+            app.dependency_overrides.clear()
+        assert response.status_code == 200
+        data = response.json()
+        assert data['hit_ratio'] == 0.75
+        assert data['top_prompts'][0]['prompt'] == 'What is AI?'
+        assert data['memory']['estimated_bytes'] == 512
+
+    def test_stats_requires_admin_token(self, client):
+        """Test prompt previews aren't served without the admin token."""
+        mock_profiling = MagicMock()
+        mock_profiling.enabled = True
+        mock_profiling.authorize = lambda token: token == 'secret'
+        mock_cache = MagicMock()
+        mock_cache.get_cache_stats = AsyncMock()
+        app.dependency_overrides[profiling_dependency] = (
+            lambda: mock_profiling
+        )
+        app.dependency_overrides[cache_dependency] = lambda: mock_cache
+        try:
+            assert client.get('/v1/cache/stats').status_code == 403
+            mock_profiling.enabled = False
+            response = client.get(
+                '/v1/cache/stats', headers={'X-Admin-Token': 'secret'}
+            )
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+        mock_cache.get_cache_stats.assert_not_called()
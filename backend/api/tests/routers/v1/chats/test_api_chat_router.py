@@ -1,8 +1,27 @@
+import asyncio
+import json
+import logging
+
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from api.dependencies import (
+    cache_dependency, core_dependency, routing_dependency
+)
 from api.main import app
+from api.services.cache_service import ClientConcurrencyExceeded
+from api.services.concurrency_service import ConcurrencyLimitExceeded
+from api.services.model_health_service import (
+    ModelNotFound, ModelUnavailable, ModelUnsupported
+)
+from api.services.rate_limit_service import RateLimitExceeded
+
+
+CACHED_BODY = (
+    b'{"model":"llama3.2","response":"Cached","created_at":"",'
+    b'"done":true,"mode":"concise","route":null}'
+)
 
 
 class TestChatRouter:
@@ -16,27 +35,47 @@ class TestChatRouter:
     @pytest.fixture
     def mock_services(self):
         """Mock all service dependencies."""
-        with patch(
-            'api.routers.v1.chats.api_chat_router.cache_service'
-        ) as mock_cache, patch(
-            'api.routers.v1.chats.api_chat_router.core_service'
-        ) as mock_core:
-            # Default mocks
-            mock_cache.check_rate_limit = AsyncMock(return_value=(True, 0))
-            mock_cache.increment_rate_limit = AsyncMock(return_value=1)
-            mock_cache.get_cached_response = AsyncMock(return_value=None)
-            mock_cache.cache_response = AsyncMock(return_value=True)
-            mock_cache.rate_limit_max = 10
-            mock_cache.rate_limit_window = 60
-
-            mock_core.get_system_prompt = lambda mode: f"System: {mode}"
-            mock_core.generate_text = AsyncMock(return_value={
-                'response': 'Generated response',
-                'created_at': '2025-11-01T12:00:00Z',
-                'done': True
-            })
-
-            yield mock_cache, mock_core
+        mock_cache = MagicMock()
+        mock_core = MagicMock()
+        # Default mocks
+        mock_cache.check_rate_limit = AsyncMock(return_value=(True, 0))
+        mock_cache.increment_rate_limit = AsyncMock(return_value=1)
+        mock_cache.get_cached_body = AsyncMock(return_value=None)
+        mock_cache.get_cached_validator = AsyncMock(return_value=None)
+        mock_cache.cache_response = AsyncMock(return_value=True)
+        mock_cache.get_cached_responses = AsyncMock(
+            side_effect=lambda model, prompt, by_mode: dict.fromkeys(
+                by_mode
+            )
+        )
+        mock_cache.rate_limit_max = 10
+        mock_cache.rate_limit_window = 60
+
+        mock_core.get_system_prompt = lambda mode: f"System: {mode}"
+        mock_core.get_generation_options = (
+            lambda mode, overrides=None: {
+                'num_predict': 128, **(overrides or {})
+            }
+        )
+        mock_core.max_fanout_concurrency = 2
+        mock_core.generate_text = AsyncMock(return_value={
+            'response': 'Generated response',
+            'created_at': '2025-11-01T12:00:00Z',
+            'done': True
+        })
+
+        app.dependency_overrides[cache_dependency] = lambda: mock_cache
+        app.dependency_overrides[core_dependency] = lambda: mock_core
+        app.dependency_overrides[routing_dependency] = lambda: MagicMock()
+        yield mock_cache, mock_core
+        app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def mock_routing(self, mock_services):
+        """Mock the model router."""
+        mock_routing = MagicMock()
+        app.dependency_overrides[routing_dependency] = lambda: mock_routing
+        return mock_routing
 
     def test_ask_endpoint_success(self, client, mock_services):
         """Test successful ask request."""
@@ -57,11 +96,14 @@ class TestChatRouter:
     def test_ask_endpoint_with_cache_hit(self, client, mock_services):
         """Test ask request with cached response."""
         mock_cache, _ = mock_services
-        mock_cache.get_cached_response = AsyncMock(return_value={
+        mock_cache.get_cached_body = AsyncMock(return_value=json.dumps({
+            'model': 'llama3.2',
             'response': 'Cached response',
             'created_at': '2025-11-01T11:00:00Z',
-            'done': True
-        })
+            'done': True,
+            'mode': 'concise',
+            'route': None,
+        }).encode())
 
         payload = {
             'model': 'llama3.2',
@@ -73,6 +115,8 @@ class TestChatRouter:
         assert response.status_code == 200
         data = response.json()
         assert data['response'] == 'Cached response'
+        assert response.headers['X-Cache'] == 'HIT'
+        assert response.headers['content-type'] == 'application/json'
 
     def test_ask_endpoint_rate_limit_exceeded(self, client, mock_services):
         """Test ask request when rate limit is exceeded."""
@@ -89,6 +133,22 @@ class TestChatRouter:
         assert response.status_code == 429
         assert 'Rate limit exceeded' in response.json()['detail']
 
+    def test_ask_endpoint_quota_gone_after_check(
+        self, client, mock_services
+    ):
+        """Test a request whose quota ran out after the check gets 429."""
+        mock_cache, mock_core = mock_services
+        mock_cache.increment_rate_limit = AsyncMock(
+            side_effect=RateLimitExceeded('Rate limit exceeded. Max 10')
+        )
+
+        response = client.post(
+            '/v1/chats/ask', json={'model': 'llama3.2', 'prompt': 'Hi'}
+        )
+        assert response.status_code == 429
+        assert 'Rate limit exceeded' in response.json()['detail']
+        mock_core.generate_text.assert_not_called()
+
     def test_ask_endpoint_all_modes(self, client, mock_services):
         """Test ask request with all available modes."""
         modes = ['concise', 'professional', 'sarcastic',
@@ -121,6 +181,17 @@ class TestChatRouter:
         assert response.status_code == 500
         assert 'Generation failed' in response.json()['detail']
 
+    def test_ask_endpoint_concurrency_limit(self, client, mock_services):
+        """Test ask request is shed with 503 when Ollama is saturated."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(
+            side_effect=ConcurrencyLimitExceeded('Too many')
+        )
+
+        response = client.post('/v1/chats/ask', json={'prompt': 'Test'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
     def test_ask_endpoint_invalid_mode(self, client):
         """Test ask request with invalid mode."""
         payload = {
@@ -192,11 +263,7 @@ class TestChatRouter:
     ):
         """Test that rate limit is not incremented on cache hit."""
         mock_cache, _ = mock_services
-        mock_cache.get_cached_response = AsyncMock(return_value={
-            'response': 'Cached',
-            'created_at': '2025-11-01T11:00:00Z',
-            'done': True
-        })
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
 
         payload = {
             'model': 'llama3.2',
@@ -209,3 +276,432 @@ class TestChatRouter:
 
         # Rate limit should NOT be incremented on cache hit
         mock_cache.increment_rate_limit.assert_not_called()
+
+    def test_ask_endpoint_passes_generation_options(
+        self, client, mock_services
+    ):
+        """Test resolved options reach the cache and the generator."""
+        mock_cache, mock_core = mock_services
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?',
+            'options': {'num_predict': 32, 'temperature': 0.2},
+        })
+        assert response.status_code == 200
+
+        expected = {'num_predict': 32, 'temperature': 0.2}
+        assert mock_cache.get_cached_body.call_args[0][3] == expected
+        assert mock_cache.cache_response.call_args[1]['options'] == expected
+        assert mock_core.generate_text.call_args[1]['options'] == expected
+
+    def test_ask_endpoint_multi_mode(self, client, mock_services):
+        """Test one call answers in several modes."""
+        mock_cache, mock_core = mock_services
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?',
+            'modes': ['concise', 'friendly', 'sarcastic'],
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data['model'] == 'llama3.2'
+        assert [r['mode'] for r in data['responses']] == [
+            'concise', 'friendly', 'sarcastic'
+        ]
+        assert mock_core.generate_text.call_count == 3
+        assert mock_cache.cache_response.call_count == 3
+        # One logical request against the rate limit
+        mock_cache.check_rate_limit.assert_called_once()
+        mock_cache.increment_rate_limit.assert_called_once()
+
+    def test_ask_endpoint_multi_mode_partial_cache_hit(
+        self, client, mock_services
+    ):
+        """Test only uncached modes are generated."""
+        mock_cache, mock_core = mock_services
+        mock_cache.get_cached_responses = AsyncMock(return_value={
+            'concise': {'response': 'Cached', 'created_at': '', 'done': True},
+            'friendly': None,
+        })
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?', 'modes': ['concise', 'friendly'],
+        })
+        assert response.status_code == 200
+        responses = response.json()['responses']
+        assert responses[0]['response'] == 'Cached'
+        assert responses[1]['response'] == 'Generated response'
+        mock_core.generate_text.assert_called_once()
+        assert mock_core.generate_text.call_args[1]['system_prompt'] == \
+            'System: friendly'
+
+    def test_ask_endpoint_multi_mode_all_cached(self, client, mock_services):
+        """Test fully cached fan-out skips generation and rate counting."""
+        mock_cache, mock_core = mock_services
+        cached = {'response': 'Cached', 'created_at': '', 'done': True}
+        mock_cache.get_cached_responses = AsyncMock(
+            return_value={'concise': cached, 'creative': cached}
+        )
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?', 'modes': ['concise', 'creative'],
+        })
+        assert response.status_code == 200
+        mock_core.generate_text.assert_not_called()
+        mock_cache.increment_rate_limit.assert_not_called()
+
+    def test_ask_endpoint_multi_mode_generation_error(
+        self, client, mock_services
+    ):
+        """Test the call fails when no mode could be answered."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(
+            side_effect=ConcurrencyLimitExceeded('Too many')
+        )
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?', 'modes': ['concise', 'friendly'],
+        })
+        assert response.status_code == 503
+
+    def test_ask_endpoint_multi_mode_partial_failure(
+        self, client, mock_services
+    ):
+        """Test answered modes are returned next to the failed ones."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(side_effect=[
+            {'response': 'ok', 'created_at': '', 'done': True},
+            ConcurrencyLimitExceeded('Too many'),
+        ])
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?', 'modes': ['concise', 'friendly'],
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert [r['mode'] for r in data['responses']] == ['concise']
+        assert data['errors'] == [
+            {'mode': 'friendly', 'status': 503, 'detail': 'Too many'}
+        ]
+
+    def test_ask_endpoint_multi_mode_respects_fanout_cap(
+        self, client, mock_services
+    ):
+        """Test at most max_fanout_concurrency generations run at once."""
+        _, mock_core = mock_services
+        mock_core.max_fanout_concurrency = 2
+        state = {'in_flight': 0, 'peak': 0}
+
+        async def generate_text(**kwargs):
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+            await asyncio.sleep(0.01)
+            state['in_flight'] -= 1
+            return {'response': 'ok', 'created_at': '', 'done': True}
+
+        mock_core.generate_text = generate_text
+
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?',
+            'modes': ['concise', 'professional', 'sarcastic',
+                      'creative', 'friendly'],
+        })
+        assert response.status_code == 200
+        assert state['peak'] == 2
+
+    def test_ask_endpoint_auto_model(
+        self, client, mock_services, mock_routing
+    ):
+        """Test model='auto' generates with the routed model."""
+        _, mock_core = mock_services
+        decision = {
+            'tier': 'small', 'model': 'llama3.2:1b',
+            'reason': 'short factual question',
+        }
+        mock_routing.route = AsyncMock(return_value=decision)
+        response = client.post('/v1/chats/ask', json={
+            'model': 'auto', 'prompt': 'What is AI?',
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['model'] == 'llama3.2:1b'
+        assert data['route'] == decision
+        mock_routing.route.assert_awaited_once_with(
+            'What is AI?', ['concise']
+        )
+        assert mock_core.generate_text.call_args.kwargs['model'] == (
+            'llama3.2:1b'
+        )
+
+    def test_ask_endpoint_without_auto_has_no_route(
+        self, client, mock_services
+    ):
+        """Test explicit models skip routing."""
+        response = client.post('/v1/chats/ask', json={
+            'model': 'llama3.2', 'prompt': 'What is AI?',
+        })
+        assert response.status_code == 200
+        assert response.json()['route'] is None
+
+    def test_ask_endpoint_x_cache_header(self, client, mock_services):
+        """Test X-Cache reports whether the answer came from the cache."""
+        mock_cache, _ = mock_services
+        payload = {'prompt': 'What is AI?'}
+        assert client.post(
+            '/v1/chats/ask', json=payload
+        ).headers['X-Cache'] == 'MISS'
+
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+        assert client.post(
+            '/v1/chats/ask', json=payload
+        ).headers['X-Cache'] == 'HIT'
+
+    def test_ask_endpoint_multi_mode_partial_x_cache(
+        self, client, mock_services
+    ):
+        """Test partially cached fan-outs report PARTIAL."""
+        mock_cache, _ = mock_services
+        mock_cache.get_cached_responses = AsyncMock(return_value={
+            'concise': {'response': 'Cached', 'done': True},
+            'friendly': None,
+        })
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'What is AI?', 'modes': ['concise', 'friendly'],
+        })
+        assert response.headers['X-Cache'] == 'PARTIAL'
+
+    def test_ask_endpoint_client_concurrency_exceeded(
+        self, client, mock_services
+    ):
+        """Test clients over their concurrency limit get 429."""
+        mock_cache, mock_core = mock_services
+        mock_cache.client_concurrency_slot.return_value.__aenter__ = (
+            AsyncMock(side_effect=ClientConcurrencyExceeded('busy'))
+        )
+        response = client.post('/v1/chats/ask', json={'prompt': 'Hi'})
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        mock_core.generate_text.assert_not_called()
+        mock_cache.increment_rate_limit.assert_not_called()
+
+    def test_ask_endpoint_cache_hit_bypasses_concurrency(
+        self, client, mock_services
+    ):
+        """Test cache hits don't take a concurrency slot."""
+        mock_cache, _ = mock_services
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+        response = client.post('/v1/chats/ask', json={'prompt': 'Hi'})
+        assert response.status_code == 200
+        mock_cache.client_concurrency_slot.assert_not_called()
+
+    def test_ask_endpoint_cache_hit_sends_stored_body(
+        self, client, mock_services
+    ):
+        """Test cache hits are sent byte for byte as stored."""
+        mock_cache, _ = mock_services
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+        with patch(
+            'api.routers.v1.chats.api_chat_router.AskResponse'
+        ) as mock_model:
+            response = client.post('/v1/chats/ask', json={'prompt': 'Hi'})
+        assert response.content == CACHED_BODY
+        mock_model.assert_not_called()
+
+    def test_ask_endpoint_caches_body_without_route(
+        self, client, mock_services, mock_routing
+    ):
+        """Test the cached body is the response minus its route."""
+        mock_cache, _ = mock_services
+        mock_routing.route = AsyncMock(return_value={
+            'tier': 'small', 'model': 'llama3.2:1b', 'reason': 'short',
+        })
+        client.post('/v1/chats/ask', json={
+            'model': 'auto', 'prompt': 'Hi',
+        })
+        assert mock_cache.cache_response.call_args[0][2] == {
+            'model': 'llama3.2:1b',
+            'response': 'Generated response',
+            'created_at': '2025-11-01T12:00:00Z',
+            'done': True,
+            'mode': 'concise',
+        }
+        assert mock_cache.get_cached_body.call_args[0][4]['tier'] == 'small'
+
+    def test_ask_endpoint_multi_mode_client_concurrency(
+        self, client, mock_services
+    ):
+        """Test a fan-out holds one slot and maps rejection to 429."""
+        mock_cache, _ = mock_services
+        mock_cache.client_concurrency_slot.return_value.__aenter__ = (
+            AsyncMock(side_effect=ClientConcurrencyExceeded('busy'))
+        )
+        response = client.post('/v1/chats/ask', json={
+            'prompt': 'Hi', 'modes': ['concise', 'friendly'],
+        })
+        assert response.status_code == 429
+        mock_cache.client_concurrency_slot.assert_called_once()
+        mock_cache.increment_rate_limit.assert_not_called()
+
+    def test_ask_endpoint_model_not_found(self, client, mock_services):
+        """Test unknown models map to 404."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(
+            side_effect=ModelNotFound("model 'ghost' not found")
+        )
+        response = client.post('/v1/chats/ask', json={'model': 'ghost'})
+        assert response.status_code == 404
+        assert 'ghost' in response.json()['detail']
+
+    def test_ask_endpoint_model_unsupported(self, client, mock_services):
+        """Test models that can't generate map to 400."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(
+            side_effect=ModelUnsupported('does not support generate')
+        )
+        response = client.post('/v1/chats/ask', json={'model': 'embed'})
+        assert response.status_code == 400
+
+    def test_ask_endpoint_model_unavailable(self, client, mock_services):
+        """Test failing models map to 503 with Retry-After."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(
+            side_effect=ModelUnavailable('failing', retry_after=7.2)
+        )
+        response = client.post('/v1/chats/ask', json={'prompt': 'Hi'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '8'
+
+    def test_get_ask_miss_generates(self, client, mock_services):
+        """Test GET /ask generates on a miss and sends a validator."""
+        mock_cache, mock_core = mock_services
+        mock_cache.get_cached_validator = AsyncMock(
+            side_effect=[None, ('"abc"', 3599)]
+        )
+
+        response = client.get(
+            '/v1/chats/ask', params={'prompt': 'What is AI?'}
+        )
+        assert response.status_code == 200
+        assert response.json()['response'] == 'Generated response'
+        assert response.json()['mode'] == 'concise'
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.headers['ETag'] == '"abc"'
+        assert response.headers['Cache-Control'] == 'public, max-age=3599'
+        mock_cache.increment_rate_limit.assert_awaited_once()
+        mock_core.generate_text.assert_awaited_once()
+
+    def test_get_ask_hit_sends_validator(self, client, mock_services):
+        """Test cache hits carry the ETag and remaining TTL."""
+        mock_cache, mock_core = mock_services
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+        mock_cache.get_cached_validator = AsyncMock(
+            return_value=('"abc"', 120)
+        )
+
+        response = client.get('/v1/chats/ask', params={
+            'prompt': 'Hi', 'model': 'llama3.2', 'mode': 'concise',
+        })
+        assert response.status_code == 200
+        assert response.content == CACHED_BODY
+        assert response.headers['ETag'] == '"abc"'
+        assert response.headers['Cache-Control'] == 'public, max-age=120'
+        assert response.headers['X-Cache'] == 'HIT'
+        mock_core.generate_text.assert_not_called()
+        mock_cache.increment_rate_limit.assert_not_called()
+
+    @pytest.mark.parametrize('if_none_match', [
+        '"abc"', 'W/"abc"', '"old", "abc"', '*',
+    ])
+    def test_get_ask_not_modified(
+        self, client, mock_services, if_none_match
+    ):
+        """Test a matching If-None-Match gets 304 without the payload."""
+        mock_cache, mock_core = mock_services
+        mock_cache.get_cached_validator = AsyncMock(
+            return_value=('"abc"', 120)
+        )
+
+        response = client.get(
+            '/v1/chats/ask', params={'prompt': 'Hi'},
+            headers={'If-None-Match': if_none_match},
+        )
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['ETag'] == '"abc"'
+        assert response.headers['Cache-Control'] == 'public, max-age=120'
+        mock_cache.get_cached_body.assert_not_called()
+        mock_core.generate_text.assert_not_called()
+
+    def test_get_ask_stale_etag(self, client, mock_services):
+        """Test a non-matching If-None-Match gets the full body."""
+        mock_cache, _ = mock_services
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+        mock_cache.get_cached_validator = AsyncMock(
+            return_value=('"abc"', 120)
+        )
+
+        response = client.get(
+            '/v1/chats/ask', params={'prompt': 'Hi'},
+            headers={'If-None-Match': '"old"'},
+        )
+        assert response.status_code == 200
+        assert response.content == CACHED_BODY
+
+    def test_get_ask_without_validator(self, client, mock_services):
+        """Test answers with no known expiry aren't cached downstream."""
+        mock_cache, _ = mock_services
+        mock_cache.get_cached_body = AsyncMock(return_value=CACHED_BODY)
+
+        response = client.get('/v1/chats/ask', params={'prompt': 'Hi'})
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert 'ETag' not in response.headers
+
+    def test_get_ask_auto_model(self, client, mock_services, mock_routing):
+        """Test model='auto' is routed before the cache lookup."""
+        mock_cache, _ = mock_services
+        route = {'tier': 'small', 'model': 'llama3.2:1b', 'reason': 'short'}
+        mock_routing.route = AsyncMock(return_value=route)
+
+        response = client.get(
+            '/v1/chats/ask', params={'prompt': 'Hi', 'model': 'auto'}
+        )
+        assert response.status_code == 200
+        assert response.json()['route'] == route
+        args = mock_cache.get_cached_validator.await_args.args
+        assert args[0] == 'llama3.2:1b'
+        assert args[4] == route
+
+    def test_get_ask_rate_limit_and_validation(self, client, mock_services):
+        """Test GET /ask enforces the rate limit and requires a prompt."""
+        mock_cache, _ = mock_services
+        assert client.get('/v1/chats/ask').status_code == 422
+        assert client.get(
+            '/v1/chats/ask', params={'prompt': 'Hi', 'mode': 'bogus'}
+        ).status_code == 422
+
+        mock_cache.check_rate_limit = AsyncMock(return_value=(False, 10))
+        response = client.get('/v1/chats/ask', params={'prompt': 'Hi'})
+        assert response.status_code == 429
+
+    def test_ask_endpoint_logs_generation(
+        self, client, mock_services, caplog
+    ):
+        """Test generations are logged with model, mode and tokens."""
+        _, mock_core = mock_services
+        mock_core.generate_text = AsyncMock(return_value={
+            'response': 'Generated', 'created_at': '', 'done': True,
+            'prompt_eval_count': 21, 'eval_count': 8,
+        })
+        caplog.set_level(logging.INFO, logger='api.generation')
+
+        client.post('/v1/chats/ask', json={'mode': 'friendly'})
+        [record] = [
+            record for record in caplog.records
+            if record.name == 'api.generation'
+        ]
+        assert record.fields['model'] == 'llama3.2'
+        assert record.fields['mode'] == 'friendly'
+        assert record.fields['prompt_tokens'] == 21
+        assert record.fields['completion_tokens'] == 8
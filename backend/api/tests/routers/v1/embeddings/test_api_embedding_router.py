@@ -0,0 +1,131 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+
+from api.dependencies import cache_dependency, embedding_dependency
+from api.main import app
+from api.services.model_health_service import (
+    ModelNotFound, ModelUnavailable
+)
+from api.services.rate_limit_service import RateLimitExceeded
+
+
+class TestEmbeddingRouter:
+    """Test suite for embedding router endpoints."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client."""
+        return TestClient(app)
+
+    @pytest.fixture
+    def mock_services(self):
+        """Mock all service dependencies."""
+        mock_cache = MagicMock()
+        mock_embedding = MagicMock()
+        mock_cache.check_rate_limit = AsyncMock(return_value=(True, 0))
+        mock_cache.increment_rate_limit = AsyncMock(return_value=1)
+        mock_cache.rate_limit_max = 10
+        mock_cache.rate_limit_window = 60
+        mock_embedding.default_model = 'nomic-embed-text'
+
+        async def embed(texts, model, on_miss=None):
+            await on_miss()
+            return [[0.5, 1.0]] * len(texts)
+
+        mock_embedding.embed = AsyncMock(side_effect=embed)
+        app.dependency_overrides[cache_dependency] = lambda: mock_cache
+        app.dependency_overrides[embedding_dependency] = (
+            lambda: mock_embedding
+        )
+        yield mock_cache, mock_embedding
+        app.dependency_overrides.clear()
+
+    def test_embed_single_text(self, client, mock_services):
+        """Test a single string input returns one embedding."""
+        _, mock_embedding = mock_services
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 200
+        assert response.json() == {
+            'model': 'nomic-embed-text', 'embeddings': [[0.5, 1.0]],
+        }
+        mock_embedding.embed.assert_awaited_once()
+        assert mock_embedding.embed.call_args[0] == (
+            ['hello'], 'nomic-embed-text'
+        )
+
+    def test_embed_list(self, client, mock_services):
+        """Test a list input returns one embedding per text."""
+        response = client.post('/v1/embeddings', json={
+            'model': 'mxbai-embed-large', 'input': ['a', 'b'],
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data['model'] == 'mxbai-embed-large'
+        assert len(data['embeddings']) == 2
+
+    def test_embed_empty_list(self, client, mock_services):
+        """Test an empty input list is rejected."""
+        response = client.post('/v1/embeddings', json={'input': []})
+        assert response.status_code == 422
+
+    def test_embed_rate_limit_exceeded(self, client, mock_services):
+        """Test embedding requests share the rate limit."""
+        mock_cache, _ = mock_services
+        mock_cache.check_rate_limit = AsyncMock(return_value=(False, 10))
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 429
+
+    def test_embed_miss_counts_against_rate_limit(
+        self, client, mock_services
+    ):
+        """Test requests that reach the model are counted."""
+        mock_cache, _ = mock_services
+        client.post('/v1/embeddings', json={'input': 'hello'})
+        mock_cache.increment_rate_limit.assert_awaited_once()
+
+    def test_embed_cache_hit_skips_rate_increment(
+        self, client, mock_services
+    ):
+        """Test fully cached requests aren't counted."""
+        mock_cache, mock_embedding = mock_services
+        mock_embedding.embed = AsyncMock(return_value=[[0.5, 1.0]])
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 200
+        mock_cache.increment_rate_limit.assert_not_called()
+
+    def test_embed_quota_gone_after_check(self, client, mock_services):
+        """Test a request whose quota ran out after the check gets 429."""
+        mock_cache, _ = mock_services
+        mock_cache.increment_rate_limit = AsyncMock(
+            side_effect=RateLimitExceeded('Rate limit exceeded. Max 10')
+        )
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 429
+
+    def test_embed_error(self, client, mock_services):
+        """Test embedding failures map to 500."""
+        _, mock_embedding = mock_services
+        mock_embedding.embed = AsyncMock(side_effect=Exception('boom'))
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 500
+        assert 'Embedding failed' in response.json()['detail']
+
+    def test_embed_model_not_found(self, client, mock_services):
+        """Test unknown embedding models map to 404."""
+        _, mock_embedding = mock_services
+        mock_embedding.embed = AsyncMock(
+            side_effect=ModelNotFound("model 'ghost' not found")
+        )
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 404
+
+    def test_embed_model_unavailable(self, client, mock_services):
+        """Test failing embedding models map to 503."""
+        _, mock_embedding = mock_services
+        mock_embedding.embed = AsyncMock(
+            side_effect=ModelUnavailable('failing', retry_after=3)
+        )
+        response = client.post('/v1/embeddings', json={'input': 'hello'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '3'
@@ -1,7 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
+from api.dependencies import (
+    cache_dependency, core_dependency, loop_monitor_dependency
+)
 from api.main import app
 
 
@@ -13,6 +16,16 @@ class TestMainRouter:
         """Create a test client."""
         return TestClient(app)
 
+    @pytest.fixture
+    def mock_services(self):
+        """Mock the core and cache services."""
+        mock_core = MagicMock()
+        mock_cache = MagicMock()
+        app.dependency_overrides[core_dependency] = lambda: mock_core
+        app.dependency_overrides[cache_dependency] = lambda: mock_cache
+        yield mock_core, mock_cache
+        app.dependency_overrides.clear()
+
     def test_root_endpoint(self, client):
         """Test the root endpoint returns welcome message."""
         response = client.get('/v1/')
@@ -21,84 +34,92 @@ class TestMainRouter:
         assert data['message'] == 'Welcome to Byte in Bottle API v1'
 
     @pytest.mark.asyncio
-    async def test_health_check_all_healthy(self, client):
+    async def test_health_check_all_healthy(self, client, mock_services):
         """Test health check when all services are healthy."""
+        mock_core, mock_cache = mock_services
         # Return list of model names instead of Mock objects
         mock_models = ['llama3.2', 'mistral']
 
-        with patch(
-            'api.routers.v1.api_main_router.core_service.get_ollama_models',
-            new_callable=AsyncMock,
-            return_value=mock_models
-        ), patch(
-            'api.routers.v1.api_main_router.cache_service.health_check',
-            new_callable=AsyncMock,
-            return_value=True
-        ):
-            response = client.get('/v1/health')
-            assert response.status_code == 200
-            data = response.json()
-            assert data['status'] == 'healthy'
-            assert data['ollama'] == 'connected'
-            assert data['redis'] == 'connected'
-            assert len(data['available_models']) == 2
+        mock_core.get_ollama_models = AsyncMock(return_value=mock_models)
+        mock_cache.health_check = AsyncMock(return_value=True)
+        response = client.get('/v1/health')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'healthy'
+        assert data['ollama'] == 'connected'
+        assert data['redis'] == 'connected'
+        assert len(data['available_models']) == 2
+
+    def test_health_check_reports_loop_lag(self, client, mock_services):
+        """Test health check includes the event loop lag percentiles."""
+        mock_core, mock_cache = mock_services
+        mock_core.get_ollama_models = AsyncMock(return_value=[])
+        mock_cache.health_check = AsyncMock(return_value=True)
+        mock_monitor = MagicMock()
+        mock_monitor.get_metrics.return_value = {
+            'lag_p50_ms': 0.4, 'lag_p99_ms': 12.5,
+        }
+        app.dependency_overrides[loop_monitor_dependency] = (
+            lambda: mock_monitor
+        )
+
+        data = client.get('/v1/health').json()
+        assert data['event_loop'] == {'lag_p50_ms': 0.4, 'lag_p99_ms': 12.5}
 
     @pytest.mark.asyncio
-    async def test_health_check_ollama_down(self, client):
+    async def test_health_check_ollama_down(self, client, mock_services):
         """Test health check when Ollama is disconnected."""
-        with patch(
-            'api.routers.v1.api_main_router.core_service.get_ollama_models',
-            new_callable=AsyncMock,
+        mock_core, mock_cache = mock_services
+        mock_core.get_ollama_models = AsyncMock(
             side_effect=Exception('Ollama error')
-        ), patch(
-            'api.routers.v1.api_main_router.cache_service.health_check',
-            new_callable=AsyncMock,
-            return_value=True
-        ):
-            response = client.get('/v1/health')
-            assert response.status_code == 200
-            data = response.json()
-            assert data['status'] == 'degraded'
-            assert data['ollama'] == 'disconnected'
-            assert data['redis'] == 'connected'
-            assert data['available_models'] == []
+        )
+        mock_cache.health_check = AsyncMock(return_value=True)
+        response = client.get('/v1/health')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'degraded'
+        assert data['ollama'] == 'disconnected'
+        assert data['redis'] == 'connected'
+        assert data['available_models'] == []
 
     @pytest.mark.asyncio
-    async def test_health_check_redis_down(self, client):
+    async def test_health_check_redis_down(self, client, mock_services):
         """Test health check when Redis is disconnected."""
+        mock_core, mock_cache = mock_services
         mock_models = ['llama3.2']
 
-        with patch(
-            'api.routers.v1.api_main_router.core_service.get_ollama_models',
-            new_callable=AsyncMock,
-            return_value=mock_models
-        ), patch(
-            'api.routers.v1.api_main_router.cache_service.health_check',
-            new_callable=AsyncMock,
-            return_value=False
-        ):
-            response = client.get('/v1/health')
-            assert response.status_code == 200
-            data = response.json()
-            assert data['status'] == 'degraded'
-            assert data['ollama'] == 'connected'
-            assert data['redis'] == 'disconnected'
+        mock_core.get_ollama_models = AsyncMock(return_value=mock_models)
+        mock_cache.health_check = AsyncMock(return_value=False)
+        response = client.get('/v1/health')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'degraded'
+        assert data['ollama'] == 'connected'
+        assert data['redis'] == 'disconnected'
 
     @pytest.mark.asyncio
-    async def test_health_check_all_down(self, client):
+    async def test_health_check_all_down(self, client, mock_services):
         """Test health check when all services are down."""
-        with patch(
-            'api.routers.v1.api_main_router.core_service.get_ollama_models',
-            new_callable=AsyncMock,
+        mock_core, mock_cache = mock_services
+        mock_core.get_ollama_models = AsyncMock(
             side_effect=Exception('Error')
-        ), patch(
-            'api.routers.v1.api_main_router.cache_service.health_check',
-            new_callable=AsyncMock,
-            return_value=False
-        ):
-            response = client.get('/v1/health')
-            assert response.status_code == 200
-            data = response.json()
-            assert data['status'] == 'unhealthy'
-            assert data['ollama'] == 'disconnected'
-            assert data['redis'] == 'disconnected'
+        )
+        mock_cache.health_check = AsyncMock(return_value=False)
+        response = client.get('/v1/health')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'unhealthy'
+        assert data['ollama'] == 'disconnected'
+        assert data['redis'] == 'disconnected'
+
+    def test_metrics_endpoint(self, client):
+        """Test metrics endpoint exposes the concurrency limit."""
+        response = client.get('/v1/metrics')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['concurrency']['limit'] >= 1
+        assert 'in_flight' in data['concurrency']
+        assert data['ollama_pool']['in_use'] >= 0
+        assert 'wait_time_max' in data['ollama_pool']
+        assert 'lag_p99_ms' in data['event_loop']
+        assert 'running' in data['logging']
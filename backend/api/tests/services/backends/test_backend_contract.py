@@ -0,0 +1,236 @@
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.backends.redis_backend import RedisBackend
+from api.services.backends.replicated_backend import ReplicatedBackend
+from api.services.backends.sharded_backend import ShardedBackend
+
+
+async def _redis_backend():
+    """Connect to the Redis at REDIS_URL, skipping if unreachable."""
+    backend = RedisBackend(
+        os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    )
+    try:
+        await asyncio.wait_for(backend.ping(), timeout=0.5)
+    except Exception:
+        await backend.close()
+        pytest.skip('Redis is not available')
+    return backend
+
+
+@pytest_asyncio.fixture(params=['memory', 'sharded', 'replicated', 'redis'])
+async def backend(request):
+    """Yield each backend implementation."""
+    if request.param == 'memory':
+        backend = MemoryBackend()
+    elif request.param == 'sharded':
+        backend = ShardedBackend([MemoryBackend() for _ in range(3)])
+    elif request.param == 'replicated':
+        # A replica sharing the primary's storage, like a zero-lag one
+        primary = MemoryBackend()
+        backend = ReplicatedBackend(primary, [primary])
+    else:
+        backend = await _redis_backend()
+    yield backend
+    keys = []
+    cursor = 0
+    while True:
+        cursor, batch = await backend.scan(
+            cursor, match='contract:*', count=100
+        )
+        keys.extend(batch)
+        if cursor == 0:
+            break
+    if keys:
+        await backend.delete(*keys)
+    await backend.close()
+
+
+@pytest.fixture
+def prefix():
+    """Unique key prefix so runs against a shared Redis don't collide."""
+    return f'contract:{uuid.uuid4().hex[:8]}'
+
+
+class TestBackendContract:
+    """Contract every CacheBackend implementation must satisfy."""
+
+    @pytest.mark.asyncio
+    async def test_get_missing(self, backend, prefix):
+        """Test missing keys return None."""
+        assert await backend.get(f'{prefix}:missing') is None
+
+    @pytest.mark.asyncio
+    async def test_setex_and_get(self, backend, prefix):
+        """Test values round-trip as strings."""
+        await backend.setex(f'{prefix}:k', 60, '{"a": 1}')
+        assert await backend.get(f'{prefix}:k') == '{"a": 1}'
+
+    @pytest.mark.asyncio
+    async def test_mget(self, backend, prefix):
+        """Test several keys are fetched at once, in order."""
+        await backend.setex(f'{prefix}:a', 60, '1')
+        await backend.setex(f'{prefix}:c', 60, '3')
+        assert await backend.mget(
+            f'{prefix}:a', f'{prefix}:b', f'{prefix}:c'
+        ) == ['1', None, '3']
+
+    @pytest.mark.asyncio
+    async def test_setex_many(self, backend, prefix):
+        """Test a batch of writes lands with each entry's value."""
+        await backend.setex_many([
+            (f'{prefix}:{index}', 60, str(index)) for index in range(20)
+        ])
+        assert await backend.mget(
+            *(f'{prefix}:{index}' for index in range(20))
+        ) == [str(index) for index in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_binary_values(self, backend, prefix):
+        """Test binary values round-trip byte for byte."""
+        value = bytes(range(256))
+        await backend.setex_bytes(f'{prefix}:bin', 60, value)
+        assert await backend.mget_bytes(
+            f'{prefix}:bin', f'{prefix}:none'
+        ) == [value, None]
+
+    @pytest.mark.asyncio
+    async def test_setex_many_bytes(self, backend, prefix):
+        """Test a batch of binary writes round-trips byte for byte."""
+        items = [
+            (f'{prefix}:bin{index}', 60, bytes([index, 0, 255]))
+            for index in range(20)
+        ]
+        await backend.setex_many_bytes(items)
+        assert await backend.mget_bytes(
+            *(key for key, _, _ in items)
+        ) == [value for _, _, value in items]
+
+    @pytest.mark.asyncio
+    async def test_setex_expires(self, backend, prefix):
+        """Test keys disappear after their TTL."""
+        await backend.setex(f'{prefix}:k', 1, 'v')
+        await asyncio.sleep(1.1)
+        assert await backend.get(f'{prefix}:k') is None
+
+    @pytest.mark.asyncio
+    async def test_incr(self, backend, prefix):
+        """Test counters start at zero and increment atomically."""
+        assert await backend.incr(f'{prefix}:c') == 1
+        assert await backend.incr(f'{prefix}:c') == 2
+        assert await backend.incr(f'{prefix}:c', 5) == 7
+        assert await backend.incr(f'{prefix}:c', -3) == 4
+        assert await backend.get(f'{prefix}:c') == '4'
+
+    @pytest.mark.asyncio
+    async def test_incr_concurrent(self, backend, prefix):
+        """Test concurrent increments are not lost."""
+        await asyncio.gather(
+            *(backend.incr(f'{prefix}:c') for _ in range(50))
+        )
+        assert await backend.get(f'{prefix}:c') == '50'
+
+    @pytest.mark.asyncio
+    async def test_expire(self, backend, prefix):
+        """Test expire applies a TTL to existing keys only."""
+        await backend.incr(f'{prefix}:c')
+        assert await backend.expire(f'{prefix}:c', 1) is True
+        assert await backend.expire(f'{prefix}:missing', 1) is False
+        await asyncio.sleep(1.1)
+        assert await backend.get(f'{prefix}:c') is None
+
+    @pytest.mark.asyncio
+    async def test_ttl(self, backend, prefix):
+        """Test ttl reports remaining seconds of expiring keys only."""
+        await backend.setex(f'{prefix}:a', 60, 'v')
+        await backend.incr(f'{prefix}:c')
+        assert 59 < await backend.ttl(f'{prefix}:a') <= 60
+        assert await backend.ttl(f'{prefix}:c') is None
+        assert await backend.ttl(f'{prefix}:missing') is None
+
+    @pytest.mark.asyncio
+    async def test_scan_and_delete(self, backend, prefix):
+        """Test scanning by pattern and invalidating the matches."""
+        for i in range(25):
+            await backend.setex(f'{prefix}:llm:{i}', 60, 'v')
+        await backend.setex(f'{prefix}:other', 60, 'v')
+
+        keys = []
+        cursor = 0
+        while True:
+            cursor, batch = await backend.scan(
+                cursor, match=f'{prefix}:llm:*', count=10
+            )
+            keys.extend(batch)
+            if cursor == 0:
+                break
+
+        assert len(set(keys)) == 25
+        assert await backend.delete(*set(keys)) == 25
+        assert await backend.delete(f'{prefix}:llm:0') == 0
+        assert await backend.get(f'{prefix}:other') == 'v'
+
+    @pytest.mark.asyncio
+    async def test_memory_usage(self, backend, prefix):
+        """Test memory usage is reported for existing keys only."""
+        await backend.setex(f'{prefix}:k', 60, 'x' * 100)
+        assert await backend.memory_usage(f'{prefix}:k') >= 100
+        assert await backend.memory_usage(f'{prefix}:missing') is None
+
+    @pytest.mark.asyncio
+    async def test_sorted_set(self, backend, prefix):
+        """Test sorted set add, count and removal."""
+        key = f'{prefix}:zset'
+        assert await backend.zcard(key) == 0
+        await backend.zadd(key, 'a', 1.0)
+        await backend.zadd(key, 'b', 2.0)
+        await backend.zadd(key, 'c', 3.0)
+        await backend.zadd(key, 'a', 1.5)  # Update, not a new member
+        assert await backend.zcard(key) == 3
+        assert await backend.zremrangebyscore(key, 0, 2.0) == 2
+        assert await backend.zrem(key, 'c', 'missing') == 1
+        assert await backend.zcard(key) == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_slot(self, backend, prefix):
+        """Test slots are capped and expired leases are dropped."""
+        key = f'{prefix}:slots'
+        now = time.time()
+        assert await backend.acquire_slot(key, 'a', 2, now, 60)
+        assert await backend.acquire_slot(key, 'b', 2, now, 60)
+        assert not await backend.acquire_slot(key, 'c', 2, now, 60)
+        assert await backend.zcard(key) == 2
+        # Both leases have expired a minute later
+        assert await backend.acquire_slot(key, 'c', 2, now + 61, 60)
+        assert await backend.zcard(key) == 1
+        assert await backend.ttl(key) > 0
+
+    @pytest.mark.asyncio
+    async def test_renew_slot(self, backend, prefix):
+        """Test held leases are extended and dropped ones stay gone."""
+        key = f'{prefix}:renew'
+        now = time.time()
+        assert await backend.acquire_slot(key, 'a', 1, now, 60)
+        assert await backend.renew_slot(key, 'a', now + 50, 60)
+        # Still held at a time the original lease would have expired
+        assert not await backend.acquire_slot(key, 'b', 1, now + 61, 60)
+        assert await backend.zrem(key, 'a') == 1
+        assert not await backend.renew_slot(key, 'a', now + 70, 60)
+        assert await backend.zcard(key) == 0
+
+    @pytest.mark.asyncio
+    async def test_ping(self, backend):
+        """Test ping succeeds on a healthy backend."""
+        assert await backend.ping()
+
+    @pytest.mark.asyncio
+    async def test_replication_offset(self, backend):
+        """Test a primary reports its replication offset."""
+        assert isinstance(await backend.replication_offset(), int)
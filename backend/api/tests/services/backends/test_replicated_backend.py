@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock
+
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.backends.replicated_backend import ReplicatedBackend
+
+
+class TestReplicatedBackend:
+    """Test suite for ReplicatedBackend."""
+
+    @pytest.fixture
+    def primary(self):
+        """Create the primary store."""
+        return MemoryBackend()
+
+    @pytest.fixture
+    def replicas(self):
+        """Create two replica stores."""
+        return [MemoryBackend(), MemoryBackend()]
+
+    @pytest.fixture
+    def backend(self, primary, replicas):
+        """Create a backend reading from the replicas."""
+        return ReplicatedBackend(primary, replicas)
+
+    def test_unknown_selection(self, primary, replicas):
+        """Test only random and sticky selection are accepted."""
+        with pytest.raises(ValueError):
+            ReplicatedBackend(primary, replicas, selection='round-robin')
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replicas(self, backend, replicas):
+        """Test GET and MGET are served by a replica."""
+        for replica in replicas:
+            await replica.setex('k', 60, 'replica')
+        assert await backend.get('k') == 'replica'
+        assert await backend.mget('k', 'missing') == ['replica', None]
+        assert backend.replica_reads == 2
+        assert backend.primary_reads == 0
+
+    @pytest.mark.asyncio
+    async def test_writes_go_to_primary(self, backend, primary, replicas):
+        """Test writes and counters only touch the primary."""
+        await backend.setex('k', 60, 'v')
+        await backend.incr('counter')
+        assert await primary.get('k') == 'v'
+        assert await primary.get('counter') == '1'
+        for replica in replicas:
+            assert await replica.get('k') is None
+
+    @pytest.mark.asyncio
+    async def test_sticky_selection(self, primary, replicas):
+        """Test sticky selection reads a key from the same replica."""
+        backend = ReplicatedBackend(primary, replicas, selection='sticky')
+        await replicas[0].setex('k', 60, 'first')
+        await replicas[1].setex('k', 60, 'second')
+        values = {await backend.get('k') for _ in range(20)}
+        assert len(values) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_replica_falls_back(self, backend, primary):
+        """Test a failing replica is retried on the primary and skipped."""
+        await primary.setex('k', 60, 'primary')
+        for replica in backend.replicas:
+            replica.get = AsyncMock(side_effect=ConnectionError('down'))
+        assert await backend.get('k') == 'primary'
+        assert await backend.get('k') == 'primary'
+        assert await backend.get('k') == 'primary'
+        # Each replica failed once, then was skipped
+        assert sum(r.get.await_count for r in backend.replicas) == 2
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_is_skipped(self, primary, replicas):
+        """Test lagging replicas and broken links don't serve reads."""
+        backend = ReplicatedBackend(primary, replicas, max_lag=0)
+        await primary.setex('k', 60, 'primary')
+        primary.replication_offset = AsyncMock(side_effect=[100, 200])
+        replicas[0].replication_offset = AsyncMock(return_value=50)
+        replicas[1].replication_offset = AsyncMock(return_value=None)
+        await backend._measure_lag()
+        await backend._measure_lag()
+        backend._lag_checked_at = time.monotonic()
+        assert await backend.get('k') == 'primary'
+        assert backend.replica_reads == 0
+
+    @pytest.mark.asyncio
+    async def test_caught_up_replica_serves(self, primary, replicas):
+        """Test caught-up replicas serve however idle the primary is."""
+        backend = ReplicatedBackend(primary, replicas, max_lag=0)
+        for replica in replicas:
+            replica.replication_offset = AsyncMock(return_value=100)
+            await replica.setex('k', 60, 'replica')
+        primary.replication_offset = AsyncMock(return_value=100)
+        await backend._measure_lag()
+        await backend._measure_lag()
+        backend._lag_checked_at = time.monotonic()
+        assert await backend.get('k') == 'replica'
+
+    @pytest.mark.asyncio
+    async def test_lag_checked_once_per_interval(self, backend):
+        """Test replica offsets aren't probed on every read."""
+        backend.replicas[0].replication_offset = AsyncMock(return_value=0)
+        for _ in range(5):
+            await backend.get('k')
+        backend.replicas[0].replication_offset.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_slow_lag_check_does_not_block_reads(
+        self, backend, replicas
+    ):
+        """Test reads are served while a replica is slow to answer."""
+        async def slow_offset():
+            await asyncio.sleep(1)
+            return 0
+
+        replicas[0].replication_offset = slow_offset
+        for replica in replicas:
+            await replica.setex('k', 60, 'replica')
+        start = time.monotonic()
+        assert await backend.get('k') == 'replica'
+        assert await backend.get('k') == 'replica'
+        assert time.monotonic() - start < 0.5
+        await backend.close()
@@ -0,0 +1,103 @@
+import pytest
+
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.backends.sharded_backend import (
+    ShardedBackend, hash_slot_key
+)
+
+
+class TestHashSlotKey:
+    """Test suite for hash tag extraction."""
+
+    def test_without_tag(self):
+        """Test keys without braces hash as a whole."""
+        assert hash_slot_key('rate_limit:1.2.3.4') == 'rate_limit:1.2.3.4'
+
+    def test_with_tag(self):
+        """Test only the first {...} section is hashed."""
+        assert hash_slot_key('llm:{m:abc}:concise') == 'm:abc'
+        assert hash_slot_key('a{x}b{y}') == 'x'
+
+    def test_empty_tag(self):
+        """Test an empty {} hashes the whole key, as in Redis."""
+        assert hash_slot_key('a{}b') == 'a{}b'
+
+
+class TestShardedBackend:
+    """Test suite for ShardedBackend."""
+
+    @pytest.fixture
+    def shards(self):
+        """Create three in-memory shards."""
+        return [MemoryBackend() for _ in range(3)]
+
+    @pytest.fixture
+    def backend(self, shards):
+        """Create a backend sharded over the shards."""
+        return ShardedBackend(shards)
+
+    def test_requires_shards(self):
+        """Test at least one shard is needed."""
+        with pytest.raises(ValueError):
+            ShardedBackend([])
+
+    def test_keys_spread_over_shards(self, backend):
+        """Test keys are distributed roughly evenly."""
+        counts = [0, 0, 0]
+        for i in range(3000):
+            counts[backend.shard_index(f'key:{i}')] += 1
+        assert all(700 < count < 1300 for count in counts)
+
+    def test_hash_tags_colocate(self, backend):
+        """Test keys sharing a hash tag land on the same shard."""
+        shards = {
+            backend.shard_index(f'llm:{{m:abc}}:{mode}')
+            for mode in ('concise', 'friendly', 'creative')
+        }
+        assert len(shards) == 1
+
+    def test_adding_shard_moves_few_keys(self, shards):
+        """Test consistent hashing only moves about 1/N of the keys."""
+        before = ShardedBackend(shards)
+        after = ShardedBackend(shards + [MemoryBackend()])
+        keys = [f'key:{i}' for i in range(4000)]
+        moved = sum(
+            before.shard_index(key) != after.shard_index(key)
+            for key in keys
+        )
+        assert moved < len(keys) * 0.35
+
+    @pytest.mark.asyncio
+    async def test_values_live_on_owning_shard(self, backend, shards):
+        """Test writes go to exactly one shard."""
+        await backend.setex('k', 60, 'v')
+        owner = shards[backend.shard_index('k')]
+        assert await owner.get('k') == 'v'
+        assert sum([await shard.get('k') == 'v' for shard in shards]) == 1
+
+    @pytest.mark.asyncio
+    async def test_mget_across_shards(self, backend):
+        """Test MGET reassembles values from several shards in order."""
+        keys = [f'key:{i}' for i in range(20)]
+        for key in keys[::2]:
+            await backend.setex(key, 60, key)
+        values = await backend.mget(*keys)
+        assert values == [
+            key if i % 2 == 0 else None for i, key in enumerate(keys)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_scan_pages_through_every_shard(self, backend):
+        """Test a scan loop returns keys from all shards."""
+        keys = {f'key:{i}' for i in range(30)}
+        for key in keys:
+            await backend.setex(key, 60, '1')
+        found, cursor, pages = set(), 0, 0
+        while True:
+            cursor, batch = await backend.scan(cursor, match='key:*')
+            found.update(batch)
+            pages += 1
+            if cursor == 0:
+                break
+        assert found == keys
+        assert pages == 3
@@ -0,0 +1,103 @@
+import pytest
+
+from api.services.cache_analytics_service import (
+    CacheAnalytics, CountMinSketch, HyperLogLog, _hash64
+)
+
+
+class TestCountMinSketch:
+    """Test suite for CountMinSketch."""
+
+    def test_counts_never_underestimate(self):
+        """Test estimates are at least the true count."""
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(500):
+            sketch.add(_hash64(f'key{i % 50}'))
+        assert sketch.add(_hash64('key0')) >= 11
+
+
+class TestHyperLogLog:
+    """Test suite for HyperLogLog."""
+
+    @pytest.mark.parametrize('n', [0, 100, 10000])
+    def test_cardinality_estimate(self, n):
+        """Test estimates are within a few percent of the true count."""
+        hll = HyperLogLog()
+        for i in range(n):
+            hll.add(_hash64(f'prompt{i}'))
+            hll.add(_hash64(f'prompt{i}'))  # Duplicates don't count
+        assert abs(hll.count() - n) <= max(2, n * 0.05)
+
+    def test_merge(self):
+        """Test merged estimators count the union."""
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(1000):
+            a.add(_hash64(f'a{i}'))
+            b.add(_hash64(f'b{i}'))
+        a.merge(bytes(b.registers))
+        assert abs(a.count() - 2000) <= 100
+
+
+class TestCacheAnalytics:
+    """Test suite for CacheAnalytics."""
+
+    @pytest.fixture
+    def analytics(self):
+        """Create analytics with a small top-K table."""
+        return CacheAnalytics(top_k=3, flush_interval=60)
+
+    def test_counters_per_model_mode(self, analytics):
+        """Test hit and miss counters per model and mode."""
+        analytics.record('k1', 'llama3.2', 'concise', 'p', hit=True)
+        analytics.record('k1', 'llama3.2', 'concise', 'p', hit=False)
+        analytics.record('k2', 'mistral', 'friendly', 'p', hit=True)
+        assert analytics.counters == {
+            'llama3.2:concise': [1, 1],
+            'mistral:friendly': [1, 0],
+        }
+
+    def test_top_k_keeps_hottest_keys(self, analytics):
+        """Test the top-K table converges on the most frequent keys."""
+        for i in range(200):
+            analytics.record(f'cold{i}', 'm', 'concise', 'cold', hit=False)
+            analytics.record(f'hot{i % 3}', 'm', 'concise', 'hot', hit=True)
+        assert set(analytics.top) == {'hot0', 'hot1', 'hot2'}
+
+    def test_distinct_prompts_ignore_mode(self, analytics):
+        """Test a prompt asked in several modes is one distinct prompt."""
+        analytics.record('k1', 'm', 'concise', 'Hello  world', hit=False)
+        analytics.record('k2', 'm', 'friendly', 'hello world', hit=False)
+        analytics.record('k3', 'm', 'concise', 'goodbye', hit=False)
+        stats = CacheAnalytics.merge_snapshots(
+            [analytics.snapshot()], top_k=3
+        )
+        assert stats['distinct_prompts'] == 2
+
+    def test_should_flush(self, analytics):
+        """Test flush is due only after the interval."""
+        assert analytics.should_flush() is False
+        analytics._last_flush -= 61
+        assert analytics.should_flush() is True
+        analytics.snapshot()
+        assert analytics.should_flush() is False
+
+    def test_merge_snapshots(self, analytics):
+        """Test snapshots from several workers are aggregated."""
+        other = CacheAnalytics(top_k=3)
+        analytics.record('k1', 'llama3.2', 'concise', 'first', hit=True)
+        other.record('k1', 'llama3.2', 'concise', 'first', hit=False)
+        other.record('k2', 'llama3.2', 'concise', 'second', hit=False)
+
+        stats = CacheAnalytics.merge_snapshots(
+            [analytics.snapshot(), other.snapshot()], top_k=3
+        )
+
+        assert stats['workers'] == 2
+        assert stats['lookups'] == 3
+        assert stats['hits'] == 1
+        assert stats['hit_ratio'] == pytest.approx(1 / 3)
+        assert stats['distinct_prompts'] == 2
+        assert stats['by_model_mode'][0]['model'] == 'llama3.2'
+        assert stats['top_prompts'][0] == {
+            'key': 'k1', 'count': 2, 'prompt': 'first'
+        }
@@ -1,9 +1,23 @@
+import asyncio
 import pytest
 import json
-from unittest.mock import AsyncMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 import os
 
-from api.services.cache_service import CacheService
+from api.models.chats.ask_model import AskResponse
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.backends.redis_backend import RedisBackend
+from api.services.backends.replicated_backend import ReplicatedBackend
+from api.services.backends.sharded_backend import (
+    ShardedBackend, hash_slot_key
+)
+from api.services.cache_service import (
+    CacheService, ClientConcurrencyExceeded
+)
+
+
+REDIS_FROM_URL = 'api.services.backends.redis_backend.redis.from_url'
 
 
 class TestCacheService:
@@ -20,19 +34,29 @@ class TestCacheService:
         mock.scan = AsyncMock(return_value=(0, []))
         mock.delete = AsyncMock(return_value=0)
         mock.ping = AsyncMock()
-        mock.close = AsyncMock()
+        mock.memory_usage = AsyncMock(return_value=100)
+        mock.mget = AsyncMock(return_value=[])
+        mock.aclose = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        mock.pipeline = MagicMock()
+        mock.pipeline.return_value.__aenter__.return_value = pipe
         return mock
 
     @pytest.fixture
     def service(self, mock_redis):
         """Create a CacheService with mocked Redis."""
-        with patch('api.services.cache_service.redis.from_url',
-                   return_value=mock_redis):
+        with patch(REDIS_FROM_URL, return_value=mock_redis):
             return CacheService()
 
+    @pytest.fixture
+    def memory_service(self):
+        """Create a CacheService on the in-memory backend."""
+        return CacheService(backend=MemoryBackend())
+
     def test_initialization(self, service):
         """Test service initialization."""
-        assert service.redis_client is not None
+        assert service.backend is not None
         assert service.cache_ttl > 0
         assert service.rate_limit_window > 0
         assert service.rate_limit_max > 0
@@ -46,13 +70,311 @@ class TestCacheService:
             'RATE_LIMIT_MAX': '20'
         }
         with patch.dict(os.environ, env_vars):
-            with patch('api.services.cache_service.redis.from_url') as mock:
+            with patch(REDIS_FROM_URL) as mock:
                 service = CacheService()
                 mock.assert_called_once()
                 assert service.cache_ttl == 7200
                 assert service.rate_limit_window == 120
                 assert service.rate_limit_max == 20
 
+    def test_separate_limiter_store(self):
+        """Test RATE_LIMIT_REDIS_URL gets its own connection."""
+        env_vars = {
+            'CACHE_BACKEND': 'redis',
+            'REDIS_URL': 'redis://main:6379/0',
+            'RATE_LIMIT_REDIS_URL': 'redis://limiter:6379/0',
+        }
+        with patch.dict(os.environ, env_vars), \
+                patch(REDIS_FROM_URL) as mock:
+            service = CacheService()
+        assert service.limiter_backend is not service.backend
+        assert service.backend.url == 'redis://main:6379/0'
+        assert service.limiter_backend.url == 'redis://limiter:6379/0'
+        assert mock.call_count == 2
+
+    def test_shared_store_by_default(self):
+        """Test cache and limiter share a connection by default."""
+        with patch.dict(os.environ, {'CACHE_BACKEND': 'redis'}), \
+                patch(REDIS_FROM_URL) as mock:
+            service = CacheService()
+        assert service.limiter_backend is service.backend
+        mock.assert_called_once()
+
+    def test_sharded_cache_store(self):
+        """Test several CACHE_REDIS_URL entries shard the cache."""
+        env_vars = {
+            'CACHE_BACKEND': 'redis',
+            'CACHE_REDIS_URL': 'redis://a:6379/0, redis://b:6379/0',
+        }
+        with patch.dict(os.environ, env_vars), patch(REDIS_FROM_URL):
+            service = CacheService()
+        assert isinstance(service.backend, ShardedBackend)
+        assert [shard.url for shard in service.backend.shards] == [
+            'redis://a:6379/0', 'redis://b:6379/0'
+        ]
+        assert isinstance(service.limiter_backend, RedisBackend)
+
+    def test_cluster_cache_store(self):
+        """Test CACHE_REDIS_CLUSTER connects with a cluster client."""
+        env_vars = {
+            'CACHE_BACKEND': 'redis',
+            'CACHE_REDIS_URL': 'redis://node:7000/0',
+            'CACHE_REDIS_CLUSTER': 'true',
+        }
+        with patch.dict(os.environ, env_vars), patch(
+            'api.services.backends.redis_backend.redis.RedisCluster'
+        ) as cluster, patch(REDIS_FROM_URL):
+            service = CacheService()
+        assert service.backend.cluster is True
+        cluster.from_url.assert_called_once()
+        assert service.limiter_backend is not service.backend
+
+    def test_replica_cache_store(self):
+        """Test cache reads use replicas and the limiter the primary."""
+        env_vars = {
+            'CACHE_BACKEND': 'redis',
+            'REDIS_URL': 'redis://primary:6379/0',
+            'CACHE_REDIS_REPLICA_URLS': 'redis://r1:6379/0,redis://r2:6379/0',
+            'CACHE_REPLICA_SELECTION': 'sticky',
+            'CACHE_REPLICA_MAX_LAG': '2',
+        }
+        with patch.dict(os.environ, env_vars), patch(REDIS_FROM_URL):
+            service = CacheService()
+        assert isinstance(service.backend, ReplicatedBackend)
+        assert service.backend.selection == 'sticky'
+        assert service.backend.max_lag == 2.0
+        assert [r.url for r in service.backend.replicas] == [
+            'redis://r1:6379/0', 'redis://r2:6379/0'
+        ]
+        assert service.limiter_backend is service.backend.primary
+
+    @pytest.mark.asyncio
+    async def test_replica_primary_pinged_and_closed_once(self):
+        """Test the limiter sharing the replicated primary isn't doubled."""
+        primary, replica = MemoryBackend(), MemoryBackend()
+        primary.ping = AsyncMock(return_value=True)
+        primary.close = AsyncMock()
+        service = CacheService(
+            backend=ReplicatedBackend(primary, [replica]),
+            limiter_backend=primary,
+        )
+        assert await service.health_check() is True
+        await service.close()
+
+        primary.ping.assert_awaited_once()
+        primary.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_leased_rate_limit_mode(self):
+        """Test RATE_LIMIT_MODE=leased enforces the limit from leases."""
+        env_vars = {
+            'RATE_LIMIT_MODE': 'leased',
+            'RATE_LIMIT_MAX': '4',
+            'RATE_LIMIT_LEASE_SIZE': '2',
+        }
+        with patch.dict(os.environ, env_vars):
+            service = CacheService(backend=MemoryBackend())
+        assert service.leased_limiter.lease_size == 2
+        for _ in range(4):
+            assert (await service.check_rate_limit('user'))[0]
+            await service.increment_rate_limit('user')
+        assert not (await service.check_rate_limit('user'))[0]
+        # Two full leases; the over-limit check only reads the counter
+        assert service.get_rate_limit_metrics()['lease_requests'] == 2
+
+    @pytest.mark.asyncio
+    async def test_leased_rate_limit_fails_open(self, mock_redis):
+        """Test leased mode allows requests when Redis is down."""
+        mock_redis.get.side_effect = Exception('Connection error')
+        mock_redis.incr.side_effect = Exception('Connection error')
+        with patch.dict(os.environ, {'RATE_LIMIT_MODE': 'leased'}), \
+                patch(REDIS_FROM_URL, return_value=mock_redis):
+            service = CacheService()
+        assert await service.check_rate_limit('user') == (True, 0)
+        assert await service.increment_rate_limit('user') == 0
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_slots(self, memory_service):
+        """Test a client can hold at most CLIENT_CONCURRENCY_MAX slots."""
+        memory_service.client_concurrency_max = 2
+        memory_service.client_concurrency_queue_timeout = 0
+        async with memory_service.client_concurrency_slot('user'):
+            async with memory_service.client_concurrency_slot('user'):
+                with pytest.raises(ClientConcurrencyExceeded):
+                    async with memory_service.client_concurrency_slot(
+                        'user'
+                    ):
+                        pass
+                # Other clients are not affected
+                async with memory_service.client_concurrency_slot('other'):
+                    pass
+        assert await memory_service.limiter_backend.zcard(
+            'concurrency:user'
+        ) == 0
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_queues_briefly(self, memory_service):
+        """Test a request waits for a slot freed within the timeout."""
+        memory_service.client_concurrency_max = 1
+        memory_service.client_concurrency_queue_timeout = 1
+        order = []
+
+        async def hold():
+            async with memory_service.client_concurrency_slot('user'):
+                order.append('first')
+                await asyncio.sleep(0.05)
+
+        async def wait():
+            await asyncio.sleep(0.01)
+            async with memory_service.client_concurrency_slot('user'):
+                order.append('second')
+
+        await asyncio.gather(hold(), wait())
+        assert order == ['first', 'second']
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_lease_expiry(self, memory_service):
+        """Test leases of crashed workers expire."""
+        memory_service.client_concurrency_max = 1
+        memory_service.client_concurrency_queue_timeout = 0
+        await memory_service.limiter_backend.zadd(
+            'concurrency:user', 'crashed', time.time() - 1
+        )
+        async with memory_service.client_concurrency_slot('user'):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_disabled(self, memory_service):
+        """Test CLIENT_CONCURRENCY_MAX=0 disables the semaphore."""
+        memory_service.client_concurrency_max = 0
+        for _ in range(5):
+            async with memory_service.client_concurrency_slot('user'):
+                pass
+        assert await memory_service.limiter_backend.zcard(
+            'concurrency:user'
+        ) == 0
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_fails_open(self, service, mock_redis):
+        """Test the semaphore allows requests when Redis is down."""
+        service.client_concurrency_max = 2
+        mock_redis.register_script = MagicMock(
+            return_value=AsyncMock(side_effect=Exception('Connection error'))
+        )
+        async with service.client_concurrency_slot('user'):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_one_round_trip(
+        self, service, mock_redis
+    ):
+        """Test a slot is taken with a single script call on Redis."""
+        service.client_concurrency_max = 2
+        script = AsyncMock(return_value=1)
+        mock_redis.register_script = MagicMock(return_value=script)
+        async with service.client_concurrency_slot('user'):
+            pass
+
+        script.assert_awaited_once()
+        assert script.call_args.kwargs['keys'] == ['concurrency:user']
+        mock_redis.zadd.assert_not_called()
+        mock_redis.zcard.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_lease_renewed(self, memory_service):
+        """Test a slot held past its lease TTL is not taken over."""
+        memory_service.client_concurrency_max = 1
+        memory_service.client_concurrency_queue_timeout = 0
+        memory_service.client_concurrency_lease_ttl = 0.1
+        async with memory_service.client_concurrency_slot('user'):
+            await asyncio.sleep(0.25)
+            with pytest.raises(ClientConcurrencyExceeded):
+                async with memory_service.client_concurrency_slot('user'):
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_client_concurrency_lost_lease_not_restored(
+        self, memory_service
+    ):
+        """Test a lease taken over after expiry isn't renewed back."""
+        memory_service.client_concurrency_max = 1
+        memory_service.client_concurrency_queue_timeout = 0
+        memory_service.client_concurrency_lease_ttl = 0.1
+        backend = memory_service.limiter_backend
+        async with memory_service.client_concurrency_slot('user'):
+            # Another worker pruned the lease and took the slot
+            await backend.delete('concurrency:user')
+            await backend.zadd('concurrency:user', 'other', time.time() + 10)
+            await asyncio.sleep(0.15)
+            assert await backend.zcard('concurrency:user') == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_uses_limiter_store(self):
+        """Test rate limit counters never touch the cache store."""
+        cache, limiter = MemoryBackend(), MemoryBackend()
+        service = CacheService(backend=cache, limiter_backend=limiter)
+        await service.increment_rate_limit('user')
+        assert await limiter.get('rate_limit:user') == '1'
+        assert await cache.get('rate_limit:user') is None
+
+    def test_backend_selection(self):
+        """Test the backend is selected by CACHE_BACKEND."""
+        with patch.dict(os.environ, {'CACHE_BACKEND': 'memory'}):
+            assert isinstance(CacheService().backend, MemoryBackend)
+        with patch.dict(os.environ, {'CACHE_BACKEND': 'redis'}), \
+                patch(REDIS_FROM_URL):
+            assert isinstance(CacheService().backend, RedisBackend)
+        with patch.dict(os.environ, {'CACHE_BACKEND': 'unknown'}):
+            with pytest.raises(ValueError):
+                CacheService()
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_cache_keeps_rate_limit(self):
+        """Test filling the memory cache doesn't reset rate limits."""
+        with patch.dict(os.environ, {
+            'CACHE_BACKEND': 'memory',
+            'MEMORY_BACKEND_MAX_KEYS': '4',
+            'RATE_LIMIT_MAX': '2',
+        }):
+            service = CacheService()
+        assert service.limiter_backend is not service.backend
+        await service.increment_rate_limit('user')
+        await service.increment_rate_limit('user')
+        for index in range(10):
+            await service.cache_response(
+                'llama3.2', str(index), {'response': index}, 'concise'
+            )
+        assert await service.check_rate_limit('user') == (False, 2)
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_cache_roundtrip(self, memory_service):
+        """Test caching end to end on the in-memory backend."""
+        assert await memory_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) is None
+        await memory_service.cache_response(
+            'llama3.2', 'test', {'response': 'cached'}, 'concise'
+        )
+        assert await memory_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) == {'response': 'cached'}
+        # The response and its validator
+        assert await memory_service.clear_cache() == 2
+        assert await memory_service.health_check() is True
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_rate_limit(self, memory_service):
+        """Test rate limiting end to end on the in-memory backend."""
+        memory_service.rate_limit_max = 2
+        for _ in range(2):
+            is_allowed, _ = await memory_service.check_rate_limit('user')
+            assert is_allowed is True
+            await memory_service.increment_rate_limit('user')
+
+        is_allowed, count = await memory_service.check_rate_limit('user')
+        assert is_allowed is False
+        assert count == 2
+
     def test_generate_cache_key(self, service):
         """Test cache key generation."""
         key1 = service._generate_cache_key('llama3.2', 'test', 'concise')
@@ -61,8 +383,34 @@ class TestCacheService:
 
         assert key1 == key2  # Same input = same key
         assert key1 != key3  # Different prompt = different key
-        assert key1.startswith('llm:llama3.2:concise:')
-        assert len(key1.split(':')[-1]) == 16  # Hash length
+        assert key1.startswith('llm:{llama3.2:')
+        assert key1.endswith('}:concise')
+        assert len(key1.split(':')[2]) == 17  # Hash and closing brace
+
+    def test_generate_cache_key_hash_tag(self, service):
+        """Test every mode of a prompt shares one hash tag."""
+        concise = service._generate_cache_key('llama3.2', 'test', 'concise')
+        friendly = service._generate_cache_key(
+            'llama3.2', 'test', 'friendly', {'num_predict': 64}
+        )
+        assert hash_slot_key(concise) == hash_slot_key(friendly)
+
+    def test_generate_cache_key_with_options(self, service):
+        """Test generation options are part of the cache key."""
+        base = service._generate_cache_key('llama3.2', 'test', 'concise')
+        key1 = service._generate_cache_key(
+            'llama3.2', 'test', 'concise', {'num_predict': 64, 'stop': []}
+        )
+        key2 = service._generate_cache_key(
+            'llama3.2', 'test', 'concise', {'stop': [], 'num_predict': 64}
+        )
+        key3 = service._generate_cache_key(
+            'llama3.2', 'test', 'concise', {'num_predict': 128}
+        )
+
+        assert key1 == key2  # Order-insensitive
+        assert key1 != key3
+        assert key1.startswith(base + ':')
 
     @pytest.mark.asyncio
     async def test_get_cached_response_hit(self, service, mock_redis):
@@ -99,9 +447,217 @@ class TestCacheService:
 
         assert result is None  # Fails gracefully
 
+    @pytest.mark.asyncio
+    async def test_get_cached_body_serves_stored_text(self, memory_service):
+        """Test stored responses come back as the final JSON body."""
+        answer = {
+            'model': 'llama3.2', 'response': 'cached', 'created_at': 'now',
+            'done': True, 'mode': 'concise',
+        }
+        await memory_service.cache_response(
+            'llama3.2', 'test', answer, 'concise'
+        )
+
+        body = await memory_service.get_cached_body(
+            'llama3.2', 'test', 'concise'
+        )
+        assert body == (
+            b'{"model":"llama3.2","response":"cached","created_at":"now",'
+            b'"done":true,"mode":"concise","route":null}'
+        )
+        assert AskResponse.model_validate_json(body).response == 'cached'
+
+    @pytest.mark.asyncio
+    async def test_get_cached_body_non_ascii(self, memory_service):
+        """Test non-ASCII answers are stored and served as UTF-8."""
+        answer = {
+            'model': 'llama3.2', 'response': 'Café ☕', 'created_at': '',
+            'done': True, 'mode': 'concise',
+        }
+        await memory_service.cache_response(
+            'llama3.2', 'test', answer, 'concise'
+        )
+
+        body = await memory_service.get_cached_body(
+            'llama3.2', 'test', 'concise'
+        )
+        assert 'Café ☕'.encode() in body
+        assert AskResponse.model_validate_json(body).response == 'Café ☕'
+
+    @pytest.mark.asyncio
+    async def test_get_cached_body_appends_route(self, memory_service):
+        """Test the request's route decision is added to the body."""
+        await memory_service.cache_response('m', 'test', {
+            'model': 'm', 'response': 'r', 'created_at': '', 'done': True,
+            'mode': 'concise',
+        }, 'concise')
+        route = {'tier': 'small', 'model': 'm', 'reason': 'short'}
+
+        body = await memory_service.get_cached_body(
+            'm', 'test', 'concise', route=route
+        )
+        assert json.loads(body)['route'] == route
+
+    @pytest.mark.asyncio
+    async def test_get_cached_body_rejects_other_formats(
+        self, memory_service
+    ):
+        """Test entries that aren't stored bodies are misses."""
+        await memory_service.cache_response(
+            'llama3.2', 'test', {'response': 'old', 'done': True}, 'friendly'
+        )
+
+        assert await memory_service.get_cached_body(
+            'llama3.2', 'test', 'friendly'
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_get_cached_body_miss_and_error(self, service, mock_redis):
+        """Test misses and backend errors return None."""
+        mock_redis.get.return_value = None
+        assert await service.get_cached_body('llama3.2', 'test') is None
+        mock_redis.get.side_effect = Exception('Redis error')
+        assert await service.get_cached_body('llama3.2', 'test') is None
+
+    @pytest.mark.asyncio
+    async def test_get_cached_responses_corrupt_entry_is_miss(
+        self, service, mock_redis
+    ):
+        """Test an entry that isn't valid JSON is treated as a miss."""
+        mock_redis.mget.return_value = ['{"response": "ok"}', '{"resp']
+
+        results = await service.get_cached_responses(
+            'llama3.2', 'test', {'concise': None, 'friendly': None}
+        )
+
+        assert results == {'concise': {'response': 'ok'}, 'friendly': None}
+        assert service.analytics.counters['llama3.2:friendly'] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_get_cached_validator(self, memory_service):
+        """Test validators derive from the stored payload."""
+        assert await memory_service.get_cached_validator(
+            'm', 'test', 'concise'
+        ) is None
+        await memory_service.cache_response('m', 'test', {
+            'model': 'm', 'response': 'r', 'created_at': '', 'done': True,
+            'mode': 'concise',
+        }, 'concise')
+
+        etag, max_age = await memory_service.get_cached_validator(
+            'm', 'test', 'concise'
+        )
+        assert etag.startswith('"') and etag.endswith('"')
+        assert memory_service.cache_ttl - 2 <= max_age <= (
+            memory_service.cache_ttl
+        )
+        # Stable while the entry lives, distinct per route and mode
+        again, _ = await memory_service.get_cached_validator(
+            'm', 'test', 'concise'
+        )
+        assert again == etag
+        routed, _ = await memory_service.get_cached_validator(
+            'm', 'test', 'concise',
+            route={'tier': 'small', 'model': 'm', 'reason': 'short'},
+        )
+        assert routed != etag
+        assert await memory_service.get_cached_validator(
+            'm', 'test', 'friendly'
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_get_cached_validator_follows_content(
+        self, memory_service
+    ):
+        """Test rewriting an entry changes its ETag only if it differs."""
+        response = {'model': 'm', 'response': 'r', 'mode': 'concise'}
+        await memory_service.cache_response('m', 'test', response)
+        etag, _ = await memory_service.get_cached_validator('m', 'test')
+
+        await memory_service.cache_response('m', 'test', response, ttl=60)
+        same, max_age = await memory_service.get_cached_validator(
+            'm', 'test'
+        )
+        assert same == etag
+        assert max_age <= 60
+
+        await memory_service.cache_response(
+            'm', 'test', {**response, 'response': 'other'}
+        )
+        changed, _ = await memory_service.get_cached_validator('m', 'test')
+        assert changed != etag
+
+    @pytest.mark.asyncio
+    async def test_get_cached_validator_error(self, service, mock_redis):
+        """Test backend errors and expired validators give none."""
+        mock_redis.get.return_value = f'abc:{time.time() - 1}'
+        assert await service.get_cached_validator('m', 'test') is None
+        mock_redis.get.side_effect = Exception('Redis error')
+        assert await service.get_cached_validator('m', 'test') is None
+
+    @pytest.mark.asyncio
+    async def test_get_cached_validator_buffered(
+        self, write_behind_service
+    ):
+        """Test entries waiting to be written already have a validator."""
+        service = write_behind_service
+        service.backend.setex_many = AsyncMock()
+        await service.cache_response('m', 'test', {'response': 'x'})
+        buffered, _ = await service.get_cached_validator('m', 'test')
+
+        await service.drain_writes()
+        items = service.backend.setex_many.call_args[0][0]
+        service.backend.get = AsyncMock(return_value=items[1][2])
+        written, _ = await service.get_cached_validator('m', 'test')
+        assert written == buffered
+
+    @pytest.mark.asyncio
+    async def test_get_cached_responses_single_mget(
+        self, service, mock_redis
+    ):
+        """Test several modes are fetched with one MGET."""
+        mock_redis.mget.return_value = [json.dumps({'response': 'a'}), None]
+
+        result = await service.get_cached_responses(
+            'llama3.2', 'test', {'concise': {}, 'friendly': {'stop': []}}
+        )
+
+        assert result == {'concise': {'response': 'a'}, 'friendly': None}
+        mock_redis.mget.assert_called_once()
+        keys = mock_redis.mget.call_args[0]
+        assert keys[0] == service._generate_cache_key(
+            'llama3.2', 'test', 'concise'
+        )
+        mock_redis.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_cached_responses_error(self, service, mock_redis):
+        """Test multi-mode lookups fail gracefully."""
+        mock_redis.mget.side_effect = Exception('Redis error')
+
+        result = await service.get_cached_responses(
+            'llama3.2', 'test', {'concise': {}}
+        )
+
+        assert result == {'concise': None}
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_multi_mode(self, memory_service):
+        """Test multi-mode lookups on the in-memory backend."""
+        await memory_service.cache_response(
+            'llama3.2', 'test', {'response': 'c'}, 'concise', options={}
+        )
+
+        result = await memory_service.get_cached_responses(
+            'llama3.2', 'test', {'concise': {}, 'creative': {}}
+        )
+
+        assert result == {'concise': {'response': 'c'}, 'creative': None}
+
     @pytest.mark.asyncio
     async def test_cache_response_success(self, service, mock_redis):
-        """Test caching a response."""
+        """Test caching a response and its validator in one pipeline."""
+        service.backend.setex_many = AsyncMock()
         response_data = {'response': 'test'}
 
         result = await service.cache_response(
@@ -109,25 +665,29 @@ class TestCacheService:
         )
 
         assert result is True
-        mock_redis.setex.assert_called_once()
-        call_args = mock_redis.setex.call_args[0]
-        assert call_args[1] == service.cache_ttl  # Default TTL
-        assert json.loads(call_args[2]) == response_data
+        service.backend.setex_many.assert_awaited_once()
+        (key, ttl, payload), (validator_key, validator_ttl, _) = (
+            service.backend.setex_many.call_args[0][0]
+        )
+        assert ttl == validator_ttl == service.cache_ttl  # Default TTL
+        assert json.loads(payload) == response_data
+        assert validator_key == f'{key}:etag'
 
     @pytest.mark.asyncio
     async def test_cache_response_custom_ttl(self, service, mock_redis):
         """Test caching with custom TTL."""
+        service.backend.setex_many = AsyncMock()
         await service.cache_response(
             'llama3.2', 'test', {}, 'concise', ttl=1800
         )
 
-        call_args = mock_redis.setex.call_args[0]
+        call_args = service.backend.setex_many.call_args[0][0][0]
         assert call_args[1] == 1800
 
     @pytest.mark.asyncio
     async def test_cache_response_error(self, service, mock_redis):
         """Test cache set handles errors gracefully."""
-        mock_redis.setex.side_effect = Exception('Redis error')
+        mock_redis.pipeline.side_effect = Exception('Redis error')
 
         result = await service.cache_response(
             'llama3.2', 'test', {}, 'concise'
@@ -215,6 +775,193 @@ class TestCacheService:
         assert deleted == 2
         assert mock_redis.scan.call_count == 2
 
+    @pytest.fixture
+    def disk_service(self, mock_redis, tmp_path):
+        """Create a CacheService with mocked Redis and a disk tier."""
+        with patch.dict(
+            os.environ, {'DISK_CACHE_PATH': str(tmp_path / 'cache.db')}
+        ), patch(REDIS_FROM_URL, return_value=mock_redis):
+            service = CacheService()
+        yield service
+        service.disk_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_serves_when_redis_down(
+        self, disk_service, mock_redis
+    ):
+        """Test the disk tier answers when Redis is unavailable."""
+        response_data = {'response': 'from disk'}
+        assert await disk_service.cache_response(
+            'llama3.2', 'test', response_data, 'concise'
+        ) is True
+
+        mock_redis.get.side_effect = Exception('Redis error')
+        result = await disk_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        )
+
+        assert result == response_data
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_serves_on_redis_miss(
+        self, disk_service, mock_redis
+    ):
+        """Test the disk tier is consulted when Redis misses."""
+        mock_redis.pipeline.side_effect = Exception('Redis error')
+        assert await disk_service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        ) is True
+
+        result = await disk_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        )
+
+        assert result == {'response': 'x'}
+
+    @pytest.fixture
+    def shm_service(self, mock_redis, tmp_path):
+        """Create a CacheService with mocked Redis and a shared cache."""
+        with patch.dict(
+            os.environ, {'SHM_CACHE_PATH': str(tmp_path / 'shm')}
+        ), patch(REDIS_FROM_URL, return_value=mock_redis):
+            service = CacheService()
+        yield service
+        service.shm_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_shm_tier_is_checked_before_redis(
+        self, shm_service, mock_redis
+    ):
+        """Test shared-memory hits don't reach Redis."""
+        await shm_service.cache_response(
+            'llama3.2', 'test', {'response': 'shared'}, 'concise'
+        )
+
+        result = await shm_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        )
+
+        assert result == {'response': 'shared'}
+        mock_redis.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_shm_tier_is_backfilled_from_redis(
+        self, shm_service, mock_redis
+    ):
+        """Test Redis hits are copied into the shared cache."""
+        mock_redis.get.return_value = json.dumps({'response': 'redis'})
+        await shm_service.get_cached_response('llama3.2', 'test', 'concise')
+        await shm_service.get_cached_response('llama3.2', 'test', 'concise')
+
+        mock_redis.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_shm_backfill_still_returns_hit(
+        self, shm_service, mock_redis, caplog
+    ):
+        """Test a shared cache write error doesn't fail a Redis hit."""
+        mock_redis.get.return_value = json.dumps({'response': 'redis'})
+        with patch.object(
+            shm_service.shm_cache, 'set', side_effect=OSError('full')
+        ):
+            result = await shm_service.get_cached_response(
+                'llama3.2', 'test', 'concise'
+            )
+
+        assert result == {'response': 'redis'}
+        assert 'Shared memory backfill failed' in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_close_closes_shm_when_disk_close_fails(
+        self, shm_service
+    ):
+        """Test a disk close error doesn't leave the shared cache open."""
+        with patch.object(
+            shm_service.disk_cache, 'close', side_effect=OSError('busy')
+        ), patch.object(shm_service.shm_cache, 'close') as shm_close:
+            await shm_service.close()
+
+        shm_close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_empties_whole_shm_tier(
+        self, shm_service, mock_redis
+    ):
+        """Test any clear drops every shared-memory entry."""
+        await shm_service.cache_response(
+            'llama3.2', 'test', {'response': 'shared'}, 'concise'
+        )
+        mock_redis.get.return_value = None
+
+        await shm_service.clear_cache('llm:unrelated:*')
+
+        assert await shm_service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) is None
+        mock_redis.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_cached_response_records_analytics(
+        self, service, mock_redis
+    ):
+        """Test cache lookups are recorded in the analytics."""
+        mock_redis.get.return_value = json.dumps({'response': 'cached'})
+        await service.get_cached_response('llama3.2', 'test', 'concise')
+        mock_redis.get.return_value = None
+        await service.get_cached_response('llama3.2', 'other', 'concise')
+
+        assert service.analytics.counters['llama3.2:concise'] == [1, 1]
+        mock_redis.setex.assert_not_called()  # Flush not due yet
+
+    @pytest.mark.asyncio
+    async def test_get_cached_response_flushes_analytics(
+        self, service, mock_redis
+    ):
+        """Test analytics are flushed in the background once due."""
+        service.analytics._last_flush -= service.analytics.flush_interval
+        await service.get_cached_response('llama3.2', 'test', 'concise')
+        # The lookup doesn't wait for the flush
+        mock_redis.setex.assert_not_called()
+        await service.get_cached_response('llama3.2', 'test', 'concise')
+        await service._analytics_task
+
+        # One flush for both lookups, taken when the task ran
+        mock_redis.setex.assert_called_once()
+        key, ttl, payload = mock_redis.setex.call_args[0]
+        assert key.startswith('cache_stats:')
+        assert json.loads(payload)['counters'] == {
+            'llama3.2:concise': [0, 2]
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_memory_usage(self, service, mock_redis):
+        """Test memory usage is extrapolated from a sample."""
+        mock_redis.scan.return_value = (0, ['k1', 'k2', 'k3', 'k4'])
+
+        usage = await service.get_memory_usage('llm:*', sample_size=2)
+
+        assert usage['keys'] == 4
+        assert usage['sampled_keys'] == 2
+        assert usage['sampled_bytes'] == 200
+        assert usage['estimated_bytes'] == 400
+
+    @pytest.mark.asyncio
+    async def test_get_cache_stats(self, service, mock_redis):
+        """Test stats merge worker snapshots stored in Redis."""
+        service.analytics.record('k1', 'llama3.2', 'concise', 'p', True)
+        snapshot = service.analytics.snapshot()
+        mock_redis.scan.side_effect = [
+            (0, ['cache_stats:w1']),
+            (0, ['llm:k1']),
+        ]
+        mock_redis.get.return_value = json.dumps(snapshot)
+
+        stats = await service.get_cache_stats()
+
+        assert stats['workers'] == 1
+        assert stats['hits'] == 1
+        assert stats['memory']['keys'] == 1
+
     @pytest.mark.asyncio
     async def test_health_check_healthy(self, service, mock_redis):
         """Test health check when Redis is healthy."""
@@ -236,11 +983,225 @@ class TestCacheService:
     async def test_close(self, service, mock_redis):
         """Test closing Redis connection."""
         await service.close()
-        mock_redis.close.assert_called_once()
+        mock_redis.aclose.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_close_error_handling(self, service, mock_redis):
         """Test close handles errors gracefully."""
-        mock_redis.close.side_effect = Exception('Close error')
+        mock_redis.aclose.side_effect = Exception('Close error')
         # Should not raise exception
         await service.close()
+
+    @pytest.mark.asyncio
+    async def test_embeddings_round_trip(self, memory_service):
+        """Test embeddings are cached and read back per text."""
+        await memory_service.cache_embeddings(
+            'embed', {'a': [0.5, -1.25], 'b': [2.0, 0.0]}
+        )
+        result = await memory_service.get_cached_embeddings(
+            'embed', ['b', 'missing', 'a']
+        )
+        assert result == [[2.0, 0.0], None, [0.5, -1.25]]
+
+    @pytest.mark.asyncio
+    async def test_embeddings_stored_as_float32(self, memory_service):
+        """Test embeddings are stored as 4 bytes per dimension."""
+        await memory_service.cache_embeddings('embed', {'a': [1.0] * 768})
+        key = memory_service._embedding_cache_key('embed', 'a')
+        value = (await memory_service.backend.mget_bytes(key))[0]
+        assert isinstance(value, bytes)
+        assert len(value) == 768 * 4
+
+    @pytest.mark.asyncio
+    async def test_cache_embeddings_one_pipeline(self, memory_service):
+        """Test a batch of embeddings is written with one call."""
+        memory_service.backend.setex_many_bytes = AsyncMock()
+        assert await memory_service.cache_embeddings(
+            'embed', {'a': [1.0], 'b': [2.0], 'c': [3.0]}
+        ) is True
+        memory_service.backend.setex_many_bytes.assert_awaited_once()
+        assert len(
+            memory_service.backend.setex_many_bytes.call_args[0][0]
+        ) == 3
+
+    @pytest.mark.asyncio
+    async def test_get_cached_embeddings_backend_error(
+        self, service, mock_redis
+    ):
+        """Test backend failures are treated as misses."""
+        mock_redis.mget.side_effect = Exception('Connection error')
+        assert await service.get_cached_embeddings(
+            'embed', ['a', 'b']
+        ) == [None, None]
+
+    @pytest.fixture
+    def write_behind_service(self):
+        """Create a write-behind CacheService on the in-memory backend."""
+        with patch.dict(os.environ, {
+            'CACHE_WRITE_BEHIND': 'true',
+            'CACHE_WRITE_BEHIND_MAX': '5',
+            'CACHE_WRITE_BEHIND_BATCH': '2',
+            'CACHE_WRITE_BEHIND_INTERVAL_MS': '10',
+        }):
+            return CacheService(backend=MemoryBackend())
+
+    @pytest.mark.asyncio
+    async def test_write_behind_serves_buffered_entries(
+        self, write_behind_service
+    ):
+        """Test buffered writes are readable before they are flushed."""
+        service = write_behind_service
+        assert await service.cache_response(
+            'llama3.2', 'test', {'response': 'buffered'}, 'concise'
+        ) is True
+        key = service._generate_cache_key('llama3.2', 'test', 'concise')
+        assert await service.backend.get(key) is None
+
+        assert await service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) == {'response': 'buffered'}
+        cached = await service.get_cached_responses(
+            'llama3.2', 'test', {'concise': None, 'friendly': None}
+        )
+        assert cached == {'concise': {'response': 'buffered'},
+                          'friendly': None}
+        await service.drain_writes()
+
+    @pytest.mark.asyncio
+    async def test_write_behind_background_flush(self, write_behind_service):
+        """Test the background task writes buffered entries."""
+        service = write_behind_service
+        for prompt in ('a', 'b', 'c'):
+            await service.cache_response(
+                'llama3.2', prompt, {'response': prompt}, 'concise'
+            )
+        await asyncio.sleep(0.1)
+
+        key = service._generate_cache_key('llama3.2', 'c', 'concise')
+        assert await service.backend.get(key) == '{"response":"c"}'
+        metrics = service.get_write_behind_metrics()
+        assert metrics['buffered'] == 0
+        assert metrics['flushed'] == 3
+
+    @pytest.mark.asyncio
+    async def test_write_behind_pipelined_batches(
+        self, write_behind_service
+    ):
+        """Test each flush sends up to CACHE_WRITE_BEHIND_BATCH entries."""
+        service = write_behind_service
+        service.backend.setex_many = AsyncMock()
+        for prompt in ('a', 'b', 'c'):
+            await service.cache_response(
+                'llama3.2', prompt, {'response': prompt}, 'concise'
+            )
+        assert await service.flush_writes() == 2
+        # Each response is written with its validator
+        assert len(service.backend.setex_many.call_args[0][0]) == 4
+        await service.drain_writes()
+        assert service.backend.setex_many.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_write_behind_drops_oldest(self, write_behind_service):
+        """Test a full buffer drops its oldest entries."""
+        service = write_behind_service
+        for index in range(7):
+            await service.cache_response(
+                'llama3.2', str(index), {'response': index}, 'concise'
+            )
+        assert service.get_write_behind_metrics()['dropped'] == 2
+        assert await service.get_cached_response(
+            'llama3.2', '0', 'concise'
+        ) is None
+        assert await service.get_cached_response(
+            'llama3.2', '6', 'concise'
+        ) == {'response': 6}
+        await service.drain_writes()
+
+    @pytest.mark.asyncio
+    async def test_write_behind_failed_flush(self, write_behind_service):
+        """Test a failed pipeline drops its batch and is counted."""
+        service = write_behind_service
+        service.backend.setex_many = AsyncMock(
+            side_effect=Exception('Redis error')
+        )
+        await service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        )
+        await service.drain_writes()
+        assert service.get_write_behind_metrics()['failed'] == 1
+        assert await service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_write_behind_disk_write_is_flushed(self, tmp_path):
+        """Test the disk tier is written by the flusher, not the caller."""
+        with patch.dict(os.environ, {
+            'CACHE_WRITE_BEHIND': 'true',
+            'DISK_CACHE_PATH': str(tmp_path / 'cache.db'),
+        }):
+            service = CacheService(backend=MemoryBackend())
+        service.disk_cache.set = AsyncMock()
+        service.disk_cache.set_many = AsyncMock(
+            wraps=service.disk_cache.set_many
+        )
+        await service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        )
+        service.disk_cache.set_many.assert_not_called()
+
+        await service.drain_writes()
+        service.disk_cache.set.assert_not_called()
+        service.disk_cache.set_many.assert_awaited_once()
+        key = service._generate_cache_key('llama3.2', 'test', 'concise')
+        assert await service.disk_cache.get(key) == '{"response":"x"}'
+        service.disk_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_write_behind_clear_waits_for_flush(
+        self, write_behind_service
+    ):
+        """Test a batch being flushed can't bring cleared entries back."""
+        service = write_behind_service
+        setex_many = service.backend.setex_many
+
+        async def slow_setex_many(items):
+            await asyncio.sleep(0.01)
+            await setex_many(items)
+
+        service.backend.setex_many = slow_setex_many
+        await service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        )
+        await asyncio.gather(service.flush_writes(), service.clear_cache())
+        key = service._generate_cache_key('llama3.2', 'test', 'concise')
+        assert await service.backend.get(key) is None
+        await service.drain_writes()
+
+    @pytest.mark.asyncio
+    async def test_write_behind_close_flushes(self, write_behind_service):
+        """Test closing the service writes everything still buffered."""
+        service = write_behind_service
+        service.backend.setex_many = AsyncMock()
+        await service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        )
+        await service.close()
+        key = service._generate_cache_key('llama3.2', 'test', 'concise')
+        service.backend.setex_many.assert_awaited_once()
+        assert service.backend.setex_many.call_args[0][0][0] == (
+            key, service.cache_ttl, '{"response":"x"}'
+        )
+
+    @pytest.mark.asyncio
+    async def test_write_behind_clear_cache(self, write_behind_service):
+        """Test clearing the cache drops matching buffered entries."""
+        service = write_behind_service
+        await service.cache_response(
+            'llama3.2', 'test', {'response': 'x'}, 'concise'
+        )
+        await service.clear_cache()
+        assert await service.get_cached_response(
+            'llama3.2', 'test', 'concise'
+        ) is None
+        await service.drain_writes()
@@ -0,0 +1,130 @@
+import json
+import os
+
+import pytest
+
+from api.services.capture_service import RequestCaptureService
+
+
+def _read(path):
+    """Read the JSONL records in a capture file."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestRequestCaptureService:
+    """Test suite for RequestCaptureService."""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Create a capture service sampling every request."""
+        monkeypatch.delenv('CAPTURE_REDACT_FIELDS', raising=False)
+        monkeypatch.delenv('CAPTURE_REDACT_PATTERNS', raising=False)
+        service = RequestCaptureService(
+            path=str(tmp_path / 'capture.jsonl'), sample_rate=1.0
+        )
+        service.start()
+        yield service
+        service.close()
+
+    def test_disabled_without_path(self, monkeypatch):
+        """Test capture is off unless CAPTURE_PATH is set."""
+        monkeypatch.delenv('CAPTURE_PATH', raising=False)
+        service = RequestCaptureService()
+        assert not service.enabled
+        assert not service.should_sample()
+
+    def test_sample_rate(self, tmp_path):
+        """Test roughly sample_rate of requests are sampled."""
+        service = RequestCaptureService(
+            path=str(tmp_path / 'c.jsonl'), sample_rate=0.25
+        )
+        sampled = sum(service.should_sample() for _ in range(4000))
+        assert 800 < sampled < 1200
+
+    def test_capture_writes_record(self, service):
+        """Test a captured request is written as one JSON line."""
+        body = {'model': 'llama3.2', 'prompt': 'hi', 'mode': 'concise'}
+        service.capture(
+            '/v1/chats/ask', 200, 0.0123, json.dumps(body).encode(), 'MISS'
+        )
+        service.close()
+
+        [record] = _read(service.file_path)
+        assert record['path'] == '/v1/chats/ask'
+        assert record['status'] == 200
+        assert record['duration_ms'] == pytest.approx(12.3)
+        assert record['model'] == 'llama3.2'
+        assert record['mode'] == 'concise'
+        assert record['cache'] == 'MISS'
+        assert record['body'] == body
+
+    def test_default_redaction(self, service):
+        """Test emails and long numbers are masked by default."""
+        body = {'prompt': 'Mail a@b.com or call 555 123 4567 about 42'}
+        assert service.redact(body) == {
+            'prompt': 'Mail [REDACTED] or call [REDACTED] about 42'
+        }
+
+    def test_redact_fields(self, tmp_path, monkeypatch):
+        """Test configured fields are removed from the body."""
+        monkeypatch.setenv('CAPTURE_REDACT_FIELDS', 'prompt, options')
+        service = RequestCaptureService(
+            path=str(tmp_path / 'c.jsonl'), sample_rate=1.0
+        )
+        assert service.redact(
+            {'prompt': 'secret', 'options': {}, 'mode': 'concise'}
+        ) == {'mode': 'concise'}
+
+    def test_redact_patterns(self, tmp_path, monkeypatch):
+        """Test custom patterns replace the defaults."""
+        monkeypatch.setenv('CAPTURE_REDACT_PATTERNS', r'sk-\w+')
+        service = RequestCaptureService(
+            path=str(tmp_path / 'c.jsonl'), sample_rate=1.0
+        )
+        assert service.redact({'prompt': 'key sk-abc a@b.com'}) == {
+            'prompt': 'key [REDACTED] a@b.com'
+        }
+
+    def test_invalid_body(self, service):
+        """Test non-JSON bodies are captured without a body."""
+        service.capture('/v1/chats/ask', 422, 0.001, b'not json')
+        service.close()
+        assert _read(service.file_path)[0]['body'] == {}
+
+    def test_rotation(self, tmp_path):
+        """Test files rotate once they reach CAPTURE_MAX_BYTES."""
+        service = RequestCaptureService(
+            path=str(tmp_path / 'c.jsonl'), sample_rate=1.0
+        )
+        service.max_bytes = 500
+        service.start()
+        for _ in range(20):
+            service.capture('/v1/chats/ask', 200, 0.001, b'{"prompt": "x"}')
+        service.close()
+        assert os.path.exists(f'{service.file_path}.1')
+
+    def test_file_per_worker(self, service):
+        """Test each worker process writes its own file."""
+        assert service.file_path == f'{service.path}.{os.getpid()}'
+
+    def test_queued_until_started(self, tmp_path):
+        """Test records captured before start are written once started."""
+        service = RequestCaptureService(
+            path=str(tmp_path / 'c.jsonl'), sample_rate=1.0
+        )
+        service.capture('/v1/chats/ask', 200, 0.001, b'{}')
+        assert service.file_path == ''
+        service.start()
+        service.close()
+        assert len(_read(service.file_path)) == 1
+
+    def test_full_queue_drops(self, service):
+        """Test records are dropped rather than blocking when full."""
+        service._listener.stop()
+        service._queue.maxsize = 1
+        service.capture('/v1/chats/ask', 200, 0.001, b'{}')
+        service.capture('/v1/chats/ask', 200, 0.001, b'{}')
+        assert service.captured == 1
+        assert service.dropped == 1
+        service._listener = None
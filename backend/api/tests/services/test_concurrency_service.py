@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from api.services.concurrency_service import (
+    AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded
+)
+
+
+class FakeOllama:
+    """Fake Ollama whose per-token latency degrades past `capacity`."""
+
+    def __init__(self, capacity: int, base_latency: float = 0.002):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def generate(self, model: str, prompt: str) -> dict:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            overload = max(1.0, self.in_flight / self.capacity)
+            await asyncio.sleep(self.base_latency * overload ** 2)
+            return {'response': 'ok', 'eval_count': 1, 'done': True}
+        finally:
+            self.in_flight -= 1
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test suite for AdaptiveConcurrencyLimiter."""
+
+    @pytest.fixture
+    def limiter(self):
+        """Create a limiter with explicit settings."""
+        return AdaptiveConcurrencyLimiter(
+            initial_limit=4, min_limit=1, max_limit=16,
+            latency_tolerance=2.0, backoff_ratio=0.5,
+        )
+
+    def test_initialization(self, limiter):
+        """Test limiter initialization."""
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+        assert limiter.baseline_latency is None
+
+    def test_sheds_when_full(self, limiter):
+        """Test requests over the limit are rejected immediately."""
+        assert all(limiter.try_acquire() for _ in range(4))
+        assert limiter.try_acquire() is False
+        assert limiter.rejected == 1
+
+    def test_grows_when_latency_is_stable(self, limiter):
+        """Test additive increase while latency stays near baseline."""
+        for _ in range(4):
+            limiter.try_acquire()
+        for _ in range(4):
+            limiter.release(0.1)
+        assert limiter.limit > 4
+
+    def test_does_not_grow_when_underused(self, limiter):
+        """Test the limit only grows when it is actually being used."""
+        limiter.try_acquire()
+        limiter.release(0.1)
+        assert limiter.limit == 4
+
+    def test_backs_off_on_latency_spike(self, limiter):
+        """Test multiplicative decrease when latency exceeds tolerance."""
+        limiter.try_acquire()
+        limiter.release(0.1)
+        limiter.try_acquire()
+        limiter.release(0.5)
+        assert limiter.limit == 2
+
+    def test_backs_off_on_failure(self, limiter):
+        """Test failures count as congestion."""
+        limiter.try_acquire()
+        limiter.release(0.01, success=False)
+        assert limiter.limit == 2
+
+    def test_limit_bounds(self, limiter):
+        """Test the limit stays within min and max."""
+        for _ in range(10):
+            limiter.try_acquire()
+            limiter.release(1.0, success=False)
+        assert limiter.limit == limiter.min_limit
+
+    def test_initialization_with_env_vars(self, monkeypatch):
+        """Test initialization from environment variables."""
+        monkeypatch.setenv('OLLAMA_CONCURRENCY_INITIAL', '8')
+        monkeypatch.setenv('OLLAMA_CONCURRENCY_MAX', '12')
+        monkeypatch.setenv('OLLAMA_LATENCY_TOLERANCE', '3.0')
+        limiter = AdaptiveConcurrencyLimiter()
+        assert limiter.limit == 8
+        assert limiter.max_limit == 12
+        assert limiter.latency_tolerance == 3.0
+
+    @pytest.mark.asyncio
+    async def test_acquire_context_manager(self, limiter):
+        """Test acquire releases the slot and honours reported latency."""
+        async with limiter.acquire() as sample:
+            assert limiter.in_flight == 1
+            sample['latency'] = 0.25
+        assert limiter.in_flight == 0
+        assert limiter.last_latency == 0.25
+
+    @pytest.mark.asyncio
+    async def test_acquire_raises_when_full(self, limiter):
+        """Test acquire raises when no slot is available."""
+        for _ in range(4):
+            limiter.try_acquire()
+        with pytest.raises(ConcurrencyLimitExceeded):
+            async with limiter.acquire():
+                pass
+
+    @pytest.mark.asyncio
+    async def test_acquire_releases_on_error(self, limiter):
+        """Test errors inside the block release the slot and back off."""
+        with pytest.raises(RuntimeError):
+            async with limiter.acquire():
+                raise RuntimeError('boom')
+        assert limiter.in_flight == 0
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_acquire_ignored_errors_leave_limit(self, limiter):
+        """Test ignored errors free the slot without a sample."""
+        with pytest.raises(KeyError):
+            async with limiter.acquire(ignore=(KeyError,)):
+                raise KeyError('client error')
+        assert limiter.in_flight == 0
+        assert limiter.limit == 4
+        assert limiter.last_latency is None
+
+    @pytest.mark.asyncio
+    async def test_acquire_cancellation_leaves_limit(self, limiter):
+        """Test a cancelled call frees the slot without backing off."""
+        with pytest.raises(asyncio.CancelledError):
+            async with limiter.acquire():
+                raise asyncio.CancelledError()
+        assert limiter.in_flight == 0
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_acquire_without_sample(self, limiter):
+        """Test a block that reports no latency leaves the baseline."""
+        async with limiter.acquire():
+            pass
+        assert limiter.in_flight == 0
+        assert limiter.baseline_latency is None
+        assert limiter.last_latency is None
+
+    @pytest.mark.asyncio
+    async def test_adapts_to_saturated_fake_ollama(self):
+        """Test the limit settles near the capacity of a saturating backend."""
+        ollama = FakeOllama(capacity=3)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=16, min_limit=1, max_limit=64,
+            latency_tolerance=2.0, backoff_ratio=0.8,
+        )
+
+        async def call():
+            try:
+                async with limiter.acquire() as sample:
+                    start = asyncio.get_running_loop().time()
+                    await ollama.generate(model='fake', prompt='hi')
+                    sample['latency'] = (
+                        asyncio.get_running_loop().time() - start
+                    )
+            except ConcurrencyLimitExceeded:
+                pass
+
+        for _ in range(30):
+            await asyncio.gather(*(call() for _ in range(20)))
+
+        assert limiter.rejected > 0
+        assert limiter.limit < 16
+        assert limiter.in_flight == 0
@@ -1,8 +1,12 @@
+import os
+
 import pytest
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
-from api.services.config_service import ConfigService
+from api.services.config_service import (
+    ConfigService, Settings, get_settings
+)
 
 
 class TestConfigService:
@@ -104,3 +108,62 @@ class TestConfigService:
             assert service.get_project_name() == 'backend'
             assert service.get_project_version() == '0.1.0'
             assert 'Powered by bytes' in service.get_project_description()
+
+
+class TestSettings:
+    """Test suite for Settings parsing."""
+
+    def test_defaults(self):
+        """Test unset variables keep the field defaults."""
+        settings = Settings.from_env({})
+        assert settings == Settings()
+        assert settings.cache_ttl == 3600
+        assert settings.ollama_read_timeout is None
+
+    def test_casts_to_field_types(self):
+        """Test values are cast to each field's type."""
+        settings = Settings.from_env({
+            'CACHE_TTL': '60',
+            'OLLAMA_CONNECT_TIMEOUT': '2.5',
+            'CACHE_WRITE_BEHIND': 'Yes',
+            'CACHE_REDIS_CLUSTER': '0',
+            'OLLAMA_MAX_KEEPALIVE': '8',
+            'MODEL_TIER_SMALL': 'tiny',
+        })
+        assert settings.cache_ttl == 60
+        assert settings.ollama_connect_timeout == 2.5
+        assert settings.cache_write_behind is True
+        assert settings.cache_redis_cluster is False
+        assert settings.ollama_max_keepalive == 8
+        assert settings.model_tier_small == 'tiny'
+
+    def test_empty_optional_number_is_unset(self):
+        """Test empty optional numbers mean None, empty strings stay."""
+        settings = Settings.from_env({
+            'OLLAMA_POOL_TIMEOUT': '',
+            'CAPTURE_REDACT_PATTERNS': '',
+        })
+        assert settings.ollama_pool_timeout is None
+        assert settings.capture_redact_patterns == ''
+
+    def test_invalid_value_names_variable(self):
+        """Test a bad value fails with the variable's name."""
+        with pytest.raises(ValueError, match='CACHE_TTL'):
+            Settings.from_env({'CACHE_TTL': 'hour'})
+
+    def test_reads_os_environ(self):
+        """Test the process environment is read by default."""
+        with patch.dict(os.environ, {'RATE_LIMIT_MAX': '99'}):
+            assert Settings.from_env().rate_limit_max == 99
+
+    def test_get_settings_parses_once(self):
+        """Test the shared settings are parsed on first use only."""
+        get_settings.cache_clear()
+        try:
+            with patch.object(
+                Settings, 'from_env', return_value=Settings()
+            ) as mock:
+                assert get_settings() is get_settings()
+            mock.assert_called_once()
+        finally:
+            get_settings.cache_clear()
@@ -2,7 +2,15 @@ import pytest
 from unittest.mock import AsyncMock, Mock, patch
 import os
 
-from api.services.core_service import CoreService, MODE_PROMPTS, AskMode
+import ollama
+
+from api.services.concurrency_service import ConcurrencyLimitExceeded
+from api.services.model_health_service import (
+    ModelNotFound, ModelUnavailable
+)
+from api.services.core_service import (
+    CoreService, MODE_OPTIONS, MODE_PROMPTS, AskMode
+)
 
 
 class TestCoreService:
@@ -26,7 +34,9 @@ class TestCoreService:
             with patch('api.services.core_service.ollama.Client') as mock:
                 service = CoreService()
                 service._get_ollama_client()
-                mock.assert_called_with(host='http://custom:11434')
+                assert mock.call_args.kwargs['host'] == (
+                    'http://custom:11434'
+                )
 
     def test_ollama_client_default(self):
         """Test Ollama client creation with default host."""
@@ -34,7 +44,7 @@ class TestCoreService:
             with patch('api.services.core_service.ollama.Client') as mock:
                 service = CoreService()
                 service._get_ollama_client()
-                mock.assert_called_with()
+                assert 'host' not in mock.call_args.kwargs
 
     def test_async_ollama_client_with_host(self):
         """Test async Ollama client creation with custom host."""
@@ -44,7 +54,36 @@ class TestCoreService:
             ) as mock:
                 service = CoreService()
                 service._get_async_ollama_client()
-                mock.assert_called_with(host='http://custom:11434')
+                assert mock.call_args.kwargs['host'] == (
+                    'http://custom:11434'
+                )
+
+    def test_sync_client_is_lazy(self):
+        """Test the sync client is only built when first used."""
+        with patch('api.services.core_service.ollama.Client') as mock, \
+                patch('api.services.core_service.ollama.AsyncClient'):
+            service = CoreService()
+            mock.assert_not_called()
+            assert service.ollama_client is service.ollama_client
+            mock.assert_called_once()
+
+    def test_pool_settings(self):
+        """Test pool limits and timeouts come from the environment."""
+        with patch.dict(os.environ, {
+            'OLLAMA_MAX_CONNECTIONS': '8',
+            'OLLAMA_KEEPALIVE_EXPIRY': '15',
+            'OLLAMA_CONNECT_TIMEOUT': '2',
+            'OLLAMA_READ_TIMEOUT': '120',
+        }), patch('api.services.core_service.ollama.AsyncClient') as mock:
+            service = CoreService()
+
+        assert service.pool_limits.max_connections == 8
+        assert service.pool_limits.max_keepalive_connections == 8
+        assert service.pool_limits.keepalive_expiry == 15
+        kwargs = mock.call_args.kwargs
+        assert kwargs['timeout'].connect == 2
+        assert kwargs['timeout'].read == 120
+        assert kwargs['transport'] is service.ollama_transport
 
     @pytest.mark.asyncio
     async def test_get_ollama_models(self, service):
@@ -80,6 +119,48 @@ class TestCoreService:
         prompt = service.get_system_prompt('invalid_mode')
         assert prompt == MODE_PROMPTS[AskMode.CONCISE]
 
+    def test_get_generation_options_defaults(self, service):
+        """Test every mode has a token cap by default."""
+        for mode in AskMode:
+            options = service.get_generation_options(mode)
+            assert options == MODE_OPTIONS[mode]
+            assert options['num_predict'] > 0
+        assert service.get_generation_options('invalid_mode') == \
+            MODE_OPTIONS[AskMode.CONCISE]
+
+    def test_get_generation_options_overrides(self, service):
+        """Test client overrides replace defaults within server limits."""
+        service.max_num_predict = 256
+        service.max_num_ctx = 4096
+        options = service.get_generation_options(
+            AskMode.CREATIVE,
+            {'num_predict': 5000, 'num_ctx': 100000, 'temperature': 0.1,
+             'stop': None},
+        )
+        assert options['num_predict'] == 256
+        assert options['num_ctx'] == 4096
+        assert options['temperature'] == 0.1
+        assert 'stop' not in options
+        # Defaults are not mutated
+        assert MODE_OPTIONS[AskMode.CREATIVE]['num_predict'] == 768
+
+    @pytest.mark.asyncio
+    async def test_generate_text_with_options(self, service):
+        """Test generation options are passed through to Ollama."""
+        service.async_ollama_client.generate = AsyncMock(
+            return_value={'response': 'ok'}
+        )
+
+        await service.generate_text(
+            'llama3.2', 'Test prompt', options={'num_predict': 32}
+        )
+
+        service.async_ollama_client.generate.assert_called_once_with(
+            model='llama3.2',
+            prompt='Test prompt',
+            options={'num_predict': 32}
+        )
+
     @pytest.mark.asyncio
     async def test_generate_text_basic(self, service):
         """Test text generation without system prompt."""
@@ -111,10 +192,38 @@ class TestCoreService:
         )
 
         assert result == mock_response
-        call_args = service.async_ollama_client.generate.call_args
-        assert call_args[1]['model'] == 'llama3.2'
-        assert 'System instruction' in call_args[1]['prompt']
-        assert 'Test prompt' in call_args[1]['prompt']
+        service.async_ollama_client.generate.assert_called_once_with(
+            model='llama3.2',
+            prompt='Test prompt',
+            system='System instruction'
+        )
+
+    @pytest.mark.asyncio
+    async def test_generate_text_sheds_when_saturated(self, service):
+        """Test generation is rejected when the concurrency limit is full."""
+        service.async_ollama_client.generate = AsyncMock()
+        limiter = service.concurrency_limiter
+        for _ in range(int(limiter.limit)):
+            limiter.try_acquire()
+
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await service.generate_text('llama3.2', 'Test prompt')
+        service.async_ollama_client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_generate_text_system_prompt_is_stable(self, service):
+        """Test same-mode requests share an identical system prefix."""
+        service.async_ollama_client.generate = AsyncMock(
+            return_value={'response': 'ok'}
+        )
+        system_prompt = service.get_system_prompt(AskMode.CONCISE)
+
+        await service.generate_text('llama3.2', 'First', system_prompt)
+        await service.generate_text('llama3.2', 'Second', system_prompt)
+
+        calls = service.async_ollama_client.generate.call_args_list
+        assert calls[0][1]['system'] == calls[1][1]['system']
+        assert calls[0][1]['prompt'] == 'First'
 
     def test_mode_prompts_exist(self):
         """Test that all mode prompts are defined."""
@@ -122,3 +231,79 @@ class TestCoreService:
             assert mode in MODE_PROMPTS
             assert isinstance(MODE_PROMPTS[mode], str)
             assert len(MODE_PROMPTS[mode]) > 0
+
+    @pytest.mark.asyncio
+    async def test_embed_texts(self, service):
+        """Test several texts are embedded with one Ollama call."""
+        service.async_ollama_client.embed = AsyncMock(
+            return_value={'embeddings': [[0.1, 0.2], [0.3, 0.4]]}
+        )
+
+        result = await service.embed_texts('nomic-embed-text', ['a', 'b'])
+
+        assert result == [[0.1, 0.2], [0.3, 0.4]]
+        service.async_ollama_client.embed.assert_called_once_with(
+            model='nomic-embed-text', input=['a', 'b']
+        )
+
+    @pytest.mark.asyncio
+    async def test_generate_text_unknown_model_fails_fast(self, service):
+        """Test a missing model is answered without asking Ollama again."""
+        service.async_ollama_client.generate = AsyncMock(
+            side_effect=ollama.ResponseError("model 'ghost' not found", 404)
+        )
+        limit = service.concurrency_limiter.limit
+
+        for _ in range(3):
+            with pytest.raises(ModelNotFound):
+                await service.generate_text('ghost', 'Test prompt')
+
+        service.async_ollama_client.generate.assert_awaited_once()
+        # A client error isn't congestion
+        assert service.concurrency_limiter.limit == limit
+
+    @pytest.mark.asyncio
+    async def test_generate_text_repeated_errors_fail_fast(self, service):
+        """Test a model that keeps failing stops reaching Ollama."""
+        service.async_ollama_client.generate = AsyncMock(
+            side_effect=ConnectionError('refused')
+        )
+        tracker = service.model_health
+        for _ in range(tracker.min_requests):
+            with pytest.raises(ConnectionError):
+                await service.generate_text('llama3.2', 'Test prompt')
+
+        with pytest.raises(ModelUnavailable):
+            await service.generate_text('llama3.2', 'Test prompt')
+        assert service.async_ollama_client.generate.await_count == (
+            tracker.min_requests
+        )
+
+    @pytest.mark.asyncio
+    async def test_model_list_change_clears_not_found(self, service):
+        """Test listing models after a pull makes the model usable."""
+        service.async_ollama_client.generate = AsyncMock(
+            side_effect=ollama.ResponseError("model 'ghost' not found", 404)
+        )
+        with pytest.raises(ModelNotFound):
+            await service.generate_text('ghost', 'Test prompt')
+
+        service.async_ollama_client.list = AsyncMock(
+            return_value=Mock(models=[Mock(model='ghost:latest')])
+        )
+        await service.get_ollama_models()
+        service.async_ollama_client.generate = AsyncMock(
+            return_value={'response': 'ok'}
+        )
+        assert await service.generate_text('ghost', 'Test prompt') == {
+            'response': 'ok'
+        }
+
+    @pytest.mark.asyncio
+    async def test_embed_texts_unknown_model(self, service):
+        """Test embedding with a missing model raises ModelNotFound."""
+        service.async_ollama_client.embed = AsyncMock(
+            side_effect=ollama.ResponseError("model 'ghost' not found", 404)
+        )
+        with pytest.raises(ModelNotFound):
+            await service.embed_texts('ghost', ['a'])
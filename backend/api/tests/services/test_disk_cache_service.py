@@ -0,0 +1,107 @@
+import pytest
+
+from api.services.disk_cache_service import DiskCacheService
+
+
+class TestDiskCacheService:
+    """Test suite for DiskCacheService."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Create a disk cache backed by a temporary file."""
+        service = DiskCacheService(
+            path=str(tmp_path / 'cache.db'), max_bytes=1000
+        )
+        yield service
+        service.close()
+
+    def test_disabled_without_path(self, monkeypatch):
+        """Test the tier is disabled when no path is configured."""
+        monkeypatch.delenv('DISK_CACHE_PATH', raising=False)
+        assert DiskCacheService().enabled is False
+
+    def test_initialization_with_env_vars(self, monkeypatch, tmp_path):
+        """Test initialization from environment variables."""
+        monkeypatch.setenv('DISK_CACHE_PATH', str(tmp_path / 'c.db'))
+        monkeypatch.setenv('DISK_CACHE_MAX_BYTES', '2048')
+        service = DiskCacheService()
+        assert service.enabled is True
+        assert service.max_bytes == 2048
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self, service):
+        """Test values round-trip through the disk tier."""
+        await service.set('llm:m:concise:abc', '{"response": "hi"}', 60)
+        assert await service.get('llm:m:concise:abc') == '{"response": "hi"}'
+        assert await service.get('llm:m:concise:missing') is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_dropped(self, service):
+        """Test expired entries are not returned."""
+        await service.set('llm:k', 'value', -1)
+        assert await service.get('llm:k') is None
+        assert service._total_bytes(service._conn) == 0
+
+    @pytest.mark.asyncio
+    async def test_persists_across_instances(self, service):
+        """Test entries survive reopening the database."""
+        await service.set('llm:k', 'value', 60)
+        service.close()
+        reopened = DiskCacheService(path=service.path)
+        assert await reopened.get('llm:k') == 'value'
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_size_bounded_eviction(self, service):
+        """Test least recently used entries are evicted over the bound."""
+        service.touch_interval = 0
+        await service.set('llm:first', 'x' * 400, 60)
+        await service.set('llm:second', 'x' * 400, 60)
+        await service.get('llm:first')  # Touch so second is LRU
+        await service.set('llm:third', 'x' * 400, 60)
+
+        assert service._total_bytes(service._conn) <= service.max_bytes
+        assert await service.get('llm:second') is None
+        assert await service.get('llm:first') is not None
+        assert await service.get('llm:third') is not None
+
+    @pytest.mark.asyncio
+    async def test_size_bound_is_shared_between_workers(self, service):
+        """Test writes through another connection count toward the bound."""
+        other = DiskCacheService(path=service.path, max_bytes=1000)
+        await other.set('llm:first', 'x' * 400, 60)
+        await other.set('llm:second', 'x' * 400, 60)
+        await service.set('llm:third', 'x' * 400, 60)
+        other.close()
+
+        assert service._total_bytes(service._conn) <= service.max_bytes
+        assert await service.get('llm:first') is None
+
+    @pytest.mark.asyncio
+    async def test_overwrite_keeps_total(self, service):
+        """Test replacing an entry adjusts the total by the difference."""
+        await service.set('llm:k', 'x' * 100, 60)
+        await service.set('llm:k', 'x' * 30, 60)
+
+        assert service._total_bytes(service._conn) == 30
+
+    @pytest.mark.asyncio
+    async def test_recent_reads_skip_recency_update(self, service):
+        """Test reads within the touch interval don't write."""
+        await service.set('llm:k', 'value', 60)
+        before = service._conn.total_changes
+        await service.get('llm:k')
+        await service.get('llm:k')
+
+        assert service._conn.total_changes == before
+
+    @pytest.mark.asyncio
+    async def test_clear(self, service):
+        """Test clearing entries by pattern."""
+        await service.set('llm:a', '1', 60)
+        await service.set('llm:b', '2', 60)
+        await service.set('other:c', '3', 60)
+
+        assert await service.clear('llm:*') == 2
+        assert await service.get('other:c') == '3'
+        assert service._total_bytes(service._conn) == 1
@@ -0,0 +1,142 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.cache_service import CacheService
+from api.services.embedding_service import EmbeddingService
+
+
+class FakeCore:
+    """Core service stand-in that records embed calls."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def embed_texts(self, model, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError('model not found')
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestEmbeddingService:
+    """Test suite for EmbeddingService."""
+
+    @pytest.fixture
+    def core(self):
+        """Create a fake core service."""
+        return FakeCore()
+
+    @pytest.fixture
+    def service(self, core, monkeypatch):
+        """Create an EmbeddingService on an in-memory cache."""
+        monkeypatch.setenv('EMBED_BATCH_WINDOW_MS', '5')
+        monkeypatch.setenv('EMBED_BATCH_MAX_SIZE', '4')
+        cache = CacheService(backend=MemoryBackend())
+        return EmbeddingService(core=core, cache=cache)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, service, core):
+        """Test requests within the window are sent in one batch."""
+        results = await asyncio.gather(
+            service.embed(['a'], 'm'),
+            service.embed(['bb'], 'm'),
+            service.embed(['ccc'], 'm'),
+        )
+        assert results == [[[1.0, 0.5]], [[2.0, 0.5]], [[3.0, 0.5]]]
+        assert core.calls == [['a', 'bb', 'ccc']]
+        assert service.get_metrics()['average_batch_size'] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_early(self, service, core):
+        """Test a batch is sent as soon as it reaches max_batch_size."""
+        service.batch_window = 10
+        texts = ['a', 'bb', 'ccc', 'dddd', 'eeeee']
+        task = asyncio.create_task(service.embed(texts, 'm'))
+        await asyncio.sleep(0.01)
+        assert core.calls == [['a', 'bb', 'ccc', 'dddd']]
+        task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_texts_are_embedded_once(self, service, core):
+        """Test identical pending texts share one batch slot."""
+        results = await asyncio.gather(
+            service.embed(['same', 'same'], 'm'),
+            service.embed(['same'], 'm'),
+        )
+        assert results == [[[4.0, 0.5], [4.0, 0.5]], [[4.0, 0.5]]]
+        assert core.calls == [['same']]
+
+    @pytest.mark.asyncio
+    async def test_cached_texts_skip_ollama(self, service, core):
+        """Test repeated texts are served from the cache."""
+        await service.embed(['a', 'bb'], 'm')
+        result = await service.embed(['bb', 'new'], 'm')
+        assert result == [[2.0, 0.5], [3.0, 0.5]]
+        assert core.calls == [['a', 'bb'], ['new']]
+
+    @pytest.mark.asyncio
+    async def test_on_miss_runs_only_when_texts_reach_ollama(
+        self, service, core
+    ):
+        """Test on_miss is awaited once per miss and skipped on hits."""
+        on_miss = AsyncMock()
+        await service.embed(['a', 'bb'], 'm', on_miss=on_miss)
+        await service.embed(['a', 'bb'], 'm', on_miss=on_miss)
+        on_miss.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_on_miss_error_skips_ollama(self, service, core):
+        """Test a failing on_miss stops texts from being sent."""
+        with pytest.raises(RuntimeError):
+            await service.embed(
+                ['a'], 'm', on_miss=AsyncMock(side_effect=RuntimeError)
+            )
+        assert core.calls == []
+
+    @pytest.mark.asyncio
+    async def test_models_are_batched_separately(self, service, core):
+        """Test texts for different models never share a call."""
+        await asyncio.gather(
+            service.embed(['a'], 'm1'), service.embed(['a'], 'm2')
+        )
+        assert core.calls == [['a'], ['a']]
+
+    @pytest.mark.asyncio
+    async def test_default_model(self, service, core):
+        """Test the configured model is used when none is given."""
+        calls = []
+
+        async def embed_texts(model, texts):
+            calls.append(model)
+            return [[0.0]] * len(texts)
+
+        core.embed_texts = embed_texts
+        await service.embed(['a'])
+        assert calls == [service.default_model]
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self, service):
+        """Test a failed batch fails all requests waiting on it."""
+        service.core = FakeCore(fail=True)
+        results = await asyncio.gather(
+            service.embed(['a'], 'm'),
+            service.embed(['b'], 'm'),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(
+        self, service, core
+    ):
+        """Test one cancelled request leaves shared futures intact."""
+        first = asyncio.create_task(service.embed(['a'], 'm'))
+        second = asyncio.create_task(service.embed(['a'], 'm'))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == [[1.0, 0.5]]
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from api.services.http_pool_service import InstrumentedTransport
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Serve keep-alive HTTP/1.1 responses after a short delay."""
+    async def handle(reader, writer):
+        try:
+            while await reader.readuntil(b'\r\n\r\n'):
+                await asyncio.sleep(0.02)
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n'
+                    b'Content-Type: application/json\r\n\r\n{}'
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f'http://127.0.0.1:{port}'
+    server.close()
+    await server.wait_closed()
+
+
+class TestInstrumentedTransport:
+    """Test suite for InstrumentedTransport."""
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, server):
+        """Test sequential requests share one kept-alive connection."""
+        transport = InstrumentedTransport(httpx.Limits(max_connections=4))
+        async with httpx.AsyncClient(
+            base_url=server, transport=transport
+        ) as client:
+            for _ in range(5):
+                assert (await client.get('/')).status_code == 200
+            metrics = transport.get_metrics()
+
+        assert metrics['requests'] == 5
+        assert metrics['connections_opened'] == 1
+        assert metrics['idle'] == 1
+        assert metrics['in_use'] == 0
+        assert metrics['waiting'] == 0
+
+    @pytest.mark.asyncio
+    async def test_in_use_until_body_closed(self, server):
+        """Test a streamed response holds its connection until closed."""
+        transport = InstrumentedTransport(httpx.Limits(max_connections=4))
+        async with httpx.AsyncClient(
+            base_url=server, transport=transport
+        ) as client:
+            async with client.stream('GET', '/') as response:
+                assert response.status_code == 200
+                during = transport.get_metrics()
+                await response.aread()
+            after = transport.get_metrics()
+
+        assert (during['in_use'], during['idle']) == (1, 0)
+        assert (after['in_use'], after['idle']) == (0, 1)
+        assert transport.get_metrics()['idle'] == 0  # Pool closed
+
+    @pytest.mark.asyncio
+    async def test_wait_time_when_pool_is_full(self, server):
+        """Test requests over the pool size wait for a connection."""
+        transport = InstrumentedTransport(httpx.Limits(max_connections=1))
+        async with httpx.AsyncClient(
+            base_url=server, transport=transport
+        ) as client:
+            await asyncio.gather(*(client.get('/') for _ in range(3)))
+            metrics = transport.get_metrics()
+
+        assert metrics['connections_opened'] == 1
+        # The third request waited for both earlier responses
+        assert metrics['wait_time_max'] >= 0.03
+        assert metrics['wait_time_avg'] == pytest.approx(
+            transport.wait_time_total / 3
+        )
+
+    @pytest.mark.asyncio
+    async def test_keeps_caller_trace(self, server):
+        """Test a trace extension set by the caller still gets events."""
+        events = []
+
+        async def trace(name, info):
+            events.append(name)
+
+        transport = InstrumentedTransport(httpx.Limits())
+        async with httpx.AsyncClient(
+            base_url=server, transport=transport
+        ) as client:
+            await client.get('/', extensions={'trace': trace})
+
+        assert 'connection.connect_tcp.complete' in events
+        assert transport.connections_opened == 1
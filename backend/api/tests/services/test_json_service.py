@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from unittest.mock import patch
+
+from api.services import json_service
+
+
+PAYLOAD = {
+    'model': 'llama3.2',
+    'response': 'Café — naïve ☕',
+    'done': True,
+    'route': None,
+    'counts': [1, 2.5],
+}
+
+
+class TestJsonService:
+    """Test suite for the shared JSON serializer."""
+
+    @pytest.fixture(params=['fast', 'stdlib'])
+    def encoder(self, request):
+        """Run each test with and without orjson."""
+        if request.param == 'fast' and not json_service.FAST_JSON:
+            pytest.skip('orjson is not installed')
+        if request.param == 'stdlib':
+            with patch.object(json_service, 'orjson', None):
+                yield request.param
+        else:
+            yield request.param
+
+    def test_dumps_is_compact_utf8(self, encoder):
+        """Test output has no whitespace and unescaped UTF-8."""
+        data = json_service.dumps(PAYLOAD)
+        assert isinstance(data, bytes)
+        assert data == json.dumps(
+            PAYLOAD, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+
+    def test_dumps_str_matches_dumps(self, encoder):
+        """Test the text form is the decoded byte form."""
+        assert json_service.dumps_str(PAYLOAD) == (
+            json_service.dumps(PAYLOAD).decode()
+        )
+
+    def test_loads_round_trip(self, encoder):
+        """Test text and bytes decode back to the value."""
+        assert json_service.loads(json_service.dumps(PAYLOAD)) == PAYLOAD
+        assert json_service.loads(json_service.dumps_str(PAYLOAD)) == (
+            PAYLOAD
+        )
+
+    def test_loads_invalid(self, encoder):
+        """Test invalid JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            json_service.loads('{"model":')
+
+    def test_dumps_unserializable(self, encoder):
+        """Test unsupported values raise TypeError."""
+        with pytest.raises(TypeError):
+            json_service.dumps({'value': object()})
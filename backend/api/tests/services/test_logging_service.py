@@ -0,0 +1,240 @@
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from api.services.config_service import Settings
+from api.services.logging_service import (
+    ACCESS_LOGGER, GENERATION_LOGGER, DroppingQueueHandler, JsonFormatter,
+    LogService, SamplingFilter, log_access, log_generation,
+)
+
+
+def _record(name=ACCESS_LOGGER, level=logging.INFO, msg='request',
+            args=None, fields=None, exc_info=None):
+    record = logging.LogRecord(
+        name, level, __file__, 1, msg, args, exc_info
+    )
+    if fields is not None:
+        record.fields = fields
+    return record
+
+
+class TestJsonFormatter:
+    """Test suite for JsonFormatter."""
+
+    def test_formats_fields(self):
+        """Test fields are merged into one JSON line."""
+        line = JsonFormatter().format(_record(
+            msg='hello %s', args=('world',),
+            fields={'status': 200, 'model': 'Café'},
+        ))
+        entry = json.loads(line)
+        assert entry['message'] == 'hello world'
+        assert entry['level'] == 'INFO'
+        assert entry['logger'] == ACCESS_LOGGER
+        assert entry['status'] == 200
+        assert entry['model'] == 'Café'
+        assert '\n' not in line
+
+    def test_formats_plain_extra(self):
+        """Test keys passed directly as `extra` are kept too."""
+        logger = logging.getLogger('api.test')
+        record = logger.makeRecord(
+            logger.name, logging.INFO, __file__, 1, 'routed', (), None,
+            extra={'route_tier': 'small', 'when': object},
+        )
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['route_tier'] == 'small'
+        assert entry['when'] == str(object)
+        assert 'args' not in entry and 'lineno' not in entry
+
+    def test_formats_exceptions(self):
+        """Test tracebacks are kept in the JSON line."""
+        try:
+            raise RuntimeError('boom')
+        except RuntimeError:
+            import sys
+            record = _record(level=logging.ERROR, exc_info=sys.exc_info())
+        entry = json.loads(JsonFormatter().format(record))
+        assert 'RuntimeError: boom' in entry['exc_info']
+
+
+class TestDroppingQueueHandler:
+    """Test suite for DroppingQueueHandler."""
+
+    def test_drops_when_full(self):
+        """Test a full queue drops records without blocking."""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+        for _ in range(5):
+            handler.handle(_record())
+        assert handler.queued == 2
+        assert handler.dropped == 3
+
+    def test_prepare_leaves_fields(self):
+        """Test records are queued with their message resolved."""
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            raise ValueError('bad')
+        except ValueError:
+            import sys
+            handler.handle(_record(
+                msg='%d items', args=(3,), fields={'status': 500},
+                exc_info=sys.exc_info(),
+            ))
+        record = handler.queue.get_nowait()
+        assert record.msg == '3 items'
+        assert record.args is None
+        assert record.exc_info is None
+        assert 'ValueError: bad' in record.exc_text
+        assert record.fields == {'status': 500}
+
+
+class TestSamplingFilter:
+    """Test suite for SamplingFilter."""
+
+    def test_samples_routine_records(self):
+        """Test only routine records of sampled loggers are dropped."""
+        sampler = SamplingFilter(
+            {ACCESS_LOGGER: 0.0, GENERATION_LOGGER: 1.0}, 1.0
+        )
+        ok = {'status': 200, 'duration_ms': 5}
+        assert not sampler.filter(_record(fields=ok))
+        assert sampler.filter(_record(GENERATION_LOGGER, fields=ok))
+        assert sampler.filter(_record('api.services.x', fields=ok))
+        assert sampler.filter(_record(fields={'status': 503}))
+        assert sampler.filter(_record(fields={'duration_ms': 1500}))
+        assert sampler.filter(_record(level=logging.WARNING, fields=ok))
+        assert sampler.sampled_out == 1
+
+    def test_sample_rate(self):
+        """Test a fractional rate keeps roughly that share."""
+        sampler = SamplingFilter({ACCESS_LOGGER: 0.25}, 1.0)
+        kept = sum(
+            sampler.filter(_record(fields={'status': 200}))
+            for _ in range(4000)
+        )
+        assert 700 < kept < 1300
+
+
+class TestLogService:
+    """Test suite for LogService."""
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        """Path of the log file."""
+        return tmp_path / 'api.log'
+
+    @pytest.fixture
+    def service(self, log_path):
+        """Create a started log service writing to a file."""
+        service = LogService(settings=Settings(
+            log_path=str(log_path), log_access_sample_rate=1.0,
+        ))
+        service.start()
+        yield service
+        service.close()
+
+    def _lines(self, service, log_path):
+        service.close()
+        return [json.loads(line) for line in log_path.read_text(
+            encoding='utf-8'
+        ).splitlines()]
+
+    def test_invalid_level(self):
+        """Test an unknown LOG_LEVEL is rejected."""
+        with pytest.raises(ValueError, match='Invalid log level'):
+            LogService(settings=Settings(log_level='chatty'))
+
+    def test_writes_access_and_generation(self, service, log_path):
+        """Test records are written as JSON lines by the thread."""
+        log_access(
+            'POST', '/v1/chats/ask', '/v1/chats/ask', 200, 0.0123,
+            'MISS', '10.0.0.1', 'llama3.2', 'concise',
+        )
+        log_generation(
+            'llama3.2', 'concise',
+            {'prompt_eval_count': 12, 'eval_count': 34,
+             'total_duration': 2_500_000_000},
+            2.6, {'tier': 'medium', 'model': 'llama3.2'},
+        )
+        logging.getLogger('api.services.test').warning('careful')
+
+        access, generation, warning = self._lines(service, log_path)
+        assert access['logger'] == ACCESS_LOGGER
+        assert access['route'] == '/v1/chats/ask'
+        assert access['status'] == 200
+        assert access['duration_ms'] == 12.3
+        assert access['cache'] == 'MISS'
+        assert access['model'] == 'llama3.2'
+        assert access['mode'] == 'concise'
+        assert generation['prompt_tokens'] == 12
+        assert generation['completion_tokens'] == 34
+        assert generation['ollama_duration_ms'] == 2500
+        assert generation['tier'] == 'medium'
+        assert warning['level'] == 'WARNING'
+        assert warning['message'] == 'careful'
+
+    def test_writes_off_the_calling_thread(self, service, log_path):
+        """Test the sink is written from the listener thread."""
+        threads = []
+        sink = service._listener.handlers[0]
+        emit = sink.emit
+        sink.emit = lambda record: (
+            threads.append(threading.get_ident()), emit(record)
+        )
+        log_access('GET', '/v1/', '/v1/', 200, 0.001)
+        service.close()
+        assert threads and threading.get_ident() not in threads
+
+    def test_close_restores_logger(self, service):
+        """Test closing removes the handler and restores propagation."""
+        logger = logging.getLogger('api')
+        handler = service._handler
+        assert handler in logger.handlers
+        assert not logger.propagate
+        service.close()
+        assert logger.propagate
+        assert logger.level == logging.NOTSET
+        assert handler not in logger.handlers
+        assert not service.running
+
+    def test_metrics(self, service):
+        """Test queue counters are reported."""
+        log_access('GET', '/v1/', '/v1/', 200, 0.001)
+        metrics = service.get_metrics()
+        assert metrics['running']
+        assert metrics['queued'] == 1
+        assert metrics['dropped'] == 0
+        assert LogService(settings=Settings()).get_metrics() == {
+            'running': False
+        }
+
+    def test_sampled_access_logs(self, log_path):
+        """Test LOG_ACCESS_SAMPLE_RATE drops routine requests only."""
+        service = LogService(settings=Settings(
+            log_path=str(log_path), log_access_sample_rate=0.0,
+        ))
+        service.start()
+        log_access('GET', '/v1/', '/v1/', 200, 0.001)
+        log_access('GET', '/v1/', '/v1/', 500, 0.001)
+
+        [line] = self._lines(service, log_path)
+        assert line['status'] == 500
+        assert service.get_metrics()['sampled_out'] == 1
+
+    def test_disabled_loggers_skip_records(self):
+        """Test nothing is built when INFO isn't enabled."""
+        logger = logging.getLogger(ACCESS_LOGGER)
+        previous = logger.level
+        logger.setLevel(logging.WARNING)
+        try:
+            handler = DroppingQueueHandler(queue.Queue())
+            logger.addHandler(handler)
+            log_access('GET', '/v1/', '/v1/', 200, 0.001)
+            assert handler.queued == 0
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(previous)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from api.services.config_service import Settings
+from api.services.loop_monitor_service import EventLoopMonitor
+
+
+def _block(seconds: float) -> None:
+    """Stand in for a blocking call made on the event loop."""
+    time.sleep(seconds)
+
+
+class TestEventLoopMonitor:
+    """Test suite for EventLoopMonitor."""
+
+    @pytest.fixture
+    def monitor(self):
+        """Create a monitor with a short interval and threshold."""
+        return EventLoopMonitor(settings=Settings(
+            loop_monitor_interval_ms=10, loop_slow_callback_ms=50,
+            loop_lag_window=100,
+        ))
+
+    def test_percentiles(self, monitor):
+        """Test lag percentiles over recorded samples."""
+        metrics = monitor.get_metrics()
+        assert metrics['samples'] == 0
+        assert metrics['lag_p99_ms'] is None
+
+        for lag_ms in range(1, 101):
+            monitor.record(lag_ms / 1000)
+
+        metrics = monitor.get_metrics()
+        assert metrics['samples'] == 100
+        assert metrics['lag_p50_ms'] == 50
+        assert metrics['lag_p95_ms'] == 95
+        assert metrics['lag_p99_ms'] == 99
+        assert metrics['lag_max_ms'] == 100
+        assert metrics['lag_max_since_start_ms'] == 100
+
+    def test_window_and_clamp(self, monitor):
+        """Test old samples leave the window and early wakeups count 0."""
+        for _ in range(150):
+            monitor.record(0.5)
+        monitor.record(-0.001)
+
+        metrics = monitor.get_metrics()
+        assert metrics['samples'] == 100
+        assert metrics['lag_p50_ms'] == 500
+        assert min(monitor._lags) == 0
+
+    def test_disabled(self):
+        """Test an interval of 0 disables the monitor."""
+        monitor = EventLoopMonitor(
+            settings=Settings(loop_monitor_interval_ms=0)
+        )
+        assert not monitor.enabled
+
+    @pytest.mark.asyncio
+    async def test_disabled_start_is_noop(self):
+        """Test a disabled monitor doesn't start a heartbeat."""
+        monitor = EventLoopMonitor(
+            settings=Settings(loop_monitor_interval_ms=0)
+        )
+        monitor.start()
+        assert not monitor.running
+        await monitor.stop()
+
+    @pytest.mark.asyncio
+    async def test_measures_lag(self, monitor):
+        """Test the heartbeat records lag caused by blocking."""
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            _block(0.1)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        metrics = monitor.get_metrics()
+        assert metrics['samples'] > 1
+        assert metrics['lag_max_ms'] >= 50
+        assert not metrics['running']
+
+    @pytest.mark.asyncio
+    async def test_logs_blocking_stack(self, monitor, caplog):
+        """Test a stall is logged once with the blocking stack."""
+        caplog.set_level(logging.WARNING)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            _block(0.2)
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+
+        assert monitor.slow_callbacks == 1
+        [record] = [
+            record for record in caplog.records
+            if 'Event loop blocked' in record.getMessage()
+        ]
+        assert '_block' in record.getMessage()
+        assert 'test_loop_monitor_service.py' in record.getMessage()
+
+    @pytest.mark.asyncio
+    async def test_start_twice(self, monitor):
+        """Test starting a running monitor keeps one heartbeat."""
+        monitor.start()
+        task = monitor._task
+        monitor.start()
+        assert monitor._task is task
+        await monitor.stop()
+        assert not monitor.running
@@ -0,0 +1,145 @@
+import pytest
+import ollama
+from unittest.mock import patch
+
+from api.services.model_health_service import (
+    ModelHealthTracker, ModelNotFound, ModelUnavailable, ModelUnsupported
+)
+
+
+NOT_FOUND = ollama.ResponseError("model 'ghost' not found", 404)
+UNSUPPORTED = ollama.ResponseError(
+    '"nomic-embed-text" does not support generate', 400
+)
+
+
+class TestModelHealthTracker:
+    """Test suite for ModelHealthTracker."""
+
+    @pytest.fixture
+    def tracker(self):
+        """Create a tracker with explicit settings."""
+        return ModelHealthTracker(
+            negative_ttl=30, error_window=30, min_requests=4,
+            error_threshold=0.5, cooldown=10,
+        )
+
+    @pytest.fixture
+    def clock(self):
+        """Control the tracker's monotonic clock."""
+        now = [1000.0]
+        with patch(
+            'api.services.model_health_service.time.monotonic',
+            side_effect=lambda: now[0],
+        ):
+            yield now
+
+    def test_not_found_is_negative_cached(self, tracker, clock):
+        """Test a missing model fails fast until the entry expires."""
+        error = tracker.record_failure('ghost', NOT_FOUND)
+        assert isinstance(error, ModelNotFound)
+        with pytest.raises(ModelNotFound):
+            tracker.check('ghost')
+        assert tracker.fast_failed == 1
+
+        clock[0] += 31
+        tracker.check('ghost')
+
+    def test_unsupported_is_negative_cached(self, tracker, clock):
+        """Test a model that can't serve the request fails fast."""
+        error = tracker.record_failure('nomic-embed-text', UNSUPPORTED)
+        assert isinstance(error, ModelUnsupported)
+        with pytest.raises(ModelUnsupported):
+            tracker.check('nomic-embed-text')
+
+    def test_other_errors_are_not_negative_cached(self, tracker, clock):
+        """Test transient errors pass through unchanged."""
+        error = ConnectionError('refused')
+        assert tracker.record_failure('llama3.2', error) is error
+        tracker.check('llama3.2')
+
+    def test_model_list_change_clears_not_found(self, tracker, clock):
+        """Test pulling a model clears its not-found entry at once."""
+        tracker.update_models(['llama3.2'])
+        tracker.record_failure('ghost', NOT_FOUND)
+        tracker.record_failure('nomic-embed-text', UNSUPPORTED)
+
+        tracker.update_models(['llama3.2'])
+        with pytest.raises(ModelNotFound):
+            tracker.check('ghost')
+
+        tracker.update_models(['llama3.2', 'ghost'])
+        tracker.check('ghost')
+        with pytest.raises(ModelUnsupported):
+            tracker.check('nomic-embed-text')
+
+    def test_error_rate_opens_breaker(self, tracker, clock):
+        """Test a high error rate fails the model fast."""
+        tracker.record_success('llama3.2')
+        tracker.record_success('llama3.2')
+        tracker.record_failure('llama3.2', TimeoutError())
+        tracker.check('llama3.2')
+        tracker.record_failure('llama3.2', TimeoutError())
+
+        with pytest.raises(ModelUnavailable) as exc:
+            tracker.check('llama3.2')
+        assert exc.value.retry_after == 10
+        tracker.check('mistral')
+        assert tracker.get_metrics()['open'] == {'llama3.2': 10}
+
+    def test_errors_below_min_requests_dont_open(self, tracker, clock):
+        """Test a few errors aren't enough to judge the model."""
+        for _ in range(3):
+            tracker.record_failure('llama3.2', TimeoutError())
+        tracker.check('llama3.2')
+
+    def test_old_outcomes_leave_the_window(self, tracker, clock):
+        """Test errors older than the window don't count."""
+        for _ in range(3):
+            tracker.record_failure('llama3.2', TimeoutError())
+        clock[0] += 31
+        tracker.record_failure('llama3.2', TimeoutError())
+        tracker.check('llama3.2')
+
+    def test_probe_success_closes_breaker(self, tracker, clock):
+        """Test one probe is let through after the cooldown."""
+        for _ in range(4):
+            tracker.record_failure('llama3.2', TimeoutError())
+        clock[0] += 10
+
+        tracker.check('llama3.2')
+        with pytest.raises(ModelUnavailable):
+            tracker.check('llama3.2')
+        tracker.record_success('llama3.2')
+        tracker.check('llama3.2')
+        assert tracker.get_metrics()['open'] == {}
+
+    def test_probe_failure_reopens_breaker(self, tracker, clock):
+        """Test a failed probe keeps the model failing fast."""
+        for _ in range(4):
+            tracker.record_failure('llama3.2', TimeoutError())
+        clock[0] += 10
+        tracker.check('llama3.2')
+        tracker.record_failure('llama3.2', TimeoutError())
+
+        clock[0] += 5
+        with pytest.raises(ModelUnavailable):
+            tracker.check('llama3.2')
+
+    def test_lost_probe_is_replaced(self, tracker, clock):
+        """Test a probe that never reports back stops blocking."""
+        for _ in range(4):
+            tracker.record_failure('llama3.2', TimeoutError())
+        clock[0] += 10
+        tracker.check('llama3.2')
+        clock[0] += 11
+        tracker.check('llama3.2')
+
+    def test_metrics(self, tracker, clock):
+        """Test metrics list negative entries and fast failures."""
+        tracker.record_failure('ghost', NOT_FOUND)
+        with pytest.raises(ModelNotFound):
+            tracker.check('ghost')
+        assert tracker.get_metrics() == {
+            'negative': ['ghost'], 'open': {}, 'fast_failed': 1,
+        }
@@ -0,0 +1,178 @@
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from api.services import profiling_service
+from api.services.config_service import Settings
+from api.services.profiling_service import ProfilerBusy, ProfilingService
+
+
+def _burn(seconds: float) -> None:
+    """Keep the CPU busy so the profilers have something to record."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+@pytest.fixture(autouse=True)
+def _no_other_profiler():
+    """Skip when a coverage or debug tool already holds the hook."""
+    if sys.getprofile() is not None:
+        pytest.skip('another profiler is active')
+
+
+class TestProfilingService:
+    """Test suite for ProfilingService."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a profiling service with admin access enabled."""
+        return ProfilingService(settings=Settings(
+            admin_token='secret', profile_max_seconds=1,
+            profile_sample_interval_ms=1, profile_history=2,
+        ))
+
+    def test_authorize(self, service):
+        """Test admin tokens are checked and required."""
+        assert service.enabled
+        assert service.authorize('secret')
+        assert not service.authorize('wrong')
+        assert not service.authorize(None)
+
+        disabled = ProfilingService(settings=Settings())
+        assert not disabled.enabled
+        assert not disabled.authorize('')
+
+    @pytest.mark.asyncio
+    async def test_profile_cpu(self, service):
+        """Test loop work during the window shows up in pstats."""
+        async def work():
+            await asyncio.sleep(0.01)
+            _burn(0.05)
+
+        task = asyncio.create_task(work())
+        report = await service.profile_cpu(0.1, sort='tottime')
+        await task
+        assert '_burn' in report
+        assert 'function calls' in report
+        assert not service.busy
+
+    @pytest.mark.asyncio
+    async def test_profile_cpu_rejects_unknown_sort(self, service):
+        """Test unknown sort keys raise ValueError before profiling."""
+        with pytest.raises(ValueError):
+            await service.profile_cpu(0.01, sort='bogus')
+        assert not service.busy
+
+    @pytest.mark.asyncio
+    async def test_profile_cpu_window_is_capped(self, service):
+        """Test windows are capped at PROFILE_MAX_SECONDS."""
+        start = time.perf_counter()
+        await service.profile_cpu(60)
+        assert time.perf_counter() - start < 5
+
+    @pytest.mark.asyncio
+    async def test_profile_cpu_formats_off_loop(self, service, monkeypatch):
+        """Test the report is formatted outside the event loop thread."""
+        format_stats = profiling_service._format_stats
+        threads = []
+
+        def recording_format(*args):
+            threads.append(threading.get_ident())
+            return format_stats(*args)
+
+        monkeypatch.setattr(
+            profiling_service, '_format_stats', recording_format
+        )
+        await service.profile_cpu(0.01)
+
+        assert threads and threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_sample_stacks_collapsed(self, service):
+        """Test sampled stacks of other threads are collapsed."""
+        worker = threading.Thread(
+            target=_burn, args=(0.3,), name='burner'
+        )
+        worker.start()
+        report = await service.sample_stacks(0.1)
+        worker.join()
+
+        lines = report.splitlines()
+        assert lines
+        burner = [line for line in lines if line.startswith('burner;')]
+        assert burner
+        stack, count = burner[0].rsplit(' ', 1)
+        assert int(count) > 0
+        assert '_burn (test_profiling_service.py:' in stack
+
+    @pytest.mark.asyncio
+    async def test_profile_memory(self, service):
+        """Test allocations made during the window are reported."""
+        kept = []
+
+        async def allocate():
+            await asyncio.sleep(0.01)
+            kept.append([bytearray(1024) for _ in range(1000)])
+
+        task = asyncio.create_task(allocate())
+        snapshot = await service.profile_memory(0.05, limit=5)
+        await task
+
+        assert snapshot['traced_peak_bytes'] >= 1024 * 1000
+        top = snapshot['top'][0]
+        assert top['file'].endswith('test_profiling_service.py')
+        assert top['size_bytes'] >= 1024 * 1000
+        assert len(snapshot['top']) <= 5
+
+    @pytest.mark.asyncio
+    async def test_profile_memory_snapshot_off_loop(
+        self, service, monkeypatch
+    ):
+        """Test the snapshot is taken outside the event loop thread."""
+        take_snapshot = tracemalloc.take_snapshot
+        threads = []
+
+        def recording_snapshot():
+            threads.append(threading.get_ident())
+            return take_snapshot()
+
+        monkeypatch.setattr(tracemalloc, 'take_snapshot', recording_snapshot)
+        await service.profile_memory(0.01)
+
+        assert threads and threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_one_profile_at_a_time(self, service):
+        """Test overlapping profiles are rejected."""
+        running = asyncio.create_task(service.profile_cpu(0.1))
+        await asyncio.sleep(0)
+        assert service.busy
+        with pytest.raises(ProfilerBusy):
+            await service.profile_memory(0.01)
+        assert service.start_request_profile() is None
+        await running
+        assert not service.busy
+
+    @pytest.mark.asyncio
+    async def test_request_profile_history(self, service):
+        """Test request reports are kept up to PROFILE_HISTORY."""
+        ids = []
+        for _ in range(3):
+            profiler = service.start_request_profile()
+            assert service.busy
+            _burn(0.001)
+            ids.append(
+                await service.finish_request_profile(profiler, 'POST /ask')
+            )
+            assert not service.busy
+
+        assert service.get_request_profile(ids[0]) is None
+        report = service.get_request_profile(ids[2])
+        assert report.startswith('POST /ask\n')
+        assert '_burn' in report
+        assert service.get_request_profile('unknown') is None
@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.rate_limit_service import (
+    LeasedRateLimiter, RateLimitExceeded
+)
+
+
+class TestLeasedRateLimiter:
+    """Test suite for LeasedRateLimiter."""
+
+    @pytest.fixture
+    def backend(self):
+        """Create a shared counter store."""
+        return MemoryBackend()
+
+    def _limiter(self, backend, **kwargs):
+        options = {
+            'max_requests': 10, 'window': 60,
+            'lease_size': 3, 'lease_ttl': 5.0,
+        }
+        options.update(kwargs)
+        return LeasedRateLimiter(backend, **options)
+
+    async def _window_count(self, limiter, backend, identifier='client'):
+        window = int(time.time() // limiter.window)
+        value = await backend.get(limiter._key(identifier, window))
+        return int(value or 0)
+
+    @pytest.mark.asyncio
+    async def test_one_round_trip_per_lease(self, backend):
+        """Test requests within a lease are decided locally."""
+        limiter = self._limiter(backend)
+        backend.incr = AsyncMock(wraps=backend.incr)
+        for _ in range(3):
+            assert (await limiter.check('client'))[0]
+            await limiter.consume('client')
+        assert limiter.lease_requests == 1
+        assert backend.incr.await_count == 1
+        assert await self._window_count(limiter, backend) == 3
+
+    @pytest.mark.asyncio
+    async def test_check_reserves_no_quota(self, backend):
+        """Test checks alone never lease from the shared counter."""
+        limiter = self._limiter(backend)
+        for _ in range(5):
+            assert await limiter.check('client') == (True, 0)
+        assert limiter.lease_requests == 0
+        assert await self._window_count(limiter, backend) == 0
+
+    @pytest.mark.asyncio
+    async def test_check_reads_window_count(self, backend):
+        """Test a worker without a lease sees other workers' quota."""
+        other = self._limiter(backend, max_requests=3)
+        await other.consume('client')
+        limiter = self._limiter(backend, max_requests=3)
+        assert await limiter.check('client') == (False, 3)
+
+    @pytest.mark.asyncio
+    async def test_sweep_keeps_held_lock(self, backend):
+        """Test a sweep during a lease doesn't lease or return twice."""
+        limiter = self._limiter(backend, lease_ttl=0.1)
+        await limiter.consume('client')
+        time.sleep(0.11)
+        incr = backend.incr
+
+        async def slow_incr(key, amount=1):
+            await asyncio.sleep(0.005)
+            return await incr(key, amount)
+
+        backend.incr = slow_incr
+        await asyncio.gather(
+            limiter.consume('client'),
+            limiter._sweep(time.time()),
+            limiter.consume('client'),
+        )
+        assert limiter.lease_requests == 2
+        # Old lease returned 2 once, new lease took 3 and used 2
+        backend.incr = incr
+        assert await self._window_count(limiter, backend) == 4
+
+    @pytest.mark.asyncio
+    async def test_global_limit_across_workers(self, backend):
+        """Test workers sharing a store never exceed the limit."""
+        workers = [self._limiter(backend) for _ in range(3)]
+        allowed = 0
+        for i in range(30):
+            worker = workers[i % 3]
+            is_allowed, _ = await worker.check('client')
+            if is_allowed:
+                await worker.consume('client')
+                allowed += 1
+        assert allowed <= 10
+        # Rejections happen at most lease_size per other worker early
+        assert allowed >= 10 - 3 * 2
+
+    @pytest.mark.asyncio
+    async def test_exhausted_window_is_rejected_locally(self, backend):
+        """Test a client over the limit doesn't cost a round trip."""
+        limiter = self._limiter(backend, max_requests=4, lease_size=3)
+        for _ in range(4):
+            await limiter.consume('client')
+        assert not (await limiter.check('client'))[0]
+        trips = limiter.lease_requests
+        for _ in range(5):
+            assert not (await limiter.check('client'))[0]
+        assert limiter.lease_requests == trips
+
+    @pytest.mark.asyncio
+    async def test_partial_grant_is_returned_to_limit(self, backend):
+        """Test a lease past the limit only keeps what is left."""
+        limiter = self._limiter(backend, max_requests=4, lease_size=3)
+        await limiter.consume('client')
+        await limiter.consume('client')
+        await limiter.consume('client')
+        await limiter.consume('client')
+        assert await self._window_count(limiter, backend) == 4
+
+    @pytest.mark.asyncio
+    async def test_consume_rejects_without_quota(self, backend):
+        """Test requests that passed check together can't overshoot."""
+        limiter = self._limiter(backend, max_requests=4, lease_size=3)
+        checks = [await limiter.check('client') for _ in range(6)]
+        assert all(is_allowed for is_allowed, _ in checks)
+        for _ in range(4):
+            await limiter.consume('client')
+        with pytest.raises(RateLimitExceeded, match='Max 4 requests'):
+            await limiter.consume('client')
+        assert await self._window_count(limiter, backend) == 4
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_returns_unused_quota(self, backend):
+        """Test unused quota goes back when a lease expires."""
+        limiter = self._limiter(backend, lease_ttl=0.01)
+        await limiter.consume('client')
+        assert await self._window_count(limiter, backend) == 3
+        time.sleep(0.02)
+        await limiter.consume('client')
+        # Old lease returned 2, new lease took 3 and used 1
+        assert await self._window_count(limiter, backend) == 4
+
+    @pytest.mark.asyncio
+    async def test_sweep_releases_idle_clients(self, backend):
+        """Test leases of clients that went quiet are swept."""
+        limiter = self._limiter(backend, lease_ttl=0.01)
+        await limiter.consume('idle')
+        time.sleep(0.02)
+        await limiter.consume('active')
+        assert 'idle' not in limiter._leases
+        assert await self._window_count(limiter, backend, 'idle') == 1
+
+    @pytest.mark.asyncio
+    async def test_release_all(self, backend):
+        """Test shutdown gives back every unused lease."""
+        limiter = self._limiter(backend)
+        await limiter.consume('a')
+        await limiter.consume('b')
+        await limiter.release_all()
+        assert await self._window_count(limiter, backend, 'a') == 1
+        assert await self._window_count(limiter, backend, 'b') == 1
+
+    @pytest.mark.asyncio
+    async def test_lease_ends_with_window(self, backend):
+        """Test a lease never outlives its window."""
+        limiter = self._limiter(backend, window=60, lease_ttl=3600)
+        with patch(
+            'api.services.rate_limit_service.time.time', return_value=119.0
+        ):
+            await limiter.consume('client')
+        assert limiter._leases['client']['expires_at'] == 120
+
+    def test_metrics(self, backend):
+        """Test metrics report the leasing mode and counters."""
+        metrics = self._limiter(backend).get_metrics()
+        assert metrics['mode'] == 'leased'
+        assert metrics['lease_requests'] == 0
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from api.services.routing_service import RoutingService
+
+
+class TestRoutingService:
+    """Test suite for RoutingService."""
+
+    @pytest.fixture
+    def core(self):
+        """Create a mocked core service."""
+        core = Mock()
+        core.generate_text = AsyncMock()
+        core.async_ollama_client.generate = AsyncMock(
+            return_value={'response': 'simple'}
+        )
+        return core
+
+    @pytest.fixture
+    def service(self, core, monkeypatch):
+        """Create a RoutingService with fixed tiers and no judge."""
+        monkeypatch.setenv('MODEL_TIER_SMALL', 'tiny')
+        monkeypatch.setenv('MODEL_TIER_MEDIUM', 'mid')
+        monkeypatch.setenv('MODEL_TIER_LARGE', 'big')
+        monkeypatch.delenv('MODEL_ROUTER_JUDGE', raising=False)
+        return RoutingService(core=core)
+
+    def test_short_factual_question_is_small(self, service):
+        """Test short factual questions go to the small tier."""
+        tier, _, confident = service.classify('What is AI?', 'concise')
+        assert tier == 'small'
+        assert confident
+
+    def test_long_prompt_is_large(self, service):
+        """Test prompts over the long threshold go to the large tier."""
+        prompt = 'x' * (service.long_prompt_chars + 1)
+        assert service.classify(prompt, 'concise')[0] == 'large'
+
+    def test_complex_keywords_are_large(self, service):
+        """Test several reasoning keywords go to the large tier."""
+        tier, _, _ = service.classify(
+            'Explain and compare these two sorting algorithms', 'concise'
+        )
+        assert tier == 'large'
+
+    def test_code_block_is_large(self, service):
+        """Test prompts containing code go to the large tier."""
+        prompt = 'Fix this:\n```\nprint(1\n```'
+        assert service.classify(prompt, 'concise')[0] == 'large'
+
+    def test_demanding_mode_skips_small(self, service):
+        """Test professional and creative modes use at least medium."""
+        assert service.classify('What is AI?', 'creative')[0] == 'medium'
+
+    def test_single_keyword_is_not_confident(self, service):
+        """Test a single reasoning keyword is left for the judge."""
+        tier, _, confident = service.classify('Why is it blue?', 'concise')
+        assert tier == 'medium'
+        assert not confident
+
+    @pytest.mark.asyncio
+    async def test_route_picks_highest_tier_across_modes(self, service):
+        """Test fan-out requests use the most demanding mode's tier."""
+        decision = await service.route(
+            'What is AI?', ['concise', 'professional']
+        )
+        assert decision['tier'] == 'medium'
+        assert decision['model'] == 'mid'
+
+    @pytest.mark.asyncio
+    async def test_route_without_judge_uses_heuristics(self, service, core):
+        """Test the judge is not called when none is configured."""
+        decision = await service.route('Why is it blue?', ['concise'])
+        assert decision['tier'] == 'medium'
+        core.async_ollama_client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_route_consults_judge_when_unsure(self, service, core):
+        """Test the judge decides prompts the heuristics can't place."""
+        service.judge_model = 'judge'
+        decision = await service.route('Why is it blue?', ['concise'])
+        assert decision == {
+            'tier': 'small', 'model': 'tiny', 'reason': 'judge (judge)',
+        }
+        kwargs = core.async_ollama_client.generate.call_args.kwargs
+        assert kwargs['model'] == 'judge'
+        assert kwargs['options']['num_predict'] == 3
+        # Judge calls bypass the adaptive limiter
+        core.generate_text.assert_not_called()
+        core.model_health.check.assert_called_once_with('judge')
+        core.model_health.record_success.assert_called_once_with('judge')
+
+    @pytest.mark.asyncio
+    async def test_route_skips_judge_when_confident(self, service, core):
+        """Test confident heuristic decisions don't call the judge."""
+        service.judge_model = 'judge'
+        await service.route('What is AI?', ['concise'])
+        core.async_ollama_client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_judge_failure_falls_back(self, service, core):
+        """Test a failing judge leaves the heuristic decision."""
+        service.judge_model = 'judge'
+        error = Exception('down')
+        core.async_ollama_client.generate = AsyncMock(side_effect=error)
+        decision = await service.route('Why is it blue?', ['concise'])
+        assert decision['tier'] == 'medium'
+        core.model_health.record_failure.assert_called_once_with(
+            'judge', error
+        )
+
+    @pytest.mark.asyncio
+    async def test_judge_skipped_when_failing_fast(self, service, core):
+        """Test a judge model that fails fast isn't called."""
+        service.judge_model = 'judge'
+        core.model_health.check.side_effect = Exception('unavailable')
+        decision = await service.route('Why is it blue?', ['concise'])
+        assert decision['tier'] == 'medium'
+        core.async_ollama_client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_judge_timeout_falls_back(self, service, core):
+        """Test a slow judge is abandoned after the timeout."""
+        service.judge_model = 'judge'
+        service.judge_timeout = 0.01
+
+        async def slow(**kwargs):
+            await asyncio.sleep(1)
+            return {'response': 'complex'}
+
+        core.async_ollama_client.generate = slow
+        decision = await service.route('Why is it blue?', ['concise'])
+        assert decision['tier'] == 'medium'
+        # A timeout isn't the judge model's failure
+        core.model_health.record_failure.assert_not_called()
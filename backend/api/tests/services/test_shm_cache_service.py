@@ -0,0 +1,141 @@
+import fcntl
+import multiprocessing
+import os
+
+import pytest
+
+from api.services.shm_cache_service import SharedMemoryCache
+
+
+def _write_from_child(path: str, key: str, value: str):
+    """Store a value from another process."""
+    cache = SharedMemoryCache(path=path, slots=64, slot_bytes=256)
+    cache.set(key, value, 60)
+    cache.close()
+
+
+def _hold_set_lock(path, start, length, locked, release):
+    """Hold a set's write lock from another process until released."""
+    fd = os.open(path, os.O_RDWR)
+    fcntl.lockf(fd, fcntl.LOCK_EX, length, start)
+    locked.set()
+    release.wait(10)
+    os.close(fd)
+
+
+class TestSharedMemoryCache:
+    """Test suite for SharedMemoryCache."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Backing file path in a temporary directory."""
+        return str(tmp_path / 'shm-cache')
+
+    @pytest.fixture
+    def cache(self, path):
+        """Create a small shared cache."""
+        cache = SharedMemoryCache(path=path, slots=64, slot_bytes=256)
+        yield cache
+        cache.close()
+
+    def test_disabled_without_path(self, monkeypatch):
+        """Test the cache is disabled when no path is configured."""
+        monkeypatch.delenv('SHM_CACHE_PATH', raising=False)
+        assert SharedMemoryCache().enabled is False
+
+    def test_set_and_get(self, cache):
+        """Test values round-trip."""
+        assert cache.get('llm:k') is None
+        assert cache.set('llm:k', '{"response": "hi"}', 60) is True
+        assert cache.get('llm:k') == '{"response": "hi"}'
+
+    def test_overwrite(self, cache):
+        """Test writing a key again replaces its value."""
+        cache.set('llm:k', 'first', 60)
+        cache.set('llm:k', 'second', 60)
+        assert cache.get('llm:k') == 'second'
+
+    def test_expiry(self, cache):
+        """Test expired entries are not returned."""
+        cache.set('llm:k', 'value', -1)
+        assert cache.get('llm:k') is None
+
+    def test_oversized_values_are_skipped(self, cache):
+        """Test values larger than a chunk are not stored."""
+        assert cache.set('llm:k', 'x' * 257, 60) is False
+        assert cache.get('llm:k') is None
+
+    def test_bounded_size_with_replacement(self, cache):
+        """Test the table stays bounded and recent writes are readable."""
+        for i in range(1000):
+            cache.set(f'llm:{i}', str(i), 60)
+        hits = sum(cache.get(f'llm:{i}') == str(i) for i in range(1000))
+        assert 0 < hits <= cache.slots
+        assert cache.get('llm:999') == '999'
+
+    def test_clear(self, cache):
+        """Test clear invalidates every entry."""
+        cache.set('llm:k', 'value', 60)
+        cache.clear()
+        assert cache.get('llm:k') is None
+
+    def test_shared_between_instances(self, cache, path):
+        """Test a second mapping of the file sees the same entries."""
+        other = SharedMemoryCache(path=path, slots=64, slot_bytes=256)
+        cache.set('llm:k', 'value', 60)
+        assert other.get('llm:k') == 'value'
+        other.close()
+
+    def test_shared_between_processes(self, cache, path):
+        """Test entries written by another process are readable."""
+        cache.get('llm:warm')  # Map the file before the child does
+        process = multiprocessing.get_context('fork').Process(
+            target=_write_from_child, args=(path, 'llm:k', 'from child')
+        )
+        process.start()
+        process.join(timeout=10)
+        assert process.exitcode == 0
+        assert cache.get('llm:k') == 'from child'
+
+    def test_locked_set_skips_write(self, cache):
+        """Test a write to a set another process holds doesn't wait."""
+        cache.get('llm:warm')  # Map and initialize the file
+        key_hi, _ = cache._hash('llm:k')
+        first = (key_hi % cache._sets) * cache.ways
+        context = multiprocessing.get_context('fork')
+        locked, release = context.Event(), context.Event()
+        start = cache._entry_offset(first)
+        length = cache._entry_offset(first + cache.ways) - start
+        process = context.Process(
+            target=_hold_set_lock,
+            args=(cache.file_path, start, length, locked, release),
+        )
+        process.start()
+        try:
+            assert locked.wait(10)
+            assert cache.set('llm:k', 'value', 60) is False
+            assert cache.busy_skips == 1
+        finally:
+            release.set()
+            process.join(timeout=10)
+        assert cache.set('llm:k', 'value', 60) is True
+        assert cache.get('llm:k') == 'value'
+
+    def test_layout_change_uses_new_file(self, cache, path):
+        """Test a different layout maps its own, empty file."""
+        cache.set('llm:k', 'value', 60)
+        resized = SharedMemoryCache(path=path, slots=128, slot_bytes=256)
+        assert resized.file_path != cache.file_path
+        assert resized.get('llm:k') is None
+        # The old mapping stays intact for workers still using it
+        assert cache.get('llm:k') == 'value'
+        assert os.path.getsize(cache.file_path) == cache.size
+        resized.close()
+
+    def test_reopen_keeps_entries(self, cache, path):
+        """Test remapping the same layout doesn't reset the table."""
+        cache.set('llm:k', 'value', 60)
+        cache.close()
+        reopened = SharedMemoryCache(path=path, slots=64, slot_bytes=256)
+        assert reopened.get('llm:k') == 'value'
+        reopened.close()
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.services.cache_service import get_cache_service
+from api.services.core_service import get_core_service
+from api.services.loop_monitor_service import get_loop_monitor
+
+
+class TestLifespan:
+    """Test suite for service construction and shutdown."""
+
+    def test_import_builds_no_services(self):
+        """Test importing the app doesn't construct any service."""
+        code = (
+            'import api.main\n'
+            'from api.services.cache_service import get_cache_service\n'
+            'from api.services.core_service import get_core_service\n'
+            'print(get_cache_service.cache_info().currsize'
+            ' + get_core_service.cache_info().currsize)\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip() == '0'
+
+    def test_startup_builds_and_shutdown_releases(self):
+        """Test the lifespan builds services and drops them on exit."""
+        get_cache_service.cache_clear()
+        get_core_service.cache_clear()
+        with TestClient(app):
+            assert get_cache_service.cache_info().currsize == 1
+            core = get_core_service()
+        assert get_cache_service.cache_info().currsize == 0
+        assert get_core_service() is not core
+        get_core_service.cache_clear()
+
+    def test_lifespan_runs_loop_monitor(self):
+        """Test the event loop monitor runs while the app is up."""
+        get_loop_monitor.cache_clear()
+        with TestClient(app) as client:
+            monitor = get_loop_monitor()
+            assert monitor.running
+            data = client.get('/v1/metrics').json()
+            assert data['event_loop']['running'] is True
+        assert not monitor.running
+        assert get_loop_monitor() is not monitor
+        get_loop_monitor.cache_clear()
@@ -0,0 +1,20 @@
+from fastapi.responses import JSONResponse
+
+from api.responses import FastJSONResponse
+
+
+class TestFastJSONResponse:
+    """Test suite for the default response class."""
+
+    def test_body_matches_json_response(self):
+        """Test the body is byte-identical to Starlette's encoder."""
+        content = {
+            'status': 'healthy',
+            'available_models': ['llama3.2', 'mistral'],
+            'response': 'Grüße',
+            'done': True,
+            'route': None,
+        }
+        response = FastJSONResponse(content)
+        assert response.body == JSONResponse(content).body
+        assert response.headers['content-type'] == 'application/json'
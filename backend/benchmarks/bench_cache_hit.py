@@ -0,0 +1,94 @@
+"""Benchmark the cache-hit path: parsed and re-encoded vs. stored body.
+
+Usage:
+    uv run python -m benchmarks.bench_cache_hit [--iterations 20000]
+
+Runs both hit paths against the in-memory backend for a few answer
+sizes. The model path is what `ask` did before: parse the cached JSON,
+build an `AskResponse`, then let FastAPI validate the response model
+and encode it. The raw path sends the stored body as it is. Reports
+wall and CPU time per hit.
+"""
+import argparse
+import asyncio
+import time
+from typing import Union
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from api.models.chats.ask_model import AskMultiResponse, AskResponse
+from api.services.backends.memory_backend import MemoryBackend
+from api.services.cache_service import CacheService
+
+
+MODEL = 'llama3.2'
+MODE = 'concise'
+SIZES = (64, 2048, 16384)
+
+# What FastAPI does with a returned model for the route's response_model
+_adapter = TypeAdapter(Union[AskResponse, AskMultiResponse])
+
+
+async def _model_hit(service: CacheService, prompt: str) -> bytes:
+    cached = await service.get_cached_response(MODEL, prompt, MODE)
+    answer = AskResponse(
+        model=MODEL,
+        response=cached.get('response', ''),
+        created_at=cached.get('created_at', ''),
+        done=cached.get('done', True),
+        mode=MODE,
+    )
+    validated = _adapter.validate_python(answer.model_dump())
+    content = _adapter.dump_python(validated, mode='json')
+    return JSONResponse(content).body
+
+
+async def _raw_hit(service: CacheService, prompt: str) -> bytes:
+    body = await service.get_cached_body(MODEL, prompt, MODE)
+    return Response(content=body, media_type='application/json').body
+
+
+async def _measure(func, service, prompt, iterations) -> tuple[float, float]:
+    """Return wall and CPU microseconds per call."""
+    for _ in range(iterations // 10):
+        await func(service, prompt)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(iterations):
+        await func(service, prompt)
+    return (
+        (time.perf_counter() - wall) / iterations * 1e6,
+        (time.process_time() - cpu) / iterations * 1e6,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    service = CacheService(backend=MemoryBackend())
+    print(f'iterations: {args.iterations}')
+    print(f'{"answer":>8}{"path":>8}{"wall":>12}{"cpu":>12}')
+    for size in SIZES:
+        prompt = f'prompt-{size}'
+        answer = AskResponse(
+            model=MODEL, response='x' * size,
+            created_at='2025-11-01T12:00:00Z', done=True, mode=MODE,
+        )
+        await service.cache_response(
+            MODEL, prompt, answer.model_dump(exclude={'route'}), MODE
+        )
+        model_body = await _model_hit(service, prompt)
+        raw_body = await _raw_hit(service, prompt)
+        assert AskResponse.model_validate_json(model_body) \
+            == AskResponse.model_validate_json(raw_body)
+        for name, func in (('model', _model_hit), ('raw', _raw_hit)):
+            wall, cpu = await _measure(
+                func, service, prompt, args.iterations
+            )
+            print(f'{size:>7}B{name:>8}{wall:>9.1f} us{cpu:>9.1f} us')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
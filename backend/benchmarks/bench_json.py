@@ -0,0 +1,117 @@
+"""Benchmark JSON encoding of API responses and cache entries.
+
+Usage:
+    uv run python -m benchmarks.bench_json [--iterations 20000]
+
+Compares the stdlib encoder behind Starlette's `JSONResponse` with the
+shared serializer (`api.services.json_service`) used by
+`FastJSONResponse` and `CacheService`. Payloads are `AskResponse`
+answers of a few sizes (with mixed ASCII and non-ASCII text, and a
+route decision) and a `HealthCheckResponse` listing pulled models.
+
+For each payload three steps are timed per call:
+
+- response: what FastAPI does after the route returns, i.e. dump the
+  model for the response_model and render the body
+- cache write: encode the answer dict for `cache_response`
+- cache read: decode a stored entry as `get_cached_response` does
+"""
+import argparse
+import json
+import time
+from typing import Union
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api.models.chats.ask_model import AskMultiResponse, AskResponse
+from api.models.generic_model import HealthCheckResponse
+from api.responses import FastJSONResponse
+from api.services import json_service
+
+
+SIZES = (64, 2048, 16384)
+TEXT = 'Large language models predict the next token. Grüße, café ☕. '
+
+_ask_adapter = TypeAdapter(Union[AskResponse, AskMultiResponse])
+_health_adapter = TypeAdapter(HealthCheckResponse)
+
+
+def _measure(func, iterations: int) -> float:
+    """Return microseconds per call."""
+    for _ in range(iterations // 10):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _payloads() -> list[tuple[str, object, TypeAdapter]]:
+    payloads = []
+    for size in SIZES:
+        answer = AskResponse(
+            model='llama3.2',
+            response=(TEXT * (size // len(TEXT) + 1))[:size],
+            created_at='2025-11-01T12:00:00.123456Z',
+            done=True,
+            mode='professional',
+            route={
+                'tier': 'medium', 'model': 'llama3.2',
+                'reason': 'long prompt in a demanding mode',
+            },
+        )
+        payloads.append((f'ask {size}B', answer, _ask_adapter))
+    health = HealthCheckResponse(
+        status='healthy', ollama='connected', redis='connected',
+        available_models=[
+            'llama3.2:latest', 'llama3.2:1b', 'llama3.1:8b',
+            'mistral:7b', 'nomic-embed-text:latest', 'qwen2.5:14b',
+        ],
+    )
+    payloads.append(('health', health, _health_adapter))
+    return payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    iterations = args.iterations
+
+    print(f'iterations: {iterations}, orjson: {json_service.FAST_JSON}')
+    print(f'{"payload":>12}{"step":>13}{"stdlib":>12}{"shared":>12}')
+    for name, model, adapter in _payloads():
+        content = adapter.dump_python(model, mode='json')
+        assert FastJSONResponse(content).body == JSONResponse(content).body
+        steps = {
+            'response': (
+                lambda: JSONResponse(
+                    adapter.dump_python(model, mode='json')
+                ).body,
+                lambda: FastJSONResponse(
+                    adapter.dump_python(model, mode='json')
+                ).body,
+            ),
+        }
+        if isinstance(model, AskResponse):
+            entry = model.model_dump(exclude={'route'})
+            stored = json.dumps(entry, separators=(',', ':'))
+            steps['cache write'] = (
+                lambda: json.dumps(entry, separators=(',', ':')),
+                lambda: json_service.dumps_str(entry),
+            )
+            steps['cache read'] = (
+                lambda: json.loads(stored),
+                lambda: json_service.loads(stored),
+            )
+        for step, (stdlib, shared) in steps.items():
+            print(
+                f'{name:>12}{step:>13}'
+                f'{_measure(stdlib, iterations):>9.2f} us'
+                f'{_measure(shared, iterations):>9.2f} us'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark the cost of structured logging on the request path.
+
+Usage:
+    uv run python -m benchmarks.bench_logging [--records 20000]
+
+Times `log_access` as the event loop would call it, per record, with:
+
+- sync: a JSON handler writing straight to a file, as naive logging
+  in the request path would
+- queued: `LogService`, which queues the record for a writer thread
+- a slow sink taking 1 ms per record (a blocked stdout pipe or a
+  remote collector), written to synchronously and through
+  `LogService`, which drops records instead of slowing the caller
+
+The queue has room for 1000 records, so a tight loop outruns even the
+fast sink; the drop count shows how many records were shed.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from api.services.config_service import Settings
+from api.services.logging_service import (
+    APP_LOGGER, JsonFormatter, LogService, log_access
+)
+
+
+def _log_many(records: int) -> float:
+    """Return microseconds per `log_access` call."""
+    start = time.perf_counter()
+    for i in range(records):
+        log_access(
+            'POST', '/v1/chats/ask', '/v1/chats/ask', 200,
+            0.0042, 'HIT', f'10.0.0.{i % 250}',
+        )
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def _slow(handler: logging.Handler) -> None:
+    emit = handler.emit
+    handler.emit = lambda record: (time.sleep(0.001), emit(record))
+
+
+def _sync(path: str, records: int, slow: bool) -> float:
+    logger = logging.getLogger(APP_LOGGER)
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(JsonFormatter())
+    if slow:
+        _slow(handler)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        return _log_many(records)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        logger.propagate = True
+
+
+def _queued(path: str, records: int, slow: bool) -> tuple[float, dict]:
+    service = LogService(settings=Settings(
+        log_path=path, log_queue_size=1000
+    ))
+    service.start()
+    if slow:
+        _slow(service._listener.handlers[0])
+    per_call = _log_many(records)
+    metrics = service.get_metrics()
+    service.close()
+    return per_call, metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'api.log')
+        print(f'records: {args.records}')
+        print(f'{"sink":>6}{"sync":>16}{"queued":>16}{"dropped":>10}')
+        for sink, slow in (('file', False), ('slow', True)):
+            # The slow synchronous run takes 1 ms per record
+            sync = _sync(
+                path, args.records // 20 if slow else args.records, slow
+            )
+            queued, metrics = _queued(path, args.records, slow)
+            print(
+                f'{sink:>6}{sync:>8.2f} us/rec{queued:>8.2f} us/rec'
+                f'{metrics["dropped"]:>10}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark prompt evaluation with the mode prompt inlined vs. as system.
+
+Usage:
+    uv run python -m benchmarks.bench_prompt_eval [--model llama3.2]
+
+Requires a running Ollama (OLLAMA_HOST). Sends the same series of
+different questions in one mode twice: first with the mode prompt glued
+onto the user prompt (the previous behaviour), then through Ollama's
+`system` field. Reports mean `prompt_eval_count` and
+`prompt_eval_duration`; with a stable system prefix Ollama can reuse the
+evaluated prefix and only evaluates the new question.
+"""
+import argparse
+import asyncio
+import statistics
+
+import ollama
+
+from api.models.chats.ask_model import AskMode
+from api.services.core_service import MODE_PROMPTS
+
+
+QUESTIONS = [
+    'What is the capital of France?',
+    'How many legs does a spider have?',
+    'What does HTTP stand for?',
+    'Who wrote Pride and Prejudice?',
+    'What is the boiling point of water at sea level?',
+    'What is a prime number?',
+    'Why is the sky blue?',
+    'What is the speed of light?',
+]
+
+
+async def _run(
+    client: ollama.AsyncClient, model: str, system_prompt: str,
+    inline: bool, num_predict: int,
+) -> list[tuple[int, float]]:
+    """Send every question and collect prompt eval count and ms."""
+    samples = []
+    for question in QUESTIONS:
+        if inline:
+            kwargs = {'prompt': f'{system_prompt}:\n\n{question}'}
+        else:
+            kwargs = {'prompt': question, 'system': system_prompt}
+        response = await client.generate(
+            model=model, options={'num_predict': num_predict}, **kwargs
+        )
+        samples.append((
+            response.get('prompt_eval_count') or 0,
+            (response.get('prompt_eval_duration') or 0) / 1e6,
+        ))
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='llama3.2')
+    parser.add_argument('--mode', default=AskMode.CONCISE)
+    parser.add_argument('--num-predict', type=int, default=8)
+    args = parser.parse_args()
+
+    client = ollama.AsyncClient()
+    system_prompt = MODE_PROMPTS[AskMode(args.mode)]
+    # Load the model so the first variant doesn't pay for it
+    await client.generate(model=args.model, prompt='hi',
+                          options={'num_predict': 1})
+
+    print(f'model: {args.model}, mode: {args.mode}, '
+          f'requests: {len(QUESTIONS)}')
+    print(f'{"variant":<12}{"prompt tokens":>16}{"prompt eval":>16}')
+    for name, inline in (('inline', True), ('system', False)):
+        samples = await _run(
+            client, args.model, system_prompt, inline, args.num_predict
+        )
+        # Skip the first request: it evaluates the full prefix either way
+        steady = samples[1:]
+        print(f'{name:<12}'
+              f'{statistics.mean(c for c, _ in steady):>16.1f}'
+              f'{statistics.mean(ms for _, ms in steady):>13.1f} ms')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Benchmark the shared-memory cache against a per-worker LRU.
+
+Usage:
+    uv run python -m benchmarks.bench_shm_cache [--workers 4]
+
+Reports hit latency for both caches and the memory needed to hold the
+same entries across all uvicorn workers: the shared cache is mapped
+once per host, while a per-worker LRU is duplicated in every worker.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from api.services.shm_cache_service import SharedMemoryCache
+
+
+class LRUCache:
+    """Minimal per-worker LRU cache used as the baseline."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+
+def _payload(i: int) -> str:
+    """A realistic cached AskResponse body (~1 KiB)."""
+    return json.dumps({
+        'model': 'llama3.2',
+        'response': f'Answer {i}: ' + 'lorem ipsum dolor sit amet ' * 36,
+        'created_at': '2025-11-01T12:00:00Z',
+        'done': True,
+        'mode': 'concise',
+    })
+
+
+def _time_hits(get, keys: list[str], rounds: int) -> float:
+    """Mean seconds per hit over `rounds` passes of `keys`."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            get(key)
+    return (time.perf_counter() - start) / (rounds * len(keys))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--entries', type=int, default=2048)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    keys = [f'llm:llama3.2:concise:{i:016x}' for i in range(args.entries)]
+    values = [_payload(i) for i in range(args.entries)]
+
+    tracemalloc.start()
+    lru = LRUCache(capacity=args.entries)
+    for i, key in enumerate(keys):
+        # Build values inside the trace: each worker holds its own copy
+        lru.set(key, _payload(i))
+    lru_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir(
+        '/dev/shm'
+    ) else None) as tmp:
+        shm = SharedMemoryCache(
+            path=os.path.join(tmp, 'cache'),
+            slots=args.entries,
+            slot_bytes=1536,
+        )
+        for key, value in zip(keys, values):
+            shm.set(key, value, 3600)
+        resident = [k for k in keys if shm.get(k) is not None]
+
+        lru_latency = _time_hits(lru.get, keys, args.rounds)
+        shm_latency = _time_hits(shm.get, resident, args.rounds)
+        shm_bytes = shm.size
+        shm.close()
+
+    print(f'entries: {args.entries} (~{len(values[0])} B each), '
+          f'workers: {args.workers}')
+    print(f'{"cache":<22}{"hit latency":>14}{"memory per host":>18}')
+    print(f'{"per-worker LRU":<22}{lru_latency * 1e6:>11.2f} us'
+          f'{lru_bytes * args.workers / 2**20:>15.1f} MiB')
+    print(f'{"shared memory":<22}{shm_latency * 1e6:>11.2f} us'
+          f'{shm_bytes / 2**20:>15.1f} MiB')
+    print(f'shared-memory residency: {len(resident)}/{args.entries}')
+
+
+if __name__ == '__main__':
+    main()
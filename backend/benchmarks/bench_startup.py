@@ -0,0 +1,73 @@
+"""Benchmark cold start: importing the app and running its startup.
+
+Usage:
+    uv run python -m benchmarks.bench_startup [--runs 10]
+
+Each run starts a fresh interpreter, so module caches and service
+singletons are cold as they are in a newly scheduled replica. Reports
+the median and worst time to import `api.main`, to run the lifespan
+startup (building the services) and to serve the first request to
+`/v1/`. No Redis or Ollama is needed: clients connect on first use.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+_CHILD = '''
+import asyncio, json, time
+start = time.perf_counter()
+from api.main import app
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://bench'
+        ) as client:
+            (await client.get('/v1/')).raise_for_status()
+        served = time.perf_counter()
+    return started, served
+
+started, served = asyncio.run(main())
+print(json.dumps({
+    'import': imported - start,
+    'startup': started - imported,
+    'first_request': served - started,
+}))
+'''
+
+
+def _run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', _CHILD],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    # One untimed run warms the OS page cache and bytecode files
+    _run_once()
+    samples = [_run_once() for _ in range(args.runs)]
+    print(f'runs: {args.runs}')
+    print(f'{"phase":>14}{"median":>12}{"max":>12}')
+    for phase in ('import', 'startup', 'first_request'):
+        values = [sample[phase] * 1000 for sample in samples]
+        print(
+            f'{phase:>14}{statistics.median(values):>9.1f} ms'
+            f'{max(values):>9.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Replay captured chat requests against a running server.
+
+Usage:
+    uv run python -m benchmarks.replay_capture captures/requests.jsonl* \
+        [--target http://localhost:8000] [--speed 1] [--limit 1000]
+
+Reads JSONL files written by the capture middleware (CAPTURE_PATH) and
+re-issues each request with its original method, query and body and
+its original spacing, divided by --speed
+(--speed 0 sends them back to back). Reports latency percentiles,
+status codes and the cache hit ratio from the X-Cache header, so two
+builds can be compared on the same production-shaped traffic.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def _load(paths: list[str], limit: int) -> list[dict]:
+    """Read capture records, oldest first."""
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record['ts'])
+    return records[:limit] if limit else records
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    index = max(0, int(round(pct / 100 * len(samples))) - 1)
+    return samples[min(index, len(samples) - 1)]
+
+
+async def _send(
+    client: httpx.AsyncClient, record: dict, results: list
+) -> None:
+    """Send one request and record latency, status and cache outcome."""
+    # Records from before methods were captured are all POSTs
+    method = record.get('method', 'POST')
+    start = time.perf_counter()
+    try:
+        response = await client.request(
+            method,
+            record['path'],
+            params=record.get('query') or None,
+            json=None if method in ('GET', 'HEAD') else record['body'],
+        )
+        status, cache = response.status_code, response.headers.get(
+            'X-Cache'
+        )
+    except httpx.HTTPError as e:
+        status, cache = type(e).__name__, None
+    results.append((time.perf_counter() - start, status, cache))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--target', default='http://localhost:8000')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--limit', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    records = _load(args.files, args.limit)
+    if not records:
+        print('no records')
+        return
+
+    results: list = []
+    async with httpx.AsyncClient(
+        base_url=args.target, timeout=args.timeout
+    ) as client:
+        tasks = []
+        origin = records[0]['ts']
+        start = time.perf_counter()
+        for record in records:
+            if args.speed > 0:
+                due = (record['ts'] - origin) / args.speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(client, record, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _, _ in results)
+    statuses = Counter(status for _, status, _ in results)
+    cache = Counter(c for _, _, c in results if c)
+    looked_up = sum(cache.values())
+
+    print(f'target: {args.target}, speed: {args.speed}x, '
+          f'requests: {len(results)}, elapsed: {elapsed:.1f} s')
+    print(f'throughput: {len(results) / elapsed:.1f} req/s')
+    print('latency ms: ' + ', '.join(
+        f'p{pct}={_percentile(latencies, pct):.1f}'
+        for pct in (50, 90, 95, 99)
+    ) + f', max={latencies[-1]:.1f}, mean={statistics.mean(latencies):.1f}')
+    print('status: ' + ', '.join(
+        f'{status}={count}' for status, count in sorted(
+            statuses.items(), key=lambda item: str(item[0])
+        )
+    ))
+    if looked_up:
+        print(f'cache hit ratio: {cache["HIT"] / looked_up:.1%} '
+              f'({dict(cache)})')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())